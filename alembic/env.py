@@ -7,6 +7,7 @@ from openfatture.payment.domain import models as payment_models
 from openfatture.platform.config import Settings
 from openfatture.storage.database import models as storage_models
 from openfatture.storage.database.base import Base
+from openfatture.storage.search import SEARCH_TABLES
 
 # Touch imported model modules so SQLAlchemy metadata is fully populated for
 # Alembic autogenerate (side-effect imports, intentionally retained).
@@ -29,6 +30,14 @@ if config.config_file_name is not None:
 # Set target_metadata from SQLAlchemy Base
 target_metadata = Base.metadata
 
+
+def include_name(name: str | None, type_: str, parent_names: dict) -> bool:
+    """Skip the FTS5 search tables (and their shadow tables) in autogenerate."""
+    if type_ == "table" and name:
+        return not any(name.startswith(table.name) for table in SEARCH_TABLES)
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -51,6 +60,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -73,7 +83,9 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection, target_metadata=target_metadata, include_name=include_name
+        )
 
         with context.begin_transaction():
             context.run_migrations()
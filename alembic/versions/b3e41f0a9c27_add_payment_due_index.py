@@ -0,0 +1,71 @@
+"""add_payment_due_index
+
+Revision ID: b3e41f0a9c27
+Revises: 692d8837
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e41f0a9c27"
+down_revision: str | Sequence[str] | None = "692d8837"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+STATI_PAGAMENTO = ("DA_PAGARE", "PAGATO_PARZIALE", "PAGATO", "SCADUTO")
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add the materialized payment due-date index.
+
+    One row per outstanding payment with residual and aging bucket, kept in sync
+    on flush and re-aged nightly, so due-date reports stop scanning pagamenti.
+    """
+    op.create_table(
+        "payment_due_index",
+        sa.Column("payment_id", sa.Integer(), nullable=False),
+        sa.Column("fattura_id", sa.Integer(), nullable=False),
+        sa.Column("data_scadenza", sa.Date(), nullable=False),
+        sa.Column("importo", sa.Numeric(10, 2), nullable=False),
+        sa.Column("importo_pagato", sa.Numeric(10, 2), nullable=False),
+        sa.Column("residuo", sa.Numeric(10, 2), nullable=False),
+        sa.Column("stato", sa.Enum(*STATI_PAGAMENTO, name="statopagamento"), nullable=False),
+        sa.Column("aging_bucket", sa.String(16), nullable=False),
+        sa.Column("aging_as_of", sa.Date(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["payment_id"],
+            ["pagamenti.id"],
+            name="fk_payment_due_index_payment_id_pagamenti",
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["fattura_id"], ["fatture.id"], name="fk_payment_due_index_fattura_id_fatture"
+        ),
+        sa.PrimaryKeyConstraint("payment_id", name="pk_payment_due_index"),
+    )
+    op.create_index("ix_payment_due_index_data_scadenza", "payment_due_index", ["data_scadenza"])
+    op.create_index("ix_payment_due_index_fattura_id", "payment_due_index", ["fattura_id"])
+    op.create_index(
+        "ix_payment_due_index_bucket_due", "payment_due_index", ["aging_bucket", "data_scadenza"]
+    )
+
+    # Backfill from existing payments
+    from openfatture.payment.infrastructure.due_index import rebuild_payment_due_index
+
+    rebuild_payment_due_index(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove the payment due-date index."""
+    op.drop_index("ix_payment_due_index_bucket_due", table_name="payment_due_index")
+    op.drop_index("ix_payment_due_index_fattura_id", table_name="payment_due_index")
+    op.drop_index("ix_payment_due_index_data_scadenza", table_name="payment_due_index")
+    op.drop_table("payment_due_index")
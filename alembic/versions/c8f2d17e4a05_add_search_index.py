@@ -0,0 +1,35 @@
+"""add_search_index
+
+Revision ID: c8f2d17e4a05
+Revises: b3e41f0a9c27
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c8f2d17e4a05"
+down_revision: str | Sequence[str] | None = "b3e41f0a9c27"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add the FTS5 search tables (SQLite only).
+
+    Creates and backfills the trigram-tokenized mirror tables of clients,
+    products and invoices. Other databases keep the LIKE-based search.
+    """
+    from openfatture.storage.search import create_search_tables
+
+    create_search_tables(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove the FTS5 search tables."""
+    from openfatture.storage.search import drop_search_tables
+
+    drop_search_tables(op.get_bind())
@@ -0,0 +1,55 @@
+"""add_cliente_aggregates
+
+Revision ID: d4a9b2c61e37
+Revises: c8f2d17e4a05
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a9b2c61e37"
+down_revision: str | Sequence[str] | None = "c8f2d17e4a05"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add denormalized per-client totals.
+
+    One row per client with invoice count, invoiced total, outstanding balance,
+    last invoice date and average days-to-pay, maintained on every flush.
+    """
+    op.create_table(
+        "cliente_aggregates",
+        sa.Column("cliente_id", sa.Integer(), nullable=False),
+        sa.Column("num_fatture", sa.Integer(), nullable=False),
+        sa.Column("totale_fatturato", sa.Numeric(12, 2), nullable=False),
+        sa.Column("residuo", sa.Numeric(12, 2), nullable=False),
+        sa.Column("ultima_fattura", sa.Date(), nullable=True),
+        sa.Column("giorni_medi_pagamento", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["cliente_id"],
+            ["clienti.id"],
+            name="fk_cliente_aggregates_cliente_id_clienti",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("cliente_id", name="pk_cliente_aggregates"),
+    )
+
+    # Backfill from existing invoices and payments
+    from openfatture.storage.client_aggregates import rebuild_client_aggregates
+
+    rebuild_client_aggregates(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove the per-client totals."""
+    op.drop_table("cliente_aggregates")
@@ -0,0 +1,54 @@
+"""add_event_rollups
+
+Revision ID: e7c3a5f18b92
+Revises: d4a9b2c61e37
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7c3a5f18b92"
+down_revision: str | Sequence[str] | None = "d4a9b2c61e37"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add hourly event rollups and the event payload search table.
+
+    One row per (hour, event type, entity type) with its event count, maintained
+    on every flush, so activity reports stop scanning event_log. On SQLite the
+    event payloads are also mirrored into an FTS5 trigram table.
+    """
+    op.create_table(
+        "event_rollups",
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("event_type", sa.String(100), nullable=False),
+        sa.Column("entity_type", sa.String(50), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "bucket_start", "event_type", "entity_type", name="pk_event_rollups"
+        ),
+    )
+
+    # Backfill from the existing event log
+    from openfatture.storage.event_rollups import rebuild_event_rollups
+    from openfatture.storage.search import create_search_tables
+
+    rebuild_event_rollups(op.get_bind())
+    create_search_tables(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove the event rollups and the event payload search table."""
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS search_events")
+    op.drop_table("event_rollups")
@@ -22,7 +22,7 @@ from openfatture.ai.streaming import StreamEvent
 from openfatture.ai.tools import ToolRegistry, get_tool_registry
 from openfatture.platform.config import DebugConfig
 from openfatture.platform.logging import get_dynamic_logger, get_logger
-from openfatture.platform.metrics import MetricsTimer, get_metrics_collector, record_ai_request
+from openfatture.platform.metrics import MetricsTimer, get_metrics_collector
 
 logger = get_logger(__name__)
 
@@ -123,14 +123,6 @@ class ChatAgent(BaseAgent[ChatContext]):
                 collector.increment_counter(
                     "chat_agent_executions", tags={"agent": self.config.name, "success": "true"}
                 )
-                if response.usage is not None:
-                    record_ai_request(
-                        provider=self.provider.provider_name,
-                        model=self.provider.model,
-                        tokens=response.usage.total_tokens,
-                        duration_ms=0,
-                        success=True,
-                    )
                 return response
             except Exception as e:
                 collector.increment_counter(
@@ -24,6 +24,7 @@ Example Usage:
     >>> reports = await checker.check_batch([123, 124, 125])
 """
 
+from openfatture.ai.agents.compliance.batch import BatchComplianceEngine
 from openfatture.ai.agents.compliance.checker import (
     ComplianceChecker,
     ComplianceLevel,
@@ -42,6 +43,7 @@ from openfatture.ai.agents.compliance.rules import (
 from openfatture.ai.agents.compliance.sdi_patterns import (
     SDIErrorCode,
     SDIPatternDatabase,
+    SDIPatternMatcher,
     SDIRejectionPattern,
 )
 
@@ -50,6 +52,7 @@ __all__ = [
     "ComplianceChecker",
     "ComplianceReport",
     "ComplianceLevel",
+    "BatchComplianceEngine",
     # Rules Engine
     "ComplianceRulesEngine",
     "ValidationResult",
@@ -57,6 +60,7 @@ __all__ = [
     "ValidationSeverity",
     # SDI Patterns
     "SDIPatternDatabase",
+    "SDIPatternMatcher",
     "SDIRejectionPattern",
     "SDIErrorCode",
     # AI Heuristics
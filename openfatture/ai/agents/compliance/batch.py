@@ -0,0 +1,267 @@
+"""Batch compliance checking.
+
+Checking invoices one by one opens a session per invoice, loads lines, payments
+and client lazily and runs one history query per invoice. For month-end batches
+:class:`BatchComplianceEngine` instead:
+
+- loads the invoices with lines, payments and clients in a few set-based queries
+- loads the client histories of the whole batch with one window query
+- runs the deterministic checks in a single pass, validating each client and
+  matching its SDI patterns once
+- asks the AI provider to review the descriptions only for the invoices with
+  errors or warnings, with a cap on concurrent requests
+
+Reports are the same as :meth:`ComplianceChecker.check_invoice`, except that
+invoices without errors or warnings skip the AI description review.
+
+Example:
+    >>> checker = ComplianceChecker(level=ComplianceLevel.ADVANCED)
+    >>> engine = BatchComplianceEngine(checker, review_concurrency=4)
+    >>> reports = await engine.check(invoice_ids)
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator, Sequence
+from typing import TYPE_CHECKING
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session, aliased, selectinload
+
+from openfatture.ai.agents.compliance.heuristics import HeuristicAnalysis
+from openfatture.ai.agents.compliance.rules import ValidationIssue, ValidationSeverity
+from openfatture.platform.logging import get_logger
+from openfatture.storage.database.base import get_session
+from openfatture.storage.database.models import Fattura
+
+if TYPE_CHECKING:
+    from openfatture.ai.agents.compliance.checker import ComplianceChecker, ComplianceReport
+
+logger = get_logger(__name__)
+
+_FLAGGED_SEVERITIES = (ValidationSeverity.ERROR, ValidationSeverity.WARNING)
+
+
+def _chunks(ids: Sequence[int], size: int) -> Iterator[Sequence[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+class BatchComplianceEngine:
+    """Check many invoices with shared preloading.
+
+    Example:
+        >>> engine = BatchComplianceEngine(checker)
+        >>> reports = await engine.check([123, 124, 125])
+        >>> failed = [r for r in reports.values() if not r.is_compliant]
+    """
+
+    def __init__(
+        self,
+        checker: ComplianceChecker,
+        review_concurrency: int = 4,
+        history_limit: int = 10,
+        chunk_size: int = 500,
+    ) -> None:
+        """Initialize the batch engine.
+
+        Args:
+            checker: Checker providing the rules, patterns and AI analyzer
+            review_concurrency: Maximum concurrent AI description reviews
+            history_limit: Previous invoices of the client used by the heuristics
+            chunk_size: Invoice ids per ``IN`` query
+
+        Raises:
+            ValueError: If review_concurrency, history_limit or chunk_size < 1
+        """
+        for name, value in (
+            ("review_concurrency", review_concurrency),
+            ("history_limit", history_limit),
+            ("chunk_size", chunk_size),
+        ):
+            if value < 1:
+                raise ValueError(f"Invalid {name}: {value} (must be positive)")
+
+        self.checker = checker
+        self.review_concurrency = review_concurrency
+        self.history_limit = history_limit
+        self.chunk_size = chunk_size
+
+    async def check(self, invoice_ids: list[int]) -> dict[int, ComplianceReport]:
+        """Check the invoices of a batch.
+
+        Args:
+            invoice_ids: Invoice IDs
+
+        Returns:
+            Dictionary mapping invoice IDs to reports, in input order; invoices
+            that are missing or fail the check are logged and left out
+        """
+        logger.info("batch_compliance_check_started", count=len(invoice_ids))
+        ids = list(dict.fromkeys(invoice_ids))
+
+        db = get_session()
+        try:
+            fatture = self._load_invoices(db, ids)
+            for invoice_id in ids:
+                if invoice_id not in fatture:
+                    logger.error(
+                        "invoice_check_failed",
+                        invoice_id=invoice_id,
+                        error=f"Invoice {invoice_id} not found",
+                    )
+
+            reports = self._check_rules(fatture)
+
+            reviewed = 0
+            if self.checker.ai_analyzer is not None:
+                histories = self._load_histories(db, list(reports))
+                reviewed = await self._analyze(fatture, histories, reports)
+
+            results: dict[int, ComplianceReport] = {}
+            for invoice_id in ids:
+                report = reports.get(invoice_id)
+                if report is not None:
+                    self.checker._finalize(report)
+                    results[invoice_id] = report
+        finally:
+            db.close()
+
+        logger.info("batch_compliance_check_completed", count=len(results), reviewed=reviewed)
+        return results
+
+    def _load_invoices(self, db: Session, ids: list[int]) -> dict[int, Fattura]:
+        """Load the invoices with lines, payments and client."""
+        fatture: dict[int, Fattura] = {}
+        for chunk in _chunks(ids, self.chunk_size):
+            query = (
+                select(Fattura)
+                .where(Fattura.id.in_(chunk))
+                .options(
+                    selectinload(Fattura.righe),
+                    selectinload(Fattura.pagamenti),
+                    selectinload(Fattura.cliente),
+                )
+            )
+            fatture.update((f.id, f) for f in db.scalars(query))
+        return fatture
+
+    def _load_histories(self, db: Session, ids: list[int]) -> dict[int, list[Fattura]]:
+        """Load the previous invoices of each client, newest first.
+
+        One window query ranks the previous invoices of the same client for
+        every invoice of the batch; the ranked invoices are then loaded once.
+        """
+        target = aliased(Fattura)
+        history = aliased(Fattura)
+        pairs: list[tuple[int, int]] = []
+
+        for chunk in _chunks(ids, self.chunk_size):
+            ranked = (
+                select(
+                    target.id.label("target_id"),
+                    history.id.label("history_id"),
+                    func.row_number()
+                    .over(
+                        partition_by=target.id,
+                        order_by=(history.data_emissione.desc(), history.id.desc()),
+                    )
+                    .label("rank"),
+                )
+                .join(
+                    history,
+                    and_(
+                        history.cliente_id == target.cliente_id,
+                        history.id != target.id,
+                        history.data_emissione < target.data_emissione,
+                    ),
+                )
+                .where(target.id.in_(chunk))
+                .subquery()
+            )
+            top_ranked = (
+                select(ranked.c.target_id, ranked.c.history_id)
+                .where(ranked.c.rank <= self.history_limit)
+                .order_by(ranked.c.target_id, ranked.c.rank)
+            )
+            pairs.extend((row.target_id, row.history_id) for row in db.execute(top_ranked))
+
+        history_ids = list({history_id for _, history_id in pairs})
+        loaded: dict[int, Fattura] = {}
+        for chunk in _chunks(history_ids, self.chunk_size):
+            query = (
+                select(Fattura)
+                .where(Fattura.id.in_(chunk))
+                .options(selectinload(Fattura.righe), selectinload(Fattura.pagamenti))
+            )
+            loaded.update((f.id, f) for f in db.scalars(query))
+
+        histories: dict[int, list[Fattura]] = {invoice_id: [] for invoice_id in ids}
+        for target_id, history_id in pairs:
+            histories[target_id].append(loaded[history_id])
+        return histories
+
+    def _check_rules(self, fatture: dict[int, Fattura]) -> dict[int, ComplianceReport]:
+        """Run the deterministic checks, validating each client once."""
+        client_issues: dict[int, list[ValidationIssue]] = {}
+        client_patterns: dict[int, frozenset[int]] = {}
+        reports: dict[int, ComplianceReport] = {}
+
+        for invoice_id, fattura in fatture.items():
+            try:
+                issues = client_issues.get(fattura.cliente_id)
+                if issues is None:
+                    issues = self.checker.rules_engine.validate_client(fattura.cliente)
+                    client_issues[fattura.cliente_id] = issues
+                reports[invoice_id] = self.checker._check_rules(fattura, issues, client_patterns)
+            except Exception as e:
+                logger.error("invoice_check_failed", invoice_id=invoice_id, error=str(e))
+
+        return reports
+
+    async def _analyze(
+        self,
+        fatture: dict[int, Fattura],
+        histories: dict[int, list[Fattura]],
+        reports: dict[int, ComplianceReport],
+    ) -> int:
+        """Run the heuristics, reviewing descriptions only for flagged invoices.
+
+        Returns:
+            Number of AI description reviews
+        """
+        analyzer = self.checker.ai_analyzer
+        assert analyzer is not None, "AI analyzer should be initialized"
+
+        analyses: dict[int, HeuristicAnalysis] = {}
+        for invoice_id in list(reports):
+            try:
+                analyses[invoice_id] = await analyzer.analyze_invoice(
+                    fatture[invoice_id], histories[invoice_id], review_descriptions=False
+                )
+            except Exception as e:
+                logger.error("invoice_check_failed", invoice_id=invoice_id, error=str(e))
+                del reports[invoice_id]
+
+        flagged = [
+            invoice_id
+            for invoice_id, analysis in analyses.items()
+            if fatture[invoice_id].righe
+            and any(
+                issue.severity in _FLAGGED_SEVERITIES
+                for issue in (*reports[invoice_id].validation_issues, *analysis.anomalies_found)
+            )
+        ]
+        semaphore = asyncio.Semaphore(self.review_concurrency)
+
+        async def review(invoice_id: int) -> None:
+            async with semaphore:
+                await analyzer.review_descriptions(fatture[invoice_id], analyses[invoice_id])
+
+        await asyncio.gather(*(review(invoice_id) for invoice_id in flagged))
+
+        for invoice_id, analysis in analyses.items():
+            self.checker._apply_heuristics(reports[invoice_id], analysis)
+
+        return len(flagged)
@@ -16,8 +16,10 @@ from typing import Any
 
 from sqlalchemy.orm import Session
 
+from openfatture.ai.agents.compliance.batch import BatchComplianceEngine
 from openfatture.ai.agents.compliance.heuristics import (
     AIHeuristicAnalyzer,
+    HeuristicAnalysis,
 )
 from openfatture.ai.agents.compliance.rules import (
     ComplianceRulesEngine,
@@ -26,6 +28,7 @@ from openfatture.ai.agents.compliance.rules import (
 )
 from openfatture.ai.agents.compliance.sdi_patterns import (
     SDIPatternDatabase,
+    SDIPatternMatcher,
     SDIRejectionPattern,
 )
 from openfatture.platform.logging import get_logger
@@ -182,13 +185,16 @@ class ComplianceChecker:
 
         # Type annotations for optional components
         self.sdi_patterns: SDIPatternDatabase | None
+        self.pattern_matcher: SDIPatternMatcher | None
         self.ai_analyzer: AIHeuristicAnalyzer | None
 
         # Initialize SDI patterns (used for STANDARD and ADVANCED)
         if self.level in [ComplianceLevel.STANDARD, ComplianceLevel.ADVANCED]:
             self.sdi_patterns = SDIPatternDatabase()
+            self.pattern_matcher = SDIPatternMatcher(self.sdi_patterns.get_all_patterns())
         else:
             self.sdi_patterns = None
+            self.pattern_matcher = None
 
         # Initialize AI heuristics (used only for ADVANCED)
         if self.level == ComplianceLevel.ADVANCED:
@@ -237,40 +243,15 @@ class ComplianceChecker:
                 level=self.level.value,
             )
 
-            # Create report
-            report = ComplianceReport(
-                invoice_id=invoice_id,
-                invoice_number=f"{fattura.numero}/{fattura.anno}",
-                timestamp=datetime.now(),
-                is_compliant=True,
-                compliance_score=100.0,
-                level=self.level,
-            )
-
-            # 1. Run rules engine validation
-            validation_result = self.rules_engine.validate_invoice(fattura)
-            report.validation_issues = validation_result.issues
-            report.is_compliant = validation_result.is_valid
-            report.compliance_score = validation_result.score
+            report = self._check_rules(fattura)
 
-            # 2. Match SDI patterns (if enabled)
-            if self.sdi_patterns:
-                self._match_sdi_patterns(fattura, report)
-
-            # 3. Run AI heuristic analysis (if enabled)
+            # Run AI heuristic analysis (if enabled)
             if self.ai_analyzer and include_history:
                 client_history = self._get_client_history(db, fattura)
                 heuristic_analysis = await self.ai_analyzer.analyze_invoice(fattura, client_history)
+                self._apply_heuristics(report, heuristic_analysis)
 
-                report.heuristic_anomalies = heuristic_analysis.anomalies_found
-                report.risk_score = heuristic_analysis.risk_score
-                report.recommendations.extend(heuristic_analysis.suggestions)
-
-            # 4. Generate recommendations
-            self._generate_recommendations(report)
-
-            # 5. Calculate final scores
-            self._calculate_final_scores(report)
+            self._finalize(report)
 
             logger.info(
                 "compliance_check_completed",
@@ -287,22 +268,66 @@ class ComplianceChecker:
         finally:
             db.close()
 
-    def _match_sdi_patterns(self, fattura: Fattura, report: ComplianceReport) -> None:
-        """Match invoice against known SDI rejection patterns."""
+    def _check_rules(
+        self,
+        fattura: Fattura,
+        client_issues: list[ValidationIssue] | None = None,
+        client_cache: dict[int, frozenset[int]] | None = None,
+    ) -> ComplianceReport:
+        """Run the deterministic checks (rules engine and SDI patterns).
+
+        Args:
+            fattura: Invoice with client and lines loaded
+            client_issues: Precomputed client issues (see ``validate_client``)
+            client_cache: Client pattern results shared across a batch
+
+        Returns:
+            Report with the deterministic findings
+        """
+        report = ComplianceReport(
+            invoice_id=fattura.id,
+            invoice_number=f"{fattura.numero}/{fattura.anno}",
+            timestamp=datetime.now(),
+            is_compliant=True,
+            compliance_score=100.0,
+            level=self.level,
+        )
+
+        # 1. Run rules engine validation
+        validation_result = self.rules_engine.validate_invoice(fattura, client_issues)
+        report.validation_issues = validation_result.issues
+        report.is_compliant = validation_result.is_valid
+        report.compliance_score = validation_result.score
+
+        # 2. Match SDI patterns (if enabled)
+        if self.pattern_matcher:
+            self._match_sdi_patterns(fattura, report, client_cache)
 
-        # Type guard: ensure sdi_patterns is initialized (called only when not None)
-        assert self.sdi_patterns is not None, "SDI patterns should be initialized"
+        return report
 
-        # Get all patterns
-        all_patterns = self.sdi_patterns.get_all_patterns()
+    def _apply_heuristics(self, report: ComplianceReport, analysis: HeuristicAnalysis) -> None:
+        """Add the heuristic analysis to the report."""
+        report.heuristic_anomalies = analysis.anomalies_found
+        report.risk_score = analysis.risk_score
+        report.recommendations.extend(analysis.suggestions)
 
-        matched_patterns = []
+    def _finalize(self, report: ComplianceReport) -> None:
+        """Generate recommendations and final scores."""
+        self._generate_recommendations(report)
+        self._calculate_final_scores(report)
 
-        for pattern in all_patterns:
-            # Check field-based patterns
-            if pattern.field_checks:
-                if self._pattern_matches_fields(fattura, pattern):
-                    matched_patterns.append(pattern)
+    def _match_sdi_patterns(
+        self,
+        fattura: Fattura,
+        report: ComplianceReport,
+        client_cache: dict[int, frozenset[int]] | None = None,
+    ) -> None:
+        """Match invoice against known SDI rejection patterns."""
+
+        # Type guard: ensure the matcher is initialized (called only when not None)
+        assert self.pattern_matcher is not None, "SDI patterns should be initialized"
+
+        matched_patterns = self.pattern_matcher.match(fattura, client_cache)
 
         report.sdi_pattern_matches = matched_patterns
 
@@ -329,31 +354,6 @@ class ComplianceChecker:
                     )
                 )
 
-    def _pattern_matches_fields(self, fattura: Fattura, pattern: SDIRejectionPattern) -> bool:
-        """Check if pattern matches invoice fields."""
-
-        # Simplified pattern matching (in production, use more sophisticated logic)
-        for field_check in pattern.field_checks:
-            if "cliente." in field_check:
-                field_name = field_check.replace("cliente.", "")
-                value = getattr(fattura.cliente, field_name, None)
-
-                # Check regex patterns
-                if value and pattern.compiled_patterns:
-                    for regex in pattern.compiled_patterns:
-                        if regex.match(str(value)):
-                            return True
-
-            elif "righe" in field_check:
-                # Check invoice lines
-                for riga in fattura.righe:
-                    if pattern.compiled_patterns:
-                        for regex in pattern.compiled_patterns:
-                            if regex.search(str(riga.descrizione)):
-                                return True
-
-        return False
-
     def _get_client_history(self, db: Session, fattura: Fattura, limit: int = 10) -> list[Fattura]:
         """Get client invoice history."""
 
@@ -425,31 +425,16 @@ class ComplianceChecker:
     ) -> dict[int, ComplianceReport]:
         """Check multiple invoices.
 
+        Invoices, clients and histories are loaded once for the whole batch
+        (see :class:`BatchComplianceEngine`).
+
         Args:
             invoice_ids: List of invoice IDs
 
         Returns:
             Dictionary mapping invoice IDs to reports
         """
-        logger.info("batch_compliance_check_started", count=len(invoice_ids))
-
-        results = {}
-
-        for invoice_id in invoice_ids:
-            try:
-                report = await self.check_invoice(invoice_id)
-                results[invoice_id] = report
-
-            except Exception as e:
-                logger.error(
-                    "invoice_check_failed",
-                    invoice_id=invoice_id,
-                    error=str(e),
-                )
-
-        logger.info("batch_compliance_check_completed", count=len(results))
-
-        return results
+        return await BatchComplianceEngine(self).check(invoice_ids)
 
     def get_stats(self) -> dict[str, Any]:
         """Get compliance checker statistics.
@@ -11,6 +11,7 @@ rules might miss. It analyzes:
 Uses the existing AI provider infrastructure for analysis.
 """
 
+import re
 import statistics
 from dataclasses import dataclass, field
 from decimal import Decimal
@@ -25,6 +26,25 @@ from openfatture.storage.session import db_session
 
 logger = get_logger(__name__)
 
+# Generic terms flagged in short line descriptions
+_VAGUE_TERMS = re.compile("servizi|consulenza|prestazione|lavori|attività")
+
+# Italian national holidays as (month, day)
+_HOLIDAYS = frozenset(
+    {
+        (1, 1),  # New Year
+        (1, 6),  # Epiphany
+        (4, 25),  # Liberation Day
+        (5, 1),  # Labor Day
+        (6, 2),  # Republic Day
+        (8, 15),  # Assumption
+        (11, 1),  # All Saints
+        (12, 8),  # Immaculate Conception
+        (12, 25),  # Christmas
+        (12, 26),  # Santo Stefano
+    }
+)
+
 
 @dataclass
 class HeuristicAnalysis:
@@ -90,12 +110,16 @@ class AIHeuristicAnalyzer:
         self,
         fattura: Fattura,
         client_history: list[Fattura] | None = None,
+        review_descriptions: bool = True,
     ) -> HeuristicAnalysis:
         """Perform AI-powered heuristic analysis on invoice.
 
         Args:
             fattura: Invoice to analyze
             client_history: Optional client invoice history for context
+            review_descriptions: Ask the AI provider to review the line descriptions;
+                batches disable it and call :meth:`review_descriptions` only for
+                the invoices that need it
 
         Returns:
             HeuristicAnalysis with anomalies and suggestions
@@ -108,7 +132,7 @@ class AIHeuristicAnalyzer:
         await self._analyze_amount_anomalies(fattura, client_history, analysis)
 
         # 2. Analyze description quality
-        await self._analyze_description_quality(fattura, analysis)
+        await self._analyze_description_quality(fattura, analysis, review_descriptions)
 
         # 3. Analyze temporal patterns
         await self._analyze_temporal_patterns(fattura, client_history, analysis)
@@ -205,6 +229,7 @@ class AIHeuristicAnalyzer:
         self,
         fattura: Fattura,
         analysis: HeuristicAnalysis,
+        review_descriptions: bool = True,
     ) -> None:
         """Analyze invoice line descriptions using AI."""
 
@@ -229,8 +254,7 @@ class AIHeuristicAnalyzer:
                 )
 
             # Generic/vague terms (using AI)
-            vague_terms = ["servizi", "consulenza", "prestazione", "lavori", "attività"]
-            if any(term in desc.lower() for term in vague_terms) and len(desc) < 50:
+            if len(desc) < 50 and _VAGUE_TERMS.search(desc.lower()):
                 analysis.anomalies_found.append(
                     ValidationIssue(
                         code="HEUR011",
@@ -243,7 +267,21 @@ class AIHeuristicAnalyzer:
                 )
 
         # AI-powered description quality analysis
-        if len(fattura.righe) > 0:
+        if review_descriptions:
+            await self._ai_analyze_descriptions(fattura, analysis)
+
+    async def review_descriptions(
+        self,
+        fattura: Fattura,
+        analysis: HeuristicAnalysis,
+    ) -> None:
+        """Run the AI review of the line descriptions on an existing analysis.
+
+        Args:
+            fattura: Analyzed invoice
+            analysis: Analysis from ``analyze_invoice(..., review_descriptions=False)``
+        """
+        if fattura.righe:
             await self._ai_analyze_descriptions(fattura, analysis)
 
     async def _ai_analyze_descriptions(
@@ -318,21 +356,8 @@ Rispondi in formato JSON con:
                 )
             )
 
-        # Holiday detection (simplified - December 25, January 1, etc.)
-        holiday_dates = [
-            (1, 1),  # New Year
-            (1, 6),  # Epiphany
-            (4, 25),  # Liberation Day
-            (5, 1),  # Labor Day
-            (6, 2),  # Republic Day
-            (8, 15),  # Assumption
-            (11, 1),  # All Saints
-            (12, 8),  # Immaculate Conception
-            (12, 25),  # Christmas
-            (12, 26),  # Santo Stefano
-        ]
-
-        if (fattura.data_emissione.month, fattura.data_emissione.day) in holiday_dates:
+        # Holiday detection (simplified - fixed-date holidays only)
+        if (fattura.data_emissione.month, fattura.data_emissione.day) in _HOLIDAYS:
             analysis.anomalies_found.append(
                 ValidationIssue(
                     code="HEUR021",
@@ -112,11 +112,17 @@ class ComplianceRulesEngine:
         """Initialize rules engine."""
         logger.info("compliance_rules_engine_initialized")
 
-    def validate_invoice(self, fattura: Fattura) -> ValidationResult:
+    def validate_invoice(
+        self,
+        fattura: Fattura,
+        client_issues: list[ValidationIssue] | None = None,
+    ) -> ValidationResult:
         """Validate complete invoice for FatturaPA compliance.
 
         Args:
             fattura: Invoice to validate
+            client_issues: Issues of the client data from :meth:`validate_client`,
+                reused instead of validating the client again
 
         Returns:
             ValidationResult with all issues found
@@ -129,7 +135,11 @@ class ComplianceRulesEngine:
         self._validate_invoice_metadata(fattura, result)
 
         # 2. Client data validation
-        self._validate_client_data(fattura.cliente, result)
+        if client_issues is None:
+            self._validate_client_data(fattura.cliente, result)
+        else:
+            for issue in client_issues:
+                result.add_issue(issue)
 
         # 3. Invoice lines validation
         self._validate_invoice_lines(fattura, result)
@@ -153,6 +163,22 @@ class ComplianceRulesEngine:
 
         return result
 
+    def validate_client(self, cliente: Cliente) -> list[ValidationIssue]:
+        """Validate the client data alone.
+
+        The issues only depend on the client, so batches validate each client
+        once and pass the result to :meth:`validate_invoice`.
+
+        Args:
+            cliente: Client to validate
+
+        Returns:
+            Issues found in the client data
+        """
+        result = ValidationResult(is_valid=True)
+        self._validate_client_data(cliente, result)
+        return result.issues
+
     def _validate_invoice_metadata(self, fattura: Fattura, result: ValidationResult) -> None:
         """Validate invoice metadata (numero, data, tipo documento)."""
 
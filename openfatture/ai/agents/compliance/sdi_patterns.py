@@ -17,6 +17,7 @@ import re
 from dataclasses import dataclass, field
 from enum import Enum
 from re import Pattern
+from typing import Any
 
 from openfatture.platform.logging import get_logger
 
@@ -433,3 +434,114 @@ class SDIPatternDatabase:
             List of all patterns
         """
         return self.patterns
+
+
+@dataclass(frozen=True)
+class _CompiledPattern:
+    pattern: SDIRejectionPattern
+    # Client attributes checked with ``match``
+    client_fields: tuple[str, ...]
+    # Whether line descriptions are checked with ``search``
+    checks_lines: bool
+    # Alternation of all the pattern regexes
+    regex: Pattern
+
+
+class SDIPatternMatcher:
+    """Decision table of the SDI patterns that inspect invoice fields.
+
+    Built once from the pattern list: patterns without regexes are dropped and
+    the regexes of each pattern are joined into a single alternation. Results of
+    the client fields only depend on the client, so they can be cached across
+    the invoices of a batch.
+
+    Example:
+        >>> matcher = SDIPatternMatcher(SDIPatternDatabase().get_all_patterns())
+        >>> client_cache: dict[int, frozenset[int]] = {}
+        >>> matched = [matcher.match(f, client_cache) for f in fatture]
+    """
+
+    def __init__(self, patterns: list[SDIRejectionPattern]) -> None:
+        """Compile the decision table.
+
+        Args:
+            patterns: Patterns in reporting order
+        """
+        self._rows: list[_CompiledPattern] = []
+
+        for pattern in patterns:
+            if not pattern.field_checks or not pattern.regex_patterns:
+                continue
+            client_fields = tuple(
+                check.replace("cliente.", "")
+                for check in pattern.field_checks
+                if "cliente." in check
+            )
+            checks_lines = any(
+                "righe" in check for check in pattern.field_checks if "cliente." not in check
+            )
+            if not client_fields and not checks_lines:
+                continue
+            self._rows.append(
+                _CompiledPattern(
+                    pattern=pattern,
+                    client_fields=client_fields,
+                    checks_lines=checks_lines,
+                    regex=re.compile(
+                        "|".join(f"(?:{regex})" for regex in pattern.regex_patterns),
+                        re.IGNORECASE,
+                    ),
+                )
+            )
+
+        self._line_rows = [i for i, row in enumerate(self._rows) if row.checks_lines]
+
+    def match_client(self, cliente: object) -> frozenset[int]:
+        """Evaluate the client-field patterns.
+
+        Args:
+            cliente: Invoice client
+
+        Returns:
+            Indexes of the matched table rows
+        """
+        matched = set()
+        for index, row in enumerate(self._rows):
+            for field_name in row.client_fields:
+                value = getattr(cliente, field_name, None)
+                if value and row.regex.match(str(value)):
+                    matched.add(index)
+                    break
+        return frozenset(matched)
+
+    def match(
+        self, fattura: Any, client_cache: dict[int, frozenset[int]] | None = None
+    ) -> list[SDIRejectionPattern]:
+        """Find the patterns matched by an invoice.
+
+        Args:
+            fattura: Invoice with client and lines loaded
+            client_cache: Client results keyed by client id, shared across calls
+
+        Returns:
+            Matched patterns, in table order
+        """
+        cliente = fattura.cliente
+        cliente_id = getattr(cliente, "id", None)
+        if client_cache is not None and cliente_id is not None:
+            matched = client_cache.get(cliente_id)
+            if matched is None:
+                matched = client_cache[cliente_id] = self.match_client(cliente)
+        else:
+            matched = self.match_client(cliente)
+
+        if self._line_rows and fattura.righe:
+            descriptions = [str(riga.descrizione) for riga in fattura.righe]
+            line_matches = {
+                index
+                for index in self._line_rows
+                if any(self._rows[index].regex.search(text) for text in descriptions)
+            }
+            matched = matched | line_matches
+
+        return [row.pattern for index, row in enumerate(self._rows) if index in matched]
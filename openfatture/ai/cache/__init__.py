@@ -21,6 +21,13 @@ Example Usage:
     >>> stats = cached_provider.get_cache_stats()
     >>> print(f"Hit rate: {stats['hit_rate']:.2%}")
     >>> print(f"Savings: ${stats['estimated_savings_usd']:.2f}")
+    >>>
+    >>> # Share cached responses across processes (or hosts, with Redis)
+    >>> config = CacheConfig(backend="sqlite", sqlite_path=Path(".cache/ai_cache.sqlite3"))
+    >>>
+    >>> # Serve paraphrased prompts from cache too
+    >>> config = CacheConfig(strategy="hybrid", similarity_threshold=0.9)
+    >>> cached_provider = CachedProvider(provider, config)
 """
 
 from openfatture.ai.cache.config import (
@@ -29,7 +36,9 @@ from openfatture.ai.cache.config import (
     get_cache_config,
 )
 from openfatture.ai.cache.memory import LRUCache
+from openfatture.ai.cache.persistent import RedisCache, SQLiteCache, create_cache_strategy
 from openfatture.ai.cache.provider import CachedProvider
+from openfatture.ai.cache.semantic import SemanticIndex
 from openfatture.ai.cache.strategy import CacheEntry, CacheStrategy
 from openfatture.ai.cache.tool_cache import ToolResultCache, get_tool_cache
 
@@ -39,11 +48,15 @@ __all__ = [
     "CacheEntry",
     # Implementations
     "LRUCache",
+    "SQLiteCache",
+    "RedisCache",
     "CachedProvider",
+    "SemanticIndex",
     "ToolResultCache",
     "get_tool_cache",
     # Configuration
     "CacheConfig",
     "DEFAULT_CACHE_CONFIG",
     "get_cache_config",
+    "create_cache_strategy",
 ]
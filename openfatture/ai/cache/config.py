@@ -4,6 +4,7 @@ This module defines cache settings and configuration using Pydantic.
 """
 
 import os
+from pathlib import Path
 from typing import Literal, cast
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -34,6 +35,26 @@ class CacheConfig(BaseModel):
         description="Cache strategy to use (lru, semantic, or hybrid)",
     )
 
+    backend: Literal["memory", "sqlite", "redis"] = Field(
+        default="memory",
+        description="Where entries are stored: process memory, a local SQLite file, or Redis",
+    )
+
+    sqlite_path: Path = Field(
+        default=Path(".cache/ai_cache.sqlite3"),
+        description="SQLite file used by the sqlite backend",
+    )
+
+    redis_url: str = Field(
+        default="redis://localhost:6379/0",
+        description="Redis connection URL used by the redis backend",
+    )
+
+    key_prefix: str = Field(
+        default="openfatture:cache",
+        description="Prefix for keys written to shared backends",
+    )
+
     # LRU Cache settings
     max_size: int = Field(
         default=1000,
@@ -47,13 +68,22 @@ class CacheConfig(BaseModel):
         description="Default TTL in seconds (None = no expiration)",
     )
 
+    tool_ttl: int = Field(
+        default=300,
+        ge=0,
+        description=(
+            "TTL in seconds for cached tool results (invalidated earlier by domain events; "
+            "bounds the staleness after writes that publish no event)"
+        ),
+    )
+
     cleanup_interval: int = Field(
         default=300,
         ge=0,
         description="Cleanup interval in seconds (0 = no automatic cleanup)",
     )
 
-    # Semantic Cache settings (for future implementation)
+    # Semantic Cache settings (semantic and hybrid strategies)
     similarity_threshold: float = Field(
         default=0.85,
         ge=0.0,
@@ -66,6 +96,13 @@ class CacheConfig(BaseModel):
         description="Embedding model for semantic cache",
     )
 
+    semantic_verify_rate: float = Field(
+        default=0.02,
+        ge=0.0,
+        le=1.0,
+        description="Fraction of semantic hits re-checked against the provider (false-hit sampling)",
+    )
+
     # Performance settings
     enable_stats: bool = Field(
         default=True,
@@ -100,9 +137,16 @@ def get_cache_config() -> CacheConfig:
     Reads cache settings from environment variables:
     - OPENFATTURE_CACHE_ENABLED: Enable/disable caching
     - OPENFATTURE_CACHE_STRATEGY: Cache strategy
+    - OPENFATTURE_CACHE_BACKEND: Storage backend (memory, sqlite or redis)
+    - OPENFATTURE_CACHE_SQLITE_PATH: SQLite cache file
+    - OPENFATTURE_CACHE_REDIS_URL: Redis connection URL
     - OPENFATTURE_CACHE_MAX_SIZE: Maximum cache size
     - OPENFATTURE_CACHE_DEFAULT_TTL: Default TTL
+    - OPENFATTURE_CACHE_TOOL_TTL: TTL of cached tool results
     - OPENFATTURE_CACHE_CLEANUP_INTERVAL: Cleanup interval
+    - OPENFATTURE_CACHE_SIMILARITY_THRESHOLD: Semantic match threshold
+    - OPENFATTURE_CACHE_EMBEDDING_MODEL: Semantic cache embedding model
+    - OPENFATTURE_CACHE_SEMANTIC_VERIFY_RATE: Share of semantic hits verified
 
     Returns:
         CacheConfig instance with settings from environment
@@ -118,14 +162,24 @@ def get_cache_config() -> CacheConfig:
 
     strategy = cast(Literal["lru", "semantic", "hybrid"], strategy_raw)
 
+    backend_raw = os.getenv("OPENFATTURE_CACHE_BACKEND", "memory")
+    if backend_raw not in {"memory", "sqlite", "redis"}:
+        _logger.warning("invalid_cache_backend", backend=backend_raw, fallback="memory")
+        backend_raw = "memory"
+
     return CacheConfig(
         enabled=os.getenv("OPENFATTURE_CACHE_ENABLED", "true").lower() == "true",
         strategy=strategy,
+        backend=cast(Literal["memory", "sqlite", "redis"], backend_raw),
+        sqlite_path=Path(os.getenv("OPENFATTURE_CACHE_SQLITE_PATH", ".cache/ai_cache.sqlite3")),
+        redis_url=os.getenv("OPENFATTURE_CACHE_REDIS_URL", "redis://localhost:6379/0"),
         max_size=int(os.getenv("OPENFATTURE_CACHE_MAX_SIZE", "1000")),
         default_ttl=int(os.getenv("OPENFATTURE_CACHE_DEFAULT_TTL", "3600")),
+        tool_ttl=int(os.getenv("OPENFATTURE_CACHE_TOOL_TTL", "300")),
         cleanup_interval=int(os.getenv("OPENFATTURE_CACHE_CLEANUP_INTERVAL", "300")),
         similarity_threshold=float(os.getenv("OPENFATTURE_CACHE_SIMILARITY_THRESHOLD", "0.85")),
         embedding_model=os.getenv("OPENFATTURE_CACHE_EMBEDDING_MODEL", "text-embedding-3-small"),
+        semantic_verify_rate=float(os.getenv("OPENFATTURE_CACHE_SEMANTIC_VERIFY_RATE", "0.02")),
         enable_stats=os.getenv("OPENFATTURE_CACHE_ENABLE_STATS", "true").lower() == "true",
         log_hits=os.getenv("OPENFATTURE_CACHE_LOG_HITS", "false").lower() == "true",
         log_misses=os.getenv("OPENFATTURE_CACHE_LOG_MISSES", "false").lower() == "true",
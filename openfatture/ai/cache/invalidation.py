@@ -0,0 +1,158 @@
+"""Dependency tags linking cached tool results to domain data.
+
+Every cached tool result records the entities it was computed from as tags:
+
+- ``invoice:{id}``, ``client:{id}``, ``payment:{id}`` for single entities
+- ``invoices``, ``clients``, ``payments`` for results over a whole collection
+  (searches, statistics)
+- ``tool:{name}`` so a tool can still be invalidated as a whole
+
+Domain events map to the tags they make stale, e.g. ``ClientUpdatedEvent``
+for client 7 invalidates ``client:7`` and ``clients`` but leaves the details
+of client 8 and every invoice detail cached.
+
+Example:
+    >>> tool_dependency_tags("get_invoice_details", {"fattura_id": 12}, data)
+    {'tool:get_invoice_details', 'invoice:12', 'client:3'}
+    >>> event_dependency_tags(InvoiceSentEvent(invoice_id=12, ...))
+    {'invoices', 'invoice:12'}
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from functools import cache
+from typing import Any
+
+TagRule = Callable[[dict[str, Any], Any], Iterable[str]]
+
+
+def _ids(prefix: str, values: Iterable[Any]) -> set[str]:
+    """Build ``prefix:{id}`` tags, skipping missing ids."""
+    return {f"{prefix}:{value}" for value in values if value is not None}
+
+
+def _rows(data: Any, key: str) -> list[dict[str, Any]]:
+    """Return the list of dict rows under ``data[key]`` (empty if absent)."""
+    if not isinstance(data, dict):
+        return []
+    return [row for row in data.get(key) or [] if isinstance(row, dict)]
+
+
+def _invoice_details(parameters: dict[str, Any], data: Any) -> set[str]:
+    client = data.get("cliente") if isinstance(data, dict) else None
+    client_id = client.get("id") if isinstance(client, dict) else None
+    return _ids("invoice", [parameters.get("fattura_id")]) | _ids("client", [client_id])
+
+
+def _client_details(parameters: dict[str, Any], data: Any) -> set[str]:
+    # Details embed the client's five most recent invoices
+    invoice_ids = [row.get("id") for row in _rows(data, "fatture_recenti")]
+    return _ids("client", [parameters.get("cliente_id")]) | _ids("invoice", invoice_ids)
+
+
+def _payment_status(parameters: dict[str, Any], data: Any) -> set[str]:
+    payment_ids = [row.get("payment_id") for row in _rows(data, "payments")]
+    tags = _ids("invoice", [parameters.get("fattura_id")]) | _ids("payment", payment_ids)
+    # Without payment rows there is no id to watch: depend on any payment change
+    return tags if payment_ids else tags | {"payments"}
+
+
+def _collections(*names: str) -> TagRule:
+    return lambda parameters, data: names
+
+
+# Read tools and the data they depend on. Tools not listed here (e.g. the
+# knowledge base) only carry their ``tool:{name}`` tag and expire by TTL.
+TOOL_DEPENDENCIES: dict[str, TagRule] = {
+    # Invoice listings show client names, so they also depend on clients
+    "search_invoices": _collections("invoices", "clients"),
+    "get_invoice_stats": _collections("invoices"),
+    "get_invoice_details": _invoice_details,
+    "search_clients": _collections("clients"),
+    "get_client_stats": _collections("clients"),
+    "get_client_details": _client_details,
+    "get_payment_status": _payment_status,
+    "search_payments": _collections("payments", "invoices"),
+    "get_payment_stats": _collections("payments"),
+    "search_bank_transactions": _collections("payments"),
+    "get_due_dates": _collections("payments", "invoices"),
+}
+
+
+def tool_dependency_tags(tool_name: str, parameters: dict[str, Any], data: Any) -> set[str]:
+    """Return the dependency tags of a tool result.
+
+    Args:
+        tool_name: Name of the tool
+        parameters: Tool parameters
+        data: ``ToolResult.data`` returned by the tool
+
+    Returns:
+        Set of tags, always including ``tool:{tool_name}``
+    """
+    tags = {f"tool:{tool_name}"}
+    rule = TOOL_DEPENDENCIES.get(tool_name)
+    if rule is not None:
+        tags.update(rule(parameters, data))
+    return tags
+
+
+@cache
+def _event_rules() -> tuple[tuple[type, Callable[[Any], set[str]]], ...]:
+    """Map event classes to tag builders (imported lazily to keep startup light)."""
+    from openfatture.events.client_events import (
+        ClientCreatedEvent,
+        ClientDeletedEvent,
+        ClientUpdatedEvent,
+    )
+    from openfatture.events.invoice_events import (
+        InvoiceCreatedEvent,
+        InvoiceDeletedEvent,
+        InvoiceSentEvent,
+        InvoiceStatusChangedEvent,
+        InvoiceUpdatedEvent,
+        InvoiceValidatedEvent,
+    )
+    from openfatture.payment.application.events import (
+        TransactionMatchedEvent,
+        TransactionUnmatchedEvent,
+    )
+
+    def invoice_changed(event: Any) -> set[str]:
+        return {"invoices"} | _ids("invoice", [event.invoice_id])
+
+    def client_changed(event: Any) -> set[str]:
+        return {"clients"} | _ids("client", [event.client_id])
+
+    def payment_changed(event: Any) -> set[str]:
+        return {"payments"} | _ids("payment", [event.payment_id])
+
+    return (
+        # A new invoice also shows up in its client's details
+        (InvoiceCreatedEvent, lambda e: invoice_changed(e) | _ids("client", [e.client_id])),
+        (InvoiceUpdatedEvent, invoice_changed),
+        (InvoiceStatusChangedEvent, invoice_changed),
+        (InvoiceValidatedEvent, invoice_changed),
+        (InvoiceSentEvent, invoice_changed),
+        (InvoiceDeletedEvent, invoice_changed),
+        (ClientCreatedEvent, lambda e: {"clients"}),
+        (ClientUpdatedEvent, client_changed),
+        (ClientDeletedEvent, client_changed),
+        (TransactionMatchedEvent, payment_changed),
+        (TransactionUnmatchedEvent, payment_changed),
+    )
+
+
+def invalidating_event_types() -> tuple[type, ...]:
+    """Return the event classes that invalidate cached tool results."""
+    return tuple(event_type for event_type, _ in _event_rules())
+
+
+def event_dependency_tags(event: Any) -> set[str]:
+    """Return the tags made stale by a domain event (empty if unrelated)."""
+    tags: set[str] = set()
+    for event_type, build in _event_rules():
+        if isinstance(event, event_type):
+            tags.update(build(event))
+    return tags
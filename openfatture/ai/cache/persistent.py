@@ -0,0 +1,604 @@
+"""Persistent cache strategies (SQLite file and Redis).
+
+``LRUCache`` lives in process memory, so every CLI invocation starts cold and
+workers cannot share LLM responses or tool results. The strategies here keep
+entries outside the process:
+
+- :class:`SQLiteCache` — a single local file (WAL mode), shared by every
+  process on the machine. Works without any service.
+- :class:`RedisCache` — the Redis instance provisioned by ``docker-compose``
+  (profile ``ai``), shared across hosts.
+
+Both honour per-entry TTLs and bound the number of entries per namespace with
+least-recently-used eviction. Values are stored as JSON; Pydantic models
+(``AgentResponse``, ``ToolResult``) round-trip through ``model_dump`` /
+``model_validate``.
+
+Example:
+    >>> cache = SQLiteCache(Path(".cache/ai_cache.sqlite3"), namespace="llm")
+    >>> await cache.set("key", response, ttl=3600)
+    >>> cached = await cache.get("key")  # also hits in the next CLI run
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+from openfatture.ai.cache.config import CacheConfig
+from openfatture.ai.cache.memory import LRUCache
+from openfatture.ai.cache.strategy import CacheStrategy
+from openfatture.platform.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS ix_cache_entries_lru ON cache_entries (namespace, accessed_at);
+CREATE INDEX IF NOT EXISTS ix_cache_entries_expiry ON cache_entries (expires_at);
+"""
+
+
+def encode_value(value: Any) -> str:
+    """Serialize a cache value to JSON.
+
+    Pydantic models are tagged with their import path so :func:`decode_value`
+    can rebuild them; anything else must be JSON-serializable.
+
+    Raises:
+        TypeError: If the value cannot be represented as JSON
+        ValueError: If the value cannot be represented as JSON
+    """
+    if isinstance(value, BaseModel):
+        model = type(value)
+        payload = {
+            "model": f"{model.__module__}:{model.__qualname__}",
+            "data": value.model_dump(mode="json"),
+        }
+    else:
+        payload = {"data": value}
+    return json.dumps(payload)
+
+
+def decode_value(raw: str | bytes) -> Any:
+    """Deserialize a value produced by :func:`encode_value`.
+
+    Only Pydantic models defined inside ``openfatture`` are rebuilt, so a
+    shared Redis cannot be used to import arbitrary classes.
+
+    Raises:
+        ValueError: If the payload references a type that is not allowed
+    """
+    payload = json.loads(raw)
+    model_path = payload.get("model")
+    if model_path is None:
+        return payload["data"]
+
+    module_name, _, qualname = model_path.partition(":")
+    if not module_name.startswith("openfatture."):
+        raise ValueError(f"Refusing to decode cached value of type {model_path}")
+
+    model: Any = importlib.import_module(module_name)
+    for attribute in qualname.split("."):
+        model = getattr(model, attribute)
+    if not (isinstance(model, type) and issubclass(model, BaseModel)):
+        raise ValueError(f"Cached value type {model_path} is not a Pydantic model")
+
+    return model.model_validate(payload["data"])
+
+
+class SQLiteCache(CacheStrategy[T]):
+    """Cache strategy stored in a local SQLite file.
+
+    Several namespaces (e.g. ``llm`` and ``tool``) share one file; each is
+    bounded by ``max_size`` independently. Reads refresh ``accessed_at`` so
+    eviction is least-recently-used. Values that cannot be serialized are
+    skipped with a warning rather than failing the request.
+
+    Example:
+        >>> cache = SQLiteCache(Path(".cache/ai_cache.sqlite3"), namespace="tool")
+        >>> await cache.set("tool:search_invoices:ab12", result, ttl=300)
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        namespace: str = "default",
+        max_size: int = 1000,
+        default_ttl: int | None = 3600,
+    ) -> None:
+        """Initialize SQLite cache.
+
+        Args:
+            path: SQLite database file (created on first use)
+            namespace: Key namespace inside the file
+            max_size: Maximum number of entries in this namespace
+            default_ttl: Default TTL in seconds (None = no expiration)
+        """
+        self.path = path
+        self.namespace = namespace
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+        # Statistics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            logger.debug("sqlite_cache_opened", path=str(self.path), namespace=self.namespace)
+        return self._conn
+
+    async def get(self, key: str) -> T | None:
+        """Retrieve value from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value if found and not expired, None otherwise
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    conn.execute(
+                        "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                        (self.namespace, key),
+                    )
+                    conn.commit()
+                self._misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            conn.commit()
+
+        try:
+            value: T = decode_value(row[0])
+        except (ValueError, TypeError, AttributeError, ImportError) as e:
+            logger.warning("cache_decode_failed", key=key, error=str(e))
+            await self.delete(key)
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return value
+
+    async def set(self, key: str, value: T, ttl: int | None = None) -> None:
+        """Store value in cache.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds (None = use default)
+        """
+        try:
+            raw = encode_value(value)
+        except (TypeError, ValueError) as e:
+            logger.warning("cache_encode_failed", key=key, error=str(e))
+            return
+
+        now = time.time()
+        ttl_seconds = ttl if ttl is not None else self.default_ttl
+        expires_at = now + ttl_seconds if ttl_seconds is not None else None
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, value, created_at, accessed_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, raw, now, now, expires_at),
+            )
+            self._evict_locked(conn)
+            conn.commit()
+
+    def _evict_locked(self, conn: sqlite3.Connection) -> None:
+        """Drop least-recently-used rows above ``max_size`` (caller holds the lock)."""
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        excess = count - self.max_size
+        if excess <= 0:
+            return
+
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key IN "
+            "(SELECT key FROM cache_entries WHERE namespace = ? ORDER BY accessed_at ASC LIMIT ?)",
+            (self.namespace, self.namespace, excess),
+        )
+        self._evictions += excess
+        logger.debug("cache_eviction", evicted=excess, namespace=self.namespace)
+
+    async def delete(self, key: str) -> bool:
+        """Remove value from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if key was found and deleted, False otherwise
+        """
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+            conn.commit()
+        return cursor.rowcount > 0
+
+    async def clear(self) -> None:
+        """Clear all entries of this namespace."""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            )
+            conn.commit()
+        logger.info("cache_cleared", entries_removed=cursor.rowcount, namespace=self.namespace)
+
+    async def exists(self, key: str) -> bool:
+        """Check if key exists in cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if key exists and is not expired, False otherwise
+        """
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT 1 FROM cache_entries WHERE namespace = ? AND key = ? "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    (self.namespace, key, time.time()),
+                )
+                .fetchone()
+            )
+        return row is not None
+
+    def size(self) -> int:
+        """Get number of entries in this namespace.
+
+        Returns:
+            Number of cache entries
+        """
+        with self._lock:
+            (count,) = (
+                self._connect()
+                .execute(
+                    "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+                )
+                .fetchone()
+            )
+        return int(count)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with cache stats
+        """
+        total_requests = self._hits + self._misses
+        return {
+            "backend": "sqlite",
+            "path": str(self.path),
+            "namespace": self.namespace,
+            "size": self.size(),
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "total_requests": total_requests,
+            "hit_rate": self._hits / total_requests if total_requests > 0 else 0,
+            "default_ttl": self.default_ttl,
+        }
+
+    async def cleanup(self) -> int:
+        """Remove expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, time.time()),
+            )
+            conn.commit()
+        return cursor.rowcount
+
+    async def shutdown(self) -> None:
+        """Close the database connection (entries are kept on disk)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"SQLiteCache(path={self.path}, namespace={self.namespace}, max_size={self.max_size})"
+        )
+
+
+class RedisCache(CacheStrategy[T]):
+    """Cache strategy backed by Redis.
+
+    Entries are plain string keys ``{prefix}:{namespace}:{key}`` with a Redis
+    TTL, so expiry is handled by the server. A sorted set per namespace
+    records access times and bounds the namespace to ``max_size`` entries
+    (least recently used first).
+
+    ``client`` is any ``redis.asyncio.Redis``-compatible object; by default
+    one is created from ``url`` (requires ``pip install redis``).
+
+    Example:
+        >>> cache = RedisCache(url="redis://localhost:6379/0", namespace="llm")
+        >>> await cache.set("key", response)
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        namespace: str = "default",
+        max_size: int = 1000,
+        default_ttl: int | None = 3600,
+        key_prefix: str = "openfatture:cache",
+        client: Any | None = None,
+    ) -> None:
+        """Initialize Redis cache.
+
+        Args:
+            url: Redis connection URL (ignored when ``client`` is given)
+            namespace: Key namespace
+            max_size: Maximum number of entries in this namespace
+            default_ttl: Default TTL in seconds (None = no expiration)
+            key_prefix: Prefix shared by every key written by OpenFatture
+            client: Pre-built async Redis client
+        """
+        self.url = url
+        self.namespace = namespace
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._prefix = f"{key_prefix}:{namespace}:"
+        self._lru_key = f"{key_prefix}:{namespace}:__lru__"
+        self._client = client if client is not None else _redis_client(url)
+
+        # Statistics (size is the count observed at the last write)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._size = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self._prefix}{key}"
+
+    async def get(self, key: str) -> T | None:
+        """Retrieve value from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value if found and not expired, None otherwise
+        """
+        raw = await self._client.get(self._key(key))
+        if raw is None:
+            self._misses += 1
+            return None
+
+        try:
+            value: T = decode_value(raw)
+        except (ValueError, TypeError, AttributeError, ImportError) as e:
+            logger.warning("cache_decode_failed", key=key, error=str(e))
+            await self.delete(key)
+            self._misses += 1
+            return None
+
+        await self._client.zadd(self._lru_key, {key: time.time()})
+        self._hits += 1
+        return value
+
+    async def set(self, key: str, value: T, ttl: int | None = None) -> None:
+        """Store value in cache.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds (None = use default)
+        """
+        try:
+            raw = encode_value(value)
+        except (TypeError, ValueError) as e:
+            logger.warning("cache_encode_failed", key=key, error=str(e))
+            return
+
+        ttl_seconds = ttl if ttl is not None else self.default_ttl
+        if ttl_seconds is not None:
+            await self._client.set(self._key(key), raw, ex=max(1, ttl_seconds))
+        else:
+            await self._client.set(self._key(key), raw)
+        await self._client.zadd(self._lru_key, {key: time.time()})
+
+        count = int(await self._client.zcard(self._lru_key))
+        excess = count - self.max_size
+        if excess > 0:
+            evicted = await self._client.zpopmin(self._lru_key, excess)
+            evicted_keys = [_as_str(member) for member, _ in evicted]
+            if evicted_keys:
+                await self._client.delete(*(self._key(k) for k in evicted_keys))
+            self._evictions += len(evicted_keys)
+            count -= len(evicted_keys)
+            logger.debug("cache_eviction", evicted=len(evicted_keys), namespace=self.namespace)
+        self._size = count
+
+    async def delete(self, key: str) -> bool:
+        """Remove value from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if key was found and deleted, False otherwise
+        """
+        await self._client.zrem(self._lru_key, key)
+        return bool(await self._client.delete(self._key(key)))
+
+    async def clear(self) -> None:
+        """Clear all entries of this namespace."""
+        keys = [key async for key in self._client.scan_iter(match=f"{self._prefix}*")]
+        if keys:
+            await self._client.delete(*keys)
+        self._size = 0
+        logger.info("cache_cleared", entries_removed=len(keys), namespace=self.namespace)
+
+    async def exists(self, key: str) -> bool:
+        """Check if key exists in cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if key exists and is not expired, False otherwise
+        """
+        return bool(await self._client.exists(self._key(key)))
+
+    def size(self) -> int:
+        """Get number of entries observed at the last write or cleanup.
+
+        Returns:
+            Number of cache entries
+        """
+        return self._size
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with cache stats
+        """
+        total_requests = self._hits + self._misses
+        return {
+            "backend": "redis",
+            "namespace": self.namespace,
+            "size": self.size(),
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "total_requests": total_requests,
+            "hit_rate": self._hits / total_requests if total_requests > 0 else 0,
+            "default_ttl": self.default_ttl,
+        }
+
+    async def cleanup(self) -> int:
+        """Drop LRU bookkeeping for keys Redis already expired.
+
+        Returns:
+            Number of entries removed
+        """
+        members = [_as_str(member) for member in await self._client.zrange(self._lru_key, 0, -1)]
+        stale = [key for key in members if not await self._client.exists(self._key(key))]
+        if stale:
+            await self._client.zrem(self._lru_key, *stale)
+        self._size = len(members) - len(stale)
+        return len(stale)
+
+    async def shutdown(self) -> None:
+        """Close the Redis connection (entries are kept on the server)."""
+        close = getattr(self._client, "aclose", None) or getattr(self._client, "close", None)
+        if close is not None:
+            await close()
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"RedisCache(url={self.url}, namespace={self.namespace}, max_size={self.max_size})"
+
+
+def _as_str(value: str | bytes) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _redis_client(url: str) -> Any:
+    """Create an async Redis client lazily; redis-py is an optional dependency."""
+    try:
+        import redis.asyncio as redis_asyncio
+    except ImportError as e:
+        raise ImportError("The Redis cache backend requires 'redis' (pip install redis)") from e
+    return redis_asyncio.Redis.from_url(url)
+
+
+def create_cache_strategy(
+    config: CacheConfig,
+    namespace: str,
+    default_ttl: int | None = None,
+    max_size: int | None = None,
+) -> CacheStrategy[Any]:
+    """Create the cache strategy selected by ``config.backend``.
+
+    Args:
+        config: Cache configuration
+        namespace: Namespace separating e.g. LLM responses from tool results
+        default_ttl: TTL override (default: ``config.default_ttl``)
+        max_size: Size override (default: ``config.max_size``)
+
+    Returns:
+        LRUCache, SQLiteCache or RedisCache
+    """
+    ttl = default_ttl if default_ttl is not None else config.default_ttl
+    size = max_size if max_size is not None else config.max_size
+
+    if config.backend == "sqlite":
+        return SQLiteCache(config.sqlite_path, namespace=namespace, max_size=size, default_ttl=ttl)
+
+    if config.backend == "redis":
+        return RedisCache(
+            url=config.redis_url,
+            namespace=namespace,
+            max_size=size,
+            default_ttl=ttl,
+            key_prefix=config.key_prefix,
+        )
+
+    return LRUCache(max_size=size, default_ttl=ttl, cleanup_interval=config.cleanup_interval)
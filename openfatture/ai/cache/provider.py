@@ -5,19 +5,35 @@ This module provides a wrapper that adds caching to any LLM provider.
 
 import hashlib
 import json
+import random
+from collections import deque
 from collections.abc import AsyncIterator
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from openfatture.ai.cache.config import CacheConfig, get_cache_config
-from openfatture.ai.cache.memory import LRUCache
+from openfatture.ai.cache.persistent import create_cache_strategy
+from openfatture.ai.cache.semantic import (
+    SemanticIndex,
+    SemanticMatch,
+    create_cache_embedder,
+    response_agreement,
+)
 from openfatture.ai.cache.strategy import CacheStrategy
-from openfatture.ai.domain.message import Message
-from openfatture.ai.domain.response import AgentResponse
+from openfatture.ai.domain.message import Message, Role
+from openfatture.ai.domain.response import AgentResponse, ResponseStatus
 from openfatture.ai.providers.base import BaseLLMProvider
 from openfatture.platform.logging import get_logger
 
+if TYPE_CHECKING:
+    from openfatture.ai.rag.embeddings import EmbeddingStrategy
+
 logger = get_logger(__name__)
 
+# A verified semantic hit whose fresh response shares less vocabulary than this
+# with the cached one is counted as a false hit.
+_FALSE_HIT_AGREEMENT = 0.5
+_FALSE_HIT_SAMPLES = 20
+
 
 class CachedProvider:
     """Wrapper that adds caching to any LLM provider.
@@ -28,9 +44,16 @@ class CachedProvider:
     Features:
     - Automatic cache key generation from messages
     - Configurable cache strategy (LRU by default)
-    - Cache hit/miss tracking
+    - Semantic matching of paraphrased prompts (``semantic``/``hybrid``)
+    - Cache hit/miss, latency-saved and false-hit tracking
     - Bypass option for streaming
 
+    With the ``semantic`` strategy every lookup embeds the last user prompt
+    and searches a :class:`SemanticIndex` of cached prompts that share the
+    rest of the request (provider, model, system prompt, parameters and
+    earlier messages). ``hybrid`` tries the exact key first and only embeds
+    on an exact miss.
+
     Example:
         >>> from openfatture.ai.providers import OpenAIProvider
         >>> from openfatture.ai.cache import CachedProvider, CacheConfig
@@ -51,39 +74,50 @@ class CachedProvider:
         provider: BaseLLMProvider,
         config: CacheConfig | None = None,
         cache: CacheStrategy[AgentResponse] | None = None,
+        embedder: "EmbeddingStrategy | None" = None,
     ) -> None:
         """Initialize cached provider.
 
         Args:
             provider: Base LLM provider to wrap
             config: Cache configuration (uses defaults if None)
-            cache: Custom cache strategy (creates LRU if None)
+            cache: Custom cache strategy (built from ``config.backend`` if None)
+            embedder: Prompt embedder for the semantic/hybrid strategies
+                (built from ``config.embedding_model`` if None)
         """
         self.provider = provider
         self.config = config or get_cache_config()
 
-        # Create cache if not provided
+        # Responses are always stored by exact key; the semantic index points into it
         self._cache: CacheStrategy[AgentResponse]
         if cache is None:
-            if self.config.strategy == "lru":
-                self._cache = LRUCache(
-                    max_size=self.config.max_size,
-                    default_ttl=self.config.default_ttl,
-                    cleanup_interval=self.config.cleanup_interval,
-                )
-            else:
-                # Future: Support semantic cache
-                raise NotImplementedError(
-                    f"Cache strategy '{self.config.strategy}' not yet implemented"
-                )
+            self._cache = create_cache_strategy(self.config, namespace="llm")
         else:
             self._cache = cache
 
+        self._semantic: SemanticIndex | None = None
+        if self.config.strategy in ("semantic", "hybrid"):
+            self._semantic = SemanticIndex(
+                embedder or create_cache_embedder(self.config),
+                similarity_threshold=self.config.similarity_threshold,
+                max_size=self.config.max_size,
+            )
+
+        # Request-level statistics
+        self._requests = 0
+        self._exact_hits = 0
+        self._semantic_hits = 0
+        self._latency_saved_ms = 0.0
+        self._verified_hits = 0
+        self._false_hits = 0
+        self._false_hit_samples: deque[dict[str, Any]] = deque(maxlen=_FALSE_HIT_SAMPLES)
+
         logger.info(
             "cached_provider_initialized",
             provider=provider.provider_name,
             model=provider.model,
             strategy=self.config.strategy,
+            backend=self.config.backend,
             max_size=self.config.max_size,
         )
 
@@ -127,6 +161,34 @@ class CachedProvider:
 
         return cache_key
 
+    def _semantic_prompt(self, messages: list[Message]) -> str | None:
+        """Return the prompt compared semantically (the trailing user message)."""
+        if not messages or messages[-1].role != Role.USER or not messages[-1].content.strip():
+            return None
+        return messages[-1].content
+
+    def _semantic_scope(
+        self,
+        messages: list[Message],
+        system_prompt: str | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+        **kwargs: Any,
+    ) -> str:
+        """Hash everything in the request except the prompt itself.
+
+        Only prompts with the same scope can match, so a paraphrase never
+        returns an answer produced for another model, system prompt or
+        conversation.
+        """
+        return self._generate_cache_key(
+            messages[:-1],
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs,
+        )
+
     async def generate(
         self,
         messages: list[Message],
@@ -160,6 +222,8 @@ class CachedProvider:
                 **kwargs,
             )
 
+        self._requests += 1
+
         # Generate cache key
         cache_key = self._generate_cache_key(
             messages=messages,
@@ -169,17 +233,71 @@ class CachedProvider:
             **kwargs,
         )
 
-        # Try to get from cache
-        cached_response = await self._cache.get(cache_key)
-
-        if cached_response is not None:
-            logger.info(
-                "cache_hit",
-                provider=self.provider.provider_name,
-                model=self.provider.model,
-                cache_key=cache_key[:16],
+        # Exact lookup (skipped by the pure semantic strategy)
+        if self._semantic is None or self.config.strategy == "hybrid":
+            cached_response = await self._cache.get(cache_key)
+
+            if cached_response is not None:
+                self._exact_hits += 1
+                self._latency_saved_ms += cached_response.latency_ms or 0.0
+                logger.info(
+                    "cache_hit",
+                    provider=self.provider.provider_name,
+                    model=self.provider.model,
+                    cache_key=cache_key[:16],
+                )
+                return cached_response
+
+        # Semantic lookup
+        prompt = self._semantic_prompt(messages) if self._semantic is not None else None
+        scope = ""
+        embedding: Any = None
+        if self._semantic is not None and prompt is not None:
+            scope = self._semantic_scope(
+                messages,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs,
             )
-            return cached_response
+            try:
+                embedding = await self._semantic.embed(prompt)
+            except Exception as e:
+                # Embedding outages degrade to exact caching, never to a failed request
+                logger.warning("semantic_cache_embedding_failed", error=str(e))
+
+            if embedding is not None:
+                match = self._semantic.search(embedding, scope)
+                if match is not None:
+                    cached_response = await self._cache.get(match.key)
+                    if cached_response is None:
+                        # The response expired or was evicted from the store
+                        self._semantic.delete(match.key)
+                    elif random.random() < self.config.semantic_verify_rate:
+                        return await self._verify_semantic_hit(
+                            match,
+                            cached_response,
+                            prompt,
+                            cache_key,
+                            embedding,
+                            scope,
+                            messages=messages,
+                            system_prompt=system_prompt,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            **kwargs,
+                        )
+                    else:
+                        self._semantic_hits += 1
+                        self._latency_saved_ms += cached_response.latency_ms or 0.0
+                        logger.info(
+                            "semantic_cache_hit",
+                            provider=self.provider.provider_name,
+                            model=self.provider.model,
+                            cache_key=match.key[:16],
+                            similarity=round(match.similarity, 4),
+                        )
+                        return cached_response
 
         # Cache miss - call provider
         logger.debug(
@@ -198,7 +316,7 @@ class CachedProvider:
         )
 
         # Cache the response
-        await self._cache.set(cache_key, response)
+        await self._store(cache_key, response, prompt, embedding, scope)
 
         logger.debug(
             "response_cached",
@@ -208,6 +326,74 @@ class CachedProvider:
 
         return response
 
+    async def _store(
+        self,
+        cache_key: str,
+        response: AgentResponse,
+        prompt: str | None,
+        embedding: Any,
+        scope: str,
+    ) -> None:
+        """Store a response and index its prompt for semantic lookups."""
+        await self._cache.set(cache_key, response)
+
+        # Only successful answers are worth serving to paraphrased prompts
+        if (
+            self._semantic is not None
+            and prompt is not None
+            and embedding is not None
+            and response.status == ResponseStatus.SUCCESS
+        ):
+            self._semantic.add(cache_key, embedding, prompt, scope)
+
+    async def _verify_semantic_hit(
+        self,
+        match: SemanticMatch,
+        cached_response: AgentResponse,
+        prompt: str,
+        cache_key: str,
+        embedding: Any,
+        scope: str,
+        messages: list[Message],
+        system_prompt: str | None,
+        temperature: float | None,
+        max_tokens: int | None,
+        **kwargs: Any,
+    ) -> AgentResponse:
+        """Answer a sampled semantic hit from the provider and score the match.
+
+        The fresh response is returned (and cached under the request's own
+        key), so sampling costs one provider call but never a wrong answer.
+        """
+        response = await self.provider.generate(
+            messages=messages,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs,
+        )
+        await self._store(cache_key, response, prompt, embedding, scope)
+
+        agreement = response_agreement(cached_response.content, response.content)
+        self._verified_hits += 1
+        if agreement < _FALSE_HIT_AGREEMENT:
+            self._false_hits += 1
+            self._false_hit_samples.append(
+                {
+                    "prompt": prompt,
+                    "matched_prompt": match.prompt,
+                    "similarity": round(match.similarity, 4),
+                    "agreement": round(agreement, 4),
+                }
+            )
+            logger.warning(
+                "semantic_cache_false_hit",
+                similarity=round(match.similarity, 4),
+                agreement=round(agreement, 4),
+            )
+
+        return response
+
     async def stream(
         self,
         messages: list[Message],
@@ -277,6 +463,28 @@ class CachedProvider:
         """
         stats = self._cache.get_stats()
 
+        if self._semantic is not None:
+            # Store-level counters double count hybrid lookups; report per request
+            served = self._exact_hits + self._semantic_hits
+            stats["hits"] = served
+            stats["misses"] = self._requests - served
+            stats["total_requests"] = self._requests
+            stats["hit_rate"] = served / self._requests if self._requests else 0
+            stats["semantic"] = {
+                **self._semantic.get_stats(),
+                "exact_hits": self._exact_hits,
+                "semantic_hits": self._semantic_hits,
+                "verify_rate": self.config.semantic_verify_rate,
+                "verified_hits": self._verified_hits,
+                "false_hits": self._false_hits,
+                "false_hit_rate": (
+                    self._false_hits / self._verified_hits if self._verified_hits else 0.0
+                ),
+                "false_hit_samples": list(self._false_hit_samples),
+            }
+
+        stats["latency_saved_ms"] = self._latency_saved_ms
+
         # Add savings estimation
         if stats["total_requests"] > 0:
             # Assume average cost per request
@@ -290,6 +498,8 @@ class CachedProvider:
     async def clear_cache(self) -> None:
         """Clear all cached responses."""
         await self._cache.clear()
+        if self._semantic is not None:
+            self._semantic.clear()
         logger.info("cache_cleared")
 
     async def shutdown(self) -> None:
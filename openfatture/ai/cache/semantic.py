@@ -0,0 +1,267 @@
+"""Semantic index over cached LLM prompts.
+
+``CachedProvider`` stores responses in its exact-key cache as usual; with the
+``semantic`` and ``hybrid`` strategies it also embeds the normalized prompt of
+each cached request into a :class:`SemanticIndex`. A new request whose prompt
+is close enough to a cached one (same provider, model, system prompt,
+parameters and conversation history) is answered from the cache even when the
+wording differs, e.g. "Quanto ho fatturato a marzo?" vs
+"quanto ho fatturato a Marzo".
+
+The index is an in-memory float32 matrix of unit vectors: a lookup is a single
+matrix-vector product restricted to rows of the same scope.
+
+Example:
+    >>> index = SemanticIndex(embedder, similarity_threshold=0.9)
+    >>> vector = await index.embed("Quanto ho fatturato a marzo?")
+    >>> index.add("key-1", vector, "quanto ho fatturato a marzo?", scope="s1")
+    >>> match = index.search(vector, scope="s1")
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from openfatture.ai.cache.config import CacheConfig
+from openfatture.platform.extras import MissingExtraError
+from openfatture.platform.logging import get_logger
+
+if TYPE_CHECKING:
+    from openfatture.ai.rag.embeddings import EmbeddingStrategy
+
+logger = get_logger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_WORDS = re.compile(r"\w+")
+
+
+def _numpy() -> Any:
+    """Import NumPy lazily (it ships with the ``rag`` extra)."""
+    try:
+        import numpy
+    except ImportError as e:  # pragma: no cover - numpy is a chromadb dependency
+        raise MissingExtraError("rag", feature="Semantic response cache", cause=e) from e
+    return numpy
+
+
+def normalize_prompt(text: str) -> str:
+    """Normalize a prompt before embedding (case and whitespace insensitive)."""
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+@dataclass(slots=True)
+class SemanticMatch:
+    """Nearest cached prompt for a lookup."""
+
+    key: str
+    prompt: str
+    similarity: float
+
+
+class SemanticIndex:
+    """Nearest-neighbour index from prompt embeddings to exact cache keys.
+
+    Rows are kept in least-recently-used order; when ``max_size`` is reached
+    the oldest row is dropped and its slot reused by moving the last row into
+    it, so the matrix never has holes.
+    """
+
+    def __init__(
+        self,
+        embedder: EmbeddingStrategy,
+        similarity_threshold: float = 0.85,
+        max_size: int = 1000,
+        initial_capacity: int = 64,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            embedder: Embedding strategy used for prompts
+            similarity_threshold: Minimum cosine similarity for a match
+            max_size: Maximum number of indexed prompts
+            initial_capacity: Rows pre-allocated before the matrix grows
+        """
+        self.np = _numpy()
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.max_size = max_size
+
+        self._capacity = max(1, min(initial_capacity, max_size))
+        self._matrix: Any = None
+        self._rows: OrderedDict[str, int] = OrderedDict()
+        self._keys: list[str] = []
+        self._scopes: list[str] = []
+        self._prompts: list[str] = []
+
+        self._lookups = 0
+        self._matches = 0
+        self._evictions = 0
+        self._similarity_sum = 0.0
+
+    async def embed(self, prompt: str) -> Any:
+        """Embed a prompt as a unit float32 vector."""
+        vector = self.np.asarray(
+            await self.embedder.embed_text(normalize_prompt(prompt)), dtype=self.np.float32
+        )
+        norm = float(self.np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def search(self, embedding: Any, scope: str) -> SemanticMatch | None:
+        """Return the most similar prompt in ``scope`` above the threshold.
+
+        Args:
+            embedding: Unit vector from :meth:`embed`
+            scope: Hash of everything in the request except the prompt
+
+        Returns:
+            Best match, or None
+        """
+        self._lookups += 1
+        count = len(self._keys)
+        if count == 0:
+            return None
+
+        similarities = self._matrix[:count] @ embedding
+        in_scope = self.np.fromiter(
+            (row_scope == scope for row_scope in self._scopes), dtype=bool, count=count
+        )
+        similarities = self.np.where(in_scope, similarities, -1.0)
+
+        row = int(self.np.argmax(similarities))
+        similarity = float(similarities[row])
+        if similarity < self.similarity_threshold:
+            return None
+
+        key = self._keys[row]
+        self._rows.move_to_end(key)
+        self._matches += 1
+        self._similarity_sum += similarity
+        return SemanticMatch(key=key, prompt=self._prompts[row], similarity=similarity)
+
+    def add(self, key: str, embedding: Any, prompt: str, scope: str) -> None:
+        """Index (or re-index) the prompt of a cached response.
+
+        Args:
+            key: Exact cache key holding the response
+            embedding: Unit vector from :meth:`embed`
+            prompt: Original prompt (kept for false-hit samples)
+            scope: Hash of everything in the request except the prompt
+        """
+        if key in self._rows:
+            row = self._rows[key]
+            self._rows.move_to_end(key)
+        else:
+            if len(self._keys) >= self.max_size:
+                oldest = next(iter(self._rows))
+                self.delete(oldest)
+                self._evictions += 1
+                logger.debug("semantic_index_eviction", evicted_key=oldest[:16])
+            row = len(self._keys)
+            self._ensure_capacity(row + 1, len(embedding))
+            self._rows[key] = row
+            self._keys.append(key)
+            self._scopes.append(scope)
+            self._prompts.append(prompt)
+
+        self._matrix[row] = embedding
+        self._scopes[row] = scope
+        self._prompts[row] = prompt
+
+    def delete(self, key: str) -> bool:
+        """Remove a key from the index (e.g. its response expired)."""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+
+        last = len(self._keys) - 1
+        if row != last:
+            moved_key = self._keys[last]
+            self._matrix[row] = self._matrix[last]
+            self._keys[row] = moved_key
+            self._scopes[row] = self._scopes[last]
+            self._prompts[row] = self._prompts[last]
+            self._rows[moved_key] = row
+
+        self._keys.pop()
+        self._scopes.pop()
+        self._prompts.pop()
+        return True
+
+    def clear(self) -> None:
+        """Remove every indexed prompt."""
+        self._rows.clear()
+        self._keys.clear()
+        self._scopes.clear()
+        self._prompts.clear()
+
+    def size(self) -> int:
+        """Return the number of indexed prompts."""
+        return len(self._keys)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return index statistics."""
+        return {
+            "index_size": self.size(),
+            "lookups": self._lookups,
+            "matches": self._matches,
+            "evictions": self._evictions,
+            "similarity_threshold": self.similarity_threshold,
+            "mean_match_similarity": (
+                self._similarity_sum / self._matches if self._matches else 0.0
+            ),
+        }
+
+    def _ensure_capacity(self, rows: int, dimension: int) -> None:
+        """Allocate or grow the matrix (doubling, capped at ``max_size``)."""
+        if self._matrix is None:
+            self._matrix = self.np.zeros((self._capacity, dimension), dtype=self.np.float32)
+        if rows <= self._matrix.shape[0]:
+            return
+
+        capacity = min(max(rows, self._matrix.shape[0] * 2), self.max_size)
+        grown = self.np.zeros((capacity, dimension), dtype=self.np.float32)
+        grown[: self._matrix.shape[0]] = self._matrix
+        self._matrix = grown
+
+
+def response_agreement(left: str, right: str) -> float:
+    """Jaccard overlap of the word sets of two responses (0.0-1.0).
+
+    Used to judge sampled semantic hits: a fresh response that shares little
+    vocabulary with the cached one marks the hit as false.
+    """
+    left_words = set(_WORDS.findall(left.lower()))
+    right_words = set(_WORDS.findall(right.lower()))
+    if not left_words and not right_words:
+        return 1.0
+    return len(left_words & right_words) / len(left_words | right_words)
+
+
+def create_cache_embedder(config: CacheConfig, api_key: str | None = None) -> EmbeddingStrategy:
+    """Build the embedding strategy for the semantic cache.
+
+    ``text-embedding-*`` models use OpenAI (``OPENAI_API_KEY``), anything else
+    is loaded with sentence-transformers. Embeddings go through the persistent
+    RAG embedding cache, so repeated prompts are embedded once.
+
+    Args:
+        config: Cache configuration (``embedding_model``)
+        api_key: OpenAI API key (default: ``OPENAI_API_KEY``)
+
+    Returns:
+        EmbeddingStrategy instance
+    """
+    from openfatture.ai.rag.config import get_rag_config
+    from openfatture.ai.rag.embeddings import create_embeddings
+
+    provider = (
+        "openai" if config.embedding_model.startswith("text-embedding") else "sentence-transformers"
+    )
+    rag_config = get_rag_config().model_copy(
+        update={"embedding_provider": provider, "embedding_model": config.embedding_model}
+    )
+    return create_embeddings(rag_config, api_key=api_key or os.getenv("OPENAI_API_KEY"))
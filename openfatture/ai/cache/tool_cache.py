@@ -2,14 +2,37 @@
 
 This module provides caching for tool execution results to improve performance
 and reduce database load for read-heavy operations.
+
+Cached results carry dependency tags (see :mod:`openfatture.ai.cache.invalidation`).
+Each tag has a version token kept in a tag store; a result is served only while
+the tokens it was cached with are still current. Domain events published on the
+event buses replace the tokens of the tags they affect, so only results
+depending on changed invoices, clients or payments are dropped. Not every write
+publishes an event yet (imports, SDI notifications, direct CLI edits), so the
+TTL stays short and bounds how long such changes go unnoticed.
+
+The tag store may evict or expire tokens. A tag without a token gets a fresh
+one when a result is cached, and results are stale as soon as one of their
+tokens is missing, so a dropped token can never make an old result current.
 """
 
+import asyncio
 import hashlib
 import json
-from collections.abc import Awaitable, Callable
+import threading
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
 from typing import Any
 
+from openfatture.ai.cache.config import get_cache_config
+from openfatture.ai.cache.invalidation import (
+    event_dependency_tags,
+    invalidating_event_types,
+    tool_dependency_tags,
+)
 from openfatture.ai.cache.memory import LRUCache
+from openfatture.ai.cache.persistent import create_cache_strategy
+from openfatture.ai.cache.strategy import CacheStrategy
 from openfatture.ai.tools.models import ToolResult
 from openfatture.platform.logging import get_logger
 
@@ -28,12 +51,17 @@ class ToolResultCache:
     - TTL-based expiration
     - Cache statistics and monitoring
     - Selective caching (only for read operations)
+    - Pluggable storage (in-memory LRU by default, SQLite or Redis to share
+      results across processes)
+    - Data-change-aware invalidation driven by domain events
     """
 
     def __init__(
         self,
         max_size: int = 1000,
         default_ttl: int = 300,  # 5 minutes
+        cache: CacheStrategy[ToolResult] | None = None,
+        tag_store: CacheStrategy[str] | None = None,
     ):
         """
         Initialize tool result cache.
@@ -41,8 +69,26 @@ class ToolResultCache:
         Args:
             max_size: Maximum number of cached results
             default_ttl: Default TTL in seconds for cached results
+            cache: Storage strategy (creates an in-memory LRU if None)
+            tag_store: Storage for dependency tag versions; must be shared
+                like ``cache``, since results whose versions are missing from
+                it are misses (creates an in-memory LRU if None)
         """
-        self.cache: LRUCache[ToolResult] = LRUCache(max_size=max_size, default_ttl=default_ttl)
+        self.cache: CacheStrategy[ToolResult] = (
+            cache if cache is not None else LRUCache(max_size=max_size, default_ttl=default_ttl)
+        )
+        self.tag_store: CacheStrategy[str] = (
+            tag_store
+            if tag_store is not None
+            else LRUCache(max_size=max_size * 4, default_ttl=None, cleanup_interval=0)
+        )
+        self._pending_tags: set[str] = set()
+        self._pending_lock = threading.Lock()
+        self._flush_tasks: set[asyncio.Task[int]] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._invalidations = 0
+        self._stale_results = 0
+
         self.read_operations = {
             # Invoice tools
             "search_invoices",
@@ -52,6 +98,12 @@ class ToolResultCache:
             "search_clients",
             "get_client_details",
             "get_client_stats",
+            # Payment tools
+            "get_payment_status",
+            "search_payments",
+            "get_payment_stats",
+            "search_bank_transactions",
+            "get_due_dates",
             # Knowledge tools
             "search_knowledge",
             "get_knowledge_details",
@@ -59,8 +111,7 @@ class ToolResultCache:
 
         logger.info(
             "tool_cache_initialized",
-            max_size=max_size,
-            default_ttl=default_ttl,
+            cache=type(self.cache).__name__,
             read_operations=len(self.read_operations),
         )
 
@@ -109,6 +160,9 @@ class ToolResultCache:
         """
         Get cached result for a tool execution.
 
+        Results whose dependency tags changed since they were cached are
+        dropped and reported as a miss.
+
         Args:
             tool_name: Name of the tool
             parameters: Tool parameters
@@ -119,10 +173,19 @@ class ToolResultCache:
         if not self.is_cacheable(tool_name):
             return None
 
+        self._loop = asyncio.get_running_loop()
+        await self.flush_invalidations()
+
         cache_key = self._generate_cache_key(tool_name, parameters)
         cached_result = await self.cache.get(cache_key)
 
         if cached_result:
+            if not await self._is_current(cached_result):
+                await self.cache.delete(cache_key)
+                self._stale_results += 1
+                logger.debug("tool_cache_stale", tool_name=tool_name, cache_key=cache_key)
+                return None
+
             # Mark as cache hit in the result
             cached_result.cache_hit = True
             cached_result.cache_key = cache_key
@@ -157,6 +220,7 @@ class ToolResultCache:
             return
 
         cache_key = self._generate_cache_key(tool_name, parameters)
+        tags = tool_dependency_tags(tool_name, parameters, result.data)
 
         # Create a copy of the result for caching
         cached_result = ToolResult(
@@ -165,7 +229,7 @@ class ToolResultCache:
             error=result.error,
             error_type=result.error_type,
             tool_name=result.tool_name,
-            metadata=result.metadata.copy(),
+            metadata={**result.metadata, "dependency_tags": await self._current_versions(tags)},
             execution_time=result.execution_time,
             retries=result.retries,
             cache_hit=False,  # Will be set to True when retrieved
@@ -179,8 +243,28 @@ class ToolResultCache:
             tool_name=tool_name,
             cache_key=cache_key,
             ttl=ttl,
+            tags=sorted(tags),
         )
 
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Invalidate every cached result depending on any of the given tags.
+
+        Args:
+            tags: Dependency tags, e.g. ``["client:7", "clients"]``
+
+        Returns:
+            Number of tags invalidated
+        """
+        tags = sorted(set(tags))
+        for tag in tags:
+            await self.tag_store.set(self._tag_key(tag), uuid.uuid4().hex)
+
+        self._invalidations += len(tags)
+        if tags:
+            logger.info("tool_cache_tags_invalidated", tags=tags)
+        return len(tags)
+
     async def invalidate_tool_cache(self, tool_name: str) -> int:
         """
         Invalidate all cached results for a specific tool.
@@ -191,22 +275,85 @@ class ToolResultCache:
             tool_name: Name of the tool to invalidate
 
         Returns:
-            Number of entries invalidated
+            Number of tags invalidated
         """
-        # This is a simplified implementation - in a real system,
-        # we'd need to track which keys belong to which tools
-        # For now, we'll clear the entire cache when any write operation occurs
-        stats_before = self.cache.get_stats()
-        await self.cache.clear()
+        invalidated = await self.invalidate_tags([f"tool:{tool_name}"])
+        logger.info("tool_cache_invalidated", tool_name=tool_name)
+        return invalidated
 
-        invalidated = int(stats_before["size"])
-        logger.info(
-            "tool_cache_invalidated",
-            tool_name=tool_name,
-            entries_invalidated=invalidated,
-        )
+    def handle_event(self, event: Any) -> None:
+        """
+        Event bus handler: invalidate results depending on the changed data.
 
-        return invalidated
+        Synchronous so it runs inline on ``publish()``. The tags are queued
+        first, so any later lookup in this process sees the invalidation, then
+        flushed to the tag store on the running event loop (or the loop last
+        used by this cache when called from a worker thread).
+
+        Args:
+            event: Domain event (invoice, client or payment event)
+        """
+        tags = event_dependency_tags(event)
+        if not tags:
+            return
+
+        with self._pending_lock:
+            self._pending_tags.update(tags)
+
+        try:
+            running_loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        try:
+            if running_loop is not None:
+                task = running_loop.create_task(self.flush_invalidations())
+                self._flush_tasks.add(task)
+                task.add_done_callback(self._flush_tasks.discard)
+            elif self._loop is not None and self._loop.is_running():
+                asyncio.run_coroutine_threadsafe(self.flush_invalidations(), self._loop)
+            else:
+                asyncio.run(self.flush_invalidations())
+        except Exception as e:
+            logger.warning(
+                "tool_cache_invalidation_deferred",
+                event_type=type(event).__name__,
+                error=str(e),
+            )
+
+    def subscribe(self, event_bus: Any) -> None:
+        """
+        Subscribe :meth:`handle_event` to the events that change cached data.
+
+        Works with the global event bus and the payment ``InMemoryEventBus``
+        (both expose ``subscribe(event_type, handler)``).
+
+        Args:
+            event_bus: Event bus to listen on
+        """
+        for event_type in invalidating_event_types():
+            event_bus.subscribe(event_type, self.handle_event)
+
+        logger.info("tool_cache_subscribed", event_bus=type(event_bus).__name__)
+
+    async def flush_invalidations(self) -> int:
+        """
+        Apply invalidations queued by :meth:`handle_event`.
+
+        Returns:
+            Number of tags invalidated
+        """
+        with self._pending_lock:
+            tags, self._pending_tags = self._pending_tags, set()
+        if not tags:
+            return 0
+
+        try:
+            return await self.invalidate_tags(tags)
+        except Exception:
+            with self._pending_lock:
+                self._pending_tags.update(tags)
+            raise
 
     async def get_or_execute(
         self,
@@ -250,6 +397,8 @@ class ToolResultCache:
         return {
             **cache_stats,
             "cacheable_operations": len(self.read_operations),
+            "tags_invalidated": self._invalidations,
+            "stale_results_dropped": self._stale_results,
         }
 
     async def clear(self) -> None:
@@ -266,6 +415,37 @@ class ToolResultCache:
         """
         return await self.cache.cleanup()
 
+    def _tag_key(self, tag: str) -> str:
+        """Tag store key holding the current version of ``tag``."""
+        return f"tag:{tag}"
+
+    async def _tag_versions(self, tags: Iterable[str]) -> dict[str, str | None]:
+        """Read the current version of each tag (None = missing or evicted)."""
+        return {tag: await self.tag_store.get(self._tag_key(tag)) for tag in sorted(tags)}
+
+    async def _current_versions(self, tags: Iterable[str]) -> dict[str, str]:
+        """Snapshot the current version of each tag, creating the missing ones."""
+        versions: dict[str, str] = {}
+        for tag, version in (await self._tag_versions(tags)).items():
+            if version is None:
+                version = uuid.uuid4().hex
+                await self.tag_store.set(self._tag_key(tag), version)
+            versions[tag] = version
+        return versions
+
+    async def _is_current(self, result: ToolResult) -> bool:
+        """Check that no dependency of a cached result changed since it was cached.
+
+        A missing version means the tag was evicted from the tag store (or the
+        result predates versioning); its invalidations are lost, so the result
+        is treated as stale.
+        """
+        versions = result.metadata.get("dependency_tags")
+        if not isinstance(versions, dict):
+            return True
+        current = await self._tag_versions(versions)
+        return None not in current.values() and versions == current
+
 
 # Global cache instance
 _tool_cache: ToolResultCache | None = None
@@ -275,12 +455,52 @@ def get_tool_cache() -> ToolResultCache:
     """
     Get the global tool result cache instance.
 
+    The instance is subscribed to the global event bus, so invoice, client and
+    payment events invalidate the results that depend on them. Payment event
+    buses built by ``create_event_bus()`` forward to it through
+    :func:`subscribe_tool_cache`.
+
     Returns:
         Global ToolResultCache instance
     """
     global _tool_cache
 
     if _tool_cache is None:
-        _tool_cache = ToolResultCache()
+        # Storage follows OPENFATTURE_CACHE_BACKEND; domain events invalidate
+        # early, the TTL bounds changes made outside the event buses
+        from openfatture.events import get_global_event_bus
+
+        config = get_cache_config()
+        _tool_cache = ToolResultCache(
+            cache=create_cache_strategy(config, namespace="tool", default_ttl=config.tool_ttl),
+            tag_store=create_cache_strategy(
+                config, namespace="tool_tags", default_ttl=config.tool_ttl
+            ),
+        )
+        _tool_cache.subscribe(get_global_event_bus())
 
     return _tool_cache
+
+
+def subscribe_tool_cache(event_bus: Any) -> None:
+    """
+    Invalidate the global tool cache on the domain events of another bus.
+
+    Unlike ``get_tool_cache().subscribe(bus)`` this does not build the cache up
+    front (the in-memory backend needs a running event loop): events reach the
+    cache once it exists, or straight away with a shared backend whose entries
+    other processes may have cached.
+
+    Args:
+        event_bus: Bus exposing ``subscribe(event_type, handler)``
+    """
+    for event_type in invalidating_event_types():
+        event_bus.subscribe(event_type, _invalidate_global_tool_cache)
+
+
+def _invalidate_global_tool_cache(event: Any) -> None:
+    cache = _tool_cache
+    if cache is None and get_cache_config().backend != "memory":
+        cache = get_tool_cache()
+    if cache is not None:
+        cache.handle_event(event)
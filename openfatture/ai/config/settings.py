@@ -202,6 +202,19 @@ class AISettings(BaseSettings):
         description="Base delay between retries in seconds",
     )
 
+    # Rate Limiting
+    requests_per_minute: int = Field(
+        default=0,
+        ge=0,
+        description="Maximum LLM requests per minute per provider (0 to disable)",
+    )
+
+    rate_limit_state_path: Path | None = Field(
+        default=None,
+        description="SQLite file sharing the request quota between processes "
+        "(default: per-process quota)",
+    )
+
     # Cache Configuration
     cache_ttl_seconds: int = Field(
         default=86400,  # 24 hours
@@ -215,6 +228,23 @@ class AISettings(BaseSettings):
         description="Maximum cache size in MB",
     )
 
+    context_snapshot_ttl_seconds: float = Field(
+        default=60.0,
+        ge=0,
+        description="TTL of the business-context snapshot used to enrich chat turns (0 to disable)",
+    )
+
+    context_history_budget_tokens: int | None = Field(
+        default=None,
+        ge=1,
+        description="Token budget for conversation history in prompts (provider default if unset)",
+    )
+
+    context_summarize_evicted: bool = Field(
+        default=False,
+        description="Summarize conversation turns evicted from the history budget",
+    )
+
     # Agent-Specific Settings
     invoice_assistant_enabled: bool = Field(
         default=True,
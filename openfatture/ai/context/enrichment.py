@@ -1,12 +1,10 @@
 """Context enrichment utilities for AI agents."""
 
-from datetime import datetime
 from typing import Any
 
+from openfatture.ai.context.snapshot import BusinessSnapshotCache, get_business_snapshot_cache
 from openfatture.ai.domain.context import AgentContext, ChatContext
 from openfatture.platform.logging import get_logger
-from openfatture.storage.database.base import get_session
-from openfatture.storage.database.models import Cliente, Fattura, StatoFattura
 
 logger = get_logger(__name__)
 
@@ -21,9 +19,21 @@ class ContextManager:
     - Error handling and graceful degradation
     """
 
-    def __init__(self) -> None:
-        """Initialize context manager."""
+    def __init__(self, snapshot_cache: BusinessSnapshotCache | None = None) -> None:
+        """Initialize context manager.
+
+        Args:
+            snapshot_cache: Business snapshot cache (default: process-wide cache)
+        """
         self._db_warning_shown = False
+        self._snapshot_cache = snapshot_cache
+
+    @property
+    def snapshot_cache(self) -> BusinessSnapshotCache:
+        """Business snapshot cache shared by chat turns."""
+        if self._snapshot_cache is None:
+            self._snapshot_cache = get_business_snapshot_cache()
+        return self._snapshot_cache
 
     async def enrich_context(self, context: ChatContext) -> ChatContext:
         """
@@ -41,14 +51,11 @@ class ContextManager:
                 session_id=getattr(context, "session_id", None),
             )
 
-            # Add current year stats
-            context.current_year_stats = self._get_current_year_stats()
-
-            # Add recent invoices summary
-            context.recent_invoices_summary = self._get_recent_invoices_summary()
-
-            # Add recent clients summary
-            context.recent_clients_summary = self._get_recent_clients_summary()
+            # Stats and recent invoices/clients come from the shared snapshot
+            snapshot = self.snapshot_cache.get()
+            context.current_year_stats = dict(snapshot.current_year_stats)
+            context.recent_invoices_summary = snapshot.recent_invoices_summary
+            context.recent_clients_summary = snapshot.recent_clients_summary
 
             logger.info(
                 "chat_context_enriched",
@@ -202,79 +209,6 @@ class ContextManager:
                 message="Continuing with unenriched context",
             )
 
-    def _get_current_year_stats(self) -> dict[str, Any]:
-        """Get statistics for current year."""
-        db = get_session()
-        try:
-            current_year = datetime.now().year
-            stats: dict[str, Any] = {
-                "anno": current_year,
-                "totale_fatture": 0,
-                "per_stato": {},
-                "importo_totale": 0.0,
-            }
-
-            for stato in StatoFattura:
-                count = (
-                    db.query(Fattura)
-                    .filter(Fattura.anno == current_year, Fattura.stato == stato)
-                    .count()
-                )
-                stats["per_stato"][stato.value] = count
-                stats["totale_fatture"] += count
-
-            fatture = db.query(Fattura).filter(Fattura.anno == current_year).all()
-            stats["importo_totale"] = float(sum(f.totale for f in fatture))
-
-            return stats
-        except Exception as e:
-            logger.error("get_current_year_stats_failed", error=str(e))
-            return {}
-        finally:
-            db.close()
-
-    def _get_recent_invoices_summary(self, limit: int = 5) -> str:
-        """Get summary of recent invoices."""
-        db = get_session()
-        try:
-            fatture = db.query(Fattura).order_by(Fattura.data_emissione.desc()).limit(limit).all()
-            if not fatture:
-                return "Nessuna fattura trovata"
-
-            lines = [f"Ultime {len(fatture)} fatture:"]
-            for f in fatture:
-                lines.append(
-                    f"- {f.numero}/{f.anno}: {f.cliente.denominazione} - "
-                    f"€{f.totale:.2f} ({f.stato.value})"
-                )
-            return "\n".join(lines)
-        except Exception as e:
-            logger.error("get_recent_invoices_summary_failed", error=str(e))
-            return "Errore nel recupero delle fatture recenti"
-        finally:
-            db.close()
-
-    def _get_recent_clients_summary(self, limit: int = 5) -> str:
-        """Get summary of recent clients."""
-        db = get_session()
-        try:
-            clienti = db.query(Cliente).limit(limit).all()
-            if not clienti:
-                return "Nessun cliente trovato"
-
-            lines = [f"Ultimi {len(clienti)} clienti:"]
-            for c in clienti:
-                fatture_count = len(c.fatture)
-                lines.append(
-                    f"- {c.denominazione} ({c.partita_iva or 'N/A'}): {fatture_count} fatture"
-                )
-            return "\n".join(lines)
-        except Exception as e:
-            logger.error("get_recent_clients_summary_failed", error=str(e))
-            return "Errore nel recupero dei clienti recenti"
-        finally:
-            db.close()
-
     @staticmethod
     def _format_invoice_result(result: Any) -> str:
         """Create human-readable summary for invoice retrieval result."""
@@ -0,0 +1,330 @@
+"""Token-budgeted packing of conversation history.
+
+Interactive sessions grow turn after turn, and sending the whole history makes
+every prompt larger (and slower, and more expensive) than the last.
+:class:`ContextPacker` bounds it:
+
+- each message is counted once with the provider tokenizer; the count is
+  cached in ``message.metadata`` so later turns (and persisted sessions) reuse it
+- the most recent messages that fit a provider-specific budget are selected
+  in a single backwards pass
+- optionally, evicted turns are replaced by a short summary; summaries are
+  cached per evicted prefix and extended incrementally as more turns fall out
+
+Example:
+    >>> packer = ContextPacker(provider)
+    >>> packed = packer.pack(history.get_messages(include_system=False))
+    >>> packed.tokens <= packer.budget_tokens
+    True
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Protocol
+
+from openfatture.ai.domain.message import Message, Role
+from openfatture.platform.logging import get_logger
+
+if TYPE_CHECKING:
+    from openfatture.ai.config.settings import AISettings
+    from openfatture.ai.domain.context import ChatContext
+    from openfatture.ai.providers.base import BaseLLMProvider
+
+logger = get_logger(__name__)
+
+TOKEN_COUNTS_KEY = "token_counts"
+APPROXIMATE_TOKENIZER = "approx"
+
+# Per-message framing added by chat APIs (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# History budgets leave room for system prompt, tool schemas and the answer
+DEFAULT_HISTORY_BUDGETS: dict[str, int] = {
+    "anthropic": 32000,
+    "openai": 16000,
+    "ollama": 3000,
+}
+DEFAULT_HISTORY_BUDGET = 4000
+
+DEFAULT_SUMMARY_MAX_TOKENS = 300
+_MAX_CACHED_SUMMARIES = 32
+
+Summarizer = Callable[[str | None, list[Message]], Awaitable[str]]
+
+
+class _CountableMessage(Protocol):
+    role: Role
+    content: str
+    metadata: dict[str, Any]
+
+
+def approximate_tokens(text: str) -> int:
+    """Estimate tokens without a tokenizer (~4 characters per token)."""
+    return len(text) // 4
+
+
+def tokenizer_key(provider: BaseLLMProvider | None) -> str:
+    """Return the cache key identifying a provider tokenizer."""
+    if provider is None:
+        return APPROXIMATE_TOKENIZER
+    return f"{provider.provider_name}:{provider.model}"
+
+
+def message_tokens(
+    message: _CountableMessage,
+    count: Callable[[str], int] = approximate_tokens,
+    key: str = APPROXIMATE_TOKENIZER,
+) -> int:
+    """Return the token count of a message, computing it at most once per tokenizer.
+
+    Args:
+        message: ``Message`` or ``ChatMessage``
+        count: Tokenizer used on a cache miss
+        key: Tokenizer identifier the count is cached under
+
+    Returns:
+        Tokens of content and tool calls, plus per-message overhead
+    """
+    counts = message.metadata.setdefault(TOKEN_COUNTS_KEY, {})
+    cached = counts.get(key)
+    if cached is None:
+        text = message.content or ""
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            text += json.dumps(tool_calls, default=str, sort_keys=True)
+        cached = counts[key] = count(text) + MESSAGE_OVERHEAD_TOKENS
+    return int(cached)
+
+
+@dataclass
+class PackedHistory:
+    """Result of packing a conversation history."""
+
+    messages: list[Message]
+    evicted: list[Message] = field(default_factory=list)
+    tokens: int = 0
+    summary: str | None = None
+
+
+class ContextPacker:
+    """Select the conversation history sent to the model within a token budget.
+
+    System messages are always kept; the most recent message is kept even if
+    it alone exceeds the budget. Tool results are never sent without the
+    assistant message that requested them.
+    """
+
+    def __init__(
+        self,
+        provider: BaseLLMProvider | None = None,
+        budget_tokens: int | None = None,
+        summarizer: Summarizer | None = None,
+        summary_max_tokens: int = DEFAULT_SUMMARY_MAX_TOKENS,
+    ) -> None:
+        """Initialize the packer.
+
+        Args:
+            provider: Provider whose tokenizer counts messages (approximation if None)
+            budget_tokens: History budget (provider default if None)
+            summarizer: Async callable ``(previous_summary, evicted) -> summary``
+            summary_max_tokens: Budget reserved for the summary when summarizing
+        """
+        self.provider = provider
+        self.summarizer = summarizer
+        self.summary_max_tokens = summary_max_tokens
+        self._key = tokenizer_key(provider)
+        if budget_tokens is None:
+            provider_name = getattr(provider, "provider_name", None)
+            budget_tokens = DEFAULT_HISTORY_BUDGETS.get(
+                provider_name if isinstance(provider_name, str) else "",
+                DEFAULT_HISTORY_BUDGET,
+            )
+        self.budget_tokens = budget_tokens
+        self._summaries: OrderedDict[str, str] = OrderedDict()
+
+        self._packs = 0
+        self._evicted_messages = 0
+        self._summaries_generated = 0
+        self._summary_cache_hits = 0
+
+    def count_text(self, text: str) -> int:
+        """Count tokens with the provider tokenizer, falling back to an estimate."""
+        if self.provider is None:
+            return approximate_tokens(text)
+        try:
+            return int(self.provider.count_tokens(text))
+        except Exception as exc:
+            logger.debug("context_packer_count_failed", error=str(exc), tokenizer=self._key)
+            return approximate_tokens(text)
+
+    def count(self, message: _CountableMessage) -> int:
+        """Return the cached token count of a message."""
+        return message_tokens(message, self.count_text, self._key)
+
+    def pack(self, messages: Sequence[Message], budget_tokens: int | None = None) -> PackedHistory:
+        """Keep the most recent messages that fit the budget.
+
+        Args:
+            messages: Conversation history, oldest first
+            budget_tokens: Override for this call
+
+        Returns:
+            PackedHistory with kept messages in their original order
+        """
+        budget = self.budget_tokens if budget_tokens is None else budget_tokens
+        used = sum(self.count(m) for m in messages if m.role == Role.SYSTEM)
+
+        start = len(messages)
+        for index in range(len(messages) - 1, -1, -1):
+            message = messages[index]
+            if message.role == Role.SYSTEM:
+                continue
+            tokens = self.count(message)
+            if used + tokens > budget and start < len(messages):
+                break
+            used += tokens
+            start = index
+
+        # A tool result without its assistant tool call is rejected by providers
+        while start < len(messages) - 1 and messages[start].role == Role.TOOL:
+            used -= self.count(messages[start])
+            start += 1
+
+        head = messages[:start]
+        kept = [m for m in head if m.role == Role.SYSTEM] + list(messages[start:])
+        evicted = [m for m in head if m.role != Role.SYSTEM]
+
+        self._packs += 1
+        self._evicted_messages += len(evicted)
+        if evicted:
+            logger.debug(
+                "context_history_packed",
+                kept=len(kept),
+                evicted=len(evicted),
+                tokens=used,
+                budget=budget,
+                tokenizer=self._key,
+            )
+        return PackedHistory(messages=kept, evicted=evicted, tokens=used)
+
+    async def apack(self, messages: Sequence[Message]) -> PackedHistory:
+        """Pack messages and, if a summarizer is set, summarize the evicted ones.
+
+        A failed summarization drops the evicted turns without a summary.
+        """
+        summarizer = self.summarizer
+        if summarizer is None:
+            return self.pack(messages)
+
+        packed = self.pack(messages, self.budget_tokens - self.summary_max_tokens)
+        if packed.evicted:
+            try:
+                packed.summary = await self._summarize(summarizer, packed.evicted)
+            except Exception as exc:
+                logger.warning("context_summary_failed", error=str(exc))
+        return packed
+
+    async def pack_context(self, context: ChatContext) -> PackedHistory:
+        """Replace ``context.conversation_history`` with its packed version.
+
+        The caller's history object is not modified. The summary of evicted
+        turns, if any, is stored in ``context.conversation_summary`` for the
+        system prompt.
+        """
+        history = context.conversation_history
+        packed = await self.apack(history.messages)
+        if packed.evicted:
+            context.conversation_history = history.model_copy(update={"messages": packed.messages})
+            if packed.summary:
+                context.conversation_summary = packed.summary
+        return packed
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return packing statistics."""
+        return {
+            "tokenizer": self._key,
+            "budget_tokens": self.budget_tokens,
+            "packs": self._packs,
+            "evicted_messages": self._evicted_messages,
+            "summaries_generated": self._summaries_generated,
+            "summary_cache_hits": self._summary_cache_hits,
+        }
+
+    async def _summarize(self, summarizer: Summarizer, evicted: list[Message]) -> str:
+        # Rolling digests identify every evicted prefix, so the summary of a
+        # longer prefix extends the newest cached one instead of starting over.
+        digests: list[str] = []
+        digest = ""
+        for message in evicted:
+            digest = hashlib.sha256(
+                f"{digest}\x00{message.role.value}\x00{message.content}".encode()
+            ).hexdigest()
+            digests.append(digest)
+
+        if digests[-1] in self._summaries:
+            self._summary_cache_hits += 1
+            self._summaries.move_to_end(digests[-1])
+            return self._summaries[digests[-1]]
+
+        previous: str | None = None
+        done = 0
+        for index in range(len(digests) - 2, -1, -1):
+            if digests[index] in self._summaries:
+                previous = self._summaries[digests[index]]
+                done = index + 1
+                break
+
+        summary = await summarizer(previous, evicted[done:])
+        self._summaries_generated += 1
+        self._summaries[digests[-1]] = summary
+        while len(self._summaries) > _MAX_CACHED_SUMMARIES:
+            self._summaries.popitem(last=False)
+        return summary
+
+
+def provider_summarizer(
+    provider: BaseLLMProvider, max_tokens: int = DEFAULT_SUMMARY_MAX_TOKENS
+) -> Summarizer:
+    """Build a summarizer that asks the provider to condense evicted turns."""
+
+    async def summarize(previous: str | None, evicted: list[Message]) -> str:
+        lines = [f"{m.role.value}: {m.content}" for m in evicted if m.content]
+        if previous:
+            lines.insert(0, f"Riepilogo precedente: {previous}")
+        response = await provider.generate(
+            messages=[Message(role=Role.USER, content="\n".join(lines))],
+            system_prompt=(
+                "Riassumi in italiano, in modo conciso, la conversazione seguente tra "
+                "utente e assistente. Conserva numeri di fattura, clienti, importi, date "
+                "e decisioni prese."
+            ),
+            temperature=0.0,
+            max_tokens=max_tokens,
+        )
+        return response.content.strip()
+
+    return summarize
+
+
+def create_context_packer(
+    provider: BaseLLMProvider, settings: AISettings | None = None
+) -> ContextPacker:
+    """Build a packer configured from AI settings."""
+    if settings is None:
+        from openfatture.ai.config.settings import get_ai_settings
+
+        settings = get_ai_settings()
+
+    summarizer = None
+    if settings.context_summarize_evicted:
+        summarizer = provider_summarizer(provider)
+    return ContextPacker(
+        provider,
+        budget_tokens=settings.context_history_budget_tokens,
+        summarizer=summarizer,
+    )
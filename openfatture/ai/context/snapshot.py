@@ -0,0 +1,260 @@
+"""Cached business-context snapshot for chat enrichment.
+
+Every chat turn is enriched with the current year statistics and short
+summaries of recent invoices and clients. Rebuilding them on each turn means
+three database round trips per message, so :class:`BusinessSnapshotCache`
+keeps one snapshot per process:
+
+- built with aggregate SQL (one ``GROUP BY`` for the statistics, column-only
+  selects for the summaries, per-client invoice counts read from
+  ``cliente_aggregates``) instead of loading ORM entities
+- shared across turns and sessions, refreshed after a short TTL
+- dropped immediately when an invoice or client domain event is published
+
+Example:
+    >>> cache = get_business_snapshot_cache()
+    >>> snapshot = cache.get()
+    >>> snapshot.recent_invoices_summary
+    'Ultime 5 fatture:\\n- 12/2025: Rossi SRL - €1220.00 (inviata)...'
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, select
+
+from openfatture.platform.logging import get_logger
+from openfatture.storage.database.base import get_session
+from openfatture.storage.database.models import (
+    Cliente,
+    ClienteAggregate,
+    Fattura,
+    StatoFattura,
+)
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class BusinessSnapshot:
+    """Business data injected into chat contexts."""
+
+    current_year_stats: dict[str, Any]
+    recent_invoices_summary: str
+    recent_clients_summary: str
+    computed_at: float = field(default_factory=time.monotonic)
+
+
+def load_business_snapshot(limit: int = 5) -> BusinessSnapshot:
+    """Build a snapshot from the database with aggregate queries.
+
+    Args:
+        limit: Number of recent invoices and clients to summarize
+
+    Returns:
+        BusinessSnapshot
+    """
+    db = get_session()
+    try:
+        current_year = datetime.now().year
+        stats: dict[str, Any] = {
+            "anno": current_year,
+            "totale_fatture": 0,
+            "per_stato": {stato.value: 0 for stato in StatoFattura},
+            "importo_totale": 0.0,
+        }
+        rows = db.execute(
+            select(
+                Fattura.stato, func.count(Fattura.id), func.coalesce(func.sum(Fattura.totale), 0)
+            )
+            .where(Fattura.anno == current_year)
+            .group_by(Fattura.stato)
+        ).all()
+        for stato, count, total in rows:
+            stats["per_stato"][stato.value] = count
+            stats["totale_fatture"] += count
+            stats["importo_totale"] += float(total)
+
+        invoices = db.execute(
+            select(
+                Fattura.numero, Fattura.anno, Fattura.totale, Fattura.stato, Cliente.denominazione
+            )
+            .join(Cliente, Fattura.cliente_id == Cliente.id)
+            .order_by(Fattura.data_emissione.desc())
+            .limit(limit)
+        ).all()
+        if invoices:
+            invoice_lines = [f"Ultime {len(invoices)} fatture:"]
+            invoice_lines.extend(
+                f"- {numero}/{anno}: {cliente} - €{totale:.2f} ({stato.value})"
+                for numero, anno, totale, stato, cliente in invoices
+            )
+            invoices_summary = "\n".join(invoice_lines)
+        else:
+            invoices_summary = "Nessuna fattura trovata"
+
+        clients = db.execute(
+            select(
+                Cliente.denominazione,
+                Cliente.partita_iva,
+                func.coalesce(ClienteAggregate.num_fatture, 0),
+            )
+            .outerjoin(ClienteAggregate, ClienteAggregate.cliente_id == Cliente.id)
+            .order_by(Cliente.id)
+            .limit(limit)
+        ).all()
+        if clients:
+            client_lines = [f"Ultimi {len(clients)} clienti:"]
+            client_lines.extend(
+                f"- {denominazione} ({partita_iva or 'N/A'}): {count} fatture"
+                for denominazione, partita_iva, count in clients
+            )
+            clients_summary = "\n".join(client_lines)
+        else:
+            clients_summary = "Nessun cliente trovato"
+
+        return BusinessSnapshot(
+            current_year_stats=stats,
+            recent_invoices_summary=invoices_summary,
+            recent_clients_summary=clients_summary,
+        )
+    finally:
+        db.close()
+
+
+class BusinessSnapshotCache:
+    """Process-wide cache of the business-context snapshot.
+
+    Concurrent callers share one load: the first caller builds the snapshot
+    while the others wait for it. A snapshot loaded while an invalidation
+    happened is returned to its caller but not cached.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 60.0,
+        loader: Callable[[], BusinessSnapshot] = load_business_snapshot,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            ttl_seconds: Maximum snapshot age (0 disables caching)
+            loader: Callable returning a fresh :class:`BusinessSnapshot`
+        """
+        self.ttl_seconds = ttl_seconds
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._snapshot: BusinessSnapshot | None = None
+        self._generation = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._load_time_total = 0.0
+
+    def get(self) -> BusinessSnapshot:
+        """Return the cached snapshot, loading a fresh one if stale.
+
+        Raises:
+            Exception: Whatever the loader raises (e.g. database not initialized)
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and self._is_fresh(snapshot):
+            self._hits += 1
+            return snapshot
+
+        with self._lock:
+            # Another caller may have refreshed it while we waited
+            snapshot = self._snapshot
+            if snapshot is not None and self._is_fresh(snapshot):
+                self._hits += 1
+                return snapshot
+
+            self._misses += 1
+            generation = self._generation
+            started = time.perf_counter()
+            snapshot = self._loader()
+            elapsed = time.perf_counter() - started
+            self._load_time_total += elapsed
+
+            if generation == self._generation and self.ttl_seconds > 0:
+                self._snapshot = snapshot
+            logger.debug("business_snapshot_loaded", load_ms=round(elapsed * 1000, 2))
+            return snapshot
+
+    def invalidate(self, event: Any = None) -> None:
+        """Drop the cached snapshot (usable as an event bus handler)."""
+        self._generation += 1
+        self._snapshot = None
+        self._invalidations += 1
+        logger.debug(
+            "business_snapshot_invalidated",
+            event_type=type(event).__name__ if event is not None else None,
+        )
+
+    def subscribe(self, event_bus: Any) -> None:
+        """Invalidate the snapshot on invoice and client domain events.
+
+        Args:
+            event_bus: Event bus exposing ``subscribe(event_type, handler)``
+        """
+        from openfatture.events import (
+            ClientCreatedEvent,
+            ClientDeletedEvent,
+            ClientUpdatedEvent,
+            InvoiceCreatedEvent,
+            InvoiceDeletedEvent,
+            InvoiceSentEvent,
+            InvoiceValidatedEvent,
+        )
+
+        for event_type in (
+            InvoiceCreatedEvent,
+            InvoiceValidatedEvent,
+            InvoiceSentEvent,
+            InvoiceDeletedEvent,
+            ClientCreatedEvent,
+            ClientUpdatedEvent,
+            ClientDeletedEvent,
+        ):
+            event_bus.subscribe(event_type, self.invalidate)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return hit/miss statistics."""
+        total = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / total if total else 0.0,
+            "invalidations": self._invalidations,
+            "avg_load_ms": (self._load_time_total / self._misses * 1000 if self._misses else 0.0),
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def _is_fresh(self, snapshot: BusinessSnapshot) -> bool:
+        return time.monotonic() - snapshot.computed_at < self.ttl_seconds
+
+
+_snapshot_cache: BusinessSnapshotCache | None = None
+
+
+def get_business_snapshot_cache() -> BusinessSnapshotCache:
+    """Return the process-wide snapshot cache, subscribed to the global event bus."""
+    global _snapshot_cache
+
+    if _snapshot_cache is None:
+        from openfatture.ai.config.settings import get_ai_settings
+        from openfatture.events import get_global_event_bus
+
+        _snapshot_cache = BusinessSnapshotCache(
+            ttl_seconds=get_ai_settings().context_snapshot_ttl_seconds
+        )
+        _snapshot_cache.subscribe(get_global_event_bus())
+
+    return _snapshot_cache
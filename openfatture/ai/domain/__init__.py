@@ -11,7 +11,12 @@ from openfatture.ai.domain.context import (
     TaxContext,
 )
 from openfatture.ai.domain.message import ConversationHistory, Message, Role
-from openfatture.ai.domain.prompt import PromptManager, PromptTemplate, create_prompt_manager
+from openfatture.ai.domain.prompt import (
+    PromptManager,
+    PromptTemplate,
+    SystemPrompt,
+    create_prompt_manager,
+)
 from openfatture.ai.domain.response import (
     AgentResponse,
     ResponseStatus,
@@ -40,6 +45,7 @@ __all__ = [
     # Prompt
     "PromptTemplate",
     "PromptManager",
+    "SystemPrompt",
     "create_prompt_manager",
     # Response
     "AgentResponse",
@@ -268,4 +268,7 @@ class ChatContext(AgentContext):
     # RAG context (if enabled)
     similar_conversations: list[str] = Field(default_factory=list)
 
+    # Summary of turns evicted from the history budget
+    conversation_summary: str | None = None
+
     model_config = ConfigDict(arbitrary_types_allowed=True)
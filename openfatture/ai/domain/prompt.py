@@ -12,6 +12,21 @@ from openfatture.platform.logging import get_logger
 logger = get_logger(__name__)
 
 
+class SystemPrompt(str):
+    """System prompt whose leading part is identical across turns.
+
+    Behaves as a plain ``str``. Providers with prompt caching read
+    ``cacheable_prefix`` to place the cache breakpoint after the stable part.
+    """
+
+    cacheable_prefix: str
+
+    def __new__(cls, prefix: str, suffix: str = "") -> "SystemPrompt":
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.cacheable_prefix = prefix
+        return prompt
+
+
 class PromptTemplate(BaseModel):
     """
     Structured prompt template.
@@ -35,6 +35,10 @@ class UsageMetrics(BaseModel):
     total_tokens: int = 0
     estimated_cost_usd: float = 0.0
 
+    # Provider prompt caching (subsets of prompt_tokens)
+    cached_prompt_tokens: int = 0
+    cache_write_tokens: int = 0
+
     @property
     def cost_display(self) -> str:
         """Format cost for display."""
@@ -8,7 +8,8 @@ consumes the structured ``AgentResponse.tool_calls`` returned by the provider.
 
 Loop:
     1. Call ``provider.generate(messages, tools=...)``.
-    2. If ``response.has_tool_calls`` execute each tool via the ToolRegistry.
+    2. If ``response.has_tool_calls`` execute the tools via the ToolRegistry
+       (independent read-only calls run concurrently).
     3. Re-inject the assistant tool-call message and tool result messages.
     4. Repeat until the model returns a tool-call-free response or
        ``max_iterations`` is reached.
@@ -27,7 +28,8 @@ from openfatture.ai.domain.context import ChatContext
 from openfatture.ai.domain.message import Message, Role
 from openfatture.ai.domain.response import AgentResponse, ToolCall
 from openfatture.ai.providers.base import BaseLLMProvider
-from openfatture.ai.tools.registry import ToolRegistry
+from openfatture.ai.tools.models import ToolResult
+from openfatture.ai.tools.registry import ToolRegistry, execute_tool_calls
 from openfatture.platform.config import DebugConfig
 from openfatture.platform.logging import get_dynamic_logger, get_logger
 
@@ -175,10 +177,8 @@ class NativeToolOrchestrator:
                 )
             )
 
-            # Execute each tool call and re-inject results.
-            for tool_call in response.tool_calls:
-                tool_message = await self._execute_tool_call(tool_call, context)
-                working_messages.append(tool_message)
+            # Execute the tool calls and re-inject results in call order.
+            working_messages.extend(await self._execute_tool_calls(response.tool_calls, context))
 
         # Max iterations reached without a tool-call-free response.
         self.metrics["max_iterations_reached"] += 1
@@ -195,65 +195,88 @@ class NativeToolOrchestrator:
 
         return AgentResponse(content="", provider=self.provider.provider_name)
 
-    async def _execute_tool_call(
+    async def _execute_tool_calls(
+        self,
+        tool_calls: list[ToolCall],
+        context: ChatContext,
+    ) -> list[Message]:
+        """Execute the tool calls of one model turn.
+
+        Consecutive read-only calls run concurrently (see
+        :func:`~openfatture.ai.tools.registry.execute_tool_calls`); mutating
+        calls run serially.
+
+        Args:
+            tool_calls: The tool calls requested by the model.
+            context: Chat context (tool results are recorded for downstream use).
+
+        Returns:
+            One ``Role.TOOL`` message per call, in call order.
+        """
+        for tool_call in tool_calls:
+            self.metrics["tool_calls_attempted"] += 1
+            logger.info(
+                "executing_tool_native",
+                tool_name=tool_call.name,
+                parameters=tool_call.arguments,
+            )
+
+        outcomes = await execute_tool_calls(
+            self.tool_registry,
+            [(tool_call.name, tool_call.arguments) for tool_call in tool_calls],
+            confirm=False,
+        )
+        return [
+            self._tool_message(tool_call, outcome, context)
+            for tool_call, outcome in zip(tool_calls, outcomes, strict=True)
+        ]
+
+    def _tool_message(
         self,
         tool_call: ToolCall,
+        outcome: ToolResult | Exception,
         context: ChatContext,
     ) -> Message:
-        """Execute a single tool call and build the tool result message.
+        """Record a tool call outcome and build the tool result message.
 
         Args:
             tool_call: The tool call requested by the model.
+            outcome: Result of the call, or the exception it raised.
             context: Chat context (tool results are recorded for downstream use).
 
         Returns:
             A ``Role.TOOL`` message containing the serialized result.
         """
-        self.metrics["tool_calls_attempted"] += 1
-
-        logger.info(
-            "executing_tool_native",
-            tool_name=tool_call.name,
-            parameters=tool_call.arguments,
-        )
-
-        try:
-            result = await self.tool_registry.execute_tool(
+        if isinstance(outcome, Exception):
+            self.metrics["tool_calls_failed"] += 1
+            content = f"Error executing tool: {outcome}"
+            tool_call.error = str(outcome)
+            logger.error(
+                "tool_execution_failed_native",
                 tool_name=tool_call.name,
-                parameters=tool_call.arguments,
-                confirm=False,
+                error=str(outcome),
             )
-
-            if result.success:
+        else:
+            if outcome.success:
                 self.metrics["tool_calls_succeeded"] += 1
-                content = self._serialize_result(result.data)
+                content = self._serialize_result(outcome.data)
             else:
                 self.metrics["tool_calls_failed"] += 1
-                content = f"Error: {result.error}"
+                content = f"Error: {outcome.error}"
 
             # Record result on the call and in the context for observability.
-            tool_call.result = result.data if result.success else None
-            tool_call.error = None if result.success else result.error
+            tool_call.result = outcome.data if outcome.success else None
+            tool_call.error = None if outcome.success else outcome.error
 
             context.tool_results.append(
                 {
                     "tool": tool_call.name,
                     "parameters": tool_call.arguments,
-                    "result": result.data,
-                    "success": result.success,
+                    "result": outcome.data,
+                    "success": outcome.success,
                 }
             )
 
-        except Exception as exc:
-            self.metrics["tool_calls_failed"] += 1
-            content = f"Error executing tool: {exc}"
-            tool_call.error = str(exc)
-            logger.error(
-                "tool_execution_failed_native",
-                tool_name=tool_call.name,
-                error=str(exc),
-            )
-
         return Message(
             role=Role.TOOL,
             content=content,
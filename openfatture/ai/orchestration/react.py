@@ -12,6 +12,7 @@ from typing import Any
 
 from openfatture.ai.domain.context import ChatContext
 from openfatture.ai.domain.message import Message, Role
+from openfatture.ai.domain.prompt import SystemPrompt
 from openfatture.ai.orchestration.parsers import ToolCallParser
 from openfatture.ai.providers.base import BaseLLMProvider
 from openfatture.ai.tools.registry import ToolRegistry
@@ -59,6 +60,7 @@ class ReActOrchestrator:
         self.max_iterations = max_iterations
         self.parser = parser or ToolCallParser()
         self.debug_config = debug_config
+        self._prompt_prefix_cache: tuple[Any, str] | None = None
 
         # Get dynamic logger for this module
         self.logger = get_dynamic_logger(__name__, debug_config)
@@ -424,7 +426,7 @@ class ReActOrchestrator:
 
         return messages
 
-    def _build_react_system_prompt(self, context: ChatContext) -> str:
+    def _build_react_system_prompt(self, context: ChatContext) -> SystemPrompt:
         """
         Build ReAct system prompt with tool descriptions.
 
@@ -434,13 +436,35 @@ class ReActOrchestrator:
         - Explicit instructions against hallucination
         - JSON format for tool inputs
 
+        The instructions and tool descriptions are memoized per registry
+        version and come before the per-turn business context, so the prompt
+        prefix stays identical across turns.
+
         Args:
             context: Chat context
 
         Returns:
             System prompt string
         """
+        prefix = self._react_prompt_prefix()
+
+        # Add business context if available
+        suffix = ""
+        if context.current_year_stats:
+            stats = context.current_year_stats
+            suffix += "\n\nCONTESTO SISTEMA:\n"
+            suffix += f"- Anno corrente: {stats.get('anno', 'N/A')}\n"
+            suffix += f"- Fatture totali YTD: {stats.get('totale_fatture', 0)}\n"
+            suffix += f"- Importo totale YTD: €{stats.get('importo_totale', 0):.2f}\n"
+
+        return SystemPrompt(prefix, suffix)
+
+    def _react_prompt_prefix(self) -> str:
+        """Return the turn-independent prompt, rebuilt only when the tool set changes."""
         tools = self.tool_registry.list_tools(enabled_only=True)
+        key = (getattr(self.tool_registry, "version", None), tuple(tool.name for tool in tools))
+        if self._prompt_prefix_cache is not None and self._prompt_prefix_cache[0] == key:
+            return self._prompt_prefix_cache[1]
 
         tool_descriptions = []
         for tool in tools:
@@ -532,14 +556,7 @@ NON rispondere senza usare tools quando sono disponibili
 
 Ora rispondi alla domanda dell'utente seguendo gli esempi sopra."""
 
-        # Add business context if available
-        if context.current_year_stats:
-            stats = context.current_year_stats
-            prompt += "\n\nCONTESTO SISTEMA:\n"
-            prompt += f"- Anno corrente: {stats.get('anno', 'N/A')}\n"
-            prompt += f"- Fatture totali YTD: {stats.get('totale_fatture', 0)}\n"
-            prompt += f"- Importo totale YTD: €{stats.get('importo_totale', 0):.2f}\n"
-
+        self._prompt_prefix_cache = (key, prompt)
         return prompt
 
     def _format_observation(self, data: Any) -> str:
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import asyncio
 import inspect
 import time
 import warnings
@@ -25,6 +24,7 @@ from openfatture.ai.providers.base import (
 )
 from openfatture.platform.extras import MissingExtraError
 from openfatture.platform.logging import get_logger
+from openfatture.platform.metrics import record_ai_request
 
 try:
     from anthropic import AnthropicError, AsyncAnthropic, RateLimitError
@@ -32,7 +32,7 @@ except ImportError as exc:
     raise MissingExtraError("ai", feature="Anthropic provider", cause=exc) from exc
 
 if TYPE_CHECKING:
-    from anthropic.types import MessageParam
+    from anthropic.types import CacheControlEphemeralParam, MessageParam, TextBlockParam
 else:
     MessageParam = Any
 
@@ -40,6 +40,9 @@ else:
 logger = get_logger(__name__)
 
 
+_CACHE_CONTROL: CacheControlEphemeralParam = {"type": "ephemeral"}
+
+
 class AnthropicProvider(BaseLLMProvider):
     """
     Anthropic provider implementation.
@@ -129,6 +132,7 @@ class AnthropicProvider(BaseLLMProvider):
         **kwargs: Any,
     ) -> AgentResponse:
         """Generate response using Anthropic API."""
+        await self._throttle()
         start_time = time.time()
 
         try:
@@ -146,10 +150,10 @@ class AnthropicProvider(BaseLLMProvider):
             response = await self.client.messages.create(
                 model=self.model,
                 messages=prepared_messages,
-                system=system_prompt or "",
+                system=self._prepare_system(system_prompt),
                 temperature=self._get_temperature(temperature),
                 max_tokens=self._get_max_tokens(max_tokens),
-                **kwargs,
+                **self._prepare_tools(system_prompt, kwargs),
             )
 
             # Extract content and tool calls
@@ -169,15 +173,7 @@ class AnthropicProvider(BaseLLMProvider):
                     content += block.text
 
             # Calculate usage
-            usage = UsageMetrics(
-                prompt_tokens=response.usage.input_tokens if response.usage else 0,
-                completion_tokens=response.usage.output_tokens if response.usage else 0,
-                total_tokens=(
-                    response.usage.input_tokens + response.usage.output_tokens
-                    if response.usage
-                    else 0
-                ),
-            )
+            usage = self._build_usage_metrics(response.usage)
 
             # Estimate cost
             usage.estimated_cost_usd = self.estimate_cost(usage)
@@ -189,10 +185,14 @@ class AnthropicProvider(BaseLLMProvider):
                 "anthropic_request_completed",
                 model=self.model,
                 tokens=usage.total_tokens,
+                cached_tokens=usage.cached_prompt_tokens,
                 cost_usd=usage.estimated_cost_usd,
                 latency_ms=latency_ms,
                 stop_reason=response.stop_reason,
             )
+            record_ai_request(
+                self.provider_name, self.model, usage.total_tokens, latency_ms, success=True
+            )
 
             agent_response = AgentResponse(
                 content=content,
@@ -260,6 +260,7 @@ class AnthropicProvider(BaseLLMProvider):
         **kwargs: Any,
     ) -> AsyncIterator[str]:
         """Stream response tokens from Anthropic."""
+        await self._throttle()
         try:
             # Prepare messages
             prepared_messages = self._prepare_claude_messages(messages)
@@ -274,10 +275,10 @@ class AnthropicProvider(BaseLLMProvider):
             async with self.client.messages.stream(
                 model=self.model,
                 messages=prepared_messages,
-                system=system_prompt or "",
+                system=self._prepare_system(system_prompt),
                 temperature=self._get_temperature(temperature),
                 max_tokens=self._get_max_tokens(max_tokens),
-                **kwargs,
+                **self._prepare_tools(system_prompt, kwargs),
             ) as stream:
                 async for text in stream.text_stream:
                     yield text
@@ -308,15 +309,16 @@ class AnthropicProvider(BaseLLMProvider):
                 result = count_tokens_fn(text)
 
                 if inspect.isawaitable(result):
-                    logger.debug("awaiting_async_count_tokens")
-                    result = asyncio.get_event_loop().run_until_complete(result)
-
-                if isinstance(result, dict):
+                    # Blocking on an async counter would stall the running event loop
+                    if inspect.iscoroutine(result):
+                        result.close()
+                    logger.debug("async_count_tokens_skipped", model=self.model)
+                elif isinstance(result, dict):
                     token_count = result.get("input_tokens") or result.get("tokens")
                     if token_count is not None:
                         return int(token_count)
-
-                return int(result)
+                else:
+                    return int(result)
             except Exception as exc:
                 logger.warning(
                     "anthropic_count_tokens_failed",
@@ -339,8 +341,16 @@ class AnthropicProvider(BaseLLMProvider):
             {"input": 2.50, "output": 12.50},  # Default to Claude 4.5 Sonnet pricing
         )
 
+        # Cache reads are billed at 10% of the input price, cache writes at 125%
+        uncached_tokens = (
+            usage.prompt_tokens - usage.cached_prompt_tokens - usage.cache_write_tokens
+        )
+        input_tokens = (
+            uncached_tokens + 0.1 * usage.cached_prompt_tokens + 1.25 * usage.cache_write_tokens
+        )
+
         # Calculate cost per million tokens
-        input_cost = (usage.prompt_tokens / 1_000_000) * pricing["input"]
+        input_cost = (input_tokens / 1_000_000) * pricing["input"]
         output_cost = (usage.completion_tokens / 1_000_000) * pricing["output"]
 
         return input_cost + output_cost
@@ -378,6 +388,61 @@ class AnthropicProvider(BaseLLMProvider):
         # Only the legacy Claude 2 series lacks it.
         return "claude-2" not in self.model
 
+    def _prepare_system(self, system_prompt: str | None) -> str | list[TextBlockParam]:
+        """
+        Build the ``system`` parameter, marking the stable prefix for caching.
+
+        With prompt caching enabled the system prompt is sent as text blocks
+        and a cache breakpoint is placed after the turn-independent prefix
+        (see :class:`SystemPrompt`), so tool schemas and instructions are read
+        from cache on later turns while per-turn context stays uncached.
+        """
+        if not system_prompt or not self.enable_prompt_caching:
+            return system_prompt or ""
+
+        prefix = getattr(system_prompt, "cacheable_prefix", str(system_prompt))
+        blocks: list[TextBlockParam] = [
+            {"type": "text", "text": prefix, "cache_control": _CACHE_CONTROL}
+        ]
+        suffix = str(system_prompt)[len(prefix) :]
+        if suffix:
+            blocks.append({"type": "text", "text": suffix})
+        return blocks
+
+    def _prepare_tools(self, system_prompt: str | None, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Mark the last tool schema for caching when there is no system prompt to mark."""
+        tools = kwargs.get("tools")
+        if system_prompt or not self.enable_prompt_caching or not tools:
+            return kwargs
+        # Schemas may be shared (registry cache): copy the one being marked
+        marked = [*tools[:-1], {**tools[-1], "cache_control": _CACHE_CONTROL}]
+        return {**kwargs, "tools": marked}
+
+    def _build_usage_metrics(self, usage: Any | None) -> UsageMetrics:
+        """Create UsageMetrics from an Anthropic usage payload.
+
+        ``input_tokens`` excludes tokens read from or written to the prompt
+        cache; ``prompt_tokens`` reports all of them.
+        """
+        if not usage:
+            return UsageMetrics()
+
+        def tokens(name: str) -> int:
+            value = getattr(usage, name, 0)
+            return value if isinstance(value, int) else 0
+
+        cache_read = tokens("cache_read_input_tokens")
+        cache_write = tokens("cache_creation_input_tokens")
+        prompt_tokens = tokens("input_tokens") + cache_read + cache_write
+        completion_tokens = tokens("output_tokens")
+        return UsageMetrics(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            cached_prompt_tokens=cache_read,
+            cache_write_tokens=cache_write,
+        )
+
     def _prepare_claude_messages(self, messages: list[Message]) -> list[MessageParam]:
         """
         Prepare messages for Claude API.
@@ -6,6 +6,7 @@ from typing import Any
 
 from openfatture.ai.domain.message import Message
 from openfatture.ai.domain.response import AgentResponse, StreamChunk, UsageMetrics
+from openfatture.platform.rate_limiter import KeyedRateLimiter
 
 
 class BaseLLMProvider(ABC):
@@ -23,6 +24,9 @@ class BaseLLMProvider(ABC):
     - Cost estimation
     """
 
+    # Requests are throttled per provider name when set (see create_provider)
+    rate_limiter: KeyedRateLimiter | None = None
+
     def __init__(
         self,
         api_key: str | None = None,
@@ -233,6 +237,11 @@ class BaseLLMProvider(ABC):
 
         return prepared
 
+    async def _throttle(self) -> None:
+        """Wait for the provider's rate limiter, if any, before a request."""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(self.provider_name)
+
     def _get_temperature(self, override: float | None = None) -> float:
         """Get temperature with optional override."""
         return override if override is not None else self.temperature
@@ -29,9 +29,13 @@ else:
         _has_context = False
 from openfatture.ai.providers.base import BaseLLMProvider, ProviderError
 from openfatture.platform.logging import get_logger
+from openfatture.platform.rate_limiter import KeyedRateLimiter, SQLiteLimiterState
 
 logger = get_logger(__name__)
 
+# Provider rate limiters by (requests per minute, state path)
+_rate_limiters: dict[tuple[int, str | None], KeyedRateLimiter] = {}
+
 
 def create_provider(
     provider_type: Literal["openai", "anthropic", "ollama"] | None = None,
@@ -94,14 +98,15 @@ def create_provider(
         )
 
     try:
+        provider: BaseLLMProvider
         if provider_type == "openai":
-            return _create_openai_provider(settings, http_client, **kwargs)
+            provider = _create_openai_provider(settings, http_client, **kwargs)
 
         elif provider_type == "anthropic":
-            return _create_anthropic_provider(settings, http_client, **kwargs)
+            provider = _create_anthropic_provider(settings, http_client, **kwargs)
 
         elif provider_type == "ollama":
-            return _create_ollama_provider(settings, http_client, **kwargs)
+            provider = _create_ollama_provider(settings, http_client, **kwargs)
 
         else:
             raise ProviderError(
@@ -117,6 +122,9 @@ def create_provider(
             error_type=type(e).__name__,
         )
         raise
+
+    provider.rate_limiter = get_provider_rate_limiter(settings)
+    return provider
     """
     Create an LLM provider instance.
 
@@ -188,6 +196,38 @@ def create_provider(
         raise
 
 
+def get_provider_rate_limiter(settings: AISettings | None = None) -> KeyedRateLimiter | None:
+    """
+    Get the rate limiter shared by the providers, keyed by provider name.
+
+    Providers created with the same settings share one limiter, so every agent
+    in the process draws from the same quota (and, with
+    ``rate_limit_state_path``, every process using that file).
+
+    Args:
+        settings: AI settings (if None, uses global settings)
+
+    Returns:
+        The limiter, or None if ``requests_per_minute`` is 0
+    """
+    if settings is None:
+        settings = get_ai_settings()
+
+    rpm = settings.requests_per_minute
+    if rpm == 0:
+        return None
+
+    path = settings.rate_limit_state_path
+    cache_key = (rpm, str(path) if path else None)
+    limiter = _rate_limiters.get(cache_key)
+    if limiter is None:
+        state = SQLiteLimiterState(path) if path else None
+        limiter = KeyedRateLimiter(rate=rpm / 60, burst=rpm, state=state)
+        _rate_limiters[cache_key] = limiter
+        logger.info("provider_rate_limiter_created", requests_per_minute=rpm, shared=bool(path))
+    return limiter
+
+
 def _pop_str_param(
     params: dict[str, str | int | float],
     name: str,
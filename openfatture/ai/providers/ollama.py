@@ -16,6 +16,7 @@ from openfatture.ai.providers.base import (
     ProviderUnavailableError,
 )
 from openfatture.platform.logging import get_logger
+from openfatture.platform.metrics import record_ai_request
 
 logger = get_logger(__name__)
 
@@ -80,6 +81,7 @@ class OllamaProvider(BaseLLMProvider):
         **kwargs: Any,
     ) -> AgentResponse:
         """Generate response using Ollama API."""
+        await self._throttle()
         start_time = time.time()
 
         try:
@@ -132,6 +134,9 @@ class OllamaProvider(BaseLLMProvider):
                 tokens=usage.total_tokens,
                 latency_ms=latency_ms,
             )
+            record_ai_request(
+                self.provider_name, self.model, usage.total_tokens, latency_ms, success=True
+            )
 
             return AgentResponse(
                 content=content,
@@ -194,6 +199,7 @@ class OllamaProvider(BaseLLMProvider):
         **kwargs: Any,
     ) -> AsyncIterator[str]:
         """Stream response tokens from Ollama."""
+        await self._throttle()
         try:
             # Prepare prompt
             prompt = self._messages_to_prompt(messages, system_prompt)
@@ -24,6 +24,7 @@ from openfatture.ai.providers.base import (
 )
 from openfatture.platform.extras import MissingExtraError
 from openfatture.platform.logging import get_logger
+from openfatture.platform.metrics import record_ai_request
 
 try:
     from openai import AsyncOpenAI
@@ -156,11 +157,15 @@ class OpenAIProvider(BaseLLMProvider):
         prompt_tokens = getattr(usage, "prompt_tokens", 0) if usage else 0
         completion_tokens = getattr(usage, "completion_tokens", 0) if usage else 0
         total_tokens = getattr(usage, "total_tokens", 0) if usage else 0
+        # Automatic prompt caching: cached tokens are reported inside prompt_tokens
+        details = getattr(usage, "prompt_tokens_details", None) if usage else None
+        cached_tokens = getattr(details, "cached_tokens", 0) if details else 0
 
         metrics = UsageMetrics(
             prompt_tokens=prompt_tokens,
             completion_tokens=completion_tokens,
             total_tokens=total_tokens,
+            cached_prompt_tokens=cached_tokens if isinstance(cached_tokens, int) else 0,
         )
         metrics.estimated_cost_usd = self.estimate_cost(metrics)
         return metrics
@@ -422,6 +427,7 @@ class OpenAIProvider(BaseLLMProvider):
         **kwargs: Any,
     ) -> AgentResponse:
         """Generate response using OpenAI API."""
+        await self._throttle()
         start_time = time.time()
 
         try:
@@ -494,6 +500,9 @@ class OpenAIProvider(BaseLLMProvider):
                 latency_ms=latency_ms,
                 finish_reason=response.choices[0].finish_reason,
             )
+            record_ai_request(
+                self.provider_name, self.model, usage.total_tokens, latency_ms, success=True
+            )
 
             agent_response = AgentResponse(
                 content=content,
@@ -527,6 +536,7 @@ class OpenAIProvider(BaseLLMProvider):
         **kwargs: Any,
     ) -> AsyncIterator[str]:
         """Stream response tokens from OpenAI."""
+        await self._throttle()
         try:
             chat_messages = self._build_chat_payload(messages, system_prompt)
 
@@ -582,6 +592,7 @@ class OpenAIProvider(BaseLLMProvider):
         **kwargs: Any,
     ) -> AsyncIterator[StreamChunk]:
         """Stream structured response chunks from OpenAI with tool call support."""
+        await self._throttle()
         try:
             chat_messages = self._build_chat_payload(messages, system_prompt)
 
@@ -729,8 +740,11 @@ class OpenAIProvider(BaseLLMProvider):
             {"input": 5.00, "output": 15.00},  # Default to GPT-5 pricing
         )
 
+        # Cached prompt tokens are billed at half the input price
+        input_tokens = usage.prompt_tokens - 0.5 * usage.cached_prompt_tokens
+
         # Calculate cost per million tokens
-        input_cost = (usage.prompt_tokens / 1_000_000) * pricing["input"]
+        input_cost = (input_tokens / 1_000_000) * pricing["input"]
         output_cost = (usage.completion_tokens / 1_000_000) * pricing["output"]
 
         return input_cost + output_cost
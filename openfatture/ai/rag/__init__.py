@@ -24,6 +24,7 @@ Example Usage:
 from typing import Optional
 
 from openfatture.ai.rag.config import DEFAULT_RAG_CONFIG, RAGConfig, get_rag_config
+from openfatture.ai.rag.embedding_cache import SQLiteEmbeddingCache, create_embedding_cache
 from openfatture.ai.rag.embeddings import (
     EmbeddingStrategy,
     OpenAIEmbeddings,
@@ -31,7 +32,8 @@ from openfatture.ai.rag.embeddings import (
     create_embeddings,
 )
 from openfatture.ai.rag.indexing import InvoiceIndexer
-from openfatture.ai.rag.knowledge_indexer import KnowledgeIndexer
+from openfatture.ai.rag.knowledge_indexer import KnowledgeIndexer, KnowledgeIndexReport
+from openfatture.ai.rag.lexical import BM25Index
 from openfatture.ai.rag.retrieval import RetrievalResult, SemanticRetriever
 from openfatture.ai.rag.vector_store import VectorStore
 from openfatture.platform.logging import get_logger
@@ -232,11 +234,15 @@ __all__ = [
     "VectorStore",
     "InvoiceIndexer",
     "KnowledgeIndexer",
+    "KnowledgeIndexReport",
     "SemanticRetriever",
     "RetrievalResult",
+    "BM25Index",
     # Embeddings
     "EmbeddingStrategy",
     "OpenAIEmbeddings",
     "SentenceTransformerEmbeddings",
     "create_embeddings",
+    "SQLiteEmbeddingCache",
+    "create_embedding_cache",
 ]
@@ -5,7 +5,8 @@ Uses SQLAlchemy event listeners and async queue for batch processing.
 
 Key Components:
 - AutoUpdateConfig: Configuration for auto-update behavior
-- ChangeTracker: Tracks changes to entities for reindexing
+- ChangeTracker: Tracks changes to entities for reindexing (coalesced per entity)
+- SQLiteChangeStore: Durable write-through storage for pending changes
 - ReindexQueue: Async queue for batch reindexing
 - AutoIndexingService: Orchestrates automatic reindexing
 - Event listeners: SQLAlchemy hooks for data changes
@@ -31,6 +32,7 @@ from openfatture.ai.rag.auto_update.config import (
 from openfatture.ai.rag.auto_update.listeners import setup_event_listeners, teardown_event_listeners
 from openfatture.ai.rag.auto_update.queue import ReindexQueue, get_reindex_queue
 from openfatture.ai.rag.auto_update.service import AutoIndexingService, get_auto_indexing_service
+from openfatture.ai.rag.auto_update.store import SQLiteChangeStore
 from openfatture.ai.rag.auto_update.tracker import (
     ChangeTracker,
     ChangeType,
@@ -48,6 +50,7 @@ __all__ = [
     "ChangeType",
     "EntityChange",
     "get_change_tracker",
+    "SQLiteChangeStore",
     # Queue
     "ReindexQueue",
     "get_reindex_queue",
@@ -8,6 +8,7 @@ Environment Variables:
 - OPENFATTURE_RAG_AUTO_UPDATE_BATCH_SIZE: Batch size for updates (default: 50)
 - OPENFATTURE_RAG_AUTO_UPDATE_DEBOUNCE_SECONDS: Debounce delay (default: 5)
 - OPENFATTURE_RAG_AUTO_UPDATE_MAX_QUEUE_SIZE: Max queue size (default: 1000)
+- OPENFATTURE_RAG_AUTO_UPDATE_QUEUE_DB_PATH: Durable queue file (default: .cache/rag_update_queue.sqlite3)
 """
 
 from pathlib import Path
@@ -64,7 +65,7 @@ class AutoUpdateConfig(BaseSettings):
         default=5,
         ge=1,
         le=300,
-        description="Seconds to wait before processing batched changes (debounce)",
+        description="Seconds an entity must stay unchanged before it is reindexed (debounce)",
     )
 
     max_queue_size: int = Field(
@@ -74,6 +75,13 @@ class AutoUpdateConfig(BaseSettings):
         description="Maximum queue size (older items dropped if exceeded)",
     )
 
+    backpressure_threshold: float = Field(
+        default=0.8,
+        gt=0.0,
+        le=1.0,
+        description="Queue utilization above which changes are flushed without waiting to settle",
+    )
+
     # Entity Tracking
     track_invoices: bool = Field(
         default=True,
@@ -115,14 +123,19 @@ class AutoUpdateConfig(BaseSettings):
     )
 
     # Persistence
+    queue_db_path: Path = Field(
+        default=Path(".cache/rag_update_queue.sqlite3"),
+        description="SQLite file backing the durable pending-changes queue",
+    )
+
     queue_persist_path: Path = Field(
         default=Path(".cache/rag_update_queue.json"),
-        description="Path to persist pending updates queue",
+        description="Legacy JSON queue file (imported into queue_db_path once, then removed)",
     )
 
     persist_queue_on_shutdown: bool = Field(
         default=True,
-        description="Persist queue to disk on shutdown for recovery",
+        description="Persist pending changes (write-through SQLite queue) for recovery",
     )
 
     # Monitoring
@@ -140,7 +153,7 @@ class AutoUpdateConfig(BaseSettings):
         """Post-initialization setup."""
         # Create queue persist directory
         if self.persist_queue_on_shutdown:
-            self.queue_persist_path.parent.mkdir(parents=True, exist_ok=True)
+            self.queue_db_path.parent.mkdir(parents=True, exist_ok=True)
 
         logger.info(
             "rag_auto_update_config_initialized",
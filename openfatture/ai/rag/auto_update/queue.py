@@ -15,7 +15,9 @@ Example:
 """
 
 import asyncio
+import time
 from collections.abc import Callable
+from datetime import UTC, datetime
 from typing import Any
 
 from openfatture.ai.rag.auto_update.config import get_auto_update_config
@@ -29,8 +31,10 @@ class ReindexQueue:
     """Async queue for batch reindexing operations.
 
     Features:
-    - Debouncing: Waits for changes to settle before processing
-    - Batching: Processes multiple changes in single operation
+    - Debouncing: An entity is processed once it has not changed for ``debounce_seconds``
+    - Coalescing: Repeated changes to one entity collapse into a single reindex
+    - Batching: Each flush drains every settled change, ``batch_size`` at a time
+    - Backpressure: Above the threshold, changes are flushed without waiting to settle
     - Concurrency control: Limits concurrent reindex operations
     - Background processing: Runs in asyncio task
 
@@ -55,12 +59,15 @@ class ReindexQueue:
         # Processing state
         self._running = False
         self._task: asyncio.Task | None = None
+        self._stop_event: asyncio.Event | None = None
         self._semaphore = asyncio.Semaphore(self.config.max_concurrent_updates)
 
         # Metrics
         self._total_processed = 0
         self._total_batches = 0
         self._last_process_time: float | None = None
+        self._failed_batches = 0
+        self._last_flush_at: datetime | None = None
 
         logger.info(
             "reindex_queue_initialized",
@@ -82,6 +89,7 @@ class ReindexQueue:
             return
 
         self._running = True
+        self._stop_event = asyncio.Event()
         self._task = asyncio.create_task(self._processing_loop())
 
         logger.info("reindex_queue_started")
@@ -93,6 +101,8 @@ class ReindexQueue:
             return
 
         self._running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
 
         # Wait for task to complete
         if self._task:
@@ -114,18 +124,11 @@ class ReindexQueue:
 
         while self._running:
             try:
-                # Wait for debounce period
-                await asyncio.sleep(self.config.debounce_seconds)
+                # Wait for the next tick (returns early when stop() is called)
+                if await self._wait_for_stop(self._poll_interval()):
+                    break
 
-                # Get pending changes
-                changes = self.tracker.get_pending_changes(batch_size=self.config.batch_size)
-
-                if not changes:
-                    # No changes to process
-                    continue
-
-                # Process batch
-                await self._process_batch(changes)
+                await self.flush()
 
             except Exception as e:
                 logger.error(
@@ -138,6 +141,50 @@ class ReindexQueue:
 
         logger.info("reindex_queue_processing_loop_stopped")
 
+    def _poll_interval(self) -> float:
+        """Seconds between flushes: half the debounce window, at most 1s late."""
+        return max(0.1, min(self.config.debounce_seconds / 2, 1.0))
+
+    async def _wait_for_stop(self, timeout: float) -> bool:
+        """Sleep up to ``timeout`` seconds; return True if a stop was requested."""
+        if self._stop_event is None:
+            await asyncio.sleep(timeout)
+            return False
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    async def flush(self, force: bool = False) -> int:
+        """Process every change that is ready, one batch at a time.
+
+        Args:
+            force: Ignore the debounce window and drain the whole queue
+
+        Returns:
+            Number of changes processed
+        """
+        settle_seconds = 0.0 if force else float(self.config.debounce_seconds)
+        processed = 0
+
+        while True:
+            changes = self.tracker.get_ready_changes(
+                settle_seconds=settle_seconds,
+                batch_size=self.config.batch_size,
+            )
+            if not changes:
+                break
+
+            await self._process_batch(changes)
+            processed += len(changes)
+
+        if processed:
+            self._last_flush_at = datetime.now(UTC)
+            logger.info("reindex_queue_flushed", processed=processed, forced=force)
+
+        return processed
+
     async def _process_batch(self, changes: list[EntityChange]) -> None:
         """Process a batch of changes.
 
@@ -156,8 +203,6 @@ class ReindexQueue:
             )
 
             try:
-                import time
-
                 start_time = time.time()
 
                 # Group changes by entity type for efficient processing
@@ -184,6 +229,7 @@ class ReindexQueue:
                 )
 
             except Exception as e:
+                self._failed_batches += 1
                 logger.error(
                     "reindex_batch_failed",
                     count=len(changes),
@@ -225,24 +271,47 @@ class ReindexQueue:
             change_types=sorted({c.change_type.value for c in changes}),
         )
 
-        # Mark all changes as processed only after a successful real callback
-        all_entity_ids = [c.entity_id for c in changes]
-        self.tracker.mark_processed(entity_type, all_entity_ids)
+        # Mark changes as processed only after a successful real callback.
+        # Entities that changed again while being reindexed stay queued.
+        self.tracker.mark_changes_processed(changes)
 
     def get_stats(self) -> dict[str, Any]:
         """Get queue statistics.
 
         Returns:
-            Dictionary with queue statistics
+            Dictionary with queue statistics. ``backpressure`` reports how full the
+            queue is, how much is waiting for the debounce window, and how many
+            changes were coalesced or dropped.
         """
+        queue_stats = self.tracker.get_queue_stats()
+        ready = len(self.tracker.get_ready_changes(settle_seconds=self.config.debounce_seconds))
+
+        oldest_age_seconds = None
+        if queue_stats["oldest_change"]:
+            oldest = datetime.fromisoformat(queue_stats["oldest_change"])
+            oldest_age_seconds = (datetime.now(UTC) - oldest).total_seconds()
+
         return {
             "running": self._running,
             "total_processed": self._total_processed,
             "total_batches": self._total_batches,
+            "failed_batches": self._failed_batches,
             "last_process_time_ms": (
                 self._last_process_time * 1000 if self._last_process_time else None
             ),
-            "queue_stats": self.tracker.get_queue_stats(),
+            "last_flush_at": self._last_flush_at.isoformat() if self._last_flush_at else None,
+            "queue_stats": queue_stats,
+            "backpressure": {
+                "pending": queue_stats["total_pending"],
+                "ready": ready,
+                "debouncing": queue_stats["total_pending"] - ready,
+                "utilization": queue_stats["utilization"],
+                "threshold": self.config.backpressure_threshold,
+                "active": queue_stats["utilization"] >= self.config.backpressure_threshold,
+                "oldest_pending_age_seconds": oldest_age_seconds,
+                "coalesced_total": queue_stats["coalesced_total"],
+                "dropped_total": queue_stats["dropped_total"],
+            },
             "config": {
                 "batch_size": self.config.batch_size,
                 "debounce_seconds": self.config.debounce_seconds,
@@ -94,33 +94,95 @@ class AutoIndexingService:
         logger.info("auto_indexing_service_stopped")
 
     async def _reindex_callback(self, changes: list[EntityChange]) -> None:
-        """Callback for reindex queue to process changes.
+        """Callback for reindex queue to process a flushed batch of changes.
+
+        Deleted invoices are removed with one vector-store call and every
+        created/updated invoice (including the invoices of changed clients) is
+        re-embedded in one batch. If the batch fails, invoices are retried one
+        at a time so a single bad record does not block the rest.
 
         Args:
             changes: List of entity changes to process
         """
+        deleted_ids: list[int] = []
+        invoice_ids: list[int] = []
+        client_ids: list[int] = []
+
         for change in changes:
-            try:
-                if change.entity_type == "invoice":
-                    await self._process_invoice_change(change)
-                elif change.entity_type == "client":
-                    await self._process_client_change(change)
+            if change.entity_type == "invoice":
+                if change.change_type == ChangeType.DELETE:
+                    deleted_ids.append(change.entity_id)
                 else:
-                    logger.warning(
-                        "unsupported_entity_type",
-                        entity_type=change.entity_type,
-                    )
+                    invoice_ids.append(change.entity_id)
+            elif change.entity_type == "client":
+                if change.change_type == ChangeType.DELETE:
+                    # Client deleted - their invoices should already be deleted
+                    # (cascading delete or handled separately)
+                    logger.info("client_deleted", client_id=change.entity_id)
+                else:
+                    client_ids.append(change.entity_id)
+            else:
+                logger.warning(
+                    "unsupported_entity_type",
+                    entity_type=change.entity_type,
+                )
+
+        if client_ids:
+            invoice_ids.extend(self._client_invoice_ids(client_ids))
 
+        if deleted_ids:
+            try:
+                await self.invoice_indexer.delete_invoices(deleted_ids)
             except Exception as e:
                 logger.error(
-                    "change_processing_failed",
-                    entity_type=change.entity_type,
-                    entity_id=change.entity_id,
-                    change_type=change.change_type.value,
+                    "invoice_batch_delete_failed",
+                    count=len(deleted_ids),
                     error=str(e),
                     exc_info=True,
                 )
-                # Continue processing other changes
+
+        deleted = set(deleted_ids)
+        to_index = [
+            invoice_id for invoice_id in dict.fromkeys(invoice_ids) if invoice_id not in deleted
+        ]
+        if not to_index:
+            return
+
+        try:
+            await self.invoice_indexer.index_invoices(to_index)
+        except Exception as e:
+            logger.error(
+                "invoice_batch_reindex_failed",
+                count=len(to_index),
+                error=str(e),
+                exc_info=True,
+            )
+            for invoice_id in to_index:
+                try:
+                    await self.invoice_indexer.index_invoice(invoice_id)
+                except Exception as item_error:
+                    logger.error(
+                        "change_processing_failed",
+                        entity_type="invoice",
+                        entity_id=invoice_id,
+                        error=str(item_error),
+                    )
+                    # Continue processing other changes
+
+    def _client_invoice_ids(self, client_ids: list[int]) -> list[int]:
+        """Return the ids of every invoice belonging to the given clients.
+
+        Client info is embedded in invoice documents, so a client change means
+        reindexing all of the client's invoices.
+        """
+        from openfatture.storage.database.models import Fattura
+        from openfatture.storage.session import db_session
+
+        with db_session() as db:
+            rows = db.query(Fattura.id).filter(Fattura.cliente_id.in_(client_ids)).all()
+
+        logger.debug("client_invoices_collected", clients=len(client_ids), invoices=len(rows))
+        return [row[0] for row in rows]
 
     async def _process_invoice_change(self, change: EntityChange) -> None:
         """Process invoice change.
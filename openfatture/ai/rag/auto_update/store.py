@@ -0,0 +1,178 @@
+"""Durable SQLite storage for pending RAG changes.
+
+The change tracker keeps one pending row per entity (last write wins), so the
+table is keyed by ``(entity_type, entity_id)`` and every tracked change is an
+UPSERT: a bulk update of 10k invoices touches 10k rows once instead of
+rewriting a growing JSON file, and a crash loses at most the change being
+written.
+
+Example:
+    >>> store = SQLiteChangeStore(Path(".cache/rag_update_queue.sqlite3"))
+    >>> store.upsert(change)
+    >>> pending = [EntityChange.from_dict(row) for row in store.load()]
+    >>> store.delete([("invoice", 123)])
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from openfatture.platform.logging import get_logger
+
+if TYPE_CHECKING:
+    from openfatture.ai.rag.auto_update.tracker import EntityChange
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_changes (
+    entity_type TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    change_type TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    metadata TEXT,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (entity_type, entity_id)
+);
+CREATE INDEX IF NOT EXISTS ix_pending_changes_seq ON pending_changes (seq);
+"""
+
+ChangeKey = tuple[str, int]
+
+
+class SQLiteChangeStore:
+    """Write-through SQLite table of pending entity changes.
+
+    ``seq`` increases with every write, so loading in ``seq`` order restores
+    the tracker's "least recently changed first" ordering after a restart.
+    The connection is opened lazily and shared across threads behind a lock,
+    because SQLAlchemy listeners may fire from any thread.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the store.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT MAX(seq) FROM pending_changes").fetchone()
+            self._seq = int(row[0] or 0)
+            self._conn = conn
+            logger.debug("change_store_opened", path=str(self.path))
+        return self._conn
+
+    def upsert(self, change: EntityChange) -> None:
+        """Insert or replace the pending change for an entity."""
+        self.upsert_many([change])
+
+    def upsert_many(self, changes: Iterable[EntityChange]) -> None:
+        """Insert or replace several pending changes in one transaction."""
+        with self._lock:
+            conn = self._connect()
+            rows = []
+            for change in changes:
+                self._seq += 1
+                rows.append(
+                    (
+                        change.entity_type,
+                        change.entity_id,
+                        change.change_type.value,
+                        change.timestamp.isoformat(),
+                        json.dumps(change.metadata) if change.metadata else None,
+                        self._seq,
+                    )
+                )
+            if not rows:
+                return
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT INTO pending_changes
+                        (entity_type, entity_id, change_type, timestamp, metadata, seq)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (entity_type, entity_id) DO UPDATE SET
+                        change_type = excluded.change_type,
+                        timestamp = excluded.timestamp,
+                        metadata = excluded.metadata,
+                        seq = excluded.seq
+                    """,
+                    rows,
+                )
+
+    def delete(self, keys: Iterable[ChangeKey]) -> None:
+        """Remove pending changes by ``(entity_type, entity_id)``."""
+        rows = list(keys)
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "DELETE FROM pending_changes WHERE entity_type = ? AND entity_id = ?",
+                    rows,
+                )
+
+    def load(self) -> list[dict[str, Any]]:
+        """Return every pending change, least recently changed first.
+
+        Returns:
+            Change dicts in the ``EntityChange.to_dict()`` format
+        """
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT entity_type, entity_id, change_type, timestamp, metadata "
+                    "FROM pending_changes ORDER BY seq"
+                )
+                .fetchall()
+            )
+
+        return [
+            {
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "change_type": change_type,
+                "timestamp": timestamp,
+                "metadata": json.loads(metadata) if metadata else None,
+            }
+            for entity_type, entity_id, change_type, timestamp, metadata in rows
+        ]
+
+    def count(self) -> int:
+        """Return the number of persisted pending changes."""
+        with self._lock:
+            row = self._connect().execute("SELECT COUNT(*) FROM pending_changes").fetchone()
+        return int(row[0])
+
+    def clear(self) -> None:
+        """Remove every pending change."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM pending_changes")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,7 +1,8 @@
 """Change Tracking System for RAG Auto-Update.
 
 Tracks changes to entities (invoices, clients) for automatic reindexing.
-Uses in-memory tracking with optional persistence.
+Changes are coalesced per entity in memory and written through to a SQLite
+queue for durability.
 
 Example:
     >>> from openfatture.ai.rag.auto_update import ChangeTracker
@@ -15,12 +16,15 @@ Example:
 """
 
 import json
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from enum import StrEnum
 from typing import Any
 
 from openfatture.ai.rag.auto_update.config import get_auto_update_config
+from openfatture.ai.rag.auto_update.store import ChangeKey, SQLiteChangeStore
 from openfatture.platform.logging import get_logger
 
 logger = get_logger(__name__)
@@ -65,11 +69,14 @@ class EntityChange:
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "EntityChange":
         """Create from dictionary."""
+        timestamp = datetime.fromisoformat(data["timestamp"])
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=UTC)
         return cls(
             entity_type=data["entity_type"],
             entity_id=data["entity_id"],
             change_type=ChangeType(data["change_type"]),
-            timestamp=datetime.fromisoformat(data["timestamp"]),
+            timestamp=timestamp,
             metadata=data.get("metadata"),
         )
 
@@ -77,25 +84,41 @@ class EntityChange:
 class ChangeTracker:
     """Tracks entity changes for automatic reindexing.
 
-    Maintains an in-memory queue of pending changes with optional
-    persistence to disk for recovery after restart.
+    Keeps one pending change per entity: tracking an entity that is already
+    pending replaces the old change (last write wins) and moves it to the back
+    of the queue, so the queue stays ordered by "last changed" and a burst of
+    updates to the same invoice costs a single reindex. Changes are written
+    through to a SQLite table for recovery after restart.
 
     Example:
         >>> tracker = ChangeTracker()
         >>> tracker.track_change("invoice", 123, ChangeType.UPDATE)
-        >>> changes = tracker.get_pending_changes(batch_size=50)
-        >>> tracker.mark_processed([c.entity_id for c in changes])
+        >>> changes = tracker.get_ready_changes(settle_seconds=5, batch_size=50)
+        >>> tracker.mark_changes_processed(changes)
     """
 
     def __init__(self) -> None:
         """Initialize change tracker."""
         self.config = get_auto_update_config()
 
-        # Pending changes (entity_type -> entity_id -> EntityChange)
-        self._pending: dict[str, dict[int, EntityChange]] = {}
+        # Pending changes keyed by (entity_type, entity_id), least recently changed first
+        self._pending: OrderedDict[ChangeKey, EntityChange] = OrderedDict()
+        self._lock = threading.RLock()
+
+        self._store = (
+            SQLiteChangeStore(self.config.queue_db_path)
+            if self.config.persist_queue_on_shutdown
+            else None
+        )
+
+        # Backpressure metrics
+        self._tracked_total = 0
+        self._coalesced_total = 0
+        self._dropped_total = 0
+        self._overflowing = False
 
         # Load persisted queue if exists
-        if self.config.persist_queue_on_shutdown:
+        if self._store is not None:
             self._load_from_disk()
 
         logger.info("change_tracker_initialized", enabled=self.config.enabled)
@@ -141,22 +164,22 @@ class ChangeTracker:
             metadata=metadata,
         )
 
-        # Add to pending (overwrite if exists - keeps latest change)
-        if entity_type not in self._pending:
-            self._pending[entity_type] = {}
+        key = (entity_type, entity_id)
+        with self._lock:
+            # Coalesce: the latest change replaces any pending one for the entity
+            if self._pending.pop(key, None) is not None:
+                self._coalesced_total += 1
+            self._pending[key] = change
+            self._tracked_total += 1
 
-        self._pending[entity_type][entity_id] = change
+            dropped = self._trim_queue()
+            total_pending = len(self._pending)
 
-        # Check queue size limit
-        total_pending = sum(len(entities) for entities in self._pending.values())
-        if total_pending > self.config.max_queue_size:
-            logger.warning(
-                "change_queue_size_exceeded",
-                size=total_pending,
-                max_size=self.config.max_queue_size,
-            )
-            # Trim oldest changes (simple FIFO)
-            self._trim_queue()
+            # Written under the lock so the table never lags behind a concurrent removal
+            if self._store is not None:
+                self._store.upsert(change)
+                if dropped:
+                    self._store.delete(dropped)
 
         logger.debug(
             "change_tracked",
@@ -178,24 +201,52 @@ class ChangeTracker:
             batch_size: Maximum number of changes to return
 
         Returns:
-            List of pending changes
+            List of pending changes (least recently changed first)
         """
-        changes = []
+        changes: list[EntityChange] = []
 
-        # Collect changes
-        if entity_type:
-            if entity_type in self._pending:
-                changes = list(self._pending[entity_type].values())
-        else:
-            for entity_changes in self._pending.values():
-                changes.extend(entity_changes.values())
+        with self._lock:
+            for change in self._pending.values():
+                if entity_type and change.entity_type != entity_type:
+                    continue
+                changes.append(change)
+                if batch_size and len(changes) >= batch_size:
+                    break
 
-        # Sort by timestamp (oldest first)
-        changes.sort(key=lambda c: c.timestamp)
+        return changes
 
-        # Apply batch size limit
-        if batch_size:
-            changes = changes[:batch_size]
+    def get_ready_changes(
+        self,
+        settle_seconds: float,
+        batch_size: int | None = None,
+        now: datetime | None = None,
+    ) -> list[EntityChange]:
+        """Get changes whose entity has not changed for ``settle_seconds``.
+
+        This is the debounce window: an invoice that is still being edited is
+        left in the queue until it settles. When the queue is above the
+        backpressure threshold, changes are returned without waiting.
+
+        Args:
+            settle_seconds: Quiet period required since the entity's last change
+            batch_size: Maximum number of changes to return
+            now: Current time (for testing)
+
+        Returns:
+            List of settled changes (least recently changed first)
+        """
+        cutoff = (now or datetime.now(UTC)) - timedelta(seconds=settle_seconds)
+        changes: list[EntityChange] = []
+
+        with self._lock:
+            under_pressure = self._utilization() >= self.config.backpressure_threshold
+            for change in self._pending.values():
+                # Ordered by last change, so the first unsettled entry ends the scan
+                if not under_pressure and change.timestamp > cutoff:
+                    break
+                changes.append(change)
+                if batch_size and len(changes) >= batch_size:
+                    break
 
         return changes
 
@@ -210,149 +261,194 @@ class ChangeTracker:
             entity_type: Type of entity
             entity_ids: List of entity IDs to mark as processed
         """
-        if entity_type not in self._pending:
-            return
-
-        count = 0
-        for entity_id in entity_ids:
-            if entity_id in self._pending[entity_type]:
-                del self._pending[entity_type][entity_id]
-                count += 1
+        removed: list[ChangeKey] = []
+        with self._lock:
+            for entity_id in entity_ids:
+                key = (entity_type, entity_id)
+                if self._pending.pop(key, None) is not None:
+                    removed.append(key)
+            remaining = len(self._pending)
 
-        # Remove empty entity type dict
-        if not self._pending[entity_type]:
-            del self._pending[entity_type]
+            if self._store is not None:
+                self._store.delete(removed)
 
         logger.info(
             "changes_marked_processed",
             entity_type=entity_type,
-            count=count,
-            remaining=sum(len(e) for e in self._pending.values()),
+            count=len(removed),
+            remaining=remaining,
+        )
+
+    def mark_changes_processed(self, changes: list[EntityChange]) -> None:
+        """Remove processed changes, keeping entities that changed again meanwhile.
+
+        A change tracked while its entity was being reindexed replaces the
+        pending entry; that newer entry is not the one that was processed, so it
+        stays queued for the next flush.
+
+        Args:
+            changes: Changes returned by ``get_ready_changes``/``get_pending_changes``
+        """
+        removed: list[ChangeKey] = []
+        with self._lock:
+            for change in changes:
+                key = (change.entity_type, change.entity_id)
+                if self._pending.get(key) is change:
+                    del self._pending[key]
+                    removed.append(key)
+            remaining = len(self._pending)
+
+            if self._store is not None:
+                self._store.delete(removed)
+
+        logger.info(
+            "changes_marked_processed",
+            count=len(removed),
+            requeued=len(changes) - len(removed),
+            remaining=remaining,
         )
 
     def get_queue_stats(self) -> dict[str, Any]:
         """Get statistics about pending changes.
 
         Returns:
-            Dictionary with queue statistics
+            Dictionary with queue statistics, including backpressure counters
+            (``coalesced_total``, ``dropped_total``, ``utilization``)
         """
         # Explicit type annotations for nested dicts to help mypy
         by_entity_type: dict[str, int] = {}
         by_change_type: dict[str, int] = {}
 
-        stats: dict[str, Any] = {
-            "total_pending": sum(len(entities) for entities in self._pending.values()),
+        with self._lock:
+            all_changes = list(self._pending.values())
+            utilization = self._utilization()
+
+        for change in all_changes:
+            by_entity_type[change.entity_type] = by_entity_type.get(change.entity_type, 0) + 1
+            change_type_str = change.change_type.value
+            by_change_type[change_type_str] = by_change_type.get(change_type_str, 0) + 1
+
+        return {
+            "total_pending": len(all_changes),
             "by_entity_type": by_entity_type,
             "by_change_type": by_change_type,
-            "oldest_change": None,
-            "newest_change": None,
+            # Ordered by last change, so the ends are the oldest and newest
+            "oldest_change": all_changes[0].timestamp.isoformat() if all_changes else None,
+            "newest_change": all_changes[-1].timestamp.isoformat() if all_changes else None,
+            "max_queue_size": self.config.max_queue_size,
+            "utilization": utilization,
+            "tracked_total": self._tracked_total,
+            "coalesced_total": self._coalesced_total,
+            "dropped_total": self._dropped_total,
         }
 
-        all_changes = []
-        for entity_type, entities in self._pending.items():
-            by_entity_type[entity_type] = len(entities)
-
-            for change in entities.values():
-                all_changes.append(change)
-
-                # Count by change type
-                change_type_str = change.change_type.value
-                by_change_type[change_type_str] = by_change_type.get(change_type_str, 0) + 1
-
-        # Find oldest and newest
-        if all_changes:
-            all_changes.sort(key=lambda c: c.timestamp)
-            stats["oldest_change"] = all_changes[0].timestamp.isoformat()
-            stats["newest_change"] = all_changes[-1].timestamp.isoformat()
-
-        return stats
-
     def clear_all(self) -> None:
         """Clear all pending changes."""
-        count = sum(len(entities) for entities in self._pending.values())
-        self._pending.clear()
+        with self._lock:
+            count = len(self._pending)
+            self._pending.clear()
+
+            if self._store is not None:
+                self._store.clear()
 
         logger.info("all_changes_cleared", count=count)
 
     def persist_to_disk(self) -> None:
-        """Persist pending changes to disk for recovery."""
-        if not self.config.persist_queue_on_shutdown:
+        """Write all pending changes to the durable queue.
+
+        Changes are already written through as they are tracked; this re-syncs
+        the whole queue in one transaction (used on shutdown).
+        """
+        if self._store is None:
             return
 
-        # Convert to serializable format
-        data = {
-            entity_type: [change.to_dict() for change in entities.values()]
-            for entity_type, entities in self._pending.items()
-        }
+        with self._lock:
+            changes = list(self._pending.values())
 
-        # Write to file
         try:
-            with self.config.queue_persist_path.open("w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-
-            total = sum(len(changes) for changes in data.values())
+            self._store.upsert_many(changes)
             logger.info(
                 "change_queue_persisted",
-                path=str(self.config.queue_persist_path),
-                count=total,
+                path=str(self.config.queue_db_path),
+                count=len(changes),
             )
 
         except Exception as e:
             logger.error("queue_persist_failed", error=str(e), exc_info=True)
 
     def _load_from_disk(self) -> None:
-        """Load persisted changes from disk."""
-        if not self.config.queue_persist_path.exists():
+        """Load persisted changes, importing the legacy JSON queue once."""
+        if self._store is None:
+            return
+
+        legacy_path = self.config.queue_persist_path
+        if not legacy_path.exists() and not self.config.queue_db_path.exists():
             return
 
         try:
-            with self.config.queue_persist_path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
+            if legacy_path.exists():
+                with legacy_path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
 
-            # Reconstruct pending changes
-            for entity_type, changes_list in data.items():
-                self._pending[entity_type] = {
-                    change_dict["entity_id"]: EntityChange.from_dict(change_dict)
+                legacy_changes = [
+                    EntityChange.from_dict(change_dict)
+                    for changes_list in data.values()
                     for change_dict in changes_list
-                }
+                ]
+                legacy_changes.sort(key=lambda c: c.timestamp)
+                self._store.upsert_many(legacy_changes)
+                legacy_path.unlink()
+
+                logger.info(
+                    "legacy_change_queue_imported",
+                    path=str(legacy_path),
+                    count=len(legacy_changes),
+                )
+
+            with self._lock:
+                for change_dict in self._store.load():
+                    change = EntityChange.from_dict(change_dict)
+                    self._pending[(change.entity_type, change.entity_id)] = change
 
-            total = sum(len(entities) for entities in self._pending.values())
             logger.info(
                 "change_queue_loaded_from_disk",
-                path=str(self.config.queue_persist_path),
-                count=total,
+                path=str(self.config.queue_db_path),
+                count=len(self._pending),
             )
 
         except Exception as e:
             logger.error("queue_load_failed", error=str(e), exc_info=True)
 
-    def _trim_queue(self) -> None:
-        """Trim queue to max size by removing oldest changes."""
-        all_changes = []
+    def _utilization(self) -> float:
+        """Fraction of ``max_queue_size`` currently pending."""
+        return len(self._pending) / self.config.max_queue_size
 
-        # Collect all changes
-        for entity_type, entities in self._pending.items():
-            for change in entities.values():
-                all_changes.append((entity_type, change))
+    def _trim_queue(self) -> list[ChangeKey]:
+        """Drop the least recently changed entries above ``max_queue_size``.
 
-        # Sort by timestamp (oldest first)
-        all_changes.sort(key=lambda x: x[1].timestamp)
-
-        # Keep only newest max_queue_size items
-        to_keep = all_changes[-self.config.max_queue_size :]
-
-        # Rebuild pending dict
-        self._pending.clear()
-        for entity_type, change in to_keep:
-            if entity_type not in self._pending:
-                self._pending[entity_type] = {}
-            self._pending[entity_type][change.entity_id] = change
+        Returns:
+            Keys of the dropped changes
+        """
+        dropped: list[ChangeKey] = []
+        while len(self._pending) > self.config.max_queue_size:
+            key, _ = self._pending.popitem(last=False)
+            dropped.append(key)
+
+        if not dropped:
+            self._overflowing = False
+            return dropped
+
+        self._dropped_total += len(dropped)
+        if not self._overflowing:
+            # Log once per overflow episode, not once per dropped change
+            self._overflowing = True
+            logger.warning(
+                "change_queue_size_exceeded",
+                max_size=self.config.max_queue_size,
+                dropped_total=self._dropped_total,
+            )
 
-        logger.warning(
-            "change_queue_trimmed",
-            removed=len(all_changes) - len(to_keep),
-            remaining=len(to_keep),
-        )
+        return dropped
 
 
 # Global tracker instance (singleton pattern)
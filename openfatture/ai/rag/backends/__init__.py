@@ -0,0 +1,21 @@
+"""Pluggable vector storage backends for the RAG system.
+
+- ``ChromaBackend``: ChromaDB persistent collection (default)
+- ``NumpyBackend``: embedded memory-mapped NumPy matrix with optional HNSW index
+"""
+
+from openfatture.ai.rag.backends.base import (
+    VectorBackend,
+    VectorHit,
+    VectorRecord,
+    matches_where,
+)
+from openfatture.ai.rag.backends.factory import create_vector_backend
+
+__all__ = [
+    "VectorBackend",
+    "VectorHit",
+    "VectorRecord",
+    "create_vector_backend",
+    "matches_where",
+]
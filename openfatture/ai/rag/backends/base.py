@@ -0,0 +1,246 @@
+"""Vector backend interface and shared metadata-filter evaluation.
+
+A backend stores pre-computed embeddings together with the document text and a
+flat metadata dict, and answers top-k similarity queries. ``VectorStore`` owns
+embedding generation and delegates storage to a backend, so the same indexing
+and retrieval code runs on ChromaDB or on the embedded NumPy backend.
+
+Metadata filters use the ChromaDB ``where`` dialect already produced by
+``SemanticRetriever`` and ``InvoiceIndexer``::
+
+    {"type": "invoice"}
+    {"$and": [{"type": "invoice"}, {"client_id": 7}]}
+    {"amount": {"$gte": 1000}}
+    {"date": {"$gte": "2025-01-01"}}
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(slots=True)
+class VectorRecord:
+    """Stored document as returned by :meth:`VectorBackend.get`."""
+
+    id: str
+    document: str
+    metadata: dict[str, Any] = field(default_factory=dict)
+    embedding: list[float] | None = None
+
+
+@dataclass(slots=True)
+class VectorHit:
+    """Single similarity-search result."""
+
+    id: str
+    document: str
+    metadata: dict[str, Any]
+    similarity: float
+
+
+class VectorBackend(ABC):
+    """Abstract base class for vector storage backends.
+
+    Implementations receive embeddings that were already generated by the
+    ``EmbeddingStrategy``; they never call an embedding model themselves.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Mapping[str, Any]],
+    ) -> None:
+        """Insert new documents (ids that already exist are left untouched)."""
+
+    @abstractmethod
+    def update(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Mapping[str, Any]],
+    ) -> None:
+        """Replace embedding, text and metadata of existing documents."""
+
+    @abstractmethod
+    def query(
+        self,
+        embedding: Sequence[float],
+        top_k: int,
+        where: Mapping[str, Any] | None = None,
+    ) -> list[VectorHit]:
+        """Return the ``top_k`` most similar documents matching ``where``."""
+
+    @abstractmethod
+    def query_ids(
+        self,
+        embedding: Sequence[float],
+        ids: Sequence[str],
+        top_k: int,
+    ) -> list[VectorHit]:
+        """Rank only the given documents by similarity (metadata pre-filtering).
+
+        Used when candidates were already resolved from metadata, e.g. by the
+        lexical index during hybrid retrieval. Unknown ids are ignored.
+        """
+
+    @abstractmethod
+    def get(
+        self,
+        ids: Sequence[str] | None = None,
+        where: Mapping[str, Any] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[VectorRecord]:
+        """Fetch documents by id and/or metadata filter."""
+
+    @abstractmethod
+    def delete(self, ids: Sequence[str]) -> None:
+        """Delete documents by id (unknown ids are ignored)."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Return number of stored documents."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Delete every document in the collection."""
+
+    def version(self) -> str:
+        """Token that changes whenever the stored documents change.
+
+        Must reflect writes made by other processes to the persistent
+        collection. Caches derived from the documents (the lexical index) are
+        rebuilt when it changes. The default only tracks the document count;
+        backends should override it.
+        """
+        return f"count:{self.count()}"
+
+    def iter_records(self, batch_size: int = 500) -> Iterator[list[VectorRecord]]:
+        """Yield every stored document in batches of at most ``batch_size``.
+
+        The default fetches everything with one ``get()``; backends that can
+        page should override it so callers never hold the whole corpus.
+        """
+        records = self.get()
+        for start in range(0, len(records), batch_size):
+            yield records[start : start + batch_size]
+
+    def describe(self) -> dict[str, Any]:
+        """Backend-specific details merged into ``VectorStore.get_stats()``."""
+        return {"backend": self.name}
+
+
+def matches_where(metadata: Mapping[str, Any], where: Mapping[str, Any] | None) -> bool:
+    """Evaluate a ChromaDB-style ``where`` filter against one metadata dict.
+
+    Supported: implicit equality, ``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``,
+    ``$lte``, ``$in``, ``$nin`` and the logical ``$and``/``$or``. Multiple keys
+    at the same level are combined with AND. A condition on a key the document
+    does not have never matches.
+
+    Args:
+        metadata: Document metadata
+        where: Filter expression (None matches everything)
+
+    Returns:
+        True if the document satisfies the filter
+    """
+    if not where:
+        return True
+
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif not _matches_field(metadata, key, condition):
+            return False
+
+    return True
+
+
+def split_where(where: Mapping[str, Any] | None) -> list[tuple[str, Any]]:
+    """Flatten top-level AND conjunctions into ``(field, condition)`` pairs.
+
+    ``$or`` clauses are kept intact under the ``"$or"`` key so callers can still
+    evaluate them with :func:`matches_where`.
+    """
+    if not where:
+        return []
+
+    clauses: list[tuple[str, Any]] = []
+    for key, condition in where.items():
+        if key == "$and":
+            for clause in condition:
+                clauses.extend(split_where(clause))
+        else:
+            clauses.append((key, condition))
+    return clauses
+
+
+def equality_value(condition: Any) -> tuple[bool, Any]:
+    """Return ``(True, value)`` if ``condition`` is a plain equality test."""
+    if isinstance(condition, Mapping):
+        if set(condition) == {"$eq"}:
+            return True, condition["$eq"]
+        return False, None
+    return True, condition
+
+
+def _matches_field(metadata: Mapping[str, Any], key: str, condition: Any) -> bool:
+    if key not in metadata:
+        return False
+
+    value = metadata[key]
+
+    if not isinstance(condition, Mapping):
+        return _equals(value, condition)
+
+    for operator, operand in condition.items():
+        if not _apply_operator(value, operator, operand):
+            return False
+    return True
+
+
+def _equals(left: Any, right: Any) -> bool:
+    # Keep booleans distinct from 0/1 the way ChromaDB does.
+    if isinstance(left, bool) != isinstance(right, bool):
+        return False
+    return bool(left == right)
+
+
+def _apply_operator(value: Any, operator: str, operand: Any) -> bool:
+    if operator == "$eq":
+        return _equals(value, operand)
+    if operator == "$ne":
+        return not _equals(value, operand)
+    if operator == "$in":
+        return any(_equals(value, item) for item in operand)
+    if operator == "$nin":
+        return not any(_equals(value, item) for item in operand)
+
+    try:
+        if operator == "$gt":
+            return bool(value > operand)
+        if operator == "$gte":
+            return bool(value >= operand)
+        if operator == "$lt":
+            return bool(value < operand)
+        if operator == "$lte":
+            return bool(value <= operand)
+    except TypeError:
+        # Incomparable types (e.g. str vs float) simply do not match.
+        return False
+
+    raise ValueError(f"Unsupported filter operator: {operator}")
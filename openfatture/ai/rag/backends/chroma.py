@@ -0,0 +1,272 @@
+"""ChromaDB vector backend (default)."""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+from openfatture.ai.rag.backends.base import VectorBackend, VectorHit, VectorRecord
+from openfatture.platform.extras import require_extra
+
+if TYPE_CHECKING:
+    from chromadb.api.models.Collection import Collection
+    from chromadb.api.types import PyEmbedding
+
+
+def _vectors(embeddings: Sequence[Sequence[float]]) -> list[PyEmbedding]:
+    """Copy embeddings into the list-of-lists shape ChromaDB expects."""
+    return [list(vector) for vector in embeddings]
+
+
+class ChromaBackend(VectorBackend):
+    """Vector backend backed by a local ``chromadb.PersistentClient`` collection."""
+
+    name = "chromadb"
+
+    def __init__(self, persist_directory: Path, collection_name: str, dimension: int) -> None:
+        """Open (or create) a persistent ChromaDB collection.
+
+        Args:
+            persist_directory: ChromaDB storage directory
+            collection_name: Collection name
+            dimension: Embedding dimension (stored as collection metadata)
+        """
+        self.persist_directory = persist_directory
+        self.collection_name = collection_name
+        self.dimension = dimension
+
+        require_extra("rag", feature="RAG vector store (ChromaDB)")
+        import chromadb
+        from chromadb.config import Settings
+
+        # Keep RAG local-only: the application never starts or connects to a
+        # ChromaDB server and does not enable remote model-code execution.
+        self.client = chromadb.PersistentClient(
+            path=str(persist_directory),
+            settings=Settings(
+                anonymized_telemetry=False,
+                allow_reset=True,
+            ),
+        )
+
+        self.collection: Collection = self.client.get_or_create_collection(
+            name=collection_name,
+            metadata={"dimension": dimension},
+        )
+        # ChromaDB exposes no change counter: every write through this backend
+        # stores a new random token next to the collection.
+        self.version_path = persist_directory / f"{collection_name}.version"
+
+    def _touch_version(self) -> None:
+        tmp_path = self.version_path.with_name(f"{self.version_path.name}.{uuid.uuid4().hex}")
+        tmp_path.write_text(uuid.uuid4().hex)
+        tmp_path.replace(self.version_path)
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Mapping[str, Any]],
+    ) -> None:
+        """Insert new documents."""
+        self.collection.add(
+            ids=list(ids),
+            embeddings=_vectors(embeddings),
+            documents=list(documents),
+            metadatas=cast(list[Mapping[str, Any]], list(metadatas)),
+        )
+        self._touch_version()
+
+    def update(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Mapping[str, Any]],
+    ) -> None:
+        """Replace existing documents."""
+        self.collection.update(
+            ids=list(ids),
+            embeddings=_vectors(embeddings),
+            documents=list(documents),
+            metadatas=cast(list[Mapping[str, Any]], list(metadatas)),
+        )
+        self._touch_version()
+
+    def query(
+        self,
+        embedding: Sequence[float],
+        top_k: int,
+        where: Mapping[str, Any] | None = None,
+    ) -> list[VectorHit]:
+        """Run a ChromaDB similarity query."""
+        results = self.collection.query(
+            query_embeddings=_vectors([embedding]),
+            n_results=top_k,
+            where=cast(Any, dict(where)) if where else None,
+        )
+
+        ids_result = cast(Sequence[Sequence[str]] | None, results.get("ids"))
+        documents_result = cast(Sequence[Sequence[str]] | None, results.get("documents"))
+        metadatas_result = cast(
+            Sequence[Sequence[Mapping[str, Any]]] | None, results.get("metadatas")
+        )
+        distances_result = cast(Sequence[Sequence[float]] | None, results.get("distances"))
+
+        hits: list[VectorHit] = []
+        if not ids_result:
+            return hits
+
+        doc_ids = ids_result[0]
+        documents_list = documents_result[0] if documents_result else []
+        metadatas_list = metadatas_result[0] if metadatas_result else []
+        distances_list = distances_result[0] if distances_result else []
+
+        for index, doc_id in enumerate(doc_ids):
+            document_text = documents_list[index] if index < len(documents_list) else ""
+            metadata_raw = metadatas_list[index] if index < len(metadatas_list) else {}
+            distance = distances_list[index] if index < len(distances_list) else 1.0
+
+            # ChromaDB returns distance, convert to similarity (1 - distance)
+            hits.append(
+                VectorHit(
+                    id=doc_id,
+                    document=document_text or "",
+                    metadata=dict(metadata_raw or {}),
+                    similarity=1.0 - distance,
+                )
+            )
+
+        return hits
+
+    def query_ids(
+        self,
+        embedding: Sequence[float],
+        ids: Sequence[str],
+        top_k: int,
+    ) -> list[VectorHit]:
+        """Rank only the given documents by cosine similarity of their stored embeddings."""
+        import numpy as np
+
+        records = self.get(ids=list(dict.fromkeys(ids)), include_embeddings=True)
+        records = [record for record in records if record.embedding is not None]
+        if top_k <= 0 or not records:
+            return []
+
+        matrix = np.asarray([record.embedding for record in records], dtype=np.float32)
+        query_vector = np.asarray(embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query_vector) or 1.0)
+        norms[norms == 0] = 1.0
+        similarities = (matrix @ query_vector) / norms
+
+        order = np.argsort(-similarities, kind="stable")[:top_k]
+        return [
+            VectorHit(
+                id=records[index].id,
+                document=records[index].document,
+                metadata=records[index].metadata,
+                similarity=float(similarities[index]),
+            )
+            for index in order
+        ]
+
+    def get(
+        self,
+        ids: Sequence[str] | None = None,
+        where: Mapping[str, Any] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[VectorRecord]:
+        """Fetch documents by id and/or filter."""
+        return self._get(ids=ids, where=where, include_embeddings=include_embeddings)
+
+    def iter_records(self, batch_size: int = 500) -> Iterator[list[VectorRecord]]:
+        """Page through the collection with ``limit``/``offset``."""
+        offset = 0
+        while records := self._get(limit=batch_size, offset=offset):
+            yield records
+            offset += len(records)
+
+    def _get(
+        self,
+        ids: Sequence[str] | None = None,
+        where: Mapping[str, Any] | None = None,
+        include_embeddings: bool = False,
+        limit: int | None = None,
+        offset: int | None = None,
+    ) -> list[VectorRecord]:
+        include: list[str] = ["documents", "metadatas"]
+        if include_embeddings:
+            include.append("embeddings")
+
+        results = self.collection.get(
+            ids=list(ids) if ids is not None else None,
+            where=cast(Any, dict(where)) if where else None,
+            limit=limit,
+            offset=offset,
+            include=cast(Any, include),
+        )
+
+        ids_value = results.get("ids")
+        if not isinstance(ids_value, list) or not ids_value:
+            return []
+
+        documents_value = results.get("documents")
+        metadatas_value = results.get("metadatas")
+        embeddings_value = results.get("embeddings") if include_embeddings else None
+
+        records: list[VectorRecord] = []
+        for index, doc_id in enumerate(ids_value):
+            document_text = (
+                documents_value[index]
+                if isinstance(documents_value, list) and index < len(documents_value)
+                else ""
+            )
+            metadata_raw = (
+                metadatas_value[index]
+                if isinstance(metadatas_value, list) and index < len(metadatas_value)
+                else {}
+            )
+            embedding: list[float] | None = None
+            if embeddings_value is not None and index < len(embeddings_value):
+                embedding = [float(value) for value in embeddings_value[index]]
+
+            records.append(
+                VectorRecord(
+                    id=doc_id,
+                    document=document_text or "",
+                    metadata=dict(metadata_raw or {}),
+                    embedding=embedding,
+                )
+            )
+
+        return records
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Delete documents by id."""
+        if ids:
+            self.collection.delete(ids=list(ids))
+            self._touch_version()
+
+    def count(self) -> int:
+        """Return number of stored documents."""
+        return self.collection.count()
+
+    def reset(self) -> None:
+        """Drop and recreate the collection."""
+        self.client.delete_collection(name=self.collection_name)
+        self.collection = self.client.get_or_create_collection(
+            name=self.collection_name,
+            metadata={"dimension": self.dimension},
+        )
+        self._touch_version()
+
+    def version(self) -> str:
+        """Token written by the last write of any process, plus the count."""
+        try:
+            token = self.version_path.read_text()
+        except FileNotFoundError:
+            token = ""
+        return f"{token}:{self.count()}"
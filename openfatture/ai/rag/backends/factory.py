@@ -0,0 +1,41 @@
+"""Factory selecting the vector backend configured in ``RAGConfig``."""
+
+from __future__ import annotations
+
+from openfatture.ai.rag.backends.base import VectorBackend
+from openfatture.ai.rag.config import RAGConfig
+
+
+def create_vector_backend(config: RAGConfig, dimension: int) -> VectorBackend:
+    """Create the vector backend selected by ``config.vector_backend``.
+
+    Args:
+        config: RAG configuration
+        dimension: Embedding dimension of the active embedding strategy
+
+    Returns:
+        VectorBackend instance
+
+    Raises:
+        ValueError: If the backend is not supported
+    """
+    if config.vector_backend == "chromadb":
+        from openfatture.ai.rag.backends.chroma import ChromaBackend
+
+        return ChromaBackend(
+            persist_directory=config.persist_directory,
+            collection_name=config.collection_name,
+            dimension=dimension,
+        )
+
+    if config.vector_backend == "numpy":
+        from openfatture.ai.rag.backends.numpy_backend import NumpyBackend
+
+        return NumpyBackend(
+            persist_directory=config.persist_directory,
+            collection_name=config.collection_name,
+            dimension=dimension,
+            use_hnsw=config.vector_index == "hnsw",
+        )
+
+    raise ValueError(f"Unsupported vector backend: {config.vector_backend}")
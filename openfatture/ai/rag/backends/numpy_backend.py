@@ -0,0 +1,678 @@
+"""Embedded NumPy vector backend.
+
+A lightweight alternative to ChromaDB for short-lived CLI invocations: opening
+a collection is a memory-map plus one SQLite read, and a top-k query is a single
+matrix-vector product over L2-normalised float32 rows (cosine similarity).
+
+On-disk layout (one directory per collection)::
+
+    <persist_directory>/<collection>.numpy/
+        vectors.npy        float32 matrix (capacity x dimension), memory-mapped
+        metadata.sqlite3   sidecar table: id, slot, document, metadata (JSON)
+        hnsw.bin           optional hnswlib index (only when ``use_hnsw=True``)
+
+Rows are addressed by stable *slots*: deleting a document zeroes its row and
+frees the slot for reuse, so single-document updates never rewrite the matrix.
+Equality filters are answered from an in-memory inverted index; range filters
+(date, amount) are evaluated on the remaining candidates only.
+"""
+
+from __future__ import annotations
+
+import json
+import secrets
+import shutil
+import sqlite3
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from openfatture.ai.rag.backends.base import (
+    VectorBackend,
+    VectorHit,
+    VectorRecord,
+    equality_value,
+    matches_where,
+    split_where,
+)
+from openfatture.platform.extras import MissingExtraError
+from openfatture.platform.logging import get_logger
+
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
+logger = get_logger(__name__)
+
+_SQL_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id TEXT PRIMARY KEY,
+    slot INTEGER NOT NULL UNIQUE,
+    document TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+EqualityKey = tuple[str, bool, str | int | float | bool | None]
+
+
+def _numpy() -> Any:
+    """Import NumPy lazily (it ships with the ``rag`` extra via ChromaDB)."""
+    try:
+        import numpy
+    except ImportError as e:  # pragma: no cover - numpy is a chromadb dependency
+        raise MissingExtraError("rag", feature="NumPy vector backend", cause=e) from e
+    return numpy
+
+
+def _hnswlib() -> Any:
+    """Import hnswlib lazily; it is an optional accelerator, not an extra."""
+    try:
+        import hnswlib
+    except ImportError as e:
+        raise ImportError(
+            "HNSW indexing for the NumPy vector backend requires 'hnswlib' (pip install hnswlib)"
+        ) from e
+    return hnswlib
+
+
+def _equality_key(field_name: str, value: Any) -> EqualityKey | None:
+    """Inverted-index key for a scalar metadata value (None if not a scalar)."""
+    if value is not None and not isinstance(value, str | int | float):
+        return None
+    return (field_name, isinstance(value, bool), value)
+
+
+class NumpyBackend(VectorBackend):
+    """Memory-mapped brute-force (optionally HNSW) vector backend.
+
+    Example:
+        >>> backend = NumpyBackend(Path(".chroma"), "openfatture", dimension=384)
+        >>> backend.add(["a"], [[0.1] * 384], ["Fattura 1/2025"], [{"type": "invoice"}])
+        >>> hits = backend.query([0.1] * 384, top_k=5, where={"type": "invoice"})
+    """
+
+    name = "numpy"
+
+    _matrix: np.memmap[Any, np.dtype[np.float32]]
+    _alive: npt.NDArray[np.bool_]
+
+    def __init__(
+        self,
+        persist_directory: Path,
+        collection_name: str,
+        dimension: int,
+        use_hnsw: bool = False,
+        initial_capacity: int = 1024,
+    ) -> None:
+        """Open (or create) a collection.
+
+        Args:
+            persist_directory: Base storage directory
+            collection_name: Collection name (one sub-directory per collection)
+            dimension: Embedding dimension
+            use_hnsw: Answer unfiltered queries through an hnswlib index
+            initial_capacity: Rows pre-allocated for a new collection
+        """
+        self.np = _numpy()
+        self.collection_name = collection_name
+        self.dimension = dimension
+        self.use_hnsw = use_hnsw
+        self.initial_capacity = max(1, initial_capacity)
+
+        self.directory = persist_directory / f"{collection_name}.numpy"
+        self.vectors_path = self.directory / "vectors.npy"
+        self.metadata_path = self.directory / "metadata.sqlite3"
+        self.hnsw_path = self.directory / "hnsw.bin"
+
+        if use_hnsw:
+            try:
+                _hnswlib()
+            except ImportError as e:
+                logger.warning(
+                    "numpy_vector_backend_hnsw_unavailable",
+                    collection=collection_name,
+                    error=str(e),
+                )
+                self.use_hnsw = False
+
+        self._open()
+
+    # ------------------------------------------------------------------ storage
+
+    def _open(self) -> None:
+        """Memory-map the matrix and load ids/metadata from the sidecar table."""
+        np = self.np
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(str(self.metadata_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+        if self.vectors_path.exists():
+            self._matrix = np.lib.format.open_memmap(self.vectors_path, mode="r+")
+            if self._matrix.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Collection '{self.collection_name}' stores {self._matrix.shape[1]}-d "
+                    f"vectors, embedding strategy produces {self.dimension}-d"
+                )
+        else:
+            self._matrix = np.lib.format.open_memmap(
+                self.vectors_path,
+                mode="w+",
+                dtype=np.float32,
+                shape=(self.initial_capacity, self.dimension),
+            )
+
+        capacity = self._matrix.shape[0]
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._slot_ids: list[str | None] = []
+        # Metadata stays as raw JSON until a filter or a result needs it, and the
+        # equality index is built on the first filtered query, so opening a large
+        # collection only costs one SQLite scan.
+        self._slot_metadata: list[dict[str, Any] | str | None] = []
+        self._id_to_slot: dict[str, int] = {}
+        self._equality_index: dict[EqualityKey, set[int]] | None = None
+
+        rows = self._conn.execute("SELECT id, slot, metadata FROM records ORDER BY slot").fetchall()
+        used = rows[-1][1] + 1 if rows else 0
+        self._slot_ids = [None] * used
+        self._slot_metadata = [None] * used
+        for doc_id, slot, metadata_json in rows:
+            self._register(slot, doc_id, metadata_json)
+        self._free_slots = [slot for slot in range(used) if self._slot_ids[slot] is None]
+
+        self._hnsw: Any = None
+        self._generation = self._read_state("generation")
+        # Random per-collection epoch: a reset followed by as many writes does
+        # not reproduce an earlier version token.
+        self._epoch = self._read_state("epoch")
+        if not self._epoch:
+            self._epoch = secrets.randbits(62) or 1
+            self._write_state("epoch", self._epoch)
+            self._conn.commit()
+
+        logger.debug(
+            "numpy_vector_backend_opened",
+            collection=self.collection_name,
+            count=len(self._id_to_slot),
+            capacity=capacity,
+        )
+
+    def _read_state(self, key: str) -> int:
+        row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _write_state(self, key: str, value: int) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+            (key, value),
+        )
+
+    def _metadata(self, slot: int) -> dict[str, Any]:
+        """Return the (lazily decoded) metadata stored in a slot."""
+        metadata = self._slot_metadata[slot]
+        if metadata is None:
+            return {}
+        if isinstance(metadata, str):
+            metadata = json.loads(metadata)
+            self._slot_metadata[slot] = metadata
+        return metadata
+
+    def _index_slot(self, index: dict[EqualityKey, set[int]], slot: int) -> None:
+        for field_name, value in self._metadata(slot).items():
+            key = _equality_key(field_name, value)
+            if key is not None:
+                index.setdefault(key, set()).add(slot)
+
+    def _ensure_equality_index(self) -> dict[EqualityKey, set[int]]:
+        if self._equality_index is None:
+            index: dict[EqualityKey, set[int]] = {}
+            for slot in self._id_to_slot.values():
+                self._index_slot(index, slot)
+            self._equality_index = index
+        return self._equality_index
+
+    def _register(self, slot: int, doc_id: str, metadata: dict[str, Any] | str) -> None:
+        self._slot_ids[slot] = doc_id
+        self._slot_metadata[slot] = metadata
+        self._id_to_slot[doc_id] = slot
+        self._alive[slot] = True
+        if self._equality_index is not None:
+            self._index_slot(self._equality_index, slot)
+
+    def _unregister(self, slot: int) -> None:
+        doc_id = self._slot_ids[slot]
+        if self._equality_index is not None:
+            for field_name, value in self._metadata(slot).items():
+                key = _equality_key(field_name, value)
+                if key is not None:
+                    slots = self._equality_index.get(key)
+                    if slots is not None:
+                        slots.discard(slot)
+                        if not slots:
+                            del self._equality_index[key]
+        if doc_id is not None:
+            self._id_to_slot.pop(doc_id, None)
+        self._slot_ids[slot] = None
+        self._slot_metadata[slot] = None
+        self._alive[slot] = False
+
+    def _allocate_slot(self) -> int:
+        if self._free_slots:
+            return self._free_slots.pop()
+        slot = len(self._slot_ids)
+        self._slot_ids.append(None)
+        self._slot_metadata.append(None)
+        if slot >= self._matrix.shape[0]:
+            self._grow(max(slot + 1, self._matrix.shape[0] * 2))
+        return slot
+
+    def _grow(self, capacity: int) -> None:
+        """Re-allocate the memory-mapped matrix with a larger capacity."""
+        np = self.np
+        old = self._matrix
+        tmp_path = self.vectors_path.with_suffix(".grow.npy")
+        grown = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dimension)
+        )
+        grown[: old.shape[0]] = old
+        grown.flush()
+        del grown
+        del old
+        self._matrix = None  # type: ignore[assignment]
+        tmp_path.replace(self.vectors_path)
+        self._matrix = np.lib.format.open_memmap(self.vectors_path, mode="r+")
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: self._alive.shape[0]] = self._alive
+        self._alive = alive
+
+        if self._hnsw is not None:
+            self._hnsw.resize_index(capacity)
+
+        logger.debug(
+            "numpy_vector_backend_grown", collection=self.collection_name, capacity=capacity
+        )
+
+    def _normalise(self, embeddings: Sequence[Sequence[float]]) -> npt.NDArray[np.float32]:
+        matrix = self.np.asarray(embeddings, dtype=self.np.float32).reshape(-1, self.dimension)
+        norms = self.np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        normalised: npt.NDArray[np.float32] = matrix / norms
+        return normalised
+
+    def _commit(self) -> None:
+        """Flush the matrix, bump the generation counter and persist HNSW."""
+        self._matrix.flush()
+        self._generation += 1
+        self._write_state("generation", self._generation)
+        if self._hnsw is not None:
+            self._hnsw.save_index(str(self.hnsw_path))
+            self._write_state("hnsw_generation", self._generation)
+        self._conn.commit()
+
+    # ------------------------------------------------------------------ writes
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Mapping[str, Any]],
+    ) -> None:
+        """Insert new documents (existing ids are skipped, as ChromaDB does)."""
+        if not ids:
+            return
+
+        vectors = self._normalise(embeddings)
+        rows: list[tuple[str, int, str, str]] = []
+        new_slots: list[int] = []
+
+        for index, doc_id in enumerate(ids):
+            if doc_id in self._id_to_slot:
+                logger.debug("numpy_vector_backend_duplicate_id", doc_id=doc_id)
+                continue
+
+            slot = self._allocate_slot()
+            metadata = dict(metadatas[index])
+            self._matrix[slot] = vectors[index]
+            self._register(slot, doc_id, metadata)
+            rows.append((doc_id, slot, documents[index], json.dumps(metadata)))
+            new_slots.append(slot)
+
+        if not rows:
+            return
+
+        self._conn.executemany(
+            "INSERT INTO records (id, slot, document, metadata) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        if self._hnsw is not None:
+            for slot in new_slots:
+                try:
+                    # Reused slots are still present in the index as deleted labels.
+                    self._hnsw.unmark_deleted(slot)
+                except RuntimeError:
+                    pass
+            self._hnsw.add_items(self._matrix[new_slots], new_slots)
+        self._commit()
+
+    def update(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Mapping[str, Any]],
+    ) -> None:
+        """Replace existing documents in place (unknown ids are ignored)."""
+        if not ids:
+            return
+
+        vectors = self._normalise(embeddings)
+        rows: list[tuple[str, str, str]] = []
+        slots: list[int] = []
+
+        for index, doc_id in enumerate(ids):
+            slot = self._id_to_slot.get(doc_id)
+            if slot is None:
+                logger.warning("numpy_vector_backend_update_missing", doc_id=doc_id)
+                continue
+
+            metadata = dict(metadatas[index])
+            self._unregister(slot)
+            self._matrix[slot] = vectors[index]
+            self._register(slot, doc_id, metadata)
+            rows.append((documents[index], json.dumps(metadata), doc_id))
+            slots.append(slot)
+
+        if not rows:
+            return
+
+        self._conn.executemany("UPDATE records SET document = ?, metadata = ? WHERE id = ?", rows)
+        if self._hnsw is not None:
+            self._hnsw.add_items(self._matrix[slots], slots)
+        self._commit()
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """Delete documents and free their slots."""
+        slots = [self._id_to_slot[doc_id] for doc_id in ids if doc_id in self._id_to_slot]
+        if not slots:
+            return
+
+        for slot in slots:
+            self._unregister(slot)
+            self._matrix[slot] = 0.0
+            self._free_slots.append(slot)
+            if self._hnsw is not None:
+                self._hnsw.mark_deleted(slot)
+
+        deleted_ids = list(ids)
+        for start in range(0, len(deleted_ids), _SQL_BATCH_SIZE):
+            chunk = deleted_ids[start : start + _SQL_BATCH_SIZE]
+            self._conn.execute(
+                f"DELETE FROM records WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+        self._commit()
+
+    def reset(self) -> None:
+        """Remove every file of the collection and start empty."""
+        self._conn.close()
+        del self._matrix
+        self._hnsw = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._open()
+
+    # ------------------------------------------------------------------ reads
+
+    def count(self) -> int:
+        """Return number of stored documents."""
+        return len(self._id_to_slot)
+
+    def version(self) -> str:
+        """Collection epoch and write generation, read from the sidecar table.
+
+        Reading the committed generation (rather than the in-memory counter)
+        picks up writes made by other processes.
+        """
+        return f"{self._epoch}:{self._read_state('generation')}"
+
+    def iter_records(self, batch_size: int = 500) -> Iterator[list[VectorRecord]]:
+        """Yield the stored documents in slot order, one SQL batch at a time."""
+        ids = [doc_id for doc_id in self._slot_ids if doc_id is not None]
+        for start in range(0, len(ids), batch_size):
+            yield self.get(ids=ids[start : start + batch_size])
+
+    def _candidate_slots(self, where: Mapping[str, Any] | None) -> npt.NDArray[np.int64] | None:
+        """Resolve a filter to matching slots (None means "every live row")."""
+        if not where:
+            return None
+
+        candidates: set[int] | None = None
+        residual: dict[str, Any] = {"$and": []}
+
+        for field_name, condition in split_where(where):
+            is_equality, value = equality_value(condition)
+            key = _equality_key(field_name, value) if is_equality else None
+            if field_name.startswith("$") or key is None:
+                residual["$and"].append({field_name: condition})
+                continue
+
+            matching = self._ensure_equality_index().get(key, set())
+            candidates = set(matching) if candidates is None else candidates & matching
+            if not candidates:
+                empty: npt.NDArray[np.int64] = self.np.empty(0, dtype=self.np.int64)
+                return empty
+
+        if candidates is None:
+            slot_iter: Any = self.np.flatnonzero(self._alive[: len(self._slot_ids)])
+        else:
+            slot_iter = sorted(candidates)
+
+        if residual["$and"]:
+            slot_iter = [
+                slot for slot in slot_iter if matches_where(self._metadata(int(slot)), residual)
+            ]
+
+        slots: npt.NDArray[np.int64] = self.np.asarray(slot_iter, dtype=self.np.int64)
+        return slots
+
+    def query(
+        self,
+        embedding: Sequence[float],
+        top_k: int,
+        where: Mapping[str, Any] | None = None,
+    ) -> list[VectorHit]:
+        """Return the ``top_k`` most similar documents (cosine similarity)."""
+        np = self.np
+        if top_k <= 0 or not self._id_to_slot:
+            return []
+
+        query_vector = self._normalise([embedding])[0]
+        candidates = self._candidate_slots(where)
+
+        if candidates is None and self.use_hnsw:
+            slots, scores = self._query_hnsw(query_vector, top_k)
+        else:
+            if candidates is None:
+                used = len(self._slot_ids)
+                slots = (
+                    np.arange(used, dtype=np.int64)
+                    if not self._free_slots
+                    else np.flatnonzero(self._alive[:used])
+                )
+                matrix = self._matrix[:used] if not self._free_slots else self._matrix[slots]
+            else:
+                slots = candidates
+                matrix = self._matrix[slots]
+
+            slots, scores = self._rank(query_vector, slots, matrix, top_k)
+
+        return self._hits(slots, scores)
+
+    def query_ids(
+        self,
+        embedding: Sequence[float],
+        ids: Sequence[str],
+        top_k: int,
+    ) -> list[VectorHit]:
+        """Rank only the given documents (exact scores over their rows)."""
+        np = self.np
+        slots = np.asarray(
+            sorted(self._id_to_slot[doc_id] for doc_id in set(ids) if doc_id in self._id_to_slot),
+            dtype=np.int64,
+        )
+        if top_k <= 0 or slots.size == 0:
+            return []
+
+        query_vector = self._normalise([embedding])[0]
+        ranked_slots, scores = self._rank(query_vector, slots, self._matrix[slots], top_k)
+        return self._hits(ranked_slots, scores)
+
+    def _rank(
+        self,
+        query_vector: npt.NDArray[np.float32],
+        slots: npt.NDArray[np.int64],
+        matrix: npt.NDArray[np.float32],
+        top_k: int,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float32]]:
+        """Select the ``top_k`` rows of ``matrix`` (one per slot) by similarity."""
+        np = self.np
+        if slots.size == 0:
+            return slots, np.empty(0, dtype=np.float32)
+
+        similarities = matrix @ query_vector
+        k = min(top_k, slots.size)
+        if k < slots.size:
+            top = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            top = np.arange(slots.size)
+        order = top[np.argsort(-similarities[top], kind="stable")]
+        return slots[order], similarities[order]
+
+    def _hits(
+        self, slots: npt.NDArray[np.int64], scores: npt.NDArray[np.float32]
+    ) -> list[VectorHit]:
+        documents = self._documents_for([self._slot_ids[int(slot)] or "" for slot in slots])
+        hits: list[VectorHit] = []
+        for slot, score in zip(slots, scores, strict=True):
+            doc_id = self._slot_ids[int(slot)]
+            if doc_id is None:
+                continue
+            hits.append(
+                VectorHit(
+                    id=doc_id,
+                    document=documents.get(doc_id, ""),
+                    metadata=dict(self._metadata(int(slot))),
+                    similarity=float(score),
+                )
+            )
+        return hits
+
+    def _query_hnsw(
+        self, query_vector: npt.NDArray[np.float32], top_k: int
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float32]]:
+        np = self.np
+        index = self._hnsw_index()
+        k = min(top_k, self.count())
+        index.set_ef(max(50, k))
+        labels, distances = index.knn_query(query_vector, k=k)
+        # hnswlib "cosine" space returns 1 - cosine similarity.
+        return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+    def _hnsw_index(self) -> Any:
+        """Load the persisted HNSW index, or build it from the live rows."""
+        if self._hnsw is not None:
+            return self._hnsw
+
+        hnswlib = _hnswlib()
+        np = self.np
+        capacity = self._matrix.shape[0]
+        index = hnswlib.Index(space="cosine", dim=self.dimension)
+
+        if self.hnsw_path.exists() and self._read_state("hnsw_generation") == self._generation:
+            index.load_index(str(self.hnsw_path), max_elements=capacity)
+        else:
+            index.init_index(max_elements=capacity, ef_construction=200, M=16)
+            slots = np.flatnonzero(self._alive[: len(self._slot_ids)])
+            if slots.size:
+                index.add_items(self._matrix[slots], slots)
+            index.save_index(str(self.hnsw_path))
+            self._write_state("hnsw_generation", self._generation)
+            self._conn.commit()
+            logger.info(
+                "numpy_vector_backend_hnsw_built",
+                collection=self.collection_name,
+                count=int(slots.size),
+            )
+
+        self._hnsw = index
+        return index
+
+    def _documents_for(self, ids: Sequence[str]) -> dict[str, str]:
+        documents: dict[str, str] = {}
+        for start in range(0, len(ids), _SQL_BATCH_SIZE):
+            chunk = list(ids[start : start + _SQL_BATCH_SIZE])
+            rows = self._conn.execute(
+                f"SELECT id, document FROM records WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            documents.update(rows)
+        return documents
+
+    def get(
+        self,
+        ids: Sequence[str] | None = None,
+        where: Mapping[str, Any] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[VectorRecord]:
+        """Fetch documents by id and/or metadata filter.
+
+        Returned embeddings are the stored, L2-normalised vectors.
+        """
+        if ids is not None:
+            slots = [self._id_to_slot[doc_id] for doc_id in ids if doc_id in self._id_to_slot]
+            if where:
+                slots = [slot for slot in slots if matches_where(self._metadata(slot), where)]
+        else:
+            candidates = self._candidate_slots(where)
+            if candidates is None:
+                slots = [int(slot) for slot in self.np.flatnonzero(self._alive)]
+            else:
+                slots = [int(slot) for slot in candidates]
+
+        doc_ids = [self._slot_ids[slot] or "" for slot in slots]
+        documents = self._documents_for(doc_ids)
+
+        return [
+            VectorRecord(
+                id=doc_id,
+                document=documents.get(doc_id, ""),
+                metadata=dict(self._metadata(slot)),
+                embedding=(
+                    [float(value) for value in self._matrix[slot]] if include_embeddings else None
+                ),
+            )
+            for slot, doc_id in zip(slots, doc_ids, strict=True)
+        ]
+
+    def describe(self) -> dict[str, Any]:
+        """Report storage layout details."""
+        return {
+            "backend": self.name,
+            "capacity": int(self._matrix.shape[0]),
+            "index": "hnsw" if self.use_hnsw else "flat",
+            "storage_path": str(self.directory),
+        }
+
+    def close(self) -> None:
+        """Flush and release the memory map and database connection."""
+        self._matrix.flush()
+        self._conn.close()
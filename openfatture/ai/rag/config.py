@@ -29,6 +29,17 @@ class RAGConfig(BaseModel):
         description="Enable RAG system",
     )
 
+    # Vector storage settings
+    vector_backend: Literal["chromadb", "numpy"] = Field(
+        default="chromadb",
+        description="Vector storage backend (chromadb or embedded numpy)",
+    )
+
+    vector_index: Literal["flat", "hnsw"] = Field(
+        default="flat",
+        description="Index used by the numpy backend for unfiltered queries (hnsw needs hnswlib)",
+    )
+
     # ChromaDB settings
     persist_directory: Path = Field(
         default=Path(".chroma"),
@@ -82,6 +93,23 @@ class RAGConfig(BaseModel):
         description="Minimum similarity score threshold (0.0-1.0)",
     )
 
+    retrieval_mode: Literal["vector", "hybrid"] = Field(
+        default="hybrid",
+        description="Retrieval mode: pure vector search, or BM25 + vector with rank fusion",
+    )
+
+    hybrid_fusion_depth: int = Field(
+        default=50,
+        ge=1,
+        description="Lexical and vector candidates ranked per query before fusion",
+    )
+
+    hybrid_rrf_k: int = Field(
+        default=60,
+        ge=1,
+        description="Reciprocal rank fusion smoothing constant",
+    )
+
     # Indexing settings
     batch_size: int = Field(
         default=100,
@@ -89,6 +117,12 @@ class RAGConfig(BaseModel):
         description="Batch size for indexing operations",
     )
 
+    indexing_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Knowledge sources read and chunked concurrently",
+    )
+
     enable_incremental: bool = Field(
         default=True,
         description="Enable incremental indexing",
@@ -106,6 +140,17 @@ class RAGConfig(BaseModel):
         description="Cache TTL in seconds",
     )
 
+    embedding_cache_path: Path | None = Field(
+        default=None,
+        description="Persistent embedding cache file (default: persist_directory/embedding_cache.sqlite3)",
+    )
+
+    embedding_cache_max_entries: int = Field(
+        default=100_000,
+        ge=1,
+        description="Maximum number of cached embeddings before LRU eviction",
+    )
+
     @field_validator("persist_directory")
     @classmethod
     def validate_persist_directory(cls, v: Path) -> Path:
@@ -130,10 +175,17 @@ def get_rag_config() -> RAGConfig:
     - OPENFATTURE_RAG_ENABLED: Enable/disable RAG
     - OPENFATTURE_RAG_PERSIST_DIR: ChromaDB storage directory
     - OPENFATTURE_RAG_COLLECTION: Collection name
+    - OPENFATTURE_RAG_VECTOR_BACKEND: Vector backend (chromadb or numpy)
+    - OPENFATTURE_RAG_VECTOR_INDEX: Numpy backend index (flat or hnsw)
     - OPENFATTURE_RAG_EMBEDDING_PROVIDER: Embedding provider
     - OPENFATTURE_RAG_EMBEDDING_MODEL: Embedding model
     - OPENFATTURE_RAG_TOP_K: Number of results
     - OPENFATTURE_RAG_SIMILARITY_THRESHOLD: Similarity threshold
+    - OPENFATTURE_RAG_RETRIEVAL_MODE: Retrieval mode (vector or hybrid)
+    - OPENFATTURE_RAG_EMBEDDING_CACHE_PATH: Persistent embedding cache file
+    - OPENFATTURE_RAG_EMBEDDING_CACHE_MAX_ENTRIES: Embedding cache size bound
+    - OPENFATTURE_RAG_BATCH_SIZE: Documents embedded per indexing batch
+    - OPENFATTURE_RAG_INDEXING_CONCURRENCY: Knowledge sources prepared concurrently
 
     Smart defaults:
     - If AI_PROVIDER=ollama and no embedding provider specified,
@@ -163,9 +215,26 @@ def get_rag_config() -> RAGConfig:
         provider_raw = default_provider
 
     provider = cast(Literal["openai", "sentence-transformers"], provider_raw)
+    cache_path_raw = os.getenv("OPENFATTURE_RAG_EMBEDDING_CACHE_PATH")
+
+    backend_raw = os.getenv("OPENFATTURE_RAG_VECTOR_BACKEND", "chromadb")
+    if backend_raw not in {"chromadb", "numpy"}:
+        _logger.warning("invalid_vector_backend", backend=backend_raw, fallback="chromadb")
+        backend_raw = "chromadb"
+    index_raw = os.getenv("OPENFATTURE_RAG_VECTOR_INDEX", "flat")
+    if index_raw not in {"flat", "hnsw"}:
+        _logger.warning("invalid_vector_index", index=index_raw, fallback="flat")
+        index_raw = "flat"
+
+    retrieval_mode_raw = os.getenv("OPENFATTURE_RAG_RETRIEVAL_MODE", "hybrid")
+    if retrieval_mode_raw not in {"vector", "hybrid"}:
+        _logger.warning("invalid_retrieval_mode", mode=retrieval_mode_raw, fallback="hybrid")
+        retrieval_mode_raw = "hybrid"
 
     return RAGConfig(
         enabled=os.getenv("OPENFATTURE_RAG_ENABLED", "true").lower() == "true",
+        vector_backend=cast(Literal["chromadb", "numpy"], backend_raw),
+        vector_index=cast(Literal["flat", "hnsw"], index_raw),
         persist_directory=Path(os.getenv("OPENFATTURE_RAG_PERSIST_DIR", ".chroma")),
         collection_name=os.getenv("OPENFATTURE_RAG_COLLECTION", "openfatture"),
         knowledge_collection_name=os.getenv("OPENFATTURE_RAG_KB_COLLECTION", "openfatture_kb"),
@@ -179,5 +248,12 @@ def get_rag_config() -> RAGConfig:
         embedding_model=os.getenv("OPENFATTURE_RAG_EMBEDDING_MODEL", "text-embedding-3-small"),
         top_k=int(os.getenv("OPENFATTURE_RAG_TOP_K", "5")),
         similarity_threshold=float(os.getenv("OPENFATTURE_RAG_SIMILARITY_THRESHOLD", "0.7")),
+        retrieval_mode=cast(Literal["vector", "hybrid"], retrieval_mode_raw),
         enable_caching=os.getenv("OPENFATTURE_RAG_ENABLE_CACHING", "true").lower() == "true",
+        embedding_cache_path=Path(cache_path_raw) if cache_path_raw else None,
+        embedding_cache_max_entries=int(
+            os.getenv("OPENFATTURE_RAG_EMBEDDING_CACHE_MAX_ENTRIES", "100000")
+        ),
+        batch_size=int(os.getenv("OPENFATTURE_RAG_BATCH_SIZE", "100")),
+        indexing_concurrency=int(os.getenv("OPENFATTURE_RAG_INDEXING_CONCURRENCY", "4")),
     )
@@ -0,0 +1,268 @@
+"""Persistent, content-addressed embedding cache.
+
+Embeddings are deterministic for a given (model, text) pair, so they can be kept
+on disk and reused across CLI invocations, ``scripts/init_vector_store.py`` runs
+and knowledge-base reindexing. Vectors are stored as packed float32 blobs in a
+single SQLite file; eviction is least-recently-used and bounded by entry count.
+
+Example:
+    >>> cache = SQLiteEmbeddingCache(Path(".chroma/embedding_cache.sqlite3"))
+    >>> await cache.set_many({"k1": [0.1, 0.2], "k2": [0.3, 0.4]})
+    >>> found = await cache.get_many(["k1", "k3"])  # {"k1": [...]} (k3 is a miss)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+from openfatture.ai.rag.config import RAGConfig
+from openfatture.platform.logging import get_logger
+
+logger = get_logger(__name__)
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 999 on older builds.
+_SQL_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    dimension INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_embeddings_accessed_at ON embeddings (accessed_at);
+"""
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    """Build the content-addressed cache key for a (model, text) pair.
+
+    Args:
+        model: Embedding model name
+        text: Input text
+
+    Returns:
+        Cache key (SHA256 hash)
+    """
+    key_data = {"model": model, "text": text}
+    key_json = json.dumps(key_data, sort_keys=True)
+    return hashlib.sha256(key_json.encode()).hexdigest()
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> list[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class SQLiteEmbeddingCache:
+    """SQLite-backed embedding cache with size-bounded LRU eviction.
+
+    Implements the ``EmbeddingCache`` protocol (``get``/``set``) plus the batch
+    variants ``get_many``/``set_many`` used by ``embed_batch`` so that only cache
+    misses are sent to the embedding model.
+
+    The database is opened lazily on first use, so constructing the cache (for
+    example from ``create_embeddings``) never touches the filesystem.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = 100_000,
+        model: str = "",
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: SQLite database file
+            max_entries: Maximum number of cached vectors before LRU eviction
+            model: Model name recorded alongside new entries (informational)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        self.path = path
+        self.max_entries = max_entries
+        self.model = model
+
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+        # Statistics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            logger.debug("embedding_cache_opened", path=str(self.path))
+        return self._conn
+
+    async def get(self, key: str) -> list[float] | None:
+        """Retrieve a cached embedding."""
+        return (await self.get_many([key])).get(key)
+
+    async def set(self, key: str, value: list[float]) -> None:
+        """Store an embedding."""
+        await self.set_many({key: value})
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, list[float]]:
+        """Retrieve several embeddings in one round-trip.
+
+        Args:
+            keys: Cache keys to look up
+
+        Returns:
+            Mapping of the keys that were found to their vectors (misses are omitted)
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return {}
+
+        found: dict[str, list[float]] = {}
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(unique_keys), _SQL_BATCH_SIZE):
+                chunk = unique_keys[start : start + _SQL_BATCH_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = _unpack(blob)
+
+            if found:
+                conn.executemany(
+                    "UPDATE embeddings SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                conn.commit()
+
+            self._hits += len(found)
+            self._misses += len(unique_keys) - len(found)
+
+        return found
+
+    async def set_many(self, items: Mapping[str, Sequence[float]]) -> None:
+        """Store several embeddings in one transaction, evicting LRU entries if full.
+
+        Args:
+            items: Mapping of cache key to embedding vector
+        """
+        if not items:
+            return
+
+        now = time.time()
+        rows = [
+            (key, self.model, len(vector), _pack(vector), now, now) for key, vector in items.items()
+        ]
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(key, model, dimension, vector, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict_locked(conn)
+            conn.commit()
+
+    def _evict_locked(self, conn: sqlite3.Connection) -> None:
+        """Drop least-recently-used rows above ``max_entries`` (caller holds the lock)."""
+        (count,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+
+        conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY accessed_at ASC LIMIT ?)",
+            (excess,),
+        )
+        self._evictions += excess
+        logger.debug("embedding_cache_eviction", evicted=excess, max_entries=self.max_entries)
+
+    def size(self) -> int:
+        """Get number of cached embeddings."""
+        with self._lock:
+            (count,) = self._connect().execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return int(count)
+
+    async def clear(self) -> None:
+        """Remove all cached embeddings."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM embeddings")
+            conn.commit()
+        logger.info("embedding_cache_cleared", path=str(self.path))
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with cache stats
+        """
+        total_requests = self._hits + self._misses
+        return {
+            "path": str(self.path),
+            "size": self.size(),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "total_requests": total_requests,
+            "hit_rate": self._hits / total_requests if total_requests > 0 else 0,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"SQLiteEmbeddingCache(path={self.path}, max_entries={self.max_entries})"
+
+
+def create_embedding_cache(config: RAGConfig) -> SQLiteEmbeddingCache:
+    """Create the persistent embedding cache described by a RAG configuration.
+
+    Args:
+        config: RAG configuration
+
+    Returns:
+        SQLiteEmbeddingCache stored under ``embedding_cache_path`` (defaults to
+        ``persist_directory/embedding_cache.sqlite3``)
+    """
+    path = config.embedding_cache_path or config.persist_directory / "embedding_cache.sqlite3"
+    return SQLiteEmbeddingCache(
+        path=path,
+        max_entries=config.embedding_cache_max_entries,
+        model=config.embedding_model,
+    )
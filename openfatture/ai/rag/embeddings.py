@@ -3,17 +3,19 @@
 This module provides embedding generation using different providers:
 - OpenAI (text-embedding-3-small, text-embedding-3-large)
 - Sentence Transformers (local models)
+
+Both providers consult an optional ``EmbeddingCache`` from ``embed_text`` and
+``embed_batch`` alike, so only cache misses are sent to the model.
 """
 
 from __future__ import annotations
 
-import hashlib
-import json
 from abc import ABC, abstractmethod
-from collections.abc import Sequence
+from collections.abc import Awaitable, Callable, Mapping, Sequence
 from typing import TYPE_CHECKING, Any, Protocol, runtime_checkable
 
 from openfatture.ai.rag.config import RAGConfig
+from openfatture.ai.rag.embedding_cache import create_embedding_cache, embedding_cache_key
 from openfatture.platform.logging import get_logger
 
 if TYPE_CHECKING:
@@ -46,6 +48,8 @@ class EmbeddingStrategy(ABC):
     All embedding providers must implement this interface.
     """
 
+    cache: EmbeddingCache | None = None
+
     @abstractmethod
     async def embed_text(self, text: str) -> list[float]:
         """Generate embedding for a single text.
@@ -82,6 +86,87 @@ class EmbeddingStrategy(ABC):
         """Get model name."""
         pass
 
+    async def _cached_embed_text(
+        self,
+        text: str,
+        encode: Callable[[str], Awaitable[list[float]]],
+    ) -> list[float]:
+        """Embed a single text, consulting the cache first.
+
+        Args:
+            text: Text to embed
+            encode: Provider call used on a cache miss
+
+        Returns:
+            Embedding vector
+        """
+        if self.cache is None:
+            return await encode(text)
+
+        cache_key = embedding_cache_key(self.model_name, text)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            logger.debug("embedding_cache_hit", model=self.model_name)
+            return cached
+
+        embedding = await encode(text)
+        await self.cache.set(cache_key, embedding)
+        return embedding
+
+    async def _cached_embed_batch(
+        self,
+        texts: Sequence[str],
+        encode_many: Callable[[list[str]], Awaitable[list[list[float]]]],
+    ) -> list[list[float]]:
+        """Embed a batch of texts, sending only (deduplicated) cache misses to the model.
+
+        Args:
+            texts: Texts to embed
+            encode_many: Provider batch call used for the misses
+
+        Returns:
+            Embedding vectors in the same order as ``texts``
+        """
+        if self.cache is None:
+            return await encode_many(list(texts))
+
+        keys = [embedding_cache_key(self.model_name, text) for text in texts]
+
+        found: dict[str, list[float]]
+        if isinstance(self.cache, BatchEmbeddingCache):
+            found = await self.cache.get_many(keys)
+        else:
+            found = {}
+            for key in dict.fromkeys(keys):
+                cached = await self.cache.get(key)
+                if cached is not None:
+                    found[key] = cached
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts, strict=True):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = await encode_many(list(missing.values()))
+            computed = dict(zip(missing, vectors, strict=True))
+            found.update(computed)
+
+            if isinstance(self.cache, BatchEmbeddingCache):
+                await self.cache.set_many(computed)
+            else:
+                for key, vector in computed.items():
+                    await self.cache.set(key, vector)
+
+        logger.info(
+            "embedding_cache_batch",
+            model=self.model_name,
+            requested=len(texts),
+            misses=len(missing),
+        )
+
+        return [found[key] for key in keys]
+
 
 @runtime_checkable
 class EmbeddingCache(Protocol):
@@ -92,6 +177,15 @@ class EmbeddingCache(Protocol):
         """Store embedding in cache."""
 
 
+@runtime_checkable
+class BatchEmbeddingCache(EmbeddingCache, Protocol):
+    async def get_many(self, keys: Sequence[str]) -> dict[str, list[float]]:
+        """Retrieve cached embeddings for several keys (misses are omitted)."""
+
+    async def set_many(self, items: Mapping[str, Sequence[float]]) -> None:
+        """Store several embeddings at once."""
+
+
 class OpenAIEmbeddings(EmbeddingStrategy):
     """OpenAI embedding strategy.
 
@@ -141,15 +235,14 @@ class OpenAIEmbeddings(EmbeddingStrategy):
 
     async def embed_text(self, text: str) -> list[float]:
         """Generate embedding for a single text."""
-        # Check cache first
-        cache_key: str | None = None
-        if self.cache:
-            cache_key = self._generate_cache_key(text)
-            cached = await self.cache.get(cache_key)
-            if cached is not None:
-                logger.debug("embedding_cache_hit", model=self.model)
-                return cached
+        return await self._cached_embed_text(text, self._request_embedding)
 
+    async def embed_batch(self, texts: Sequence[str]) -> list[list[float]]:
+        """Generate embeddings for multiple texts."""
+        return await self._cached_embed_batch(texts, self._request_batch)
+
+    async def _request_embedding(self, text: str) -> list[float]:
+        """Call the OpenAI API for a single text."""
         try:
             # Call OpenAI API
             response = await self.client.embeddings.create(
@@ -159,10 +252,6 @@ class OpenAIEmbeddings(EmbeddingStrategy):
 
             embedding = response.data[0].embedding
 
-            # Cache result
-            if self.cache and cache_key is not None:
-                await self.cache.set(cache_key, embedding)
-
             logger.debug(
                 "embedding_generated",
                 model=self.model,
@@ -179,12 +268,12 @@ class OpenAIEmbeddings(EmbeddingStrategy):
             )
             raise
 
-    async def embed_batch(self, texts: Sequence[str]) -> list[list[float]]:
-        """Generate embeddings for multiple texts."""
+    async def _request_batch(self, texts: list[str]) -> list[list[float]]:
+        """Call the OpenAI API for a batch of texts."""
         try:
             # Batch API call
             response = await self.client.embeddings.create(
-                input=list(texts),
+                input=texts,
                 model=self.model,
             )
 
@@ -226,9 +315,7 @@ class OpenAIEmbeddings(EmbeddingStrategy):
         Returns:
             Cache key (SHA256 hash)
         """
-        key_data = {"model": self.model, "text": text}
-        key_json = json.dumps(key_data, sort_keys=True)
-        return hashlib.sha256(key_json.encode()).hexdigest()
+        return embedding_cache_key(self.model, text)
 
 
 class SentenceTransformerEmbeddings(EmbeddingStrategy):
@@ -254,15 +341,18 @@ class SentenceTransformerEmbeddings(EmbeddingStrategy):
         self,
         model_name: str = "all-MiniLM-L6-v2",
         device: str | None = None,
+        cache: EmbeddingCache | None = None,
     ) -> None:
         """Initialize Sentence Transformers embeddings.
 
         Args:
             model_name: Model name (default: all-MiniLM-L6-v2)
             device: Device to use (cpu, cuda, mps)
+            cache: Optional cache for embeddings
         """
         self.model_name_str = model_name
         self.device = device
+        self.cache = cache
 
         # Load model via the lazy module-level seam (see _sentence_transformer).
         self.model = _sentence_transformer(model_name, device=device)
@@ -276,6 +366,14 @@ class SentenceTransformerEmbeddings(EmbeddingStrategy):
 
     async def embed_text(self, text: str) -> list[float]:
         """Generate embedding for a single text."""
+        return await self._cached_embed_text(text, self._encode_text)
+
+    async def embed_batch(self, texts: Sequence[str]) -> list[list[float]]:
+        """Generate embeddings for multiple texts."""
+        return await self._cached_embed_batch(texts, self._encode_batch)
+
+    async def _encode_text(self, text: str) -> list[float]:
+        """Run the local model on a single text."""
         try:
             # Encode (runs in thread pool to avoid blocking)
             import asyncio
@@ -300,14 +398,14 @@ class SentenceTransformerEmbeddings(EmbeddingStrategy):
             )
             raise
 
-    async def embed_batch(self, texts: Sequence[str]) -> list[list[float]]:
-        """Generate embeddings for multiple texts."""
+    async def _encode_batch(self, texts: list[str]) -> list[list[float]]:
+        """Run the local model on a batch of texts."""
         try:
             # Batch encode
             import asyncio
 
             loop = asyncio.get_event_loop()
-            embeddings = await loop.run_in_executor(None, self.model.encode, list(texts))
+            embeddings = await loop.run_in_executor(None, self.model.encode, texts)
             embedding_lists = [[float(value) for value in vector.tolist()] for vector in embeddings]
 
             logger.info(
@@ -348,7 +446,8 @@ def create_embeddings(
     Args:
         config: RAG configuration
         api_key: API key (required for OpenAI)
-        cache: Optional cache for embeddings
+        cache: Optional cache for embeddings (default: the persistent SQLite
+            cache under ``config.persist_directory`` when caching is enabled)
 
     Returns:
         EmbeddingStrategy instance
@@ -356,6 +455,12 @@ def create_embeddings(
     Raises:
         ValueError: If provider is not supported
     """
+    if config.enable_caching:
+        if cache is None:
+            cache = create_embedding_cache(config)
+    else:
+        cache = None
+
     if config.embedding_provider == "openai":
         if not api_key:
             raise ValueError("OpenAI API key required for OpenAI embeddings")
@@ -363,12 +468,13 @@ def create_embeddings(
         return OpenAIEmbeddings(
             api_key=api_key,
             model=config.embedding_model,
-            cache=cache if config.enable_caching else None,
+            cache=cache,
         )
 
     elif config.embedding_provider == "sentence-transformers":
         return SentenceTransformerEmbeddings(
             model_name=config.embedding_model,
+            cache=cache,
         )
 
     else:
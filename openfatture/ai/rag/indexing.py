@@ -3,6 +3,8 @@
 This module handles indexing of invoices and related documents into the vector store.
 """
 
+from sqlalchemy.orm import selectinload
+
 from openfatture.ai.rag.vector_store import VectorStore
 from openfatture.platform.logging import get_logger
 from openfatture.storage.database.models import Fattura
@@ -10,6 +12,9 @@ from openfatture.storage.session import db_session
 
 logger = get_logger(__name__)
 
+# Keep ``IN (...)`` lists below SQLite's variable limit on older builds.
+_ID_CHUNK_SIZE = 500
+
 
 class InvoiceIndexer:
     """Invoice indexing pipeline for RAG system.
@@ -137,6 +142,49 @@ class InvoiceIndexer:
 
             return doc_id
 
+    async def index_invoices(self, invoice_ids: list[int]) -> list[str]:
+        """Index or reindex several invoices with one embedding batch per chunk.
+
+        New invoices are added and already indexed ones replaced. Ids that no
+        longer exist in the database are skipped.
+
+        Args:
+            invoice_ids: Invoice IDs
+
+        Returns:
+            Document IDs written to the vector store
+        """
+        unique_ids = list(dict.fromkeys(invoice_ids))
+        doc_ids: list[str] = []
+
+        with db_session() as db:
+            for start in range(0, len(unique_ids), _ID_CHUNK_SIZE):
+                chunk = unique_ids[start : start + _ID_CHUNK_SIZE]
+                fatture = (
+                    db.query(Fattura)
+                    .options(selectinload(Fattura.cliente), selectinload(Fattura.righe))
+                    .filter(Fattura.id.in_(chunk))
+                    .all()
+                )
+                if not fatture:
+                    continue
+
+                doc_ids.extend(
+                    await self.vector_store.upsert_documents(
+                        documents=[self._create_invoice_document(f) for f in fatture],
+                        metadatas=[self._create_invoice_metadata(f) for f in fatture],
+                        ids=[f"invoice-{f.id}" for f in fatture],
+                    )
+                )
+
+        logger.info(
+            "invoices_indexed_batch",
+            requested=len(unique_ids),
+            indexed=len(doc_ids),
+        )
+
+        return doc_ids
+
     async def _index_invoice_batch(self, fatture: list[Fattura]) -> list[str]:
         """Index a batch of invoices.
 
@@ -229,6 +277,21 @@ class InvoiceIndexer:
 
         logger.info("invoice_deleted_from_index", invoice_id=invoice_id)
 
+    async def delete_invoices(self, invoice_ids: list[int]) -> None:
+        """Delete several invoices from the index in one call.
+
+        Args:
+            invoice_ids: Invoice IDs
+        """
+        if not invoice_ids:
+            return
+
+        await self.vector_store.delete_documents(
+            [f"invoice-{invoice_id}" for invoice_id in invoice_ids]
+        )
+
+        logger.info("invoices_deleted_from_index", count=len(invoice_ids))
+
     async def reindex_year(self, year: int) -> int:
         """Reindex all invoices for a specific year.
 
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import re
-from collections.abc import Iterable
-from dataclasses import dataclass
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -16,6 +19,8 @@ from openfatture.platform.logging import get_logger
 
 logger = get_logger(__name__)
 
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*)")
+
 
 @dataclass(slots=True)
 class KnowledgeSource:
@@ -32,6 +37,55 @@ class KnowledgeSource:
     chunk_overlap: int = 200
 
 
+@dataclass(slots=True)
+class KnowledgeIndexReport:
+    """Progress and throughput of one source in an indexing run."""
+
+    source_id: str
+    path: str
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    chunks_skipped: int = 0
+    chunks_deleted: int = 0
+    chunks_pending: int = 0
+    bytes_read: int = 0
+    read_seconds: float = 0.0
+    duration_seconds: float = 0.0
+    missing: bool = False
+    started_at: float = field(default=0.0, repr=False)
+
+    def finish(self) -> None:
+        """Record the elapsed time once the last chunk of the source is stored."""
+        self.duration_seconds = time.perf_counter() - self.started_at
+
+    @property
+    def chunks_per_second(self) -> float:
+        """Chunks processed (embedded or skipped) per second."""
+        if self.duration_seconds <= 0:
+            return 0.0
+        return self.chunks_total / self.duration_seconds
+
+
+@dataclass(slots=True)
+class _Chunk:
+    """Chunk ready for embedding."""
+
+    id: str
+    text: str
+    metadata: dict[str, Any]
+
+
+@dataclass(slots=True)
+class _PreparedSource:
+    """Chunks of one source (``None`` when the file is missing)."""
+
+    source: KnowledgeSource
+    chunks: list[_Chunk] | None
+    started_at: float
+    bytes_read: int = 0
+    read_seconds: float = 0.0
+
+
 class KnowledgeIndexer:
     """Indexer for static knowledge base documents (Markdown/YAML/Plaintext)."""
 
@@ -100,36 +154,104 @@ class KnowledgeIndexer:
         Returns:
             Total chunks indexed.
         """
-        total_chunks = 0
+        reports = await self.sync_sources(source_ids)
+        return sum(report.chunks_total for report in reports)
+
+    async def index_source(self, source_id: str) -> int:
+        """Index a single source by id."""
+        source = self.get_source(source_id)
+        if source is None:
+            raise ValueError(f"Knowledge source '{source_id}' not found")
+
+        if not source.enabled:
+            logger.warning("knowledge_source_disabled", source_id=source_id)
+            return 0
+
+        reports = await self._sync([source])
+        return reports[0].chunks_total
+
+    async def sync_sources(
+        self, source_ids: Iterable[str] | None = None
+    ) -> list[KnowledgeIndexReport]:
+        """Incrementally bring the knowledge collection in line with the sources.
+
+        Sources are read and chunked concurrently (bounded by
+        ``config.indexing_concurrency``). Chunks whose id and content hash are
+        already stored are skipped, new or changed chunks are embedded in
+        batches of ``config.batch_size`` across sources, and chunks that a
+        changed source no longer produces are deleted.
+
+        Args:
+            source_ids: Optional iterable of source IDs to restrict indexing.
+
+        Returns:
+            One report per processed source, in manifest order.
+        """
+        selected_ids = set(source_ids) if source_ids is not None else None
+        sources: list[KnowledgeSource] = []
 
         for source in self.sources:
             if not source.enabled:
                 logger.debug("knowledge_source_skipped_disabled", source_id=source.id)
                 continue
 
-            if source_ids and source.id not in source_ids:
+            if selected_ids is not None and source.id not in selected_ids:
                 continue
 
-            chunks_indexed = await self._index_single_source(source)
-            total_chunks += chunks_indexed
+            sources.append(source)
 
-        logger.info("knowledge_sources_indexed", total_chunks=total_chunks)
-        return total_chunks
+        return await self._sync(sources)
 
-    async def index_source(self, source_id: str) -> int:
-        """Index a single source by id."""
-        source = self.get_source(source_id)
-        if source is None:
-            raise ValueError(f"Knowledge source '{source_id}' not found")
+    async def _sync(self, sources: list[KnowledgeSource]) -> list[KnowledgeIndexReport]:
+        """Run the read → diff → embed → GC pipeline over ``sources``."""
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.config.indexing_concurrency)
 
-        if not source.enabled:
-            logger.warning("knowledge_source_disabled", source_id=source_id)
-            return 0
+        async def prepare(source: KnowledgeSource) -> _PreparedSource:
+            async with semaphore:
+                return await asyncio.to_thread(self._prepare_source, source)
 
-        return await self._index_single_source(source)
+        tasks = [asyncio.create_task(prepare(source)) for source in sources]
+        reports: dict[str, KnowledgeIndexReport] = {}
+        pending: list[_Chunk] = []
 
-    async def _index_single_source(self, source: KnowledgeSource) -> int:
-        """Index one source definition."""
+        try:
+            # Diff each source as soon as it is chunked, while the others are still read
+            for next_prepared in asyncio.as_completed(tasks):
+                prepared = await next_prepared
+                report, changed = await self._diff_source(prepared)
+                reports[prepared.source.id] = report
+                pending.extend(changed)
+
+                while len(pending) >= self.config.batch_size:
+                    batch = pending[: self.config.batch_size]
+                    del pending[: self.config.batch_size]
+                    await self._embed_chunks(batch, reports)
+
+            if pending:
+                await self._embed_chunks(pending, reports)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        ordered = [reports[source.id] for source in sources]
+        for report in ordered:
+            self._log_report(report)
+
+        logger.info(
+            "knowledge_sources_indexed",
+            sources=len(ordered),
+            total_chunks=sum(report.chunks_total for report in ordered),
+            chunks_embedded=sum(report.chunks_embedded for report in ordered),
+            chunks_skipped=sum(report.chunks_skipped for report in ordered),
+            chunks_deleted=sum(report.chunks_deleted for report in ordered),
+            duration_seconds=round(time.perf_counter() - started, 3),
+        )
+        return ordered
+
+    def _prepare_source(self, source: KnowledgeSource) -> _PreparedSource:
+        """Read and chunk one source (runs in a worker thread)."""
+        started = time.perf_counter()
         absolute_path = (
             source.path if source.path.is_absolute() else (self.base_path / source.path).resolve()
         )
@@ -139,66 +261,153 @@ class KnowledgeIndexer:
                 source_id=source.id,
                 path=str(absolute_path),
             )
-            return 0
+            return _PreparedSource(source=source, chunks=None, started_at=started)
 
-        raw_text = absolute_path.read_text(encoding="utf-8")
+        chunks: list[_Chunk] = []
+        bytes_read = 0
 
-        if source.type.lower() == "markdown":
-            sections = self._parse_markdown(raw_text)
-        else:
-            sections = [{"title": source.id, "content": raw_text}]
+        with absolute_path.open(encoding="utf-8") as handle:
+            lines = (line.rstrip("\n") for line in handle)
+            if source.type.lower() == "markdown":
+                sections = self._iter_markdown_sections(lines)
+            else:
+                sections = iter([{"title": source.id, "content": "\n".join(lines)}])
+
+            for section in sections:
+                bytes_read += len(section["content"].encode("utf-8"))
+                chunks.extend(self._build_chunks(source, section["title"], section["content"]))
+
+        return _PreparedSource(
+            source=source,
+            chunks=chunks,
+            started_at=started,
+            bytes_read=bytes_read,
+            read_seconds=time.perf_counter() - started,
+        )
 
-        documents: list[str] = []
-        metadatas: list[dict[str, Any]] = []
-        ids: list[str] = []
+    def _build_chunks(
+        self, source: KnowledgeSource, section_title: str, content: str
+    ) -> list[_Chunk]:
+        """Chunk one section and attach metadata, content hash and stable id."""
+        section_chunks = self._chunk_text(
+            content,
+            max_chars=source.chunk_max_chars,
+            overlap=source.chunk_overlap,
+        )
 
-        chunk_counter = 0
+        chunks: list[_Chunk] = []
+        for index, text in enumerate(section_chunks):
+            metadata: dict[str, Any] = {
+                "type": "knowledge",
+                "knowledge_source": source.id,
+                "section_title": section_title,
+                "chunk_index": index,
+                "total_chunks": len(section_chunks),
+                "tags": source.tags or [],
+                "source_path": str(source.path),
+            }
+
+            if source.metadata:
+                metadata.update(source.metadata)
 
-        for section in sections:
-            section_title = section["title"]
-            section_chunks = self._chunk_text(
-                section["content"],
-                max_chars=source.chunk_max_chars,
-                overlap=source.chunk_overlap,
+            metadata["chunk_hash"] = self._hash_chunk(text, metadata)
+            chunks.append(
+                _Chunk(
+                    id=self._build_document_id(source.id, section_title, index, text),
+                    text=text,
+                    metadata=metadata,
+                )
             )
 
-            for index, chunk in enumerate(section_chunks):
-                chunk_counter += 1
-                documents.append(chunk)
-                metadata = {
-                    "type": "knowledge",
-                    "knowledge_source": source.id,
-                    "section_title": section_title,
-                    "chunk_index": index,
-                    "total_chunks": len(section_chunks),
-                    "tags": source.tags or [],
-                    "source_path": str(source.path),
-                }
-
-                if source.metadata:
-                    metadata.update(source.metadata)
-
-                metadatas.append(metadata)
-                ids.append(self._build_document_id(source.id, section_title, index, chunk))
-
-        if not documents:
-            logger.info("knowledge_source_empty", source_id=source.id)
-            return 0
+        return chunks
 
-        await self.vector_store.add_documents(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids,
-        )
+    async def _diff_source(
+        self, prepared: _PreparedSource
+    ) -> tuple[KnowledgeIndexReport, list[_Chunk]]:
+        """Compare a prepared source with the stored chunks and drop stale ones.
 
-        logger.info(
-            "knowledge_source_indexed",
+        Returns:
+            The source report and the chunks that need (re-)embedding.
+        """
+        source = prepared.source
+        report = KnowledgeIndexReport(
             source_id=source.id,
             path=str(source.path),
-            chunks=len(documents),
+            bytes_read=prepared.bytes_read,
+            read_seconds=prepared.read_seconds,
+            started_at=prepared.started_at,
         )
+        if prepared.chunks is None:
+            report.missing = True
+            report.finish()
+            return report, []
+
+        # Duplicate ids inside a source (identical text under the same heading) collapse
+        chunks = list({chunk.id: chunk for chunk in prepared.chunks}.values())
+        stored = self.vector_store.find_metadata({"knowledge_source": source.id})
+        model_name = self.vector_store.embedding_strategy.model_name
+
+        changed = [
+            chunk
+            for chunk in chunks
+            if chunk.id not in stored
+            or stored[chunk.id].get("chunk_hash") != chunk.metadata["chunk_hash"]
+            or stored[chunk.id].get("embedding_model") != model_name
+        ]
+
+        current_ids = {chunk.id for chunk in chunks}
+        stale_ids = sorted(doc_id for doc_id in stored if doc_id not in current_ids)
+        if stale_ids:
+            await self.vector_store.delete_documents(stale_ids)
+
+        report.chunks_total = len(chunks)
+        report.chunks_skipped = len(chunks) - len(changed)
+        report.chunks_deleted = len(stale_ids)
+        report.chunks_pending = len(changed)
+        if not changed:
+            report.finish()
+
+        return report, changed
+
+    async def _embed_chunks(
+        self, chunks: list[_Chunk], reports: dict[str, KnowledgeIndexReport]
+    ) -> None:
+        """Embed and upsert one batch of chunks, possibly spanning several sources."""
+        await self.vector_store.upsert_documents(
+            documents=[chunk.text for chunk in chunks],
+            metadatas=[chunk.metadata for chunk in chunks],
+            ids=[chunk.id for chunk in chunks],
+        )
+
+        for chunk in chunks:
+            report = reports[chunk.metadata["knowledge_source"]]
+            report.chunks_embedded += 1
+            report.chunks_pending -= 1
+            if report.chunks_pending == 0:
+                report.finish()
+
+    @staticmethod
+    def _log_report(report: KnowledgeIndexReport) -> None:
+        """Emit the per-source progress/throughput event."""
+        if report.missing:
+            return
+
+        if report.chunks_total == 0:
+            logger.info("knowledge_source_empty", source_id=report.source_id)
 
-        return len(documents)
+        logger.info(
+            "knowledge_source_indexed",
+            source_id=report.source_id,
+            path=report.path,
+            chunks=report.chunks_total,
+            embedded=report.chunks_embedded,
+            skipped=report.chunks_skipped,
+            deleted=report.chunks_deleted,
+            bytes_read=report.bytes_read,
+            read_seconds=round(report.read_seconds, 3),
+            duration_seconds=round(report.duration_seconds, 3),
+            chunks_per_second=round(report.chunks_per_second, 1),
+        )
 
     def _load_manifest(self) -> list[KnowledgeSource]:
         """Load manifest JSON file and build KnowledgeSource objects."""
@@ -243,28 +452,36 @@ class KnowledgeIndexer:
         Returns:
             List of {"title": str, "content": str}
         """
-        sections: list[dict[str, str]] = []
+        return list(KnowledgeIndexer._iter_markdown_sections(text.splitlines()))
+
+    @staticmethod
+    def _iter_markdown_sections(lines: Iterable[str]) -> Iterator[dict[str, str]]:
+        """Yield markdown sections one at a time while ``lines`` is consumed.
+
+        Lets sources be streamed from disk: only the current section is held
+        in memory, not the whole file.
+
+        Args:
+            lines: markdown lines without trailing newlines
+
+        Yields:
+            {"title": str, "content": str}
+        """
         current_title = "Introduzione"
         current_lines: list[str] = []
 
-        heading_pattern = re.compile(r"^(#{1,6})\s+(.*)")
-
-        for line in text.splitlines():
-            match = heading_pattern.match(line)
+        for line in lines:
+            match = _HEADING_PATTERN.match(line)
             if match:
                 if current_lines:
-                    sections.append(
-                        {"title": current_title, "content": "\n".join(current_lines).strip()}
-                    )
+                    yield {"title": current_title, "content": "\n".join(current_lines).strip()}
                 current_title = match.group(2).strip()
                 current_lines = []
             else:
                 current_lines.append(line)
 
         if current_lines:
-            sections.append({"title": current_title, "content": "\n".join(current_lines).strip()})
-
-        return sections
+            yield {"title": current_title, "content": "\n".join(current_lines).strip()}
 
     @staticmethod
     def _chunk_text(text: str, max_chars: int = 1800, overlap: int = 200) -> list[str]:
@@ -302,8 +519,6 @@ class KnowledgeIndexer:
         Returns:
             Unique document ID
         """
-        import hashlib
-
         slug = KnowledgeIndexer._slugify(title) or "section"
 
         # Add short hash of content to ensure uniqueness
@@ -311,6 +526,12 @@ class KnowledgeIndexer:
 
         return f"kb-{source_id}-{slug}-{chunk_index}-{content_hash}"
 
+    @staticmethod
+    def _hash_chunk(text: str, metadata: dict[str, Any]) -> str:
+        """Hash chunk text and metadata so metadata-only edits are re-indexed too."""
+        payload = json.dumps(metadata, sort_keys=True, default=str)
+        return hashlib.sha256(f"{text}\x00{payload}".encode()).hexdigest()
+
     @staticmethod
     def _slugify(value: str) -> str:
         """Generate URL-safe slug from value."""
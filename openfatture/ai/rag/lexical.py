@@ -0,0 +1,266 @@
+"""BM25 lexical index and rank fusion for hybrid retrieval.
+
+Embeddings are good at "invoices for web development" and bad at exact
+identifiers: an invoice number like ``12/2025`` or a P.IVA embeds to roughly the
+same vector as any other number. The lexical index scores documents with Okapi
+BM25 over normalised tokens and keeps each document's metadata in memory, so a
+structured filter (client, date range, amount) can be resolved to candidate ids
+before anything is scored.
+
+Lexical and vector rankings are combined with reciprocal rank fusion, which only
+needs the rank of each document in each list and therefore does not care that
+BM25 scores and cosine similarities live on different scales.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+from openfatture.ai.rag.backends.base import matches_where
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+_PREFIXED_NUMBER_PATTERN = re.compile(r"^([^\W\d_]+)(\d+)$", re.UNICODE)
+
+# Words that commonly surround an identifier in a query ("fattura n. 12/2025",
+# "P.IVA IT01234567890") without carrying meaning of their own.
+IDENTIFIER_PREFIXES = frozenset(
+    {
+        "fattura",
+        "fatture",
+        "invoice",
+        "n",
+        "nr",
+        "num",
+        "numero",
+        "p",
+        "iva",
+        "piva",
+        "partita",
+        "vat",
+        "cf",
+        "codice",
+        "fiscale",
+    }
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower-case word tokens for BM25.
+
+    Purely numeric tokens lose leading zeros (``"001"`` and ``"1"`` match), and a
+    letter prefix glued to a number also yields the bare number, so
+    ``IT01234567890`` matches a query for ``01234567890``.
+
+    Args:
+        text: Document or query text
+
+    Returns:
+        List of tokens (duplicates preserved)
+    """
+    tokens: list[str] = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if token.isdigit():
+            tokens.append(token.lstrip("0") or "0")
+            continue
+
+        tokens.append(token)
+        prefixed = _PREFIXED_NUMBER_PATTERN.match(token)
+        if prefixed:
+            tokens.append(prefixed.group(2).lstrip("0") or "0")
+    return tokens
+
+
+def is_identifier_query(query: str) -> bool:
+    """Return True if the query is an exact lookup (invoice number, VAT, ...).
+
+    A query qualifies when it contains at least one number and every other token
+    is an identifier prefix such as "fattura", "n." or "P.IVA".
+    """
+    words = _TOKEN_PATTERN.findall(query.lower())
+    has_number = any(any(char.isdigit() for char in word) for word in words)
+    return has_number and all(
+        any(char.isdigit() for char in word) or word in IDENTIFIER_PREFIXES for word in words
+    )
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    k: int = 60,
+) -> list[tuple[str, float]]:
+    """Fuse several rankings of document ids with reciprocal rank fusion.
+
+    Each document scores ``sum(1 / (k + rank))`` over the lists it appears in
+    (ranks start at 1).
+
+    Args:
+        rankings: Ranked id lists, best first
+        k: Smoothing constant (60 is the value from the original RRF paper)
+
+    Returns:
+        ``(doc_id, score)`` pairs sorted by descending fused score
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """In-memory Okapi BM25 index with per-document metadata.
+
+    Example:
+        >>> index = BM25Index()
+        >>> index.add("invoice-1", "Fattura 12/2025 Cliente: Rossi", {"client_id": 3})
+        >>> candidates = index.filter_ids({"client_id": 3})
+        >>> hits = index.search("fattura 12/2025", top_k=5, candidates=candidates)
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        """Initialize an empty index.
+
+        Args:
+            k1: Term-frequency saturation
+            b: Document-length normalisation strength
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[str, int]] = {}
+        self._doc_terms: dict[str, Counter[str]] = {}
+        self._lengths: dict[str, int] = {}
+        self._metadata: dict[str, dict[str, Any]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._lengths
+
+    def add(self, doc_id: str, text: str, metadata: Mapping[str, Any] | None = None) -> None:
+        """Index a document, replacing any previous version with the same id."""
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+
+        terms = Counter(tokenize(text))
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+
+        length = sum(terms.values())
+        self._doc_terms[doc_id] = terms
+        self._lengths[doc_id] = length
+        self._metadata[doc_id] = dict(metadata or {})
+        self._total_length += length
+
+    def add_many(
+        self,
+        ids: Iterable[str],
+        texts: Iterable[str],
+        metadatas: Iterable[Mapping[str, Any] | None],
+    ) -> None:
+        """Index several documents."""
+        for doc_id, text, metadata in zip(ids, texts, metadatas, strict=True):
+            self.add(doc_id, text, metadata)
+
+    def update_metadata(self, doc_id: str, metadata: Mapping[str, Any]) -> None:
+        """Replace the metadata of an indexed document (text unchanged)."""
+        if doc_id in self._lengths:
+            self._metadata[doc_id] = dict(metadata)
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document (unknown ids are ignored)."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+        self._total_length -= self._lengths.pop(doc_id)
+        self._metadata.pop(doc_id, None)
+
+    def clear(self) -> None:
+        """Remove every document."""
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._lengths.clear()
+        self._metadata.clear()
+        self._total_length = 0
+
+    def metadata(self, doc_id: str) -> dict[str, Any]:
+        """Return the metadata stored for a document (empty if unknown)."""
+        return self._metadata.get(doc_id, {})
+
+    def filter_ids(self, where: Mapping[str, Any] | None) -> set[str] | None:
+        """Resolve a metadata filter to matching document ids.
+
+        Uses the same ``where`` dialect as the vector backends, including range
+        operators on ISO date strings.
+
+        Args:
+            where: Metadata filter
+
+        Returns:
+            Matching ids, or None when there is no filter (every document matches)
+        """
+        if not where:
+            return None
+        return {
+            doc_id for doc_id, metadata in self._metadata.items() if matches_where(metadata, where)
+        }
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        candidates: set[str] | None = None,
+    ) -> list[tuple[str, float]]:
+        """Score documents containing at least one query term.
+
+        Args:
+            query: Query text
+            top_k: Maximum number of results
+            candidates: Restrict scoring to these ids (None for all documents)
+
+        Returns:
+            ``(doc_id, bm25_score)`` pairs sorted by descending score
+        """
+        document_count = len(self._lengths)
+        if top_k <= 0 or document_count == 0 or candidates is not None and not candidates:
+            return []
+
+        average_length = self._total_length / document_count or 1.0
+        scores: dict[str, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+
+            frequency = len(postings)
+            idf = math.log(1.0 + (document_count - frequency + 0.5) / (frequency + 0.5))
+
+            if candidates is not None and len(candidates) < len(postings):
+                matches: Iterable[tuple[str, int]] = (
+                    (doc_id, postings[doc_id]) for doc_id in candidates if doc_id in postings
+                )
+            else:
+                matches = postings.items()
+
+            for doc_id, term_frequency in matches:
+                if candidates is not None and doc_id not in candidates:
+                    continue
+                norm = self.k1 * (1.0 - self.b + self.b * self._lengths[doc_id] / average_length)
+                score = idf * term_frequency * (self.k1 + 1.0) / (term_frequency + norm)
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
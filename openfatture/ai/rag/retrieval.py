@@ -4,7 +4,7 @@ This module provides semantic search and retrieval functionality.
 """
 
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Literal
 
 from openfatture.ai.rag.vector_store import VectorStore
 from openfatture.platform.logging import get_logger
@@ -42,6 +42,7 @@ class SemanticRetriever:
 
     Features:
     - Query-based retrieval with filters
+    - Hybrid BM25 + vector retrieval with metadata pre-filtering
     - Client-specific search
     - Date range filtering
     - Relevance reranking
@@ -56,15 +57,21 @@ class SemanticRetriever:
         ... )
     """
 
-    def __init__(self, vector_store: VectorStore) -> None:
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        mode: Literal["vector", "hybrid"] | None = None,
+    ) -> None:
         """Initialize semantic retriever.
 
         Args:
             vector_store: Vector store instance
+            mode: Retrieval mode (default: ``vector_store.config.retrieval_mode``)
         """
         self.vector_store = vector_store
+        self.mode = mode or vector_store.config.retrieval_mode
 
-        logger.info("semantic_retriever_initialized")
+        logger.info("semantic_retriever_initialized", mode=self.mode)
 
     async def retrieve(
         self,
@@ -87,14 +94,14 @@ class SemanticRetriever:
             List of RetrievalResult objects
         """
         # Build filters using ChromaDB $and operator for multiple conditions
-        filter_conditions = []
+        filter_conditions: list[dict[str, Any]] = []
 
         # Always filter for invoices
         filter_conditions.append({"type": "invoice"})
 
-        # Add client filter if provided
+        # Add client filter if provided (indexed as an integer by InvoiceIndexer)
         if client_id:
-            filter_conditions.append({"client_id": str(client_id)})
+            filter_conditions.append({"client_id": client_id})
 
         # Add custom filters
         if filters:
@@ -109,7 +116,10 @@ class SemanticRetriever:
             search_filters = filter_conditions[0]
 
         # Search vector store
-        raw_results = await self.vector_store.search(
+        search = (
+            self.vector_store.hybrid_search if self.mode == "hybrid" else self.vector_store.search
+        )
+        raw_results = await search(
             query=query,
             top_k=top_k,
             filters=search_filters,
@@ -131,6 +141,7 @@ class SemanticRetriever:
             query_length=len(query),
             results_count=len(results),
             top_k=top_k,
+            mode=self.mode,
         )
 
         return results
@@ -190,6 +201,16 @@ class SemanticRetriever:
                 top_k=top_k,
                 client_id=client_id,
             )
+        elif self.mode == "hybrid":
+            # Pure metadata lookup: most recent client invoices, no embedding call
+            documents = self.vector_store.find_documents(
+                {"$and": [{"type": "invoice"}, {"client_id": client_id}]}
+            )
+            documents.sort(key=lambda doc: str(doc["metadata"].get("date", "")), reverse=True)
+            results = [
+                RetrievalResult(document=doc["document"], metadata=doc["metadata"], similarity=1.0)
+                for doc in documents[:top_k]
+            ]
         else:
             # Get all client invoices (sorted by relevance to generic query)
             results = await self.retrieve(
@@ -224,20 +245,27 @@ class SemanticRetriever:
         Returns:
             List of invoices in date range
         """
-        # Note: ChromaDB doesn't support range queries directly
-        # We retrieve more results and filter manually
-
-        results = await self.retrieve(
-            query=query,
-            top_k=top_k * 3,  # Get more to filter
-        )
+        if self.mode == "hybrid":
+            # The lexical index evaluates the range before scoring, on any backend
+            filtered_results = await self.retrieve(
+                query=query,
+                top_k=top_k,
+                filters={"date": {"$gte": start_date, "$lte": end_date}},
+            )
+        else:
+            # Note: ChromaDB doesn't support range queries on strings
+            # We retrieve more results and filter manually
+            results = await self.retrieve(
+                query=query,
+                top_k=top_k * 3,  # Get more to filter
+            )
 
-        # Filter by date range
-        filtered_results = [
-            r
-            for r in results
-            if r.metadata.get("date") and start_date <= r.metadata["date"] <= end_date
-        ]
+            # Filter by date range
+            filtered_results = [
+                r
+                for r in results
+                if r.metadata.get("date") and start_date <= r.metadata["date"] <= end_date
+            ]
 
         logger.info(
             "date_range_retrieval",
@@ -264,14 +292,21 @@ class SemanticRetriever:
         Returns:
             List of high-value invoices
         """
-        # Retrieve more results to filter
-        results = await self.retrieve(
-            query=query,
-            top_k=top_k * 3,
-        )
+        if self.mode == "hybrid":
+            filtered_results = await self.retrieve(
+                query=query,
+                top_k=top_k,
+                filters={"amount": {"$gte": min_amount}},
+            )
+        else:
+            # Retrieve more results to filter
+            results = await self.retrieve(
+                query=query,
+                top_k=top_k * 3,
+            )
 
-        # Filter by amount
-        filtered_results = [r for r in results if r.metadata.get("amount", 0) >= min_amount]
+            # Filter by amount
+            filtered_results = [r for r in results if r.metadata.get("amount", 0) >= min_amount]
 
         # Sort by amount (descending)
         filtered_results.sort(
@@ -1,17 +1,18 @@
-"""Vector store implementation using ChromaDB.
+"""Vector store for persistent vector storage and semantic search.
 
-This module provides a wrapper around ChromaDB for persistent vector storage
-and semantic search.
+This module wraps a pluggable vector backend (ChromaDB by default, or the
+embedded NumPy backend) and owns embedding generation for documents and queries.
 """
 
 import uuid
-from collections.abc import Mapping, Sequence
+from collections.abc import Mapping
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any
 
+from openfatture.ai.rag.backends import VectorBackend, create_vector_backend
 from openfatture.ai.rag.config import RAGConfig
 from openfatture.ai.rag.embeddings import EmbeddingStrategy
-from openfatture.platform.extras import require_extra
+from openfatture.ai.rag.lexical import BM25Index, is_identifier_query, reciprocal_rank_fusion
 from openfatture.platform.logging import get_logger
 
 if TYPE_CHECKING:
@@ -21,11 +22,12 @@ logger = get_logger(__name__)
 
 
 class VectorStore:
-    """Vector store using ChromaDB for persistent storage.
+    """Vector store with persistent storage and semantic search.
 
     Features:
-    - Persistent storage with automatic checkpointing
+    - Persistent storage through a pluggable backend (``config.vector_backend``)
     - Metadata filtering for advanced search
+    - Hybrid BM25 + vector search with reciprocal rank fusion
     - Batch operations for efficiency
     - Automatic embedding generation
     - Incremental indexing support
@@ -54,44 +56,70 @@ class VectorStore:
         self,
         config: RAGConfig,
         embedding_strategy: EmbeddingStrategy,
+        backend: VectorBackend | None = None,
     ) -> None:
         """Initialize vector store.
 
         Args:
             config: RAG configuration
             embedding_strategy: Embedding strategy for vectorization
+            backend: Optional pre-built backend (default: from ``config.vector_backend``)
         """
         self.config = config
         self.embedding_strategy = embedding_strategy
-
-        require_extra("rag", feature="RAG vector store (ChromaDB)")
-        import chromadb
-        from chromadb.config import Settings
-
-        # Keep RAG local-only: the application never starts or connects to a
-        # ChromaDB server and does not enable remote model-code execution.
-        self.client = chromadb.PersistentClient(
-            path=str(config.persist_directory),
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True,
-            ),
-        )
-
-        # Get or create collection
-        self.collection: Collection = self.client.get_or_create_collection(
-            name=config.collection_name,
-            metadata={"dimension": embedding_strategy.dimension},
-        )
+        self.backend = backend or create_vector_backend(config, embedding_strategy.dimension)
+        self._lexical: BM25Index | None = None
+        self._lexical_version: str | None = None
 
         logger.info(
             "vector_store_initialized",
             collection=config.collection_name,
+            backend=self.backend.name,
             dimension=embedding_strategy.dimension,
             persist_directory=str(config.persist_directory),
-            document_count=self.collection.count(),
+            document_count=self.backend.count(),
         )
 
+    @property
+    def collection(self) -> "Collection | None":
+        """Underlying ChromaDB collection (None for non-Chroma backends)."""
+        return getattr(self.backend, "collection", None)
+
+    @property
+    def lexical_index(self) -> BM25Index:
+        """BM25 index over the stored documents.
+
+        Built from the backend on first use and kept in sync by this store's
+        write methods. It is rebuilt when the backend's version token changes
+        behind its back (another process wrote to the persistent collection),
+        including updates and deletes that leave the document count unchanged.
+        """
+        version = self.backend.version()
+        if self._lexical is None or version != self._lexical_version:
+            index = BM25Index()
+            # Page through the backend: only the term statistics are kept
+            for records in self.backend.iter_records():
+                index.add_many(
+                    (record.id for record in records),
+                    (record.document for record in records),
+                    (record.metadata for record in records),
+                )
+            self._lexical = index
+            self._lexical_version = version
+
+            logger.info(
+                "lexical_index_built",
+                collection=self.config.collection_name,
+                document_count=len(index),
+            )
+
+        return self._lexical
+
+    def _lexical_synced(self) -> None:
+        """Record that the lexical index includes this store's latest write."""
+        if self._lexical is not None:
+            self._lexical_version = self.backend.version()
+
     async def add_documents(
         self,
         documents: list[str],
@@ -136,22 +164,83 @@ class VectorStore:
             metadata["indexed_at"] = timestamp
             metadata["embedding_model"] = self.embedding_strategy.model_name
 
-        embedding_matrix: list[Sequence[float]] = [list(vector) for vector in embeddings]
-        metadata_payload = cast(list[Mapping[str, Any]], metadata_dicts)
-
         # Add to collection
-        self.collection.add(
-            documents=list(documents),
-            embeddings=embedding_matrix,
-            metadatas=metadata_payload,
+        self.backend.add(
             ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadata_dicts,
         )
 
+        if self._lexical is not None:
+            for doc_id, document, metadata in zip(ids, documents, metadata_dicts, strict=True):
+                # The backend keeps the first version of a duplicate id; so does the index.
+                if doc_id not in self._lexical:
+                    self._lexical.add(doc_id, document, metadata)
+            self._lexical_synced()
+
         logger.info(
             "documents_added",
             count=len(documents),
             collection=self.config.collection_name,
-            total_count=self.collection.count(),
+            total_count=self.backend.count(),
+        )
+
+        return ids
+
+    async def upsert_documents(
+        self,
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+        ids: list[str],
+    ) -> list[str]:
+        """Add new documents and replace existing ones with a single embedding batch.
+
+        Args:
+            documents: List of document texts
+            metadatas: List of metadata dicts (merged with the stored metadata on update)
+            ids: List of document IDs
+
+        Returns:
+            List of document IDs
+        """
+        if not documents:
+            return []
+
+        existing = {record.id: record.metadata for record in self.backend.get(ids=ids)}
+        embeddings = await self.embedding_strategy.embed_batch(documents)
+
+        timestamp = datetime.now().isoformat()
+        metadata_dicts: list[dict[str, MetadataValue]] = []
+        for doc_id, metadata in zip(ids, metadatas, strict=True):
+            merged = _coerce_metadata_dict(existing.get(doc_id, {}))
+            merged.update(_coerce_metadata_dict(metadata))
+            merged["embedding_model"] = self.embedding_strategy.model_name
+            merged["updated_at" if doc_id in existing else "indexed_at"] = timestamp
+            metadata_dicts.append(merged)
+
+        new_rows = [index for index, doc_id in enumerate(ids) if doc_id not in existing]
+        updated_rows = [index for index, doc_id in enumerate(ids) if doc_id in existing]
+
+        for rows, write in ((new_rows, self.backend.add), (updated_rows, self.backend.update)):
+            if rows:
+                write(
+                    [ids[index] for index in rows],
+                    [embeddings[index] for index in rows],
+                    [documents[index] for index in rows],
+                    [metadata_dicts[index] for index in rows],
+                )
+
+        if self._lexical is not None:
+            for doc_id, document, metadata in zip(ids, documents, metadata_dicts, strict=True):
+                self._lexical.add(doc_id, document, metadata)
+            self._lexical_synced()
+
+        logger.info(
+            "documents_upserted",
+            added=len(new_rows),
+            updated=len(updated_rows),
+            collection=self.config.collection_name,
         )
 
         return ids
@@ -186,65 +275,172 @@ class VectorStore:
 
         # Generate query embedding
         query_embedding = await self.embedding_strategy.embed_text(query)
-        query_embeddings_payload: list[Sequence[float]] = [list(query_embedding)]
 
-        # Build ChromaDB where clause for filters
-        where = filters if filters else None
+        hits = self.backend.query(query_embedding, top_k=top_k, where=filters or None)
+
+        # Filter by similarity threshold
+        processed_results = [
+            {
+                "id": hit.id,
+                "document": hit.document,
+                "metadata": _coerce_metadata_dict(hit.metadata),
+                "similarity": hit.similarity,
+            }
+            for hit in hits
+            if hit.similarity >= min_similarity
+        ]
 
-        # Search collection
-        results = self.collection.query(
-            query_embeddings=query_embeddings_payload,
-            n_results=top_k,
-            where=where,
+        logger.info(
+            "search_completed",
+            query_length=len(query),
+            results_count=len(processed_results),
+            top_k=top_k,
+            min_similarity=min_similarity,
         )
 
-        # Process results
-        processed_results = []
+        return processed_results
 
-        ids_result = cast(Sequence[Sequence[str]] | None, results.get("ids"))
-        documents_result = cast(Sequence[Sequence[str]] | None, results.get("documents"))
-        metadatas_result = cast(
-            Sequence[Sequence[Mapping[str, Any]]] | None, results.get("metadatas")
-        )
-        distances_result = cast(Sequence[Sequence[float]] | None, results.get("distances"))
-
-        if ids_result and len(ids_result) > 0:
-            doc_ids = ids_result[0]
-            documents_list = documents_result[0] if documents_result else []
-            metadatas_list = metadatas_result[0] if metadatas_result else []
-            distances_list = distances_result[0] if distances_result else []
-
-            for index, doc_id in enumerate(doc_ids):
-                document_text = documents_list[index] if index < len(documents_list) else ""
-                metadata_raw = metadatas_list[index] if index < len(metadatas_list) else {}
-                distance = distances_list[index] if index < len(distances_list) else 1.0
-
-                # ChromaDB returns distance, convert to similarity (1 - distance)
-                similarity = 1.0 - distance
-
-                # Filter by similarity threshold
-                if similarity < min_similarity:
-                    continue
-
-                processed_results.append(
-                    {
-                        "id": doc_id,
-                        "document": document_text,
-                        "metadata": _coerce_metadata_dict(dict(metadata_raw)),
-                        "similarity": similarity,
-                    }
-                )
+    async def hybrid_search(
+        self,
+        query: str,
+        top_k: int | None = None,
+        filters: dict[str, Any] | None = None,
+        min_similarity: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """Search with BM25 and vector similarity fused by reciprocal rank.
+
+        Metadata filters are resolved to candidate ids first (range operators on
+        ISO dates included, on every backend), then both rankings are computed
+        over the candidates only. Identifier lookups such as an invoice number or
+        a P.IVA are answered lexically, without an embedding call, whenever BM25
+        finds a match.
+
+        Args:
+            query: Search query text
+            top_k: Number of results to return (default: config.top_k)
+            filters: Optional metadata filters
+            min_similarity: Minimum similarity for vector hits (lexical hits always count)
+
+        Returns:
+            List of result dictionaries like :meth:`search`, plus ``score``
+            (fused RRF score). ``similarity`` is the cosine similarity for vector
+            hits and the BM25 score relative to the best lexical hit otherwise.
+        """
+        if top_k is None:
+            top_k = self.config.top_k
+
+        if min_similarity is None:
+            min_similarity = self.config.similarity_threshold
+
+        index = self.lexical_index
+        candidates = index.filter_ids(filters)
+        if candidates is not None and not candidates:
+            return []
+
+        depth = max(top_k, self.config.hybrid_fusion_depth)
+        lexical_hits = index.search(query, top_k=depth, candidates=candidates)
+
+        vector_hits = []
+        used_embedding = not (lexical_hits and is_identifier_query(query))
+        if used_embedding:
+            query_embedding = await self.embedding_strategy.embed_text(query)
+            if candidates is None:
+                vector_hits = self.backend.query(query_embedding, top_k=depth)
+            else:
+                vector_hits = self.backend.query_ids(query_embedding, list(candidates), depth)
+            vector_hits = [hit for hit in vector_hits if hit.similarity >= min_similarity]
+
+        fused = reciprocal_rank_fusion(
+            [[doc_id for doc_id, _ in lexical_hits], [hit.id for hit in vector_hits]],
+            k=self.config.hybrid_rrf_k,
+        )[:top_k]
+
+        vector_by_id = {hit.id: hit for hit in vector_hits}
+        lexical_by_id = dict(lexical_hits)
+        best_lexical = lexical_hits[0][1] if lexical_hits else 1.0
+
+        missing = [doc_id for doc_id, _ in fused if doc_id not in vector_by_id]
+        records = {record.id: record for record in self.backend.get(ids=missing)} if missing else {}
+
+        processed_results: list[dict[str, Any]] = []
+        for doc_id, score in fused:
+            hit = vector_by_id.get(doc_id)
+            if hit is not None:
+                document, metadata, similarity = hit.document, hit.metadata, hit.similarity
+            elif doc_id in records:
+                record = records[doc_id]
+                document, metadata = record.document, record.metadata
+                similarity = lexical_by_id[doc_id] / best_lexical
+            else:
+                continue
+
+            processed_results.append(
+                {
+                    "id": doc_id,
+                    "document": document,
+                    "metadata": _coerce_metadata_dict(metadata),
+                    "similarity": similarity,
+                    "score": score,
+                }
+            )
 
         logger.info(
-            "search_completed",
+            "hybrid_search_completed",
             query_length=len(query),
+            candidates=len(candidates) if candidates is not None else None,
+            lexical_hits=len(lexical_hits),
+            vector_hits=len(vector_hits),
+            used_embedding=used_embedding,
             results_count=len(processed_results),
             top_k=top_k,
-            min_similarity=min_similarity,
         )
 
         return processed_results
 
+    def find_documents(self, filters: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        """Return every document matching a metadata filter, without ranking.
+
+        Filters are evaluated on the lexical index, so range operators on ISO
+        date strings work on every backend.
+
+        Args:
+            filters: Metadata filters (None returns all documents)
+
+        Returns:
+            List of document dicts (id, document, metadata)
+        """
+        candidates = self.lexical_index.filter_ids(filters)
+        if candidates is not None and not candidates:
+            return []
+
+        records = self.backend.get(ids=sorted(candidates) if candidates is not None else None)
+        return [
+            {
+                "id": record.id,
+                "document": record.document,
+                "metadata": _coerce_metadata_dict(record.metadata),
+            }
+            for record in records
+        ]
+
+    def find_metadata(self, filters: dict[str, Any]) -> dict[str, dict[str, Any]]:
+        """Return the metadata of documents matching a filter, keyed by id.
+
+        Unlike :meth:`find_documents` this goes straight to the backend and
+        does not build the lexical index, so incremental indexers can diff
+        against stored content hashes cheaply.
+
+        Args:
+            filters: Metadata filters
+
+        Returns:
+            Mapping of document ID to metadata
+        """
+        return {
+            record.id: _coerce_metadata_dict(record.metadata)
+            for record in self.backend.get(where=filters)
+        }
+
     async def update_document(
         self,
         doc_id: str,
@@ -259,20 +455,14 @@ class VectorStore:
             metadata: New metadata (merged with existing)
         """
         # Get existing document
-        existing = self.collection.get(ids=[doc_id])
-
-        ids_result = cast(list[str] | None, existing.get("ids"))
-        if not ids_result:
+        existing = self.backend.get(ids=[doc_id], include_embeddings=document is None)
+        if not existing:
             raise ValueError(f"Document {doc_id} not found")
 
         # Prepare update
-        documents_result = cast(list[str] | None, existing.get("documents"))
-        update_doc = document if document is not None else (documents_result or [""])[0]
-
-        metadatas_result = cast(list[Mapping[str, Any]] | None, existing.get("metadatas"))
-        update_metadata = _coerce_metadata_dict(
-            dict(metadatas_result[0]) if metadatas_result else {}
-        )
+        record = existing[0]
+        update_doc = document if document is not None else record.document
+        update_metadata = _coerce_metadata_dict(record.metadata)
 
         if metadata:
             update_metadata.update(_coerce_metadata_dict(metadata))
@@ -280,25 +470,22 @@ class VectorStore:
         update_metadata["updated_at"] = datetime.now().isoformat()
 
         # Generate new embedding if document changed
-        if document is not None:
-            embedding_vector = await self.embedding_strategy.embed_text(document)
+        if document is None and record.embedding:
+            embedding_vector = record.embedding
         else:
-            embeddings_result = cast(list[list[float]] | None, existing.get("embeddings"))
-            if embeddings_result and embeddings_result[0]:
-                embedding_vector = list(embeddings_result[0])
-            else:
-                embedding_vector = await self.embedding_strategy.embed_text(update_doc)
-
-        # Update collection
-        embedding_payload: list[Sequence[float]] = [list(embedding_vector)]
+            embedding_vector = await self.embedding_strategy.embed_text(update_doc)
 
-        self.collection.update(
+        self.backend.update(
             ids=[doc_id],
+            embeddings=[embedding_vector],
             documents=[update_doc],
-            embeddings=embedding_payload,
             metadatas=[update_metadata],
         )
 
+        if self._lexical is not None:
+            self._lexical.add(doc_id, update_doc, update_metadata)
+            self._lexical_synced()
+
         logger.info("document_updated", doc_id=doc_id)
 
     async def delete_documents(self, ids: list[str]) -> None:
@@ -307,12 +494,17 @@ class VectorStore:
         Args:
             ids: List of document IDs to delete
         """
-        self.collection.delete(ids=ids)
+        self.backend.delete(ids)
+
+        if self._lexical is not None:
+            for doc_id in ids:
+                self._lexical.remove(doc_id)
+            self._lexical_synced()
 
         logger.info(
             "documents_deleted",
             count=len(ids),
-            total_count=self.collection.count(),
+            total_count=self.backend.count(),
         )
 
     async def delete_by_filter(self, filters: dict[str, Any]) -> int:
@@ -325,14 +517,16 @@ class VectorStore:
             Number of documents deleted
         """
         # Get matching documents
-        results = self.collection.get(where=filters)
-
-        ids_value = results.get("ids")
-        ids_list = list(ids_value) if isinstance(ids_value, list) else None
+        ids_list = [record.id for record in self.backend.get(where=filters)]
 
         if ids_list:
             count = len(ids_list)
-            self.collection.delete(ids=ids_list)
+            self.backend.delete(ids_list)
+
+            if self._lexical is not None:
+                for doc_id in ids_list:
+                    self._lexical.remove(doc_id)
+                self._lexical_synced()
 
             logger.info(
                 "documents_deleted_by_filter",
@@ -353,21 +547,13 @@ class VectorStore:
         Returns:
             Document dict or None if not found
         """
-        results = self.collection.get(ids=[doc_id])
-
-        ids_value = results.get("ids")
-        documents_value = results.get("documents")
-        metadatas_value = results.get("metadatas")
+        records = self.backend.get(ids=[doc_id])
 
-        if isinstance(ids_value, list) and ids_value:
-            document_text = documents_value[0] if isinstance(documents_value, list) else ""
-            metadata_raw = (
-                metadatas_value[0] if isinstance(metadatas_value, list) and metadatas_value else {}
-            )
+        if records:
             return {
-                "id": ids_value[0],
-                "document": document_text,
-                "metadata": _coerce_metadata_dict(dict(metadata_raw)),
+                "id": records[0].id,
+                "document": records[0].document,
+                "metadata": _coerce_metadata_dict(records[0].metadata),
             }
 
         return None
@@ -378,7 +564,7 @@ class VectorStore:
         Returns:
             Number of documents in collection
         """
-        return self.collection.count()
+        return self.backend.count()
 
     def reset(self) -> None:
         """Delete all documents from collection.
@@ -388,12 +574,8 @@ class VectorStore:
         logger.warning("resetting_collection", collection=self.config.collection_name)
 
         # Delete collection and recreate
-        self.client.delete_collection(name=self.config.collection_name)
-
-        self.collection = self.client.get_or_create_collection(
-            name=self.config.collection_name,
-            metadata={"dimension": self.embedding_strategy.dimension},
-        )
+        self.backend.reset()
+        self._lexical = None
 
         logger.info("collection_reset", collection=self.config.collection_name)
 
@@ -405,10 +587,11 @@ class VectorStore:
         """
         return {
             "collection_name": self.config.collection_name,
-            "document_count": self.collection.count(),
+            "document_count": self.backend.count(),
             "embedding_dimension": self.embedding_strategy.dimension,
             "embedding_model": self.embedding_strategy.model_name,
             "persist_directory": str(self.config.persist_directory),
+            **self.backend.describe(),
         }
 
 
@@ -4,7 +4,7 @@ Public CLI still uses :class:`~openfatture.ai.runtime.service.AssistantRuntime`.
 This module provides a first-class StateGraph with:
 
 - ``call_model`` — LLM generation with tool schemas
-- ``call_tools`` — ToolRegistry execution
+- ``call_tools`` — ToolRegistry execution (independent reads run concurrently)
 - conditional edges until a final answer or max iterations
 
 Experimental multi-agent workflows remain under ``ai.orchestration.workflows``.
@@ -17,7 +17,7 @@ from typing import Any, Literal, Protocol, TypedDict
 
 from openfatture.ai.domain.message import Message, Role
 from openfatture.ai.providers.base import BaseLLMProvider
-from openfatture.ai.tools.registry import ToolRegistry
+from openfatture.ai.tools.registry import ToolRegistry, execute_tool_calls
 from openfatture.platform.extras import require_extra
 from openfatture.platform.logging import get_logger
 
@@ -156,6 +156,7 @@ def build_tool_loop_graph(
         last = messages[-1]
         tool_calls = last.get("tool_calls") or []
         results = list(state.get("tool_results") or [])
+        calls: list[tuple[str, dict[str, Any]]] = []
         for tc in tool_calls:
             fn = tc.get("function") or {}
             name = fn.get("name") or tc.get("name") or ""
@@ -167,31 +168,36 @@ def build_tool_loop_graph(
                     arguments = {}
             else:
                 arguments = dict(raw_args)
+            calls.append((name, arguments))
+
+        # Independent read-only calls run concurrently; results keep call order
+        outcomes = await execute_tool_calls(tool_registry, calls, confirm=False)
+        for tc, (name, arguments), outcome in zip(tool_calls, calls, outcomes, strict=True):
             tool_call_id = tc.get("id") or name
-            try:
-                result = await tool_registry.execute_tool(
-                    tool_name=name,
-                    parameters=arguments,
-                    confirm=False,
+            if isinstance(outcome, Exception):
+                content = f"Error executing tool: {outcome}"
+                results.append(
+                    {
+                        "tool": name,
+                        "parameters": arguments,
+                        "success": False,
+                        "result": str(outcome),
+                    }
                 )
+            else:
                 content = (
-                    json.dumps(result.data, default=str, ensure_ascii=False)
-                    if result.success
-                    else f"Error: {result.error}"
+                    json.dumps(outcome.data, default=str, ensure_ascii=False)
+                    if outcome.success
+                    else f"Error: {outcome.error}"
                 )
                 results.append(
                     {
                         "tool": name,
                         "parameters": arguments,
-                        "success": result.success,
-                        "result": result.data if result.success else result.error,
+                        "success": outcome.success,
+                        "result": outcome.data if outcome.success else outcome.error,
                     }
                 )
-            except Exception as exc:
-                content = f"Error executing tool: {exc}"
-                results.append(
-                    {"tool": name, "parameters": arguments, "success": False, "result": str(exc)}
-                )
             messages.append(
                 {
                     "role": "tool",
@@ -9,8 +9,8 @@ from __future__ import annotations
 from collections.abc import AsyncIterator
 from typing import Any
 
+from openfatture.ai.context.packing import ContextPacker, create_context_packer
 from openfatture.ai.domain.context import ChatContext
-from openfatture.ai.domain.message import Role
 from openfatture.ai.domain.response import AgentResponse, ResponseStatus, UsageMetrics
 from openfatture.ai.providers.base import BaseLLMProvider
 from openfatture.ai.runtime.constants import DEFAULT_TOOL_MAX_ITERATIONS
@@ -37,6 +37,7 @@ class GraphAssistantBackend:
         debug_config: DebugConfig | None = None,
         temperature: float = 0.7,
         max_tokens: int = 1500,
+        context_packer: ContextPacker | None = None,
     ) -> None:
         require_extra("ai", feature="LangGraph assistant backend")
         self.provider = provider
@@ -46,6 +47,7 @@ class GraphAssistantBackend:
         self.debug_config = debug_config
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.context_packer = context_packer or create_context_packer(provider)
         self._compiled_tool_graph: Any | None = None
 
     def prepare_context(self, context: ChatContext) -> ChatContext:
@@ -132,12 +134,11 @@ class GraphAssistantBackend:
         )
 
     async def _run_plain(self, context: ChatContext) -> AgentResponse:
-        messages = build_chat_messages(context, enable_tools=self.enable_tools)
-        system: str | None = None
-        chat_messages = messages
-        if messages and messages[0].role == Role.SYSTEM:
-            system = messages[0].content
-            chat_messages = messages[1:]
+        # System prompt passed as built: SystemPrompt carries its cacheable prefix
+        system = build_chat_system_prompt(context, enable_tools=self.enable_tools)
+        chat_messages = build_chat_messages(
+            context, enable_tools=self.enable_tools, include_system=False
+        )
         response: AgentResponse = await self.provider.generate(
             messages=chat_messages,
             system_prompt=system,
@@ -184,6 +185,7 @@ class GraphAssistantBackend:
     async def run(self, context: ChatContext) -> AgentResponse:
         """Execute one assistant turn via the LangGraph product path."""
         context = self.prepare_context(context)
+        await self.context_packer.pack_context(context)
         if not context.user_input or not str(context.user_input).strip():
             return AgentResponse(
                 content="",
@@ -223,6 +225,7 @@ class GraphAssistantBackend:
         receives progressive tool lifecycle events and final content.
         """
         context = self.prepare_context(context)
+        await self.context_packer.pack_context(context)
 
         if self._use_react(context):
             from openfatture.ai.orchestration.react import ReActOrchestrator
@@ -6,15 +6,19 @@ compare orchestration, not copy-paste drift.
 
 from __future__ import annotations
 
+import functools
+
 from openfatture.ai.domain.context import ChatContext
 from openfatture.ai.domain.message import Message, Role
+from openfatture.ai.domain.prompt import SystemPrompt
 from openfatture.platform.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-def build_chat_system_prompt(context: ChatContext, *, enable_tools: bool = True) -> str:
-    """Build the product assistant system prompt with optional tool/context hints."""
+@functools.lru_cache(maxsize=32)
+def _chat_prompt_prefix(enable_tools: bool, tool_count: int) -> str:
+    """Turn-independent part of the system prompt (identical across turns)."""
     parts = [
         "Sei un assistente AI specializzato per OpenFatture, un sistema di "
         "fatturazione elettronica italiana.",
@@ -33,6 +37,30 @@ def build_chat_system_prompt(context: ChatContext, *, enable_tools: bool = True)
         "- Cita i dati specifici quando disponibili (numeri, date, importi)",
     ]
 
+    if enable_tools and tool_count:
+        parts.extend(
+            [
+                "",
+                "Strumenti disponibili:",
+                f"- Hai accesso a {tool_count} tools",
+                "- Usa i tools per recuperare dati o eseguire azioni",
+                "- I tools includono: ricerca fatture, statistiche, info clienti",
+            ]
+        )
+
+    return "\n".join(parts)
+
+
+def build_chat_system_prompt(context: ChatContext, *, enable_tools: bool = True) -> SystemPrompt:
+    """Build the product assistant system prompt with optional tool/context hints.
+
+    The static instructions come first and are memoized; per-turn context
+    (statistics, summary, documents) follows, so providers with prompt caching
+    can cache the prefix across turns.
+    """
+    prefix = _chat_prompt_prefix(enable_tools, len(context.available_tools))
+    parts: list[str] = []
+
     if context.current_year_stats:
         stats = context.current_year_stats
         parts.extend(
@@ -45,14 +73,12 @@ def build_chat_system_prompt(context: ChatContext, *, enable_tools: bool = True)
             ]
         )
 
-    if enable_tools and context.available_tools:
+    if context.conversation_summary:
         parts.extend(
             [
                 "",
-                "Strumenti disponibili:",
-                f"- Hai accesso a {len(context.available_tools)} tools",
-                "- Usa i tools per recuperare dati o eseguire azioni",
-                "- I tools includono: ricerca fatture, statistiche, info clienti",
+                "Riepilogo della conversazione precedente:",
+                context.conversation_summary,
             ]
         )
 
@@ -85,7 +111,8 @@ def build_chat_system_prompt(context: ChatContext, *, enable_tools: bool = True)
             ]
         )
 
-    return "\n".join(parts)
+    suffix = "\n" + "\n".join(parts) if parts else ""
+    return SystemPrompt(prefix, suffix)
 
 
 def build_chat_messages(
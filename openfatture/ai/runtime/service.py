@@ -165,7 +165,8 @@ class AssistantRuntime:
         elif self._session is not None:
             conv = ConversationHistory()
             for msg in self._session.messages:
-                conv.add_message(Message(role=msg.role, content=msg.content))
+                # Shared metadata keeps cached token counts on the session messages
+                conv.add_message(Message(role=msg.role, content=msg.content, metadata=msg.metadata))
         else:
             conv = ConversationHistory()
         context = ChatContext(user_input=user_input, conversation_history=conv)
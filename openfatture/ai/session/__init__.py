@@ -6,6 +6,7 @@ Key Components:
 - ChatSession, ChatMessage: Core session models
 - SessionStore: Abstract storage interface
 - FileSessionStore: JSON file persistence
+- IndexedSessionStore: JSON files plus SQLite metadata and full-text index
 - get_session_store(): Factory for the file-backed store
 
 Example:
@@ -18,9 +19,10 @@ Example:
 
 from openfatture.ai.session.factory import get_session_store
 from openfatture.ai.session.file_store import FileSessionStore
+from openfatture.ai.session.indexed_store import IndexedSessionStore
 from openfatture.ai.session.manager import SessionManager
 from openfatture.ai.session.models import ChatMessage, ChatSession, SessionMetadata, SessionStatus
-from openfatture.ai.session.store import SessionStore
+from openfatture.ai.session.store import SessionStore, SessionSummary
 
 __all__ = [
     # Core models
@@ -31,7 +33,9 @@ __all__ = [
     "SessionManager",
     # New unified storage
     "SessionStore",
+    "SessionSummary",
     "FileSessionStore",
+    "IndexedSessionStore",
     # Factory
     "get_session_store",
 ]
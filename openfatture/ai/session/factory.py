@@ -1,7 +1,8 @@
 """Factory for creating the CLI session store.
 
 OpenFatture uses file-backed session persistence for CLI and interactive
-terminal workflows. One backend keeps session behavior predictable.
+terminal workflows. Session files are indexed in SQLite so listing and
+search do not parse every file.
 
 Design Rationale (2025 Best Practices):
 - Factory pattern for dependency injection
@@ -18,20 +19,22 @@ from __future__ import annotations
 from pathlib import Path
 
 from openfatture.ai.session.file_store import FileSessionStore
+from openfatture.ai.session.indexed_store import IndexedSessionStore
 from openfatture.ai.session.store import SessionStore
 from openfatture.platform.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-def get_session_store(sessions_dir: Path | None = None) -> SessionStore:
+def get_session_store(sessions_dir: Path | None = None, indexed: bool = True) -> SessionStore:
     """Return a file-backed session store.
 
     Args:
         sessions_dir: Custom sessions directory for file storage
+        indexed: Maintain the SQLite metadata/full-text index (plain files if False)
 
     Returns:
-        FileSessionStore instance
+        IndexedSessionStore (or FileSessionStore if ``indexed`` is False)
 
     Example:
         >>> # Default CLI store
@@ -40,8 +43,16 @@ def get_session_store(sessions_dir: Path | None = None) -> SessionStore:
         >>> # Custom location
         >>> store = get_session_store(sessions_dir=Path(".sessions"))
     """
-    file_store = FileSessionStore(sessions_dir=sessions_dir)
-    logger.debug("session_store_created", type="file", sessions_dir=str(file_store.sessions_dir))
+    file_store = (
+        IndexedSessionStore(sessions_dir=sessions_dir)
+        if indexed
+        else FileSessionStore(sessions_dir=sessions_dir)
+    )
+    logger.debug(
+        "session_store_created",
+        type="indexed" if indexed else "file",
+        sessions_dir=str(file_store.sessions_dir),
+    )
     return file_store
 
 
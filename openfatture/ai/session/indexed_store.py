@@ -0,0 +1,398 @@
+"""File session storage with an SQLite metadata and full-text index.
+
+Session JSON files stay the source of truth, but listing, sorting and
+searching them by parsing every file (full message bodies included) makes
+``interactive`` startup slow once thousands of sessions accumulate.
+:class:`IndexedSessionStore` keeps ``index.sqlite3`` next to the files:
+
+- ``sessions``: one compact row per session (title, status, timestamps,
+  counts, metadata) used for listing, sorting and statistics
+- ``session_text``: an FTS5 table over title and message text used for search
+
+The index is updated on every save and delete made through the store, and
+reconciled with the directory (by file mtime and size) before each query, so
+sessions written by other processes or older versions are picked up without
+re-parsing unchanged files.
+
+Example:
+    store = IndexedSessionStore()
+    summaries = store.list_summaries(limit=20)   # index only
+    sessions = store.search_sessions("fattura 12")  # FTS query
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from openfatture.ai.session.file_store import FileSessionStore
+from openfatture.ai.session.models import ChatSession, SessionMetadata, SessionStatus
+from openfatture.ai.session.store import SessionSummary
+from openfatture.platform.logging import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_FILENAME = "index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    message_count INTEGER NOT NULL,
+    total_tokens INTEGER NOT NULL,
+    total_cost_usd REAL NOT NULL,
+    metadata TEXT NOT NULL,
+    file_mtime_ns INTEGER NOT NULL,
+    file_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_status_updated ON sessions (status, updated_at);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS session_text USING fts5(
+    session_id UNINDEXED,
+    title,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_SUMMARY_COLUMNS = "id, status, metadata"
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts_query(query: str) -> str | None:
+    """Turn free text into an FTS5 prefix query matching all terms."""
+    terms = _TERM_RE.findall(query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class IndexedSessionStore(FileSessionStore):
+    """File-backed session store with an SQLite index for listing and search.
+
+    Attributes:
+        index_path: Path of the SQLite index database
+        fts_enabled: Whether SQLite was built with FTS5 (substring search otherwise)
+
+    Thread Safety:
+        Index access is serialized with a lock; SQLite WAL mode lets several
+        processes share the index.
+    """
+
+    def __init__(self, sessions_dir: Path | None = None) -> None:
+        """Initialize the store and open (or build) its index.
+
+        Args:
+            sessions_dir: Custom sessions directory (uses default if None)
+        """
+        super().__init__(sessions_dir=sessions_dir)
+        self.index_path = self.sessions_dir / INDEX_FILENAME
+        self.fts_enabled = True
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._refresh()
+
+    # Write path
+
+    def save(self, session: ChatSession) -> bool:
+        """Save the session file and update its index rows."""
+        if not super().save(session):
+            return False
+        self._index_session(session)
+        return True
+
+    def delete(self, session_id: str, permanent: bool = False) -> bool:
+        """Delete a session and update the index."""
+        deleted = super().delete(session_id, permanent=permanent)
+        if deleted and not permanent:
+            session = super().load(session_id)
+            if session is not None:
+                self._index_session(session)
+        elif deleted:
+            with self._lock:
+                self._remove_locked([session_id])
+                self._conn.commit()
+        return deleted
+
+    # Read path (index only)
+
+    def list_summaries(
+        self,
+        status: SessionStatus | None = None,
+        limit: int | None = None,
+    ) -> list[SessionSummary]:
+        """List session metadata from the index without reading session files.
+
+        Args:
+            status: Filter by status (None = all except deleted)
+            limit: Maximum number of sessions to return
+
+        Returns:
+            Summaries sorted by last update (newest first)
+        """
+        self._refresh()
+        where, params = self._status_filter(status)
+        sql = f"SELECT {_SUMMARY_COLUMNS} FROM sessions WHERE {where} ORDER BY updated_at DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._summary(row) for row in rows]
+
+    def list_sessions(
+        self,
+        status: SessionStatus | None = None,
+        limit: int | None = None,
+    ) -> list[ChatSession]:
+        """List sessions, loading only the files of the selected page.
+
+        Args:
+            status: Filter by status (None = all except deleted)
+            limit: Maximum number of sessions
+
+        Returns:
+            List of sessions sorted by last update (newest first)
+        """
+        return self._load_all(summary.id for summary in self.list_summaries(status, limit))
+
+    def get_recent_sessions(self, limit: int = 10) -> list[ChatSession]:
+        """Get most recent active sessions."""
+        return self.list_sessions(status=SessionStatus.ACTIVE, limit=limit)
+
+    def search_summaries(self, query: str, limit: int = 20) -> list[SessionSummary]:
+        """Search titles and message text with the full-text index.
+
+        All query terms must match, as word prefixes, ignoring case and accents.
+
+        Args:
+            query: Search query
+            limit: Maximum results
+
+        Returns:
+            Matching non-deleted sessions, newest first
+        """
+        if not self.fts_enabled:
+            return [
+                SessionSummary(id=s.id, status=s.status, metadata=s.metadata)
+                for s in super().search_sessions(query, limit)
+            ]
+
+        match = _fts_query(query)
+        if match is None:
+            return []
+        self._refresh()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM sessions "
+                "WHERE status != ? AND id IN "
+                "(SELECT session_id FROM session_text WHERE session_text MATCH ?) "
+                "ORDER BY updated_at DESC LIMIT ?",
+                (SessionStatus.DELETED.value, match, limit),
+            ).fetchall()
+        return [self._summary(row) for row in rows]
+
+    def search_sessions(self, query: str, limit: int = 20) -> list[ChatSession]:
+        """Search sessions by title or content (full-text index).
+
+        Args:
+            query: Search query
+            limit: Maximum results
+
+        Returns:
+            List of matching sessions
+        """
+        return self._load_all(summary.id for summary in self.search_summaries(query, limit))
+
+    def get_stats(self) -> dict[str, int]:
+        """Get session counts per status from the index."""
+        self._refresh()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM sessions GROUP BY status"
+            ).fetchall()
+        counts = dict(rows)
+        stats = {status.value: counts.get(status.value, 0) for status in SessionStatus}
+        return {"total": sum(stats.values()), **stats}
+
+    # Maintenance (index selects the sessions to touch)
+
+    def archive_old_sessions(self, days_old: int = 30) -> int:
+        """Archive active sessions not updated in ``days_old`` days."""
+        cutoff = (datetime.now() - timedelta(days=days_old)).isoformat()
+        archived_count = 0
+        for session in self._load_all(self._ids(SessionStatus.ACTIVE, updated_before=cutoff)):
+            session.archive()
+            if self.save(session):
+                archived_count += 1
+
+        logger.info("sessions_archived", count=archived_count, days_old=days_old)
+        return archived_count
+
+    def cleanup_deleted(self) -> int:
+        """Permanently delete sessions marked as deleted."""
+        deleted_count = sum(
+            1
+            for session_id in self._ids(SessionStatus.DELETED)
+            if self.delete(session_id, permanent=True)
+        )
+        logger.info("deleted_sessions_cleaned_up", count=deleted_count)
+        return deleted_count
+
+    def close(self) -> None:
+        """Close the index connection."""
+        with self._lock:
+            self._conn.close()
+
+    # Index maintenance
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        try:
+            conn.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            self.fts_enabled = False
+            logger.warning("session_fts_unavailable", error=str(e))
+        conn.commit()
+        return conn
+
+    def _refresh(self) -> None:
+        """Reconcile the index with the session files on disk.
+
+        Only ``stat`` is used for unchanged files; new or modified files are
+        parsed and re-indexed, rows of vanished files are dropped.
+        """
+        on_disk: dict[str, os.stat_result] = {}
+        with os.scandir(self.sessions_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    on_disk[entry.name[:-5]] = entry.stat()
+
+        with self._lock:
+            indexed = {
+                session_id: (mtime_ns, size)
+                for session_id, mtime_ns, size in self._conn.execute(
+                    "SELECT id, file_mtime_ns, file_size FROM sessions"
+                )
+            }
+
+        stale = [
+            session_id
+            for session_id, stat in on_disk.items()
+            if indexed.get(session_id) != (stat.st_mtime_ns, stat.st_size)
+        ]
+        vanished = [session_id for session_id in indexed if session_id not in on_disk]
+
+        for session_id in stale:
+            try:
+                data = json.loads(self._path(session_id).read_text(encoding="utf-8"))
+                self._index_session(ChatSession.from_json(data), on_disk[session_id])
+            except Exception as e:
+                logger.warning("session_index_failed", session_id=session_id, error=str(e))
+
+        if vanished:
+            with self._lock:
+                self._remove_locked(vanished)
+                self._conn.commit()
+
+        if stale or vanished:
+            logger.debug("session_index_refreshed", indexed=len(stale), removed=len(vanished))
+
+    def _index_session(self, session: ChatSession, stat: os.stat_result | None = None) -> None:
+        if stat is None:
+            stat = self._path(session.id).stat()
+        metadata = session.export_json()["metadata"]
+        body = "\n".join(msg.content for msg in session.messages if msg.content)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, title, status, created_at, updated_at, "
+                "message_count, total_tokens, total_cost_usd, metadata, file_mtime_ns, "
+                "file_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session.id,
+                    session.metadata.title,
+                    session.status.value,
+                    metadata["created_at"],
+                    metadata["updated_at"],
+                    session.metadata.message_count,
+                    session.metadata.total_tokens,
+                    session.metadata.total_cost_usd,
+                    json.dumps(metadata, ensure_ascii=False),
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                ),
+            )
+            if self.fts_enabled:
+                self._conn.execute("DELETE FROM session_text WHERE session_id = ?", (session.id,))
+                self._conn.execute(
+                    "INSERT INTO session_text (session_id, title, body) VALUES (?, ?, ?)",
+                    (session.id, session.metadata.title, body),
+                )
+            self._conn.commit()
+
+    def _remove_locked(self, session_ids: list[str]) -> None:
+        """Drop index rows (caller holds the lock and commits)."""
+        params = [(session_id,) for session_id in session_ids]
+        self._conn.executemany("DELETE FROM sessions WHERE id = ?", params)
+        if self.fts_enabled:
+            self._conn.executemany("DELETE FROM session_text WHERE session_id = ?", params)
+
+    # Helpers
+
+    def _ids(self, status: SessionStatus, updated_before: str | None = None) -> list[str]:
+        self._refresh()
+        sql = "SELECT id FROM sessions WHERE status = ?"
+        params: list[Any] = [status.value]
+        if updated_before is not None:
+            sql += " AND updated_at < ?"
+            params.append(updated_before)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def _load_all(self, session_ids: Any) -> list[ChatSession]:
+        sessions = []
+        for session_id in session_ids:
+            session = super().load(session_id)
+            if session is not None:
+                sessions.append(session)
+        return sessions
+
+    def _path(self, session_id: str) -> Path:
+        return self.manager._get_session_path(session_id)
+
+    @staticmethod
+    def _status_filter(status: SessionStatus | None) -> tuple[str, list[Any]]:
+        if status is None:
+            return "status != ?", [SessionStatus.DELETED.value]
+        return "status = ?", [status.value]
+
+    @staticmethod
+    def _summary(row: tuple[str, str, str]) -> SessionSummary:
+        session_id, status, metadata = row
+        data = json.loads(metadata)
+        for field in ("created_at", "updated_at"):
+            data[field] = datetime.fromisoformat(data[field])
+        return SessionSummary(
+            id=session_id,
+            status=SessionStatus(status),
+            metadata=SessionMetadata(**data),
+        )
+
+
+__all__ = ["IndexedSessionStore"]
@@ -1,12 +1,14 @@
 """Data models for chat sessions."""
 
 import uuid
+from collections.abc import Iterable
 from datetime import datetime
 from enum import StrEnum
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from openfatture.ai.context.packing import message_tokens
 from openfatture.ai.domain.message import Role
 
 
@@ -387,33 +389,52 @@ class ChatSession(BaseModel):
         )
 
     def _truncate_if_needed(self) -> None:
-        """Truncate messages if exceeding limits."""
-        # Keep system messages and truncate conversation
-        if len(self.messages) > self.max_messages:
-            system_messages = [m for m in self.messages if m.role == Role.SYSTEM]
-            other_messages = [m for m in self.messages if m.role != Role.SYSTEM]
-
-            # Keep most recent messages
-            recent = other_messages[-(self.max_messages - len(system_messages)) :]
-
-            self.messages = system_messages + recent
-
-        # Token-based truncation (simplified)
-        # In production, use tiktoken for accurate counting
-        if self.metadata.total_tokens > self.max_tokens:
-            # Keep last N messages that fit within token limit
-            cumulative_tokens = 0
-            keep_messages: list[ChatMessage] = []
-
-            for msg in reversed(self.messages):
-                if msg.role == Role.SYSTEM:
-                    keep_messages.insert(0, msg)
-                    continue
-
-                cumulative_tokens += msg.total_tokens
-                if cumulative_tokens <= self.max_tokens:
-                    keep_messages.insert(0, msg)
-                else:
-                    break
-
-            self.messages = keep_messages
+        """Truncate messages if exceeding limits.
+
+        System messages are always kept. The conversation is dropped from the
+        oldest turn, where an assistant message requesting tools goes together
+        with the tool results, so no tool result outlives its request; the
+        newest turn is always kept. Token counts are cached on each message
+        the first time it is counted, so the check is a single backwards pass.
+        """
+        system_messages = [m for m in self.messages if m.role == Role.SYSTEM]
+        turns = _group_turns(m for m in self.messages if m.role != Role.SYSTEM)
+
+        # Token-based truncation on message content (usage totals include prompts)
+        message_budget = self.max_messages - len(system_messages)
+        token_budget = self.max_tokens - sum(message_tokens(m) for m in system_messages)
+        kept = count = tokens = 0
+        for turn in reversed(turns):
+            count += len(turn)
+            tokens += sum(message_tokens(m) for m in turn)
+            if kept and (count > message_budget or tokens > token_budget):
+                break
+            kept += 1
+        if kept == len(turns):
+            return
+
+        recent = turns[len(turns) - kept :]
+        # Tool results whose request was dropped before turns were grouped
+        while len(recent) > 1 and recent[0][0].role == Role.TOOL:
+            recent.pop(0)
+        self.messages = system_messages + [m for turn in recent for m in turn]
+
+
+def _group_turns(messages: Iterable[ChatMessage]) -> list[list[ChatMessage]]:
+    """Group messages that must be kept or dropped together.
+
+    Tool results join the assistant message that requested them; every other
+    message is a group of its own.
+    """
+    turns: list[list[ChatMessage]] = []
+    for message in messages:
+        if (
+            message.role == Role.TOOL
+            and turns
+            and turns[-1][0].role == Role.ASSISTANT
+            and turns[-1][0].tool_calls
+        ):
+            turns[-1].append(message)
+        else:
+            turns.append([message])
+    return turns
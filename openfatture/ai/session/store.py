@@ -24,9 +24,22 @@ Example:
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from pathlib import Path
 
-from openfatture.ai.session.models import ChatSession, SessionStatus
+from openfatture.ai.session.models import ChatSession, SessionMetadata, SessionStatus
+
+
+@dataclass(frozen=True, slots=True)
+class SessionSummary:
+    """Session identity and metadata, without messages.
+
+    Returned by listing and search methods that do not need message bodies.
+    """
+
+    id: str
+    status: SessionStatus
+    metadata: SessionMetadata
 
 
 class SessionStore(ABC):
@@ -133,6 +146,28 @@ class SessionStore(ABC):
         """
         return self.list_sessions(status=SessionStatus.ACTIVE, limit=limit)
 
+    def list_summaries(
+        self,
+        status: SessionStatus | None = None,
+        limit: int | None = None,
+    ) -> list[SessionSummary]:
+        """List session metadata without message bodies.
+
+        Default implementation derives summaries from ``list_sessions``.
+        Indexed backends override it to avoid loading sessions.
+
+        Args:
+            status: Filter by status (None = all except deleted)
+            limit: Maximum number of sessions to return
+
+        Returns:
+            Summaries sorted by last update (newest first)
+        """
+        return [
+            SessionSummary(id=session.id, status=session.status, metadata=session.metadata)
+            for session in self.list_sessions(status=status, limit=limit)
+        ]
+
     def search_sessions(self, query: str, limit: int = 20) -> list[ChatSession]:
         """Search sessions by title or content.
 
@@ -208,4 +243,4 @@ class SessionStore(ABC):
             return None
 
 
-__all__ = ["SessionStore"]
+__all__ = ["SessionStore", "SessionSummary"]
@@ -4,13 +4,15 @@ This module provides comprehensive metrics collection for tool execution,
 including performance monitoring, error tracking, and usage statistics.
 """
 
-from collections import defaultdict
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import islice
 from typing import Any
 
 from openfatture.ai.tools.models import ToolResult
 from openfatture.platform.logging import get_logger
+from openfatture.platform.metrics import get_metrics_collector
 
 logger = get_logger(__name__)
 
@@ -76,8 +78,8 @@ class ToolMetricsCollector:
     def __init__(self) -> None:
         """Initialize metrics collector."""
         self._stats: dict[str, ToolStats] = defaultdict(ToolStats)
-        self._execution_history: list[ToolExecutionMetrics] = []
         self._max_history_size = 10000  # Keep last 10k executions
+        self._execution_history: deque[ToolExecutionMetrics] = deque(maxlen=self._max_history_size)
 
         logger.info("tool_metrics_collector_initialized")
 
@@ -120,8 +122,13 @@ class ToolMetricsCollector:
 
         # Add to execution history
         self._execution_history.append(metrics)
-        if len(self._execution_history) > self._max_history_size:
-            self._execution_history.pop(0)
+
+        # Latency percentiles and Prometheus export
+        get_metrics_collector().record_timing(
+            "tool_execution",
+            metrics.execution_time * 1000,
+            {"tool": result.tool_name, "success": str(result.success).lower()},
+        )
 
         # Log execution
         logger.info(
@@ -193,7 +200,8 @@ class ToolMetricsCollector:
         Returns:
             List of recent ToolExecutionMetrics
         """
-        return self._execution_history[-limit:]
+        start = max(len(self._execution_history) - limit, 0)
+        return list(islice(self._execution_history, start, None))
 
     def get_error_summary(self) -> dict[str, int]:
         """
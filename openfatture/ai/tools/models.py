@@ -1,11 +1,16 @@
 """Data models for AI tools and function calling."""
 
 from collections.abc import Callable
+from contextvars import ContextVar
 from enum import StrEnum
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field
 
+# Set while a batch of tool calls runs concurrently: synchronous tool functions
+# are then run in worker threads instead of blocking the event loop.
+offload_sync_tools: ContextVar[bool] = ContextVar("offload_sync_tools", default=False)
+
 
 class ToolParameterType(StrEnum):
     """Parameter type for tools."""
@@ -173,6 +178,8 @@ class Tool(BaseModel):
 
                     if inspect.iscoroutinefunction(self.func):
                         result = await self.func(**kwargs)
+                    elif offload_sync_tools.get():
+                        result = await asyncio.to_thread(self.func, **kwargs)
                     else:
                         result = self.func(**kwargs)
 
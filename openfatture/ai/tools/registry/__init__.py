@@ -7,5 +7,6 @@ Import from here (or ``openfatture.ai.tools``):
 
 from openfatture.ai.tools.registry.core import ToolRegistry
 from openfatture.ai.tools.registry.defaults import get_tool_registry
+from openfatture.ai.tools.registry.parallel import execute_tool_calls, is_parallel_safe
 
-__all__ = ["ToolRegistry", "get_tool_registry"]
+__all__ = ["ToolRegistry", "execute_tool_calls", "get_tool_registry", "is_parallel_safe"]
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable
 from typing import TYPE_CHECKING, Any
 
 from openfatture.ai.orchestration.resilience import (
@@ -12,7 +13,7 @@ from openfatture.ai.orchestration.resilience import (
 )
 from openfatture.ai.tools.models import Tool, ToolResult
 from openfatture.platform.logging import get_logger
-from openfatture.platform.rate_limiter import RateLimiter
+from openfatture.platform.rate_limiter import KeyedRateLimiter
 
 if TYPE_CHECKING:
     from openfatture.ai.cache.tool_cache import ToolResultCache
@@ -37,7 +38,7 @@ class ToolRegistry:
         self._tools: dict[str, Tool] = {}
         self._categories: dict[str, list[str]] = {}
         # Rate limiters: 10 calls per minute per tool
-        self._rate_limiters: dict[str, RateLimiter] = {}
+        self._rate_limiter = KeyedRateLimiter(rate=10 / 60, burst=10)
 
         # Circuit breakers for resilience (Phase 3)
         self._circuit_breakers: dict[str, CircuitBreaker] = {}
@@ -49,8 +50,17 @@ class ToolRegistry:
         self._cache: ToolResultCache | None = None
         self._metrics: ToolMetricsCollector | None = None
 
+        # Serialized provider schemas, keyed by (format, category, enabled tools)
+        self._version = 0
+        self._schema_cache: dict[tuple[Any, ...], list[dict[str, Any]]] = {}
+
         logger.info("tool_registry_initialized")
 
+    @property
+    def version(self) -> int:
+        """Counter incremented whenever tools are registered or unregistered."""
+        return self._version
+
     def _get_cache(self) -> ToolResultCache | None:
         """Lazy load tool cache."""
         if self._cache is None:
@@ -88,6 +98,7 @@ class ToolRegistry:
             logger.warning("tool_already_registered", name=tool.name)
 
         self._tools[tool.name] = tool
+        self._invalidate_schemas()
 
         # Add to category index
         if tool.category not in self._categories:
@@ -120,6 +131,7 @@ class ToolRegistry:
                 self._categories[tool.category].remove(tool_name)
 
             del self._tools[tool_name]
+            self._invalidate_schemas()
             logger.info("tool_unregistered", name=tool_name)
             return True
 
@@ -477,8 +489,11 @@ class ToolRegistry:
         Returns:
             List of function schemas for OpenAI Chat Completions API
         """
-        tools = self.list_tools(category=category, enabled_only=True)
-        return [{"type": "function", "function": tool.to_openai_function()} for tool in tools]
+        return self._cached_schemas(
+            "openai",
+            category,
+            lambda tool: {"type": "function", "function": tool.to_openai_function()},
+        )
 
     def get_anthropic_tools(
         self,
@@ -493,8 +508,32 @@ class ToolRegistry:
         Returns:
             List of tool schemas for Anthropic API
         """
+        return self._cached_schemas("anthropic", category, lambda tool: tool.to_anthropic_tool())
+
+    def _cached_schemas(
+        self,
+        schema_format: str,
+        category: str | None,
+        serialize: Callable[[Tool], dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """Return serialized schemas, rebuilding them only when the tool set changes.
+
+        Schemas are sent on every model call; serializing them once per
+        registry version also keeps the request prefix byte-identical, which
+        provider prompt caching relies on. Callers get a new list but shared
+        schema dicts, which must not be mutated.
+        """
         tools = self.list_tools(category=category, enabled_only=True)
-        return [tool.to_anthropic_tool() for tool in tools]
+        key = (schema_format, category, self._version, tuple(tool.name for tool in tools))
+        schemas = self._schema_cache.get(key)
+        if schemas is None:
+            schemas = [serialize(tool) for tool in tools]
+            self._schema_cache[key] = schemas
+        return list(schemas)
+
+    def _invalidate_schemas(self) -> None:
+        self._version += 1
+        self._schema_cache.clear()
 
     async def execute_tool(
         self,
@@ -542,10 +581,7 @@ class ToolRegistry:
             return result
 
         # Check rate limiting (per tool)
-        if tool_name not in self._rate_limiters:
-            self._rate_limiters[tool_name] = RateLimiter(max_calls=10, period=60)
-
-        if not self._rate_limiters[tool_name].acquire(blocking=False):
+        if not self._rate_limiter.try_acquire(tool_name):
             logger.warning("tool_rate_limited", name=tool_name)
             result = ToolResult(
                 success=False,
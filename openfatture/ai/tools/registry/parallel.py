@@ -0,0 +1,109 @@
+"""Concurrent execution of the tool calls requested in one model turn.
+
+Models often ask for several independent reads at once (invoice stats, a
+search, due dates). Running them one after another makes the turn as slow as
+the sum of the calls; :func:`execute_tool_calls` runs consecutive read-only
+calls concurrently instead.
+
+Each call still goes through ``ToolRegistry.execute_tool``, so rate limits,
+circuit breakers and per-tool bulkhead semaphores apply unchanged. Mutating
+tools (tagged ``write``) and tools that require confirmation run alone and act
+as barriers: reads requested after a write see its effects. Results are
+returned in request order.
+
+Example:
+    >>> results = await execute_tool_calls(
+    ...     registry,
+    ...     [("get_invoice_stats", {"anno": 2025}), ("get_due_dates", {})],
+    ... )
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+from openfatture.ai.tools.models import Tool, ToolResult, offload_sync_tools
+from openfatture.platform.logging import get_logger
+
+if TYPE_CHECKING:
+    from openfatture.ai.tools.registry.core import ToolRegistry
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_PARALLEL_TOOL_CALLS = 8
+
+MUTATING_TOOL_TAGS = frozenset({"write"})
+
+
+def is_parallel_safe(tool: Tool | None) -> bool:
+    """Return True if a tool can run concurrently with other calls.
+
+    Unknown tools run serially.
+    """
+    return (
+        isinstance(tool, Tool)
+        and not tool.requires_confirmation
+        and not MUTATING_TOOL_TAGS.intersection(tool.tags)
+    )
+
+
+async def execute_tool_calls(
+    registry: ToolRegistry,
+    calls: Sequence[tuple[str, dict[str, Any]]],
+    confirm: bool = False,
+    max_concurrency: int = DEFAULT_MAX_PARALLEL_TOOL_CALLS,
+) -> list[ToolResult | Exception]:
+    """Execute tool calls, running consecutive read-only calls concurrently.
+
+    Args:
+        registry: Registry executing the tools
+        calls: ``(tool_name, parameters)`` pairs in the order the model requested
+        confirm: Forwarded to ``ToolRegistry.execute_tool``
+        max_concurrency: Maximum calls in flight at once
+
+    Returns:
+        One entry per call, in request order: the ``ToolResult``, or the
+        exception raised while executing it
+    """
+    results: dict[int, ToolResult | Exception] = {}
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(index: int) -> None:
+        name, parameters = calls[index]
+        async with semaphore:
+            try:
+                results[index] = await registry.execute_tool(
+                    tool_name=name, parameters=parameters, confirm=confirm
+                )
+            except Exception as exc:
+                results[index] = exc
+
+    batch: list[int] = []
+
+    async def flush() -> None:
+        if len(batch) == 1:
+            await run(batch[0])
+        elif batch:
+            logger.info(
+                "tool_calls_parallel",
+                tools=[calls[index][0] for index in batch],
+                max_concurrency=max_concurrency,
+            )
+            token = offload_sync_tools.set(True)
+            try:
+                await asyncio.gather(*(run(index) for index in batch))
+            finally:
+                offload_sync_tools.reset(token)
+        batch.clear()
+
+    for index, (name, _) in enumerate(calls):
+        if is_parallel_safe(registry.get_tool(name)):
+            batch.append(index)
+            continue
+        await flush()
+        await run(index)
+    await flush()
+
+    return [results[index] for index in range(len(calls))]
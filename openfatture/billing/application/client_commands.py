@@ -341,3 +341,51 @@ def delete_client(
         return {"error": str(e), "success": False}
     finally:
         db.close()
+
+
+def rebuild_client_aggregates(check_only: bool = False) -> dict[str, Any]:
+    """
+    Verify and rebuild the denormalized per-client totals.
+
+    Args:
+        check_only: Only report drifted aggregates, without rebuilding
+
+    Returns:
+        Dictionary with the mismatches found and, unless ``check_only``,
+        the number of rebuilt client rows
+    """
+    from openfatture.storage.client_aggregates import (
+        check_client_aggregates,
+    )
+    from openfatture.storage.client_aggregates import (
+        rebuild_client_aggregates as rebuild,
+    )
+
+    db = get_session()
+    try:
+        connection = db.connection()
+        mismatches = check_client_aggregates(connection)
+        result: dict[str, Any] = {
+            "success": True,
+            "mismatches": [
+                {
+                    "cliente_id": m.cliente_id,
+                    "field": m.field,
+                    "stored": str(m.stored),
+                    "expected": str(m.expected),
+                }
+                for m in mismatches
+            ],
+        }
+        if not check_only:
+            result["rebuilt"] = rebuild(connection)
+            db.commit()
+            logger.info("client_aggregates_rebuild_completed", mismatches=len(mismatches))
+        return result
+
+    except Exception as e:
+        db.rollback()
+        logger.error("rebuild_client_aggregates_failed", error=str(e))
+        return {"error": str(e), "success": False}
+    finally:
+        db.close()
@@ -4,12 +4,19 @@ from __future__ import annotations
 
 from typing import Any
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session, selectinload
 
 from openfatture.platform.logging import get_logger
-from openfatture.platform.security import sanitize_sql_like_input, validate_integer_input
+from openfatture.platform.security import (
+    sanitize_sql_like_input,
+    sanitize_string_input,
+    validate_integer_input,
+)
+from openfatture.storage.client_aggregates import has_client_aggregates
 from openfatture.storage.database.base import get_session
-from openfatture.storage.database.models import Cliente
+from openfatture.storage.database.models import Cliente, ClienteAggregate, Fattura
+from openfatture.storage.search import SearchIndex
 
 logger = get_logger(__name__)
 
@@ -20,21 +27,46 @@ def search_clients(
     *,
     session: Session | None = None,
 ) -> dict[str, Any]:
-    """Search clients by name, VAT, or tax code."""
+    """Search clients by name, VAT, or tax code.
+
+    Uses the typo-tolerant full-text index when the database has one.
+    """
+    # The search index escapes its own LIKE patterns and needs the plain text
+    text_query = None
     if query is not None:
+        text_query = sanitize_string_input(query, max_length=255)
         query = sanitize_sql_like_input(query)
     limit = validate_integer_input(limit, min_value=1, max_value=100)
 
     owns_session = session is None
     db = session or get_session()
     try:
+        index = SearchIndex(db)
+        if index.available():
+            hits = index.search_clients(text_query, limit=limit)
+            return {
+                "count": len(hits),
+                "clienti": [
+                    {
+                        "id": hit.id,
+                        "denominazione": hit.denominazione,
+                        "partita_iva": hit.partita_iva,
+                        "codice_fiscale": hit.codice_fiscale,
+                        "email": hit.email,
+                        "fatture_count": hit.fatture_count,
+                    }
+                    for hit in hits
+                ],
+                "has_more": len(hits) == limit,
+            }
+
         db_query = db.query(Cliente)
         if query:
             query_lower = f"%{query.lower()}%"
             db_query = db_query.filter(
-                (Cliente.denominazione.ilike(query_lower))
-                | (Cliente.partita_iva.ilike(query_lower))
-                | (Cliente.codice_fiscale.ilike(query_lower))
+                (Cliente.denominazione.ilike(query_lower, escape="\\"))
+                | (Cliente.partita_iva.ilike(query_lower, escape="\\"))
+                | (Cliente.codice_fiscale.ilike(query_lower, escape="\\"))
             )
         db_query = db_query.order_by(Cliente.denominazione)
         clienti = db_query.limit(limit).all()
@@ -72,14 +104,36 @@ def get_client_details(
     owns_session = session is None
     db = session or get_session()
     try:
-        cliente = (
-            db.query(Cliente)
-            .options(selectinload(Cliente.fatture))
-            .filter(Cliente.id == cliente_id)
-            .first()
-        )
-        if cliente is None:
-            return {"error": f"Cliente {cliente_id} non trovato"}
+        aggregate: ClienteAggregate | None = None
+        if has_client_aggregates(db):
+            # Totals come from the aggregate row: load only the recent invoices
+            cliente = db.get(Cliente, cliente_id)
+            if cliente is None:
+                return {"error": f"Cliente {cliente_id} non trovato"}
+            aggregate = db.get(ClienteAggregate, cliente_id)
+            fatture_count = aggregate.num_fatture if aggregate else 0
+            fatture_recenti = (
+                db.query(Fattura)
+                .filter(Fattura.cliente_id == cliente_id)
+                .order_by(Fattura.data_emissione.desc())
+                .limit(5)
+                .all()
+            )
+        else:
+            cliente = (
+                db.query(Cliente)
+                .options(selectinload(Cliente.fatture))
+                .filter(Cliente.id == cliente_id)
+                .first()
+            )
+            if cliente is None:
+                return {"error": f"Cliente {cliente_id} non trovato"}
+            fatture_count = len(cliente.fatture)
+            fatture_recenti = (
+                sorted(cliente.fatture, key=lambda f: f.data_emissione, reverse=True)[:5]
+                if cliente.fatture
+                else []
+            )
 
         details: dict[str, Any] = {
             "id": cliente.id,
@@ -98,13 +152,17 @@ def get_client_details(
                 "pec": cliente.pec or "",
                 "telefono": cliente.telefono or "",
             },
-            "fatture_count": len(cliente.fatture),
+            "fatture_count": fatture_count,
         }
-        fatture_recenti = (
-            sorted(cliente.fatture, key=lambda f: f.data_emissione, reverse=True)[:5]
-            if cliente.fatture
-            else []
-        )
+        if aggregate is not None:
+            details["totali"] = {
+                "fatturato": float(aggregate.totale_fatturato),
+                "residuo": float(aggregate.residuo),
+                "ultima_fattura": (
+                    aggregate.ultima_fattura.isoformat() if aggregate.ultima_fattura else None
+                ),
+                "giorni_medi_pagamento": aggregate.giorni_medi_pagamento,
+            }
         details["fatture_recenti"] = [
             {
                 "id": f.id,
@@ -130,6 +188,25 @@ def get_client_stats(*, session: Session | None = None) -> dict[str, Any]:
     owns_session = session is None
     db = session or get_session()
     try:
+        if has_client_aggregates(db):
+            row = db.execute(
+                select(
+                    func.count(Cliente.id),
+                    func.count(Cliente.partita_iva),
+                    func.count(Cliente.email),
+                    func.count(Cliente.pec),
+                    func.coalesce(func.sum(ClienteAggregate.totale_fatturato), 0),
+                    func.coalesce(func.sum(ClienteAggregate.residuo), 0),
+                ).outerjoin(ClienteAggregate, ClienteAggregate.cliente_id == Cliente.id)
+            ).one()
+            return {
+                "totale_clienti": row[0],
+                "con_partita_iva": row[1],
+                "con_email": row[2],
+                "con_pec": row[3],
+                "fatturato_totale": float(row[4]),
+                "residuo_totale": float(row[5]),
+            }
         return {
             "totale_clienti": db.query(Cliente).count(),
             "con_partita_iva": db.query(Cliente).filter(Cliente.partita_iva.isnot(None)).count(),
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from openfatture.platform.logging import get_logger
 from openfatture.platform.security import validate_integer_input
@@ -16,9 +16,32 @@ from openfatture.storage.database.models import (
     TipoDocumento,
 )
 
+if TYPE_CHECKING:
+    from openfatture.events import BaseEvent
+
 logger = get_logger(__name__)
 
 
+def _publish(event: BaseEvent) -> None:
+    """Publish a domain event on the application event bus, if one is running."""
+    from openfatture.cli.lifespan import get_event_bus
+
+    event_bus = get_event_bus()
+    if event_bus:
+        event_bus.publish(event)
+
+
+def _righe_updated(fattura: Fattura) -> BaseEvent:
+    """Event for a change of the line items (and totals) of an invoice."""
+    from openfatture.events import InvoiceUpdatedEvent
+
+    return InvoiceUpdatedEvent(
+        invoice_id=fattura.id,
+        invoice_number=f"{fattura.numero}/{fattura.anno}",
+        updated_fields=["righe"],
+    )
+
+
 def create_invoice(
     cliente_id: int,
     anno: int | None = None,
@@ -43,7 +66,6 @@ def create_invoice(
     """
     from datetime import datetime
 
-    from openfatture.cli.lifespan import get_event_bus
     from openfatture.events import InvoiceCreatedEvent
 
     # Validate inputs
@@ -110,18 +132,15 @@ def create_invoice(
         db.commit()
         db.refresh(fattura)
 
-        # Publish event
-        event_bus = get_event_bus()
-        if event_bus:
-            event_bus.publish(
-                InvoiceCreatedEvent(
-                    invoice_id=fattura.id,
-                    invoice_number=f"{fattura.numero}/{fattura.anno}",
-                    client_id=fattura.cliente_id,
-                    client_name=cliente.denominazione,
-                    total_amount=fattura.totale,
-                )
+        _publish(
+            InvoiceCreatedEvent(
+                invoice_id=fattura.id,
+                invoice_number=f"{fattura.numero}/{fattura.anno}",
+                client_id=fattura.cliente_id,
+                client_name=cliente.denominazione,
+                total_amount=fattura.totale,
             )
+        )
 
         logger.info("invoice_created", invoice_id=fattura.id, numero=numero, anno=anno)
 
@@ -163,6 +182,8 @@ def update_invoice(
     """
     from datetime import datetime
 
+    from openfatture.events import InvoiceUpdatedEvent
+
     # Validate input
     fattura_id = validate_integer_input(fattura_id, min_value=1)
 
@@ -211,6 +232,14 @@ def update_invoice(
         db.commit()
         db.refresh(fattura)
 
+        _publish(
+            InvoiceUpdatedEvent(
+                invoice_id=fattura.id,
+                invoice_number=f"{fattura.numero}/{fattura.anno}",
+                updated_fields=changes,
+            )
+        )
+
         logger.info(
             "invoice_updated",
             fattura_id=fattura_id,
@@ -250,6 +279,8 @@ def delete_invoice(
     Returns:
         Dictionary with deletion result
     """
+    from openfatture.events import InvoiceDeletedEvent
+
     # Validate input
     fattura_id = validate_integer_input(fattura_id, min_value=1)
 
@@ -288,6 +319,8 @@ def delete_invoice(
         db.delete(fattura)
         db.commit()
 
+        _publish(InvoiceDeletedEvent(invoice_id=fattura_id, invoice_number=f"{numero}/{anno}"))
+
         logger.warning(
             "invoice_deleted",
             fattura_id=fattura_id,
@@ -328,6 +361,8 @@ def update_invoice_status(
     Returns:
         Dictionary with status update result
     """
+    from openfatture.events import InvoiceStatusChangedEvent
+
     # Validate input
     fattura_id = validate_integer_input(fattura_id, min_value=1)
 
@@ -384,6 +419,15 @@ def update_invoice_status(
         db.commit()
         db.refresh(fattura)
 
+        _publish(
+            InvoiceStatusChangedEvent(
+                invoice_id=fattura.id,
+                invoice_number=f"{fattura.numero}/{fattura.anno}",
+                old_status=old_status,
+                new_status=new_status_enum.value,
+            )
+        )
+
         logger.info(
             "invoice_status_updated",
             fattura_id=fattura_id,
@@ -488,6 +532,8 @@ def create_riga(
         db.commit()
         db.refresh(riga)
 
+        _publish(_righe_updated(fattura))
+
         logger.info(
             "riga_created",
             fattura_id=fattura_id,
@@ -609,6 +655,8 @@ def update_riga(
         db.refresh(riga)
         db.refresh(fattura)
 
+        _publish(_righe_updated(fattura))
+
         logger.info(
             "riga_updated",
             riga_id=riga_id,
@@ -688,6 +736,8 @@ def delete_riga(
         db.commit()
         db.refresh(fattura)
 
+        _publish(_righe_updated(fattura))
+
         logger.warning(
             "riga_deleted",
             riga_id=riga_id,
@@ -9,12 +9,19 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, TypedDict
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.sql.elements import ColumnElement
 
 from openfatture.platform.logging import get_logger
-from openfatture.platform.security import sanitize_sql_like_input, validate_integer_input
+from openfatture.platform.security import (
+    sanitize_sql_like_input,
+    sanitize_string_input,
+    validate_integer_input,
+)
 from openfatture.storage.database.base import get_session
 from openfatture.storage.database.models import Fattura, StatoFattura
+from openfatture.storage.search import SEARCH_FATTURE, SearchIndex
 
 logger = get_logger(__name__)
 
@@ -35,8 +42,16 @@ def search_invoices(
     *,
     session: Session | None = None,
 ) -> dict[str, Any]:
-    """Search invoices matching criteria."""
+    """Search invoices matching criteria.
+
+    The free-text query matches numero and note. It goes through the
+    typo-tolerant full-text index when the database has one, ranking the best
+    matches among the invoices passing the other filters first.
+    """
+    # The search index escapes its own LIKE patterns and needs the plain text
+    text_query = None
     if query is not None:
+        text_query = sanitize_string_input(query, max_length=255)
         query = sanitize_sql_like_input(query)
     if anno is not None:
         anno = validate_integer_input(anno, min_value=2000, max_value=2100)
@@ -47,24 +62,41 @@ def search_invoices(
     owns_session = session is None
     db = session or get_session()
     try:
-        db_query = db.query(Fattura).options(selectinload(Fattura.cliente))
-
-        if query:
-            db_query = db_query.filter(
-                (Fattura.numero.contains(query)) | (Fattura.note.contains(query))
-            )
+        filters: list[ColumnElement[bool]] = []
         if anno:
-            db_query = db_query.filter(Fattura.anno == anno)
+            filters.append(Fattura.anno == anno)
         if stato:
             try:
-                db_query = db_query.filter(Fattura.stato == StatoFattura(stato))
+                filters.append(Fattura.stato == StatoFattura(stato))
             except ValueError:
                 pass
         if cliente_id:
-            db_query = db_query.filter(Fattura.cliente_id == cliente_id)
+            filters.append(Fattura.cliente_id == cliente_id)
+
+        db_query = db.query(Fattura).options(selectinload(Fattura.cliente)).filter(*filters)
+
+        ranked: dict[int, float] = {}
+        index = SearchIndex(db)
+        if query and text_query and index.available():
+            ranked = index.rank(
+                SEARCH_FATTURE,
+                text_query,
+                limit=limit,
+                columns=("numero", "note"),
+                within=select(Fattura.id).where(*filters),
+            )
+            db_query = db_query.filter(Fattura.id.in_(ranked))
+        elif query:
+            db_query = db_query.filter(
+                (Fattura.numero.contains(query, escape="\\"))
+                | (Fattura.note.contains(query, escape="\\"))
+            )
 
         db_query = db_query.order_by(Fattura.anno.desc(), Fattura.numero.desc())
-        fatture = db_query.limit(limit).all()
+        if ranked:
+            fatture = sorted(db_query.all(), key=lambda f: -ranked[f.id])[:limit]
+        else:
+            fatture = db_query.limit(limit).all()
 
         results = []
         for f in fatture:
@@ -10,6 +10,7 @@ from openfatture.platform.security import validate_integer_input
 from openfatture.storage.database.base import get_session
 from openfatture.storage.database.models import Prodotto
 from openfatture.storage.database.models import RigaFattura as Riga
+from openfatture.storage.search import SEARCH_PRODOTTI, SearchIndex, contains_ids
 
 logger = get_logger(__name__)
 
@@ -53,10 +54,23 @@ def search_prodotti(
             query = query.filter(Prodotto.categoria == categoria)
         if is_servizio is not None:
             query = query.filter(Prodotto.is_servizio == is_servizio)
+        indexed = SearchIndex(db).available()
         if codice_contains:
-            query = query.filter(Prodotto.codice.ilike(f"%{codice_contains}%"))
+            if indexed:
+                query = query.filter(
+                    Prodotto.id.in_(contains_ids(SEARCH_PRODOTTI, "codice", codice_contains))
+                )
+            else:
+                query = query.filter(Prodotto.codice.ilike(f"%{codice_contains}%"))
         if descrizione_contains:
-            query = query.filter(Prodotto.descrizione.ilike(f"%{descrizione_contains}%"))
+            if indexed:
+                query = query.filter(
+                    Prodotto.id.in_(
+                        contains_ids(SEARCH_PRODOTTI, "descrizione", descrizione_contains)
+                    )
+                )
+            else:
+                query = query.filter(Prodotto.descrizione.ilike(f"%{descrizione_contains}%"))
 
         # Execute query
         prodotti = query.order_by(Prodotto.codice).limit(limit).all()
@@ -10,6 +10,7 @@ from sqlalchemy import extract, func
 
 from openfatture.payment.application.services.payment_overview import (
     PaymentDueEntry,
+    collect_payment_aging,
     collect_payment_due_summary,
 )
 from openfatture.platform.logging import get_logger
@@ -297,6 +298,10 @@ def get_due_dates(window_days: int = 14, max_results: int = 20) -> dict[str, Any
         result["overdue_total"] = sum(float(e.residual) for e in summary.overdue)
         result["due_soon_total"] = sum(float(e.residual) for e in summary.due_soon)
         result["upcoming_total"] = sum(float(e.residual) for e in summary.upcoming)
+        result["aging"] = {
+            total.bucket.value: {"count": total.count, "residual": float(total.residual)}
+            for total in collect_payment_aging(db)
+        }
 
         logger.info(
             "due_dates_report_generated",
@@ -28,7 +28,9 @@ if TYPE_CHECKING:
 from openfatture.events import GlobalEventBus, initialize_event_system
 from openfatture.hooks import HookEventBridge, initialize_hook_system
 from openfatture.platform.async_bridge import run_async
+from openfatture.platform.config import get_settings
 from openfatture.platform.logging import get_logger
+from openfatture.platform.metrics import MetricsServer
 
 # Context variable to hold the shared HTTP client
 _http_client_context: ContextVar[httpx.AsyncClient | None] = ContextVar(
@@ -50,6 +52,7 @@ class LifespanManager:
         self.http_client: httpx.AsyncClient | None = None
         self.event_bus: GlobalEventBus | None = None
         self.hook_bridge: HookEventBridge | None = None
+        self.metrics_server: MetricsServer | None = None
         self.shutdown_event = asyncio.Event()
         self._shutdown_handlers: list[asyncio.Task[Any]] = []
 
@@ -81,6 +84,16 @@ class LifespanManager:
         self.hook_bridge = initialize_hook_system(self.event_bus)
         logger.info("Hook system initialized and registered with event bus")
 
+        # Local Prometheus scrape endpoint (opt-in)
+        metrics_port = get_settings().metrics_port
+        if metrics_port is not None:
+            try:
+                self.metrics_server = MetricsServer(port=metrics_port)
+                self.metrics_server.start()
+            except OSError as e:
+                logger.warning(f"Metrics endpoint not started: {e}")
+                self.metrics_server = None
+
         # Optional feature extras (never required for core invoicing)
         await self._initialize_self_learning()
 
@@ -162,6 +175,17 @@ class LifespanManager:
             # Shutdown self-learning systems
             await self._shutdown_self_learning()
 
+            # Stop the hook worker pool (lets background hooks finish)
+            if self.hook_bridge:
+                logger.debug("Stopping hook workers")
+                await asyncio.to_thread(self.hook_bridge.close)
+
+            # Stop the metrics endpoint
+            if self.metrics_server:
+                logger.debug("Stopping metrics endpoint")
+                self.metrics_server.stop()
+                self.metrics_server = None
+
             # Close HTTP client
             if self.http_client:
                 logger.debug("Closing HTTP client")
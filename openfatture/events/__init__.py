@@ -32,6 +32,8 @@ __all__ = [
     "get_global_event_bus",
     # Invoice events
     "InvoiceCreatedEvent",
+    "InvoiceUpdatedEvent",
+    "InvoiceStatusChangedEvent",
     "InvoiceSentEvent",
     "InvoiceValidatedEvent",
     "InvoiceDeletedEvent",
@@ -64,6 +66,8 @@ from .invoice_events import (
     InvoiceCreatedEvent,
     InvoiceDeletedEvent,
     InvoiceSentEvent,
+    InvoiceStatusChangedEvent,
+    InvoiceUpdatedEvent,
     InvoiceValidatedEvent,
 )
 from .listeners import audit_log_listener, initialize_event_system, register_default_listeners
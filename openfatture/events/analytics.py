@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Any
 
 from .repository import EventRepository
@@ -12,6 +12,9 @@ from .repository import EventRepository
 class EventAnalytics:
     """Provides analytics and metrics for event data.
 
+    Counts are grouped in the database by :class:`EventRepository` (from the
+    hourly event rollups where possible), so reports never load events.
+
     Aggregates event data to provide insights like:
     - Time-based trends (events per day/week/month)
     - Entity-based metrics (most active entities)
@@ -40,27 +43,11 @@ class EventAnalytics:
             List of dictionaries with date and event count
         """
         start_date = datetime.now() - timedelta(days=days)
-        events = self.repo.get_all(
-            event_type=event_type,
-            start_date=start_date,
-            limit=10000,
+        daily_counts = self.repo.count_by_period(
+            "day", event_type=event_type, start_date=start_date
         )
 
-        # Group by date
-        daily_counts: dict[str, int] = defaultdict(int)
-        for event in events:
-            # Handle both naive and timezone-aware datetime
-            occurred_at = event.occurred_at
-            if occurred_at.tzinfo is not None:
-                occurred_at = occurred_at.replace(tzinfo=None)
-
-            date_key = occurred_at.strftime("%Y-%m-%d")
-            daily_counts[date_key] += 1
-
-        # Sort by date
-        result = [{"date": date, "count": count} for date, count in sorted(daily_counts.items())]
-
-        return result
+        return [{"date": day, "count": count} for day, count in daily_counts]
 
     def get_weekly_activity(
         self, weeks: int = 12, event_type: str | None = None
@@ -75,23 +62,15 @@ class EventAnalytics:
             List of dictionaries with week start date and event count
         """
         start_date = datetime.now() - timedelta(weeks=weeks)
-        events = self.repo.get_all(
-            event_type=event_type,
-            start_date=start_date,
-            limit=10000,
+        daily_counts = self.repo.count_by_period(
+            "day", event_type=event_type, start_date=start_date
         )
 
-        # Group by week (ISO week)
+        # Fold days into ISO weeks
         weekly_counts: dict[str, int] = defaultdict(int)
-        for event in events:
-            occurred_at = event.occurred_at
-            if occurred_at.tzinfo is not None:
-                occurred_at = occurred_at.replace(tzinfo=None)
-
-            # Get ISO week
-            year, week, _ = occurred_at.isocalendar()
-            week_key = f"{year}-W{week:02d}"
-            weekly_counts[week_key] += 1
+        for day, count in daily_counts:
+            year, week, _ = date.fromisoformat(day).isocalendar()
+            weekly_counts[f"{year}-W{week:02d}"] += count
 
         # Sort by week
         result = [{"week": week, "count": count} for week, count in sorted(weekly_counts.items())]
@@ -111,28 +90,11 @@ class EventAnalytics:
             List of dictionaries with month and event count
         """
         start_date = datetime.now() - timedelta(days=months * 30)  # Approximate
-        events = self.repo.get_all(
-            event_type=event_type,
-            start_date=start_date,
-            limit=10000,
+        monthly_counts = self.repo.count_by_period(
+            "month", event_type=event_type, start_date=start_date
         )
 
-        # Group by month
-        monthly_counts: dict[str, int] = defaultdict(int)
-        for event in events:
-            occurred_at = event.occurred_at
-            if occurred_at.tzinfo is not None:
-                occurred_at = occurred_at.replace(tzinfo=None)
-
-            month_key = occurred_at.strftime("%Y-%m")
-            monthly_counts[month_key] += 1
-
-        # Sort by month
-        result = [
-            {"month": month, "count": count} for month, count in sorted(monthly_counts.items())
-        ]
-
-        return result
+        return [{"month": month, "count": count} for month, count in monthly_counts]
 
     def get_event_type_distribution(self, days: int | None = None) -> list[dict[str, Any]]:
         """Get distribution of events by type.
@@ -209,28 +171,12 @@ class EventAnalytics:
         if days:
             start_date = datetime.now() - timedelta(days=days)
 
-        events = self.repo.get_all(
-            entity_type=entity_type,
-            start_date=start_date,
-            limit=10000,
-        )
-
-        # Count events per entity
-        entity_counts: dict[int, int] = defaultdict(int)
-        for event in events:
-            if event.entity_id is not None:
-                entity_counts[event.entity_id] += 1
+        entity_counts = self.repo.count_by_entity(entity_type, limit=limit, start_date=start_date)
 
-        # Sort by count and limit
-        result = [
-            {"entity_id": entity_id, "event_count": count}
-            for entity_id, count in sorted(entity_counts.items(), key=lambda x: x[1], reverse=True)[
-                :limit
-            ]
+        return [
+            {"entity_id": entity_id, "event_count": count} for entity_id, count in entity_counts
         ]
 
-        return result
-
     def get_activity_trends(self, days: int = 30) -> dict[str, Any]:
         """Get activity trends comparing recent period to previous period.
 
@@ -281,16 +227,12 @@ class EventAnalytics:
             List of dictionaries with hour (0-23) and count
         """
         start_date = datetime.now() - timedelta(days=days)
-        events = self.repo.get_all(start_date=start_date, limit=10000)
+        hourly = self.repo.count_by_period("hour", start_date=start_date)
 
-        # Count by hour
+        # Fold "YYYY-MM-DD HH:00" buckets by hour of day
         hourly_counts: dict[int, int] = defaultdict(int)
-        for event in events:
-            occurred_at = event.occurred_at
-            if occurred_at.tzinfo is not None:
-                occurred_at = occurred_at.replace(tzinfo=None)
-
-            hourly_counts[occurred_at.hour] += 1
+        for bucket, count in hourly:
+            hourly_counts[int(bucket[11:13])] += count
 
         # Create result with all 24 hours
         result = [{"hour": hour, "count": hourly_counts.get(hour, 0)} for hour in range(24)]
@@ -8,7 +8,7 @@ from __future__ import annotations
 
 import asyncio
 from collections import defaultdict
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from typing import Any, Protocol
@@ -106,6 +106,8 @@ class GlobalEventBus:
     - Event type filtering (handlers only receive matching events)
     - Error isolation (one handler failure doesn't affect others)
     - Structured logging of all events and handler execution
+    - Per-event-type dispatch cache, invalidated on subscribe/unsubscribe
+    - Batched publishing (:meth:`publish_many`) for bulk operations
 
     Example:
         >>> bus = GlobalEventBus()
@@ -117,6 +119,8 @@ class GlobalEventBus:
         """Initialize the event bus."""
         self._handlers: dict[type[BaseEvent], list[_HandlerRegistration]] = defaultdict(list)
         self._event_count: dict[str, int] = defaultdict(int)
+        # Concrete event type -> matching registrations, sorted by priority
+        self._dispatch_cache: dict[type[BaseEvent], tuple[_HandlerRegistration, ...]] = {}
 
     def subscribe(
         self,
@@ -149,6 +153,7 @@ class GlobalEventBus:
 
         # Sort handlers by priority (descending)
         self._handlers[event_type].sort(key=lambda r: r.priority, reverse=True)
+        self._dispatch_cache.clear()
 
         logger.debug(
             "handler_registered",
@@ -173,6 +178,7 @@ class GlobalEventBus:
             self._handlers[event_type] = [
                 reg for reg in self._handlers[event_type] if reg.handler != handler
             ]
+            self._dispatch_cache.clear()
 
             logger.debug(
                 "handler_unregistered",
@@ -211,7 +217,45 @@ class GlobalEventBus:
             logger.debug("no_handlers_found", event_type=event_name)
             return
 
-        # Execute handlers by priority
+        self._dispatch(event, event_name, handlers)
+
+    def publish_many(self, events: Iterable[BaseEvent]) -> None:
+        """Publish a batch of events synchronously.
+
+        Events are grouped by type: handlers are resolved once per type and a
+        single summary line is logged for the whole batch. Events of the same
+        type are delivered in their original order; types are delivered in the
+        order they first appear.
+
+        Args:
+            events: Events to publish
+
+        Example:
+            >>> bus.publish_many(InvoiceCreatedEvent(...) for fattura in fatture)
+        """
+        groups: dict[type[BaseEvent], list[BaseEvent]] = {}
+        for event in events:
+            groups.setdefault(type(event), []).append(event)
+        if not groups:
+            return
+
+        counts = {event_type.__name__: len(batch) for event_type, batch in groups.items()}
+        for event_name, count in counts.items():
+            self._event_count[event_name] += count
+        logger.info("events_published_batch", total=sum(counts.values()), event_types=counts)
+
+        for event_type, batch in groups.items():
+            handlers = self._handlers_for_type(event_type)
+            for event in batch:
+                self._dispatch(event, event_type.__name__, handlers)
+
+    def _dispatch(
+        self,
+        event: BaseEvent,
+        event_name: str,
+        handlers: tuple[_HandlerRegistration, ...],
+    ) -> None:
+        """Execute resolved handlers by priority (sync now, async scheduled)."""
         for registration in handlers:
             try:
                 if registration.is_async:
@@ -316,21 +360,33 @@ class GlobalEventBus:
                 exc_info=True,
             )
 
-    def _get_handlers_for_event(self, event: BaseEvent) -> list[_HandlerRegistration]:
+    def _get_handlers_for_event(self, event: BaseEvent) -> tuple[_HandlerRegistration, ...]:
         """Get all handlers that should receive this event.
 
         Checks for exact type match and inheritance (subclasses).
         """
-        handlers: list[_HandlerRegistration] = []
+        return self._handlers_for_type(type(event))
 
-        for event_type, registrations in self._handlers.items():
-            if isinstance(event, event_type):
-                handlers.extend(registrations)
+    def _handlers_for_type(self, event_type: type[BaseEvent]) -> tuple[_HandlerRegistration, ...]:
+        """Resolve the handlers of a concrete event type, cached until the next (un)subscribe.
+
+        Registrations of every class in the type's MRO are merged in
+        subscription order, then sorted by priority (stable, descending).
+        """
+        cached = self._dispatch_cache.get(event_type)
+        if cached is not None:
+            return cached
 
-        # Sort by priority (should already be sorted per event type, but ensure global order)
+        mro = set(event_type.__mro__)
+        handlers: list[_HandlerRegistration] = []
+        for registered_type, registrations in self._handlers.items():
+            if registered_type in mro:
+                handlers.extend(registrations)
         handlers.sort(key=lambda r: r.priority, reverse=True)
 
-        return handlers
+        resolved = tuple(handlers)
+        self._dispatch_cache[event_type] = resolved
+        return resolved
 
     def get_stats(self) -> dict[str, Any]:
         """Get event bus statistics.
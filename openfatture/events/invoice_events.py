@@ -1,6 +1,7 @@
 """Invoice lifecycle events.
 
-Events emitted during invoice operations (creation, validation, sending, deletion).
+Events emitted during invoice operations (creation, updates, validation,
+sending, deletion).
 """
 
 from __future__ import annotations
@@ -28,6 +29,35 @@ class InvoiceCreatedEvent(BaseEvent):
     currency: str = "EUR"
 
 
+@dataclass(frozen=True)
+class InvoiceUpdatedEvent(BaseEvent):
+    """Event emitted when a draft invoice or its line items are modified.
+
+    Triggered after the changes are saved to database.
+
+    Hook point: post-invoice-update
+    """
+
+    invoice_id: int
+    invoice_number: str
+    updated_fields: list[str]
+
+
+@dataclass(frozen=True)
+class InvoiceStatusChangedEvent(BaseEvent):
+    """Event emitted when an invoice status is changed manually.
+
+    Triggered after the new status is saved to database.
+
+    Hook point: post-invoice-status-changed
+    """
+
+    invoice_id: int
+    invoice_number: str
+    old_status: str
+    new_status: str
+
+
 @dataclass(frozen=True)
 class InvoiceValidatedEvent(BaseEvent):
     """Event emitted after invoice XML validation.
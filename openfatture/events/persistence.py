@@ -27,6 +27,8 @@ class EventPersistenceListener:
     This listener runs with low priority (-100) to ensure it doesn't impact
     the performance of critical event handlers. Failed persistence attempts
     are logged but don't propagate exceptions to avoid breaking the event bus.
+    The hourly ``event_rollups`` and the payload search index are updated in
+    the same transaction by the storage flush hooks.
     """
 
     def __init__(self) -> None:
@@ -6,18 +6,21 @@ import json
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from openfatture.storage.database.base import get_session
 from openfatture.storage.database.models import EventLog
+from openfatture.storage.event_rollups import count_events
+from openfatture.storage.search import SEARCH_EVENTS, SearchIndex, contains_ids
 
 
 class EventRepository:
     """Repository for querying event audit logs.
 
     Provides high-level query methods for retrieving and analyzing
-    persisted domain events.
+    persisted domain events. Counts and statistics are grouped in the database
+    (from the hourly ``event_rollups`` where possible) and never load events.
     """
 
     def __init__(self, session: Session | None = None):
@@ -172,49 +175,31 @@ class EventRepository:
             Dictionary with statistics
         """
         db = self._get_session()
-        query = db.query(EventLog)
 
-        # Apply date filters
+        # Events by type and by entity type, summed from the rollups
+        events_by_type = count_events(db, by=("event_type",), start=start_date, end=end_date)
+        events_by_entity = count_events(db, by=("entity_type",), start=start_date, end=end_date)
+        total_events = sum(events_by_type.values())
+
+        bounds = select(EventLog.event_type, EventLog.occurred_at)
         if start_date:
-            query = query.filter(EventLog.occurred_at >= start_date)
+            bounds = bounds.where(EventLog.occurred_at >= start_date)
         if end_date:
-            query = query.filter(EventLog.occurred_at <= end_date)
+            bounds = bounds.where(EventLog.occurred_at <= end_date)
 
-        # Total events
-        total_events = query.count()
-
-        # Events by type
-        events_by_type = (
-            query.with_entities(EventLog.event_type, func.count(EventLog.id))
-            .group_by(EventLog.event_type)
-            .all()
-        )
-
-        # Events by entity type
-        events_by_entity = (
-            query.filter(EventLog.entity_type.isnot(None))
-            .with_entities(EventLog.entity_type, func.count(EventLog.id))
-            .group_by(EventLog.entity_type)
-            .all()
-        )
-
-        # Most recent event
-        most_recent = query.order_by(EventLog.occurred_at.desc()).first()
-
-        # Oldest event
-        oldest = query.order_by(EventLog.occurred_at.asc()).first()
+        # Most recent and oldest event (occurred_at index)
+        most_recent = db.execute(bounds.order_by(EventLog.occurred_at.desc()).limit(1)).first()
+        oldest = db.execute(bounds.order_by(EventLog.occurred_at.asc()).limit(1)).first()
 
         if self._owns_session:
             db.close()
 
-        # Convert Row objects to tuples for dict()
-        events_by_type_list = [(row[0], row[1]) for row in events_by_type]
-        events_by_entity_list = [(row[0], row[1]) for row in events_by_entity]
-
         return {
             "total_events": total_events,
-            "events_by_type": dict(events_by_type_list),
-            "events_by_entity": dict(events_by_entity_list),
+            "events_by_type": {key[0]: n for key, n in events_by_type.items()},
+            "events_by_entity": {
+                key[0]: n for key, n in events_by_entity.items() if key[0] is not None
+            },
             "most_recent_event": (
                 {
                     "event_type": most_recent.event_type,
@@ -256,24 +241,98 @@ class EventRepository:
             Number of matching events
         """
         db = self._get_session()
-        query = db.query(EventLog)
+        counts = count_events(
+            db,
+            event_type=event_type,
+            entity_type=entity_type,
+            start=start_date,
+            end=end_date,
+        )
+        count = counts.get((), 0)
 
-        # Apply filters
-        if event_type:
-            query = query.filter(EventLog.event_type == event_type)
-        if entity_type:
-            query = query.filter(EventLog.entity_type == entity_type)
+        if self._owns_session:
+            db.close()
+
+        return count
+
+    def count_by_period(
+        self,
+        period: str,
+        event_type: str | None = None,
+        entity_type: str | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> list[tuple[str, int]]:
+        """Count events per time bucket, grouped in the database.
+
+        Args:
+            period: ``"hour"``, ``"day"`` or ``"month"``
+            event_type: Filter by event type
+            entity_type: Filter by entity type
+            start_date: Filter events after this date
+            end_date: Filter events before this date
+
+        Returns:
+            ``(bucket, count)`` pairs in chronological order, only for buckets
+            with events. Buckets are UTC, formatted as ``"2025-01-31 09:00"``,
+            ``"2025-01-31"`` or ``"2025-01"``.
+        """
+        db = self._get_session()
+        counts = count_events(
+            db,
+            period=period,
+            event_type=event_type,
+            entity_type=entity_type,
+            start=start_date,
+            end=end_date,
+        )
+
+        if self._owns_session:
+            db.close()
+
+        return sorted((key[0], n) for key, n in counts.items())
+
+    def count_by_entity(
+        self,
+        entity_type: str,
+        limit: int = 10,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> list[tuple[int, int]]:
+        """Count events per entity of a type, most active first.
+
+        Args:
+            entity_type: Entity type (e.g., "invoice", "client")
+            limit: Maximum number of entities
+            start_date: Filter events after this date
+            end_date: Filter events before this date
+
+        Returns:
+            ``(entity_id, count)`` pairs, ordered by count (ties by entity ID)
+        """
+        db = self._get_session()
+        event_count = func.count(EventLog.id)
+        stmt = select(EventLog.entity_id, event_count).where(
+            EventLog.entity_type == entity_type, EventLog.entity_id.isnot(None)
+        )
         if start_date:
-            query = query.filter(EventLog.occurred_at >= start_date)
+            stmt = stmt.where(EventLog.occurred_at >= start_date)
         if end_date:
-            query = query.filter(EventLog.occurred_at <= end_date)
+            stmt = stmt.where(EventLog.occurred_at <= end_date)
+        stmt = (
+            stmt.group_by(EventLog.entity_id)
+            .order_by(event_count.desc(), EventLog.entity_id)
+            .limit(limit)
+        )
 
-        count = query.count()
+        results = [
+            (entity_id, count) for entity_id, count in db.execute(stmt) if entity_id is not None
+        ]
 
         if self._owns_session:
             db.close()
 
-        return count
+        return results
 
     def _create_event_summary(self, event_type: str, event_data: dict[str, Any]) -> str:
         """Create human-readable event summary.
@@ -312,7 +371,7 @@ class EventRepository:
             return event_type.replace("Event", "")
 
     def search(self, query: str, limit: int = 100) -> list[EventLog]:
-        """Search events by text in event_data.
+        """Search events by text in event_data (case-insensitive substring).
 
         Args:
             query: Search query string
@@ -323,10 +382,14 @@ class EventRepository:
         """
         db = self._get_session()
 
-        # SQLite full-text search using LIKE
+        # Substring match on the payload, answered by the trigram index when available
+        if SearchIndex(db).available():
+            matches = EventLog.id.in_(contains_ids(SEARCH_EVENTS, "event_data", query))
+        else:
+            matches = EventLog.event_data.like(f"%{query}%")
         results = (
             db.query(EventLog)
-            .filter(EventLog.event_data.like(f"%{query}%"))
+            .filter(matches)
             .order_by(EventLog.occurred_at.desc())
             .limit(limit)
             .all()
@@ -6,6 +6,7 @@ lifecycle events (invoice creation, AI commands, SDI notifications, etc.).
 Architecture:
     - Models: HookConfig, HookResult, HookMetadata
     - Executor: Runs hook scripts with timeout, env vars, error handling
+    - Pool: Runs hooks concurrently, keeping persistent hooks alive between events
     - Registry: Discovers and manages hooks from ~/.openfatture/hooks/
     - Bridge: Connects events to hooks automatically
 
@@ -40,6 +41,8 @@ __all__ = [
     # Executor
     "HookExecutor",
     "HookExecutionError",
+    # Pool
+    "HookWorkerPool",
     # Registry
     "HookRegistry",
     "get_hook_registry",
@@ -52,4 +55,5 @@ __all__ = [
 from .executor import HookExecutionError, HookExecutor
 from .listeners import HookEventBridge, get_hook_bridge, initialize_hook_system
 from .models import HookConfig, HookMetadata, HookResult
+from .pool import HookWorkerPool
 from .registry import HookRegistry, get_hook_registry
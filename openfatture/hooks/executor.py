@@ -9,10 +9,12 @@ from __future__ import annotations
 import asyncio
 import json
 import os
+import signal
 import subprocess
 import time
 from dataclasses import asdict
 from pathlib import Path
+from typing import Any
 
 import structlog
 
@@ -23,6 +25,54 @@ from .models import HookConfig, HookResult
 logger = structlog.get_logger("hooks.executor")
 
 
+def event_payload(event: BaseEvent) -> dict[str, Any]:
+    """Event fields as a JSON-serializable dictionary."""
+    event_data = asdict(event)
+    # Convert non-serializable types
+    if "event_id" in event_data:
+        event_data["event_id"] = str(event_data["event_id"])
+    if "occurred_at" in event_data:
+        event_data["occurred_at"] = event_data["occurred_at"].isoformat()
+    return event_data
+
+
+def parse_response(line: str) -> tuple[int, str, str]:
+    """Parse the JSON response line of a persistent hook.
+
+    The response is an object with optional ``exit_code`` (default 0),
+    ``stdout`` and ``stderr`` keys.
+
+    Returns:
+        Tuple of (exit_code, stdout, stderr); an invalid line yields exit code 1
+    """
+    try:
+        response = json.loads(line)
+        if not isinstance(response, dict):
+            raise ValueError("response is not a JSON object")
+        return (
+            int(response.get("exit_code", 0)),
+            str(response.get("stdout", "")),
+            str(response.get("stderr", "")),
+        )
+    except (TypeError, ValueError) as e:
+        return 1, line, f"Invalid persistent hook response: {e}"
+
+
+def kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill a hook together with the commands it started.
+
+    Hooks run in their own session (POSIX): killing only the script would leave
+    its children (e.g. ``sleep`` in a shell hook) holding the output pipes open.
+    """
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
 class HookExecutionError(Exception):
     """Exception raised when hook execution fails with fail_on_error=True."""
 
@@ -98,14 +148,7 @@ class HookExecutor:
         """
         if not config.enabled:
             logger.debug("hook_disabled", hook=config.name)
-            return HookResult(
-                hook_name=config.name,
-                success=True,
-                exit_code=0,
-                stdout="",
-                stderr="Hook is disabled",
-                duration_ms=0.0,
-            )
+            return self._disabled_result(config)
 
         start_time = time.perf_counter()
 
@@ -122,100 +165,248 @@ class HookExecutor:
                 timeout=config.timeout_seconds,
             )
 
-            result = self._run_script(config, hook_env)
-
-            duration_ms = (time.perf_counter() - start_time) * 1000
+            stdin = self.build_request(config, event) if config.persistent else None
+            result = self._run_script(config, hook_env, stdin)
 
-            # Build result
-            hook_result = HookResult(
-                hook_name=config.name,
-                success=result.returncode == 0,
-                exit_code=result.returncode,
-                stdout=result.stdout.decode("utf-8", errors="replace").strip(),
-                stderr=result.stderr.decode("utf-8", errors="replace").strip(),
-                duration_ms=duration_ms,
-                timed_out=False,
+            return self._completed_result(
+                config, result.returncode, result.stdout, result.stderr, start_time
             )
 
-            # Log result
-            log_method = logger.info if hook_result.success else logger.warning
-            log_method(
-                "hook_executed",
-                hook=config.name,
-                success=hook_result.success,
-                exit_code=hook_result.exit_code,
-                duration_ms=duration_ms,
-                stdout_length=len(hook_result.stdout),
-                stderr_length=len(hook_result.stderr),
-            )
+        except subprocess.TimeoutExpired as e:
+            return self.timeout_result(config, e.stdout, e.stderr, start_time, e)
 
-            # Check fail_on_error
-            if not hook_result.success and config.fail_on_error:
-                raise HookExecutionError(
-                    f"Hook '{config.name}' failed with exit code {hook_result.exit_code}",
-                    hook_result,
-                )
+        except HookExecutionError:
+            raise
 
-            return hook_result
+        except Exception as e:
+            return self.error_result(config, e, start_time)
 
-        except subprocess.TimeoutExpired as e:
-            duration_ms = (time.perf_counter() - start_time) * 1000
+    async def execute_hook_async(
+        self,
+        config: HookConfig,
+        event: BaseEvent,
+        env_vars: dict[str, str] | None = None,
+    ) -> HookResult:
+        """Execute a hook as an asyncio subprocess, without blocking the event loop.
+
+        Same semantics as :meth:`execute_hook` (timeout, env vars, fail_on_error).
+
+        Args:
+            config: Hook configuration
+            event: The event
+            env_vars: Additional environment variables
 
-            logger.error(
-                "hook_timeout",
+        Returns:
+            HookResult
+
+        Raises:
+            HookExecutionError: If hook fails and config.fail_on_error is True
+
+        Example:
+            >>> result = await executor.execute_hook_async(config, event)
+        """
+        if not config.enabled:
+            logger.debug("hook_disabled", hook=config.name)
+            return self._disabled_result(config)
+
+        start_time = time.perf_counter()
+        process: asyncio.subprocess.Process | None = None
+        readers: list[asyncio.Task[bytes]] = []
+
+        try:
+            hook_env = self._build_env_vars(config, event, env_vars or {})
+            logger.info(
+                "hook_executing",
                 hook=config.name,
+                script=str(config.script_path),
+                event_type=event.__class__.__name__,
                 timeout=config.timeout_seconds,
-                duration_ms=duration_ms,
             )
 
-            timeout_result = HookResult(
-                hook_name=config.name,
-                success=False,
-                exit_code=-1,
-                stdout=(e.stdout.decode("utf-8", errors="replace") if e.stdout else ""),
-                stderr=(e.stderr.decode("utf-8", errors="replace") if e.stderr else ""),
-                duration_ms=duration_ms,
-                error=f"Hook timed out after {config.timeout_seconds}s",
-                timed_out=True,
+            process = await asyncio.create_subprocess_exec(
+                *self.build_command(config),
+                stdin=asyncio.subprocess.PIPE if config.persistent else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=hook_env,
+                cwd=self.hooks_dir,
+                start_new_session=os.name == "posix",
             )
+            if config.persistent:
+                assert process.stdin is not None
+                process.stdin.write(self.build_request(config, event))
+                await process.stdin.drain()
+                process.stdin.close()
+            # Read output concurrently so partial output survives a timeout
+            assert process.stdout is not None and process.stderr is not None
+            readers = [
+                asyncio.create_task(process.stdout.read()),
+                asyncio.create_task(process.stderr.read()),
+            ]
+            try:
+                returncode = await asyncio.wait_for(process.wait(), config.timeout_seconds)
+            except TimeoutError as e:
+                kill_process_group(process)
+                await process.wait()
+                stdout, stderr = await asyncio.gather(*readers)
+                return self.timeout_result(config, stdout, stderr, start_time, e)
+
+            stdout, stderr = await asyncio.gather(*readers)
+            return self._completed_result(config, returncode, stdout, stderr, start_time)
+
+        except HookExecutionError:
+            raise
+
+        except Exception as e:
+            if process is not None and process.returncode is None:
+                kill_process_group(process)
+            for reader in readers:
+                reader.cancel()
+            return self.error_result(config, e, start_time)
+
+    def _disabled_result(self, config: HookConfig) -> HookResult:
+        return HookResult(
+            hook_name=config.name,
+            success=True,
+            exit_code=0,
+            stdout="",
+            stderr="Hook is disabled",
+            duration_ms=0.0,
+        )
 
-            if config.fail_on_error:
-                raise HookExecutionError(
-                    f"Hook '{config.name}' timed out after {config.timeout_seconds}s",
-                    timeout_result,
-                ) from e
+    def _completed_result(
+        self,
+        config: HookConfig,
+        returncode: int,
+        stdout: bytes,
+        stderr: bytes,
+        start_time: float,
+    ) -> HookResult:
+        """Build (and log) the result of a finished hook process.
 
-            return timeout_result
+        Raises:
+            HookExecutionError: If the hook failed and config.fail_on_error is True
+        """
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        stdout_text = stdout.decode("utf-8", errors="replace").strip()
+        stderr_text = stderr.decode("utf-8", errors="replace").strip()
+        if config.persistent and returncode == 0:
+            # One-shot run of a persistent hook: stdout holds its JSON response
+            returncode, stdout_text, reply_stderr = parse_response(stdout_text)
+            stderr_text = "\n".join(filter(None, (stderr_text, reply_stderr)))
+
+        hook_result = HookResult(
+            hook_name=config.name,
+            success=returncode == 0,
+            exit_code=returncode,
+            stdout=stdout_text,
+            stderr=stderr_text,
+            duration_ms=duration_ms,
+            timed_out=False,
+        )
+        return self.finish(config, hook_result)
 
-        except Exception as e:
-            duration_ms = (time.perf_counter() - start_time) * 1000
+    def finish(self, config: HookConfig, hook_result: HookResult) -> HookResult:
+        """Log a hook result and enforce ``fail_on_error``.
 
-            logger.error(
-                "hook_execution_failed",
-                hook=config.name,
-                error=str(e),
-                error_type=type(e).__name__,
-                duration_ms=duration_ms,
-                exc_info=True,
-            )
+        Raises:
+            HookExecutionError: If the hook failed and config.fail_on_error is True
+        """
+        log_method = logger.info if hook_result.success else logger.warning
+        log_method(
+            "hook_executed",
+            hook=config.name,
+            success=hook_result.success,
+            exit_code=hook_result.exit_code,
+            duration_ms=hook_result.duration_ms,
+            stdout_length=len(hook_result.stdout),
+            stderr_length=len(hook_result.stderr),
+        )
 
-            error_result = HookResult(
-                hook_name=config.name,
-                success=False,
-                exit_code=-1,
-                stdout="",
-                stderr="",
-                duration_ms=duration_ms,
-                error=str(e),
+        # Check fail_on_error
+        if not hook_result.success and config.fail_on_error:
+            raise HookExecutionError(
+                f"Hook '{config.name}' failed with exit code {hook_result.exit_code}",
+                hook_result,
             )
 
-            if config.fail_on_error:
-                raise HookExecutionError(
-                    f"Hook '{config.name}' failed: {e}",
-                    error_result,
-                ) from e
+        return hook_result
 
-            return error_result
+    def timeout_result(
+        self,
+        config: HookConfig,
+        stdout: bytes | None,
+        stderr: bytes | None,
+        start_time: float,
+        cause: BaseException,
+    ) -> HookResult:
+        """Build (and log) the result of a hook killed by its timeout.
+
+        Raises:
+            HookExecutionError: If config.fail_on_error is True
+        """
+        duration_ms = (time.perf_counter() - start_time) * 1000
+
+        logger.error(
+            "hook_timeout",
+            hook=config.name,
+            timeout=config.timeout_seconds,
+            duration_ms=duration_ms,
+        )
+
+        timeout_result = HookResult(
+            hook_name=config.name,
+            success=False,
+            exit_code=-1,
+            stdout=(stdout.decode("utf-8", errors="replace") if stdout else ""),
+            stderr=(stderr.decode("utf-8", errors="replace") if stderr else ""),
+            duration_ms=duration_ms,
+            error=f"Hook timed out after {config.timeout_seconds}s",
+            timed_out=True,
+        )
+
+        if config.fail_on_error:
+            raise HookExecutionError(
+                f"Hook '{config.name}' timed out after {config.timeout_seconds}s",
+                timeout_result,
+            ) from cause
+
+        return timeout_result
+
+    def error_result(self, config: HookConfig, error: Exception, start_time: float) -> HookResult:
+        """Build (and log) the result of a hook that could not run.
+
+        Raises:
+            HookExecutionError: If config.fail_on_error is True
+        """
+        duration_ms = (time.perf_counter() - start_time) * 1000
+
+        logger.error(
+            "hook_execution_failed",
+            hook=config.name,
+            error=str(error),
+            error_type=type(error).__name__,
+            duration_ms=duration_ms,
+            exc_info=True,
+        )
+
+        error_result = HookResult(
+            hook_name=config.name,
+            success=False,
+            exit_code=-1,
+            stdout="",
+            stderr="",
+            duration_ms=duration_ms,
+            error=str(error),
+        )
+
+        if config.fail_on_error:
+            raise HookExecutionError(
+                f"Hook '{config.name}' failed: {error}",
+                error_result,
+            ) from error
+
+        return error_result
 
     def _build_env_vars(
         self,
@@ -249,12 +440,7 @@ class HookExecutor:
         env["OPENFATTURE_EVENT_TIME"] = event.occurred_at.isoformat()
 
         # Event data as JSON
-        event_data = asdict(event)
-        # Convert non-serializable types
-        if "event_id" in event_data:
-            event_data["event_id"] = str(event_data["event_id"])
-        if "occurred_at" in event_data:
-            event_data["occurred_at"] = event_data["occurred_at"].isoformat()
+        event_data = event_payload(event)
 
         env["OPENFATTURE_EVENT_DATA"] = json.dumps(event_data, default=str)
 
@@ -272,65 +458,64 @@ class HookExecutor:
 
         return env
 
-    def _run_script(self, config: HookConfig, env: dict[str, str]) -> subprocess.CompletedProcess:
-        """Run hook script with subprocess.
-
-        Args:
-            config: Hook configuration
-            env: Environment variables
+    def build_base_env(self, config: HookConfig) -> dict[str, str]:
+        """Environment of a persistent hook process (events arrive on stdin instead).
 
-        Returns:
-            CompletedProcess with stdout, stderr, returncode
+        Combines the current process environment, OPENFATTURE_HOOK_NAME,
+        OPENFATTURE_HOOK_PERSISTENT=1 and the config env_vars.
         """
+        env = dict(os.environ)
+        env["OPENFATTURE_HOOK_NAME"] = config.name
+        env["OPENFATTURE_HOOK_PERSISTENT"] = "1"
+        env.update(config.env_vars)
+        return env
+
+    def build_command(self, config: HookConfig) -> list[str]:
+        """Command line running the hook script (interpreter chosen by extension)."""
         script_path = config.script_path
 
         # Determine interpreter based on file extension
         suffix = script_path.suffix.lower()
 
         if suffix in (".sh", ".bash"):
-            command = ["/bin/bash", str(script_path)]
-        elif suffix == ".py":
-            command = ["python", str(script_path)]
-        else:
-            # Default to making file executable and running directly
-            command = [str(script_path)]
+            return ["/bin/bash", str(script_path)]
+        if suffix == ".py":
+            return ["python", str(script_path)]
+        # Default to making file executable and running directly
+        return [str(script_path)]
+
+    def build_request(self, config: HookConfig, event: BaseEvent) -> bytes:
+        """JSON line sent on stdin to a persistent hook for one event."""
+        request = {
+            "hook": config.name,
+            "event_type": event.__class__.__name__,
+            "event_id": str(event.event_id),
+            "occurred_at": event.occurred_at.isoformat(),
+            "data": event_payload(event),
+        }
+        return (json.dumps(request, default=str) + "\n").encode("utf-8")
+
+    def _run_script(
+        self, config: HookConfig, env: dict[str, str], stdin: bytes | None = None
+    ) -> subprocess.CompletedProcess:
+        """Run hook script with subprocess.
+
+        Args:
+            config: Hook configuration
+            env: Environment variables
+            stdin: Data written to the script's stdin (persistent hooks)
 
+        Returns:
+            CompletedProcess with stdout, stderr, returncode
+        """
         # Execute with timeout
         result = subprocess.run(
-            command,
+            self.build_command(config),
             env=env,
+            input=stdin,
             capture_output=True,
             timeout=config.timeout_seconds,
             cwd=self.hooks_dir,
         )
 
         return result
-
-    async def execute_hook_async(
-        self,
-        config: HookConfig,
-        event: BaseEvent,
-        env_vars: dict[str, str] | None = None,
-    ) -> HookResult:
-        """Execute a hook asynchronously in a background thread.
-
-        Args:
-            config: Hook configuration
-            event: The event
-            env_vars: Additional environment variables
-
-        Returns:
-            HookResult
-
-        Example:
-            >>> result = await executor.execute_hook_async(config, event)
-        """
-        # Run in executor to avoid blocking event loop
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self.execute_hook,
-            config,
-            event,
-            env_vars,
-        )
@@ -6,11 +6,17 @@ triggering hooks when matching events are published.
 
 from __future__ import annotations
 
+from concurrent.futures import Future
+from functools import partial
+
 import structlog
 
 from openfatture.events.base import BaseEvent, GlobalEventBus, get_global_event_bus
+from openfatture.platform.config import get_settings
 
 from .executor import HookExecutionError, HookExecutor
+from .models import HookConfig, HookResult
+from .pool import HookWorkerPool
 from .registry import HookRegistry, get_hook_registry
 
 logger = structlog.get_logger("hooks.listeners")
@@ -22,6 +28,10 @@ class HookEventBridge:
     Listens to all events and automatically executes matching hooks
     when events are published to the event bus.
 
+    With ``max_workers`` set, hooks run on a :class:`HookWorkerPool`: the
+    publisher only waits for hooks with ``fail_on_error`` (so they can still halt
+    the triggering operation); the others run in the background.
+
     Example:
         >>> bridge = HookEventBridge()
         >>> bridge.register(event_bus)
@@ -33,20 +43,25 @@ class HookEventBridge:
         self,
         executor: HookExecutor | None = None,
         registry: HookRegistry | None = None,
+        max_workers: int | None = None,
     ):
         """Initialize hook-event bridge.
 
         Args:
             executor: Hook executor instance (creates new if None)
             registry: Hook registry instance (uses global if None)
+            max_workers: Run hooks on a worker pool of this size (None = run
+                them one after another in the publishing thread)
         """
         self.executor = executor or HookExecutor()
         self.registry = registry or get_hook_registry()
+        self.pool = HookWorkerPool(self.executor, max_workers) if max_workers else None
 
         logger.info(
             "hook_event_bridge_initialized",
             hooks_dir=str(self.registry.hooks_dir),
             hook_count=len(self.registry.list_hooks()),
+            max_workers=max_workers,
         )
 
     def register(self, event_bus: GlobalEventBus | None = None) -> None:
@@ -83,62 +98,126 @@ class HookEventBridge:
             hooks=[h.name for h in hooks],
         )
 
+        if self.pool is not None:
+            self._dispatch_to_pool(hooks, event)
+            return
+
         # Execute each matching hook
         for hook_config in hooks:
             try:
                 result = self.executor.execute_hook(hook_config, event)
-
-                if result.success:
-                    logger.info(
-                        "hook_succeeded",
-                        hook=hook_config.name,
-                        event_type=event_name,
-                        duration_ms=result.duration_ms,
-                    )
-                else:
-                    logger.warning(
-                        "hook_failed",
-                        hook=hook_config.name,
-                        event_type=event_name,
-                        exit_code=result.exit_code,
-                        error=result.error,
-                        stderr=result.stderr[:200],  # Truncate for logging
-                    )
+                self._log_result(hook_config, event_name, result)
 
             except HookExecutionError as e:
                 # Hook failed with fail_on_error=True
-                logger.error(
-                    "hook_execution_error_critical",
-                    hook=hook_config.name,
-                    event_type=event_name,
-                    error=str(e),
-                )
+                self._log_critical(hook_config, event_name, e)
                 # Re-raise to potentially halt the triggering operation
                 raise
 
             except Exception as e:
                 # Unexpected error - log but don't halt
-                logger.error(
-                    "hook_execution_exception",
-                    hook=hook_config.name,
-                    event_type=event_name,
-                    error=str(e),
-                    error_type=type(e).__name__,
-                    exc_info=True,
-                )
+                self._log_exception(hook_config, event_name, e)
+
+    def _dispatch_to_pool(self, hooks: list[HookConfig], event: BaseEvent) -> None:
+        """Fan hooks out to the pool, waiting only for the ``fail_on_error`` ones."""
+        assert self.pool is not None
+        event_name = event.__class__.__name__
+
+        blocking: list[tuple[HookConfig, Future[HookResult]]] = []
+        for hook_config in hooks:
+            future = self.pool.submit(hook_config, event)
+            if hook_config.fail_on_error:
+                blocking.append((hook_config, future))
+            else:
+                future.add_done_callback(partial(self._log_future, hook_config, event_name))
+
+        for hook_config, future in blocking:
+            try:
+                self._log_result(hook_config, event_name, future.result())
+            except HookExecutionError as e:
+                self._log_critical(hook_config, event_name, e)
+                raise
+            except Exception as e:
+                self._log_exception(hook_config, event_name, e)
+
+    def _log_future(
+        self, hook_config: HookConfig, event_name: str, future: Future[HookResult]
+    ) -> None:
+        if future.cancelled():
+            logger.warning("hook_cancelled", hook=hook_config.name, event_type=event_name)
+            return
+        error = future.exception()
+        if error is None:
+            self._log_result(hook_config, event_name, future.result())
+        else:
+            self._log_exception(hook_config, event_name, error)
+
+    def _log_result(self, hook_config: HookConfig, event_name: str, result: HookResult) -> None:
+        if result.success:
+            logger.info(
+                "hook_succeeded",
+                hook=hook_config.name,
+                event_type=event_name,
+                duration_ms=result.duration_ms,
+            )
+        else:
+            logger.warning(
+                "hook_failed",
+                hook=hook_config.name,
+                event_type=event_name,
+                exit_code=result.exit_code,
+                error=result.error,
+                stderr=result.stderr[:200],  # Truncate for logging
+            )
+
+    def _log_critical(
+        self, hook_config: HookConfig, event_name: str, error: HookExecutionError
+    ) -> None:
+        logger.error(
+            "hook_execution_error_critical",
+            hook=hook_config.name,
+            event_type=event_name,
+            error=str(error),
+        )
+
+    def _log_exception(
+        self, hook_config: HookConfig, event_name: str, error: BaseException
+    ) -> None:
+        logger.error(
+            "hook_execution_exception",
+            hook=hook_config.name,
+            event_type=event_name,
+            error=str(error),
+            error_type=type(error).__name__,
+            exc_info=error,
+        )
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the worker pool (if any) and its persistent hook processes.
+
+        Args:
+            wait: Wait for background hooks to finish first
+        """
+        if self.pool is not None:
+            self.pool.shutdown(wait=wait)
 
 
 # Global bridge instance
 _bridge: HookEventBridge | None = None
 
 
-def initialize_hook_system(event_bus: GlobalEventBus | None = None) -> HookEventBridge:
+def initialize_hook_system(
+    event_bus: GlobalEventBus | None = None,
+    max_workers: int | None = None,
+) -> HookEventBridge:
     """Initialize the hook system and register with event bus.
 
     This is the main entry point for setting up the hook system.
 
     Args:
         event_bus: Event bus instance (uses global if None)
+        max_workers: Size of the hook worker pool (uses settings.hook_workers
+            if None; 0 runs hooks inline)
 
     Returns:
         HookEventBridge instance
@@ -150,7 +229,9 @@ def initialize_hook_system(event_bus: GlobalEventBus | None = None) -> HookEvent
     global _bridge
 
     if _bridge is None:
-        _bridge = HookEventBridge()
+        if max_workers is None:
+            max_workers = get_settings().hook_workers
+        _bridge = HookEventBridge(max_workers=max_workers or None)
 
     event_bus = event_bus or get_global_event_bus()
     _bridge.register(event_bus)
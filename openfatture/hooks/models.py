@@ -21,6 +21,8 @@ class HookConfig:
         fail_on_error: If True, halt the triggering operation on hook failure
         env_vars: Additional environment variables to pass to the hook
         description: Optional human-readable description
+        persistent: If True, the script is a long-lived process reading one JSON
+            event per line on stdin and answering one JSON line per event
 
     Example:
         >>> config = HookConfig(
@@ -38,6 +40,7 @@ class HookConfig:
     fail_on_error: bool = False
     env_vars: dict[str, str] = field(default_factory=dict)
     description: str | None = None
+    persistent: bool = False
 
     def __post_init__(self) -> None:
         """Validate hook configuration after initialization."""
@@ -107,18 +110,21 @@ class HookMetadata:
         # AUTHOR: John Doe
         # REQUIRES: curl, jq
         # TIMEOUT: 15
+        # PERSISTENT: true
 
     Attributes:
         description: Hook description
         author: Hook author
         requires: Required dependencies (commands/tools)
         timeout: Recommended timeout in seconds
+        persistent: Whether the script speaks the persistent stdin/stdout protocol
     """
 
     description: str | None = None
     author: str | None = None
     requires: list[str] = field(default_factory=list)
     timeout: int | None = None
+    persistent: bool = False
 
     @classmethod
     def from_script(cls, script_path: Path) -> HookMetadata:
@@ -162,6 +168,8 @@ class HookMetadata:
                                 metadata.timeout = int(value)
                             except ValueError:
                                 pass
+                        elif key == "persistent":
+                            metadata.persistent = value.lower() in ("1", "true", "yes")
 
         except Exception:
             # If metadata parsing fails, return empty metadata
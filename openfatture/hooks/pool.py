@@ -0,0 +1,365 @@
+"""Bounded worker pool running hooks concurrently.
+
+The pool owns an asyncio event loop in a daemon thread, so sync callers (the
+event bridge during a batch import) and async callers can both fan hooks out
+without waiting for one process after another:
+
+- at most ``max_workers`` hooks run at once, each as an asyncio subprocess with
+  its own timeout (``HookConfig.timeout_seconds``)
+- at most ``max_pending`` hooks may be queued or running: :meth:`HookWorkerPool.submit`
+  blocks the caller beyond that (back-pressure)
+- persistent hooks (``# PERSISTENT: true`` in the script header) are started once
+  and kept alive: every event is written to their stdin as one JSON line and
+  answered with one JSON line on stdout, so Python/Node hooks skip interpreter
+  startup
+
+Example persistent hook (~/.openfatture/hooks/on-invoice-create.py):
+    #!/usr/bin/env python3
+    # PERSISTENT: true
+    import json, sys
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        number = request["data"]["invoice_number"]
+        print(json.dumps({"exit_code": 0, "stdout": f"indexed {number}"}), flush=True)
+
+Example:
+    >>> with HookWorkerPool(HookExecutor(), max_workers=8) as pool:
+    ...     results = pool.map(registry.get_hooks_for_event("InvoiceCreatedEvent"), event)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable
+from types import TracebackType
+
+import structlog
+
+from openfatture.events.base import BaseEvent
+
+from .executor import HookExecutor, kill_process_group, parse_response
+from .models import HookConfig, HookResult
+
+logger = structlog.get_logger("hooks.pool")
+
+# Seconds a persistent hook gets to exit after its stdin is closed
+_CLOSE_GRACE_SECONDS = 2.0
+_STDERR_TAIL_LINES = 20
+
+
+class PersistentHookProcess:
+    """A long-lived persistent hook process, serving one event at a time.
+
+    The process is (re)started on demand: after a crash, a timeout or an invalid
+    response it is discarded and the next event starts a fresh one.
+    """
+
+    def __init__(self, executor: HookExecutor, config: HookConfig) -> None:
+        """Initialize the process wrapper (the process starts on the first request).
+
+        Args:
+            executor: Executor providing the command line, environment and results
+            config: Configuration of the persistent hook
+        """
+        self.executor = executor
+        self.config = config
+        self._process: asyncio.subprocess.Process | None = None
+        self._stderr_reader: asyncio.Task[None] | None = None
+        self._stderr_tail: deque[str] = deque(maxlen=_STDERR_TAIL_LINES)
+        self._lock = asyncio.Lock()
+
+    async def _ensure_started(self) -> asyncio.subprocess.Process:
+        if self._process is not None and self._process.returncode is None:
+            return self._process
+
+        self._process = await asyncio.create_subprocess_exec(
+            *self.executor.build_command(self.config),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self.executor.build_base_env(self.config),
+            cwd=self.executor.hooks_dir,
+            start_new_session=os.name == "posix",
+        )
+        self._stderr_tail.clear()
+        self._stderr_reader = asyncio.create_task(self._drain_stderr(self._process))
+        logger.info("persistent_hook_started", hook=self.config.name, pid=self._process.pid)
+        return self._process
+
+    async def _drain_stderr(self, process: asyncio.subprocess.Process) -> None:
+        # Keep reading so a chatty hook never blocks on a full pipe
+        assert process.stderr is not None
+        async for raw in process.stderr:
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            self._stderr_tail.append(line)
+            logger.debug("persistent_hook_stderr", hook=self.config.name, line=line)
+
+    async def request(self, event: BaseEvent) -> HookResult:
+        """Send one event to the process and wait for its response.
+
+        Returns:
+            HookResult built from the JSON response
+
+        Raises:
+            HookExecutionError: If the hook fails and config.fail_on_error is True
+        """
+        async with self._lock:
+            start_time = time.perf_counter()
+            try:
+                process = await self._ensure_started()
+                assert process.stdin is not None and process.stdout is not None
+                process.stdin.write(self.executor.build_request(self.config, event))
+                await process.stdin.drain()
+                line = await asyncio.wait_for(
+                    process.stdout.readline(), self.config.timeout_seconds
+                )
+            except TimeoutError as e:
+                await self.close(kill=True)
+                return self.executor.timeout_result(self.config, None, None, start_time, e)
+            except (BrokenPipeError, ConnectionResetError) as e:
+                await self.close()
+                return self.executor.error_result(self.config, e, start_time)
+
+            if not line:
+                returncode = await process.wait()
+                tail = "\n".join(self._stderr_tail)
+                await self.close()
+                error = RuntimeError(
+                    f"Persistent hook exited with code {returncode}" + (f": {tail}" if tail else "")
+                )
+                return self.executor.error_result(self.config, error, start_time)
+
+            exit_code, stdout, stderr = parse_response(line.decode("utf-8", errors="replace"))
+            if stderr.startswith("Invalid persistent hook response"):
+                # Out of sync with the protocol: start over on the next event
+                await self.close()
+            result = HookResult(
+                hook_name=self.config.name,
+                success=exit_code == 0,
+                exit_code=exit_code,
+                stdout=stdout.strip(),
+                stderr=stderr.strip(),
+                duration_ms=(time.perf_counter() - start_time) * 1000,
+            )
+            return self.executor.finish(self.config, result)
+
+    async def close(self, kill: bool = False) -> None:
+        """Stop the process: close its stdin, then kill it after a grace period.
+
+        Args:
+            kill: Kill the process right away (e.g. after a timeout)
+        """
+        process, self._process = self._process, None
+        if process is not None and process.returncode is None:
+            if process.stdin is not None:
+                process.stdin.close()
+            if not kill:
+                try:
+                    await asyncio.wait_for(process.wait(), _CLOSE_GRACE_SECONDS)
+                except TimeoutError:
+                    kill = True
+            if kill:
+                kill_process_group(process)
+                await process.wait()
+            logger.info("persistent_hook_stopped", hook=self.config.name)
+        if self._stderr_reader is not None:
+            self._stderr_reader.cancel()
+            self._stderr_reader = None
+
+
+class HookWorkerPool:
+    """Bounded pool running hooks on a background event loop.
+
+    The loop thread starts on the first submission and stops on :meth:`shutdown`
+    (the pool can be reused afterwards: the next submission restarts it).
+    """
+
+    def __init__(
+        self,
+        executor: HookExecutor,
+        max_workers: int = 4,
+        max_pending: int = 256,
+    ) -> None:
+        """Initialize the worker pool.
+
+        Args:
+            executor: Executor running the hooks
+            max_workers: Maximum number of hooks running at once
+            max_pending: Maximum number of hooks queued or running before
+                :meth:`submit` blocks
+
+        Raises:
+            ValueError: If max_workers < 1 or max_pending < max_workers
+        """
+        if max_workers < 1:
+            raise ValueError(f"Invalid max_workers: {max_workers} (must be positive)")
+        if max_pending < max_workers:
+            raise ValueError(f"max_pending ({max_pending}) must be >= max_workers ({max_workers})")
+
+        self.executor = executor
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending: set[concurrent.futures.Future[HookResult]] = set()
+        self._state_lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        # Created on the loop thread
+        self._workers: asyncio.Semaphore | None = None
+        self._processes: dict[str, PersistentHookProcess] = {}
+
+    @property
+    def pending(self) -> int:
+        """Number of hooks queued or running."""
+        return len(self._pending)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._state_lock:
+            if self._loop is not None:
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            thread = threading.Thread(
+                target=self._run_loop, args=(loop, ready), name="hook-worker-pool", daemon=True
+            )
+            thread.start()
+            ready.wait()
+            self._loop, self._thread = loop, thread
+
+        logger.info(
+            "hook_worker_pool_started",
+            max_workers=self.max_workers,
+            max_pending=self.max_pending,
+        )
+        return loop
+
+    def _run_loop(self, loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        self._workers = asyncio.Semaphore(self.max_workers)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def submit(self, config: HookConfig, event: BaseEvent) -> concurrent.futures.Future[HookResult]:
+        """Schedule a hook, blocking while ``max_pending`` hooks are in flight.
+
+        Args:
+            config: Hook configuration
+            event: The event that triggered the hook
+
+        Returns:
+            Future resolving to the HookResult; it raises HookExecutionError
+            if the hook fails and config.fail_on_error is True
+        """
+        self._slots.acquire()
+        return self._schedule(config, event)
+
+    def _schedule(
+        self, config: HookConfig, event: BaseEvent
+    ) -> concurrent.futures.Future[HookResult]:
+        # Called with a slot held: the slot is released when the hook finishes
+        try:
+            loop = self._ensure_loop()
+            future = asyncio.run_coroutine_threadsafe(self._run(config, event), loop)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._pending.add(future)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: concurrent.futures.Future[HookResult]) -> None:
+        self._pending.discard(future)
+        self._slots.release()
+
+    async def _run(self, config: HookConfig, event: BaseEvent) -> HookResult:
+        assert self._workers is not None
+        async with self._workers:
+            if config.persistent and config.enabled:
+                process = self._processes.get(config.name)
+                if process is None or process.config is not config:
+                    # New hook, or a registry reload replaced its configuration
+                    if process is not None:
+                        await process.close()
+                    process = PersistentHookProcess(self.executor, config)
+                    self._processes[config.name] = process
+                return await process.request(event)
+            return await self.executor.execute_hook_async(config, event)
+
+    def map(self, hooks: Iterable[HookConfig], event: BaseEvent) -> list[HookResult]:
+        """Run hooks concurrently and wait for all of their results.
+
+        Returns:
+            Results in the order of ``hooks``
+
+        Raises:
+            HookExecutionError: If a hook with fail_on_error=True fails
+        """
+        futures = [self.submit(config, event) for config in hooks]
+        concurrent.futures.wait(futures)
+        return [future.result() for future in futures]
+
+    async def run(self, hooks: Iterable[HookConfig], event: BaseEvent) -> list[HookResult]:
+        """Async variant of :meth:`map`: waits for free slots without blocking the caller's loop.
+
+        Raises:
+            HookExecutionError: If a hook with fail_on_error=True fails
+        """
+        futures = []
+        for config in hooks:
+            if not self._slots.acquire(blocking=False):
+                await asyncio.to_thread(self._slots.acquire)
+            futures.append(asyncio.wrap_future(self._schedule(config, event)))
+        return list(await asyncio.gather(*futures))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the loop thread and the persistent hook processes.
+
+        Args:
+            wait: Wait for queued and running hooks first (otherwise cancel them)
+        """
+        with self._state_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+
+        pending = list(self._pending)
+        if wait:
+            concurrent.futures.wait(pending)
+        else:
+            for future in pending:
+                future.cancel()
+
+        asyncio.run_coroutine_threadsafe(self._close_processes(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        logger.info("hook_worker_pool_stopped", cancelled=0 if wait else len(pending))
+
+    async def _close_processes(self) -> None:
+        processes = list(self._processes.values())
+        self._processes.clear()
+        await asyncio.gather(*(process.close() for process in processes))
+
+    def __enter__(self) -> HookWorkerPool:
+        """Context manager entry."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Context manager exit: wait for pending hooks and stop the pool."""
+        self.shutdown()
@@ -50,6 +50,8 @@ class HookRegistry:
         """
         self.hooks_dir = hooks_dir or (Path.home() / ".openfatture" / "hooks")
         self._hooks: dict[str, HookConfig] = {}
+        # Event name -> matching enabled hooks, cleared whenever hooks change
+        self._event_hooks: dict[str, tuple[HookConfig, ...]] = {}
 
         # Ensure hooks directory exists
         self.hooks_dir.mkdir(parents=True, exist_ok=True)
@@ -59,6 +61,7 @@ class HookRegistry:
 
     def _load_hooks(self) -> None:
         """Discover and load all hooks from hooks directory."""
+        self._event_hooks.clear()
         loaded_count = 0
         error_count = 0
 
@@ -90,6 +93,7 @@ class HookRegistry:
                     timeout_seconds=metadata.timeout or 30,
                     fail_on_error=False,
                     description=metadata.description,
+                    persistent=metadata.persistent,
                 )
 
                 # Check for duplicate names
@@ -172,7 +176,8 @@ class HookRegistry:
     def get_hooks_for_event(self, event_name: str) -> list[HookConfig]:
         """Get hooks matching the given event name.
 
-        Maps event names to hook naming convention and returns all matching hooks:
+        Maps event names to hook naming convention and returns all matching hooks
+        (memoized per event name until hooks are reloaded, enabled or disabled):
         - InvoiceCreatedEvent [post-invoice-create]
         - InvoiceSentEvent [post-invoice-send]
         - AICommandStartedEvent [pre-ai-command]
@@ -190,19 +195,24 @@ class HookRegistry:
             ...     print(hook.name)
             post-invoice-create
         """
-        # Convert event name to hook patterns
-        patterns = self._event_to_hook_patterns(event_name)
+        cached = self._event_hooks.get(event_name)
+        if cached is None:
+            # Convert event name to hook patterns
+            patterns = self._event_to_hook_patterns(event_name)
 
-        # Find matching hooks
-        matching_hooks = []
+            # Find matching hooks
+            matching_hooks = []
 
-        for pattern in patterns:
-            for hook_name, config in self._hooks.items():
-                if config.enabled and self._matches_pattern(hook_name, pattern):
-                    if config not in matching_hooks:
-                        matching_hooks.append(config)
+            for pattern in patterns:
+                for hook_name, config in self._hooks.items():
+                    if config.enabled and self._matches_pattern(hook_name, pattern):
+                        if config not in matching_hooks:
+                            matching_hooks.append(config)
 
-        return sorted(matching_hooks, key=lambda h: h.name)
+            cached = tuple(sorted(matching_hooks, key=lambda h: h.name))
+            self._event_hooks[event_name] = cached
+
+        return list(cached)
 
     def _event_to_hook_patterns(self, event_name: str) -> list[str]:
         """Convert event name to hook name patterns.
@@ -313,6 +323,7 @@ class HookRegistry:
         """
         if name in self._hooks:
             self._hooks[name].enabled = True
+            self._event_hooks.clear()
             logger.info("hook_enabled", hook=name)
             return True
         return False
@@ -328,6 +339,7 @@ class HookRegistry:
         """
         if name in self._hooks:
             self._hooks[name].enabled = False
+            self._event_hooks.clear()
             logger.info("hook_disabled", hook=name)
             return True
         return False
@@ -48,6 +48,11 @@ def create_event_bus(settings: Settings | None = None) -> InMemoryEventBus:
     bus = InMemoryEventBus()
     register_default_payment_listeners(bus)
 
+    # Reconciliations change the data behind cached AI tool results
+    from openfatture.ai.cache.tool_cache import subscribe_tool_cache
+
+    subscribe_tool_cache(bus)
+
     extra_listeners = (
         settings.payment_event_listeners.split(",") if settings.payment_event_listeners else []
     )
@@ -16,12 +16,21 @@ import structlog
 from jinja2 import Environment, FileSystemLoader
 
 from openfatture.platform.config import Settings, get_settings
+from openfatture.platform.email.outbox import (
+    EmailOutbox,
+    OutboxWorker,
+    SMTPConnectionPool,
+    SMTPServerConfig,
+)
 
 if TYPE_CHECKING:
     from ...domain.models import PaymentReminder
 
 logger = structlog.get_logger()
 
+# Default outbox route of the reminders sent by EmailNotifier
+REMINDER_ROUTE = "payment-reminders"
+
 
 @dataclass
 class SMTPConfig:
@@ -35,6 +44,16 @@ class SMTPConfig:
     from_email: str = ""
     from_name: str = "OpenFatture"
 
+    def server_config(self) -> SMTPServerConfig:
+        """Connection parameters of the server, for the outbox worker."""
+        return SMTPServerConfig(
+            host=self.host,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            starttls=self.use_tls,
+        )
+
 
 class INotifier(ABC):
     """Abstract notifier interface.
@@ -55,6 +74,10 @@ class INotifier(ABC):
         """
         pass
 
+    async def flush(self) -> None:
+        """Deliver the notifications queued by send_reminder (no-op by default)."""
+        return None
+
 
 class EmailNotifier(INotifier):
     """Email-based reminder notifications using SMTP.
@@ -64,6 +87,8 @@ class EmailNotifier(INotifier):
     - SMTP with TLS support
     - Template rendering with payment context
     - Error handling and logging
+    - Optional durable outbox: reminders are queued on the notifier's route and
+      sent through its own SMTP server by flush()
 
     Example:
         >>> config = SMTPConfig(
@@ -82,15 +107,23 @@ class EmailNotifier(INotifier):
         smtp_config: SMTPConfig,
         template_dir: Path | None = None,
         settings: Settings | None = None,
+        outbox: EmailOutbox | None = None,
+        outbox_route: str = REMINDER_ROUTE,
     ) -> None:
         """Initialize email notifier.
 
         Args:
             smtp_config: SMTP server configuration
             template_dir: Directory containing email templates
+            settings: Application settings
+            outbox: Queue reminders here instead of opening an SMTP session per email
+            outbox_route: Outbox route of the queued reminders; notifiers with
+                different SMTP servers sharing an outbox need different routes
         """
         self.smtp_config = smtp_config
         self.settings = settings or get_settings()
+        self.outbox = outbox
+        self.outbox_route = outbox_route
         self.env: Environment | None = None
 
         # Setup Jinja2 environment
@@ -157,6 +190,7 @@ class EmailNotifier(INotifier):
                 subject=f"Payment Reminder - Invoice {invoice.numero}",
                 html_body=html_body,
                 text_body=text_body,
+                dedup_key=f"payment-reminder:{reminder.id}" if reminder.id else None,
             )
 
             logger.info(
@@ -255,14 +289,16 @@ Kind regards,
         subject: str,
         html_body: str,
         text_body: str,
+        dedup_key: str | None = None,
     ) -> None:
-        """Send email via SMTP.
+        """Send email via SMTP, or queue it in the outbox if configured.
 
         Args:
             to_email: Recipient email
             subject: Email subject
             html_body: HTML body
             text_body: Plain text body
+            dedup_key: Outbox idempotency key
 
         Raises:
             ValueError: If to_email is None
@@ -284,6 +320,17 @@ Kind regards,
         msg.attach(part1)
         msg.attach(part2)
 
+        if self.outbox is not None:
+            self.outbox.enqueue_message(
+                msg,
+                self.smtp_config.from_email,
+                [to_email],
+                dedup_key=dedup_key,
+                route=self.outbox_route,
+            )
+            logger.debug("email_queued_for_delivery", to=to_email, subject=subject)
+            return
+
         # Send via SMTP
         with smtplib.SMTP(self.smtp_config.host, self.smtp_config.port) as server:
             if self.smtp_config.use_tls:
@@ -296,6 +343,24 @@ Kind regards,
 
         logger.debug("email_sent", to=to_email, subject=subject)
 
+    async def flush(self) -> None:
+        """Send the reminders queued in the outbox through this notifier's SMTP server.
+
+        Only the entries of the notifier's route are delivered; the ones
+        rescheduled after a temporary failure go out with a later flush.
+        """
+        if self.outbox is not None:
+            await asyncio.to_thread(self._drain_outbox, self.outbox)
+
+    def _drain_outbox(self, outbox: EmailOutbox) -> None:
+        concurrency = self.settings.email_outbox_concurrency
+        pool = SMTPConnectionPool(self.smtp_config.server_config(), max_size=concurrency)
+        worker = OutboxWorker(outbox, {self.outbox_route: pool}, concurrency=concurrency)
+        try:
+            worker.drain()
+        finally:
+            worker.close()
+
 
 class ConsoleNotifier(INotifier):
     """Structured-log notifier for local development.
@@ -385,6 +450,10 @@ class CompositeNotifier(INotifier):
 
         return success
 
+    async def flush(self) -> None:
+        """Flush every channel."""
+        await asyncio.gather(*(notifier.flush() for notifier in self.notifiers))
+
     def __repr__(self) -> str:
         """Human-readable string representation."""
         notifier_types = [n.__class__.__name__ for n in self.notifiers]
@@ -4,6 +4,7 @@ Service Layer Pattern implementation following DDD and Hexagonal Architecture.
 """
 
 __all__ = [
+    "BatchAllocation",
     "MatchingService",
     "ReconciliationService",
     "ReminderScheduler",
@@ -13,5 +14,5 @@ __all__ = [
 
 from .insight_service import TransactionInsightService
 from .matching_service import MatchingService
-from .reconciliation_service import ReconciliationService
+from .reconciliation_service import BatchAllocation, ReconciliationService
 from .reminder_scheduler import ReminderRepository, ReminderScheduler
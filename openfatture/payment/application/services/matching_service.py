@@ -13,6 +13,8 @@ from uuid import UUID
 
 import structlog
 
+from openfatture.platform.metrics import MetricsTimer, timed
+
 from ...domain.enums import TransactionStatus
 from ...domain.models import BankTransaction
 from ...domain.value_objects import MatchResult, PaymentInsight, ReconciliationResult
@@ -65,6 +67,7 @@ class MatchingService:
         self.strategies = strategies
         self.insight_service = insight_service
 
+    @timed("payment_match_transaction")
     async def match_transaction(
         self,
         transaction: BankTransaction,
@@ -118,9 +121,10 @@ class MatchingService:
 
         for strategy in self.strategies:
             try:
-                strategy_matches = strategy.match(transaction, candidates)
-                if inspect.isawaitable(strategy_matches):
-                    strategy_matches = await strategy_matches
+                with MetricsTimer("payment_matcher", {"strategy": type(strategy).__name__}):
+                    strategy_matches = strategy.match(transaction, candidates)
+                    if inspect.isawaitable(strategy_matches):
+                        strategy_matches = await strategy_matches
 
                 # Merge results (keep highest confidence per payment)
                 for match in strategy_matches:
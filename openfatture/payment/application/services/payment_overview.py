@@ -5,12 +5,14 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date, timedelta
 from decimal import Decimal
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func
+from sqlalchemy.orm import Session, contains_eager
 
 if TYPE_CHECKING:
-    from ....storage.database.models import Fattura, Pagamento, StatoPagamento
+    from ....storage.database.models import Fattura, Pagamento, PaymentDue, StatoPagamento
+    from ...domain.enums import AgingBucket
 
 
 @dataclass(frozen=True)
@@ -39,6 +41,15 @@ class PaymentDueSummary:
     hidden_upcoming: int
 
 
+@dataclass(frozen=True)
+class AgingBucketTotal:
+    """Outstanding payments in one aging bucket."""
+
+    bucket: AgingBucket
+    count: int
+    residual: Decimal
+
+
 def _compute_residual(payment: Pagamento) -> Decimal:
     """Return outstanding amount for payment."""
     saldo = getattr(payment, "saldo_residuo", None)
@@ -77,6 +88,10 @@ def collect_payment_due_summary(
 ) -> PaymentDueSummary:
     """Gather outstanding payments grouped by urgency window.
 
+    Reads the maintained ``payment_due_index`` instead of scanning payments:
+    only overdue, due-soon and the first ``max_upcoming`` upcoming rows are
+    loaded, totals are aggregated in SQL.
+
     Args:
         session: Active SQLAlchemy session.
         window_days: Number of days considered as "due soon".
@@ -85,66 +100,76 @@ def collect_payment_due_summary(
     Returns:
         PaymentDueSummary containing grouped entries and aggregate totals.
     """
-    from ....storage.database.models import Fattura, Pagamento, StatoPagamento
+    from ....storage.database.models import Fattura, PaymentDue
 
     today = date.today()
     due_soon_threshold = today + timedelta(days=window_days)
 
-    payments = (
-        session.query(Pagamento)
-        .options(joinedload(Pagamento.fattura).joinedload(Fattura.cliente))
-        .filter(Pagamento.stato != StatoPagamento.PAGATO)
-        .order_by(Pagamento.data_scadenza.asc())
-        .all()
-    )
-
-    overdue: list[PaymentDueEntry] = []
-    due_soon: list[PaymentDueEntry] = []
-    upcoming_full: list[PaymentDueEntry] = []
-    total_outstanding = Decimal("0.00")
-
-    for payment in payments:
-        residual = _compute_residual(payment)
-        if residual <= Decimal("0.00"):
-            continue
-
-        fattura = getattr(payment, "fattura", None)
-        due_date = getattr(payment, "data_scadenza", None) or today
-        days_delta = (due_date - today).days
-
-        entry = PaymentDueEntry(
-            payment_id=getattr(payment, "id", 0),
-            invoice_ref=(
-                f"{getattr(fattura, 'numero', 'N/A')}/{getattr(fattura, 'anno', '')}"
-                if fattura
-                else "N/A"
-            ),
-            client_name=_client_name(fattura),
-            due_date=due_date,
-            days_delta=days_delta,
-            residual=residual,
-            paid=Decimal(getattr(payment, "importo_pagato", 0)),
-            total=Decimal(getattr(payment, "importo", 0)),
-            status=getattr(payment, "stato", StatoPagamento.DA_PAGARE),
+    def rows(*criteria: Any, limit: int | None = None) -> list[PaymentDue]:
+        query = (
+            session.query(PaymentDue)
+            .join(PaymentDue.fattura)
+            .options(contains_eager(PaymentDue.fattura).joinedload(Fattura.cliente))
+            .filter(*criteria)
+            .order_by(PaymentDue.data_scadenza.asc(), Fattura.anno.asc(), Fattura.numero.asc())
         )
+        return query.limit(limit).all() if limit is not None else query.all()
 
-        total_outstanding += residual
+    near = rows(PaymentDue.data_scadenza <= due_soon_threshold)
+    upcoming = rows(PaymentDue.data_scadenza > due_soon_threshold, limit=max_upcoming)
 
-        if due_date < today:
-            overdue.append(entry)
-        elif due_date <= due_soon_threshold:
-            due_soon.append(entry)
-        else:
-            upcoming_full.append(entry)
-
-    upcoming_full.sort(key=lambda item: (item.days_delta, item.invoice_ref))
-    hidden_upcoming = max(0, len(upcoming_full) - max_upcoming)
-    upcoming = upcoming_full[:max_upcoming]
+    upcoming_count, total_outstanding = session.query(
+        func.count(PaymentDue.payment_id).filter(PaymentDue.data_scadenza > due_soon_threshold),
+        func.coalesce(func.sum(PaymentDue.residuo), 0),
+    ).one()
 
+    entries = [_entry(row, today) for row in near]
     return PaymentDueSummary(
-        overdue=overdue,
-        due_soon=due_soon,
-        upcoming=upcoming,
-        total_outstanding=total_outstanding,
-        hidden_upcoming=hidden_upcoming,
+        overdue=[e for e in entries if e.due_date < today],
+        due_soon=[e for e in entries if e.due_date >= today],
+        upcoming=[_entry(row, today) for row in upcoming],
+        total_outstanding=Decimal(str(total_outstanding)).quantize(Decimal("0.01")),
+        hidden_upcoming=max(0, int(upcoming_count) - max_upcoming),
+    )
+
+
+def collect_payment_aging(session: Session) -> list[AgingBucketTotal]:
+    """Return outstanding count and residual per aging bucket.
+
+    Buckets come from the due-date index and are as fresh as the last nightly
+    ``mark_overdue_payments`` run (or the last change to each payment).
+    """
+    from ....storage.database.models import PaymentDue
+    from ...domain.enums import AgingBucket
+
+    totals = {
+        bucket: (int(count), Decimal(str(residual)).quantize(Decimal("0.01")))
+        for bucket, count, residual in session.query(
+            PaymentDue.aging_bucket,
+            func.count(PaymentDue.payment_id),
+            func.sum(PaymentDue.residuo),
+        ).group_by(PaymentDue.aging_bucket)
+    }
+    return [
+        AgingBucketTotal(
+            bucket=bucket,
+            count=totals.get(bucket.value, (0, Decimal("0.00")))[0],
+            residual=totals.get(bucket.value, (0, Decimal("0.00")))[1],
+        )
+        for bucket in AgingBucket
+    ]
+
+
+def _entry(row: PaymentDue, today: date) -> PaymentDueEntry:
+    fattura = row.fattura
+    return PaymentDueEntry(
+        payment_id=row.payment_id,
+        invoice_ref=f"{fattura.numero}/{fattura.anno}" if fattura else "N/A",
+        client_name=_client_name(fattura),
+        due_date=row.data_scadenza,
+        days_delta=(row.data_scadenza - today).days,
+        residual=Decimal(row.residuo),
+        paid=Decimal(row.importo_pagato),
+        total=Decimal(row.importo),
+        status=row.stato,
     )
@@ -6,6 +6,7 @@ with proper state transitions and event handling.
 
 import asyncio
 import inspect
+from dataclasses import dataclass, replace
 from datetime import UTC, datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING, Any, cast
@@ -31,6 +32,18 @@ if TYPE_CHECKING:
 logger = structlog.get_logger()
 
 
+@dataclass(frozen=True)
+class BatchAllocation:
+    """A transaction-to-payment allocation planned by a batch reconciliation."""
+
+    transaction: BankTransaction
+    payment: "Pagamento"
+    amount: Decimal
+    outstanding_before: Decimal
+    match_type: MatchType
+    confidence: float
+
+
 class ReconciliationService:
     """Service for managing reconciliation workflows and state transitions.
 
@@ -434,6 +447,7 @@ class ReconciliationService:
         account_id: int,
         auto_apply: bool = True,
         auto_apply_threshold: float = 0.85,
+        single_transaction: bool = False,
     ) -> ReconciliationResult:
         """Batch reconciliation with auto-apply option.
 
@@ -442,10 +456,17 @@ class ReconciliationService:
         2. If auto_apply=True, reconcile high-confidence matches
         3. Return result with statistics
 
+        With ``single_transaction=True`` the high-confidence matches are first
+        resolved into a conflict-free assignment (see :meth:`plan_batch`), then
+        applied and committed together; events are published after the commit.
+        Transactions that lose a conflict and have no other viable candidate are
+        counted for review instead of failing.
+
         Args:
             account_id: Account ID to reconcile
             auto_apply: Whether to auto-apply high-confidence matches
             auto_apply_threshold: Confidence threshold for auto-apply
+            single_transaction: Apply all matches atomically in one database transaction
 
         Returns:
             ReconciliationResult with statistics and details
@@ -468,6 +489,9 @@ class ReconciliationService:
             auto_apply_threshold=auto_apply_threshold,
         )
 
+        if auto_apply and single_transaction:
+            return self._apply_batch(account_id, result, auto_apply_threshold)
+
         if auto_apply:
             # Auto-reconcile high-confidence matches
             reconciled_count = 0
@@ -500,6 +524,146 @@ class ReconciliationService:
 
         return result
 
+    def plan_batch(
+        self,
+        matches: list[tuple[BankTransaction, list[MatchResult]]],
+        min_confidence: float = 0.85,
+    ) -> list[BatchAllocation]:
+        """Resolve candidate matches into a globally consistent assignment.
+
+        Candidates are taken greedily by descending confidence: each transaction
+        is assigned at most once, and a payment only accepts transactions while
+        it still has an outstanding balance. A transaction whose best payment is
+        taken falls back to its next candidate above ``min_confidence``.
+
+        Args:
+            matches: ``(transaction, candidates)`` pairs from ``match_batch``
+            min_confidence: Minimum confidence for a candidate to be considered
+
+        Returns:
+            Planned allocations, in application order
+        """
+        candidates = [
+            (match.confidence, tx_index, rank, tx, match)
+            for tx_index, (tx, tx_matches) in enumerate(matches)
+            if tx.status == TransactionStatus.UNMATCHED and abs(tx.amount) > Decimal("0.00")
+            for rank, match in enumerate(tx_matches)
+            if match.confidence >= min_confidence
+        ]
+        # Ties keep the matching service order (earlier transactions, better rank)
+        candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+
+        assigned: set[UUID] = set()
+        remaining: dict[int, Decimal] = {}
+        plan: list[BatchAllocation] = []
+        for _, _, _, tx, match in candidates:
+            if tx.id in assigned:
+                continue
+            payment = match.payment
+            outstanding = remaining.get(payment.id)
+            if outstanding is None:
+                outstanding = payment.saldo_residuo
+            if outstanding <= Decimal("0.00"):
+                continue
+
+            amount = min(abs(tx.amount), outstanding)
+            plan.append(
+                BatchAllocation(
+                    transaction=tx,
+                    payment=payment,
+                    amount=amount,
+                    outstanding_before=outstanding,
+                    match_type=match.match_type,
+                    confidence=match.confidence,
+                )
+            )
+            assigned.add(tx.id)
+            remaining[payment.id] = outstanding - amount
+
+        return plan
+
+    def _apply_batch(
+        self,
+        account_id: int,
+        result: ReconciliationResult,
+        auto_apply_threshold: float,
+    ) -> ReconciliationResult:
+        """Apply a planned batch in one database transaction."""
+        session = self.session or self.tx_repo.session
+        plan = self.plan_batch(result.matches, auto_apply_threshold)
+        eligible = sum(
+            1
+            for _, matches in result.matches
+            if matches and matches[0].confidence >= auto_apply_threshold
+        )
+
+        matched_at = datetime.now(UTC)
+        allocations: list[PaymentAllocation] = []
+        try:
+            for item in plan:
+                transaction = item.transaction
+                transaction.status = TransactionStatus.MATCHED
+                transaction.matched_payment_id = item.payment.id
+                transaction.match_type = item.match_type
+                transaction.match_confidence = item.confidence
+                transaction.matched_at = matched_at
+
+                item.payment.apply_payment(item.amount, pagamento_effective_date=transaction.date)
+
+                reconciliation = dict((transaction.raw_data or {}).get("reconciliation", {}))
+                reconciliation.update(
+                    {
+                        "applied_amount": float(item.amount),
+                        "payment_id": item.payment.id,
+                        "outstanding_before": float(item.outstanding_before),
+                    }
+                )
+                # Reassign so JSON column changes are detected without per-row updates
+                transaction.raw_data = {
+                    **(transaction.raw_data or {}),
+                    "reconciliation": reconciliation,
+                }
+
+                allocations.append(
+                    PaymentAllocation(
+                        payment_id=item.payment.id,
+                        transaction_id=transaction.id,
+                        amount=item.amount,
+                        match_type=item.match_type,
+                        match_confidence=item.confidence,
+                    )
+                )
+
+            self.payment_repo.add_allocations(allocations)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(
+                "batch_reconciliation_failed",
+                account_id=account_id,
+                planned=len(plan),
+                error=str(e),
+            )
+            raise RuntimeError(f"Batch reconciliation failed: {e}") from e
+
+        for item in plan:
+            self._emit_transaction_matched_event(item.transaction, item.payment, item.amount)
+
+        deferred = max(eligible - len(plan), 0)
+        logger.info(
+            "batch_reconciliation_completed",
+            account_id=account_id,
+            reconciled=len(plan),
+            deferred=deferred,
+            single_transaction=True,
+        )
+        return replace(
+            result,
+            matched_count=len(plan),
+            review_count=result.review_count + deferred,
+            total_amount_matched=sum((item.amount for item in plan), Decimal("0.00")),
+        )
+
     def _emit_transaction_matched_event(
         self,
         transaction: BankTransaction,
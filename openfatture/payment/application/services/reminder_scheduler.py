@@ -287,12 +287,14 @@ class ReminderScheduler:
         """Process all reminders due today (background job).
 
         Workflow:
-        1. Query reminders with reminder_date = target_date AND not sent
-        2. For each reminder:
+        1. Flag all overdue payments as SCADUTO (one set-based update)
+        2. Query reminders with reminder_date = target_date AND not sent
+        3. For each reminder:
            - Check payment status (skip if paid)
            - Send notification via notifier
            - Mark as sent (sent_date = now)
-        3. Return count of sent reminders
+        4. Flush the notifier (deliver the reminders it queued)
+        5. Return count of sent reminders
 
         Args:
             target_date: Date to process (default: today)
@@ -310,11 +312,15 @@ class ReminderScheduler:
 
         logger.info("processing_due_reminders", target_date=target_date.isoformat())
 
+        self.payment_repo.mark_overdue(target_date)
+
         # Get due reminders
         reminders = self.reminder_repo.get_due_reminders(target_date)
 
         if not reminders:
             logger.info("no_due_reminders", target_date=target_date.isoformat())
+            # Reminders rescheduled by an earlier run may be due
+            await self.notifier.flush()
             return 0
 
         sent_count = 0
@@ -358,6 +364,8 @@ class ReminderScheduler:
                 )
                 errors.append(f"Reminder {reminder.id}: {e}")
 
+        await self.notifier.flush()
+
         logger.info(
             "due_reminders_processed",
             target_date=target_date.isoformat(),
@@ -5,6 +5,7 @@ Domain-Driven Design (DDD) entities and value objects for payment tracking.
 
 __all__ = [
     # Enums
+    "AgingBucket",
     "TransactionStatus",
     "MatchType",
     "ReminderStatus",
@@ -20,7 +21,14 @@ __all__ = [
     "ReconciliationResult",
 ]
 
-from .enums import ImportSource, MatchType, ReminderStatus, ReminderStrategy, TransactionStatus
+from .enums import (
+    AgingBucket,
+    ImportSource,
+    MatchType,
+    ReminderStatus,
+    ReminderStrategy,
+    TransactionStatus,
+)
 from .models import BankAccount, BankTransaction, PaymentReminder
 from .payment_allocation import PaymentAllocation
 from .value_objects import MatchResult, ReconciliationResult
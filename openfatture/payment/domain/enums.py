@@ -110,3 +110,39 @@ class ImportSource(StrEnum):
 
     def __str__(self) -> str:
         return self.value
+
+
+class AgingBucket(StrEnum):
+    """Aging of an outstanding payment by days past its due date.
+
+    Buckets are refreshed nightly (see ``mark_overdue_payments``), so between
+    refreshes they reflect the date of the last refresh or payment change.
+    """
+
+    CURRENT = "current"  # Not yet due
+    DAYS_1_30 = "1_30"
+    DAYS_31_60 = "31_60"
+    DAYS_61_90 = "61_90"
+    OVER_90 = "over_90"
+
+    @property
+    def min_days_overdue(self) -> int:
+        """Lowest number of days past due that falls in this bucket."""
+        return {
+            AgingBucket.CURRENT: 0,
+            AgingBucket.DAYS_1_30: 1,
+            AgingBucket.DAYS_31_60: 31,
+            AgingBucket.DAYS_61_90: 61,
+            AgingBucket.OVER_90: 91,
+        }[self]
+
+    @classmethod
+    def for_days_overdue(cls, days: int) -> "AgingBucket":
+        """Return the bucket for a payment ``days`` past due (negative if not yet due)."""
+        for bucket in reversed(cls):
+            if days >= bucket.min_days_overdue:
+                return bucket
+        return cls.CURRENT
+
+    def __str__(self) -> str:
+        return self.value
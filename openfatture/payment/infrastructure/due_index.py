@@ -0,0 +1,222 @@
+"""Maintenance of the payment due-date index (``payment_due_index``).
+
+The index holds one row per payment with an outstanding balance. It is kept
+current incrementally and with set-based statements only:
+
+- after every ORM flush, rows of the payments touched by the flush (directly or
+  through a ``PaymentAllocation``) are replaced with one ``INSERT ... SELECT``
+- :func:`mark_overdue_payments`, meant to run nightly, flags overdue payments
+  as ``SCADUTO`` and re-ages the whole index with a handful of ``UPDATE``
+  statements instead of loading payments one at a time
+- the table is backfilled from ``pagamenti`` when it is created
+
+Example:
+    >>> from openfatture.payment.infrastructure.due_index import mark_overdue_payments
+    >>> marked = mark_overdue_payments(session)
+    >>> session.commit()
+"""
+
+from collections.abc import Iterable
+from datetime import date, timedelta
+from typing import Any, cast
+
+import structlog
+from sqlalchemy import (
+    Connection,
+    CursorResult,
+    and_,
+    case,
+    delete,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from openfatture.platform.datetime import utc_now
+from openfatture.storage.side_tables import (
+    FlushedObjects,
+    SideTable,
+    register_side_table,
+    resync_rows,
+    table_available,
+)
+
+from ...storage.database.models import Pagamento, PaymentDue, StatoPagamento
+from ..domain.enums import AgingBucket
+from ..domain.payment_allocation import PaymentAllocation
+
+logger = structlog.get_logger()
+
+# Statuses a payment can be flagged overdue from
+OPEN_STATES = (StatoPagamento.DA_PAGARE, StatoPagamento.PAGATO_PARZIALE)
+
+
+def aging_bucket_expression(due_date: Any, as_of: date) -> ColumnElement[str]:
+    """SQL expression mapping a due-date column to its AgingBucket value.
+
+    Compares against precomputed cutoff dates, so it is portable across
+    databases (no date arithmetic in SQL).
+    """
+    buckets = list(AgingBucket)
+    whens = [
+        (due_date > as_of - timedelta(days=following.min_days_overdue), bucket.value)
+        for bucket, following in zip(buckets, buckets[1:], strict=False)
+    ]
+    return case(*whens, else_=buckets[-1].value)
+
+
+def _index_rows(payment_filter: ColumnElement[bool] | None, as_of: date) -> Any:
+    """INSERT ... SELECT populating index rows from ``pagamenti``."""
+    now = utc_now()
+    outstanding = and_(
+        Pagamento.importo_pagato < Pagamento.importo,
+        Pagamento.stato != StatoPagamento.PAGATO,
+    )
+    source = select(
+        Pagamento.id,
+        Pagamento.fattura_id,
+        Pagamento.data_scadenza,
+        Pagamento.importo,
+        Pagamento.importo_pagato,
+        Pagamento.importo - Pagamento.importo_pagato,
+        Pagamento.stato,
+        aging_bucket_expression(Pagamento.data_scadenza, as_of),
+        literal(as_of, PaymentDue.aging_as_of.type),
+        literal(now, PaymentDue.created_at.type),
+        literal(now, PaymentDue.updated_at.type),
+    ).where(outstanding if payment_filter is None else and_(outstanding, payment_filter))
+    return insert(PaymentDue).from_select(
+        [
+            "payment_id",
+            "fattura_id",
+            "data_scadenza",
+            "importo",
+            "importo_pagato",
+            "residuo",
+            "stato",
+            "aging_bucket",
+            "aging_as_of",
+            "created_at",
+            "updated_at",
+        ],
+        source,
+        include_defaults=False,
+    )
+
+
+def sync_payments(
+    connection: Connection, payment_ids: Iterable[int], as_of: date | None = None
+) -> None:
+    """Replace the index rows of the given payments with their current state."""
+    day = as_of or date.today()
+    resync_rows(
+        connection,
+        PaymentDue,
+        PaymentDue.payment_id,
+        payment_ids,
+        lambda chunk: _index_rows(Pagamento.id.in_(chunk), day),
+    )
+
+
+def rebuild_payment_due_index(connection: Connection, as_of: date | None = None) -> int:
+    """Rebuild the whole index from ``pagamenti``.
+
+    Returns:
+        Number of indexed (outstanding) payments
+    """
+    connection.execute(delete(PaymentDue))
+    result = connection.execute(_index_rows(None, as_of or date.today()))
+    logger.debug("payment_due_index_rebuilt", rows=result.rowcount)
+    return int(result.rowcount or 0)
+
+
+def mark_overdue_payments(session: Session, as_of: date | None = None) -> int:
+    """Flag overdue payments as SCADUTO and refresh aging buckets (nightly job).
+
+    A payment is overdue when its due date is before ``as_of`` and it still has
+    an outstanding balance. Both tables are updated set-based; the caller
+    commits.
+
+    Args:
+        session: Active SQLAlchemy session
+        as_of: Reference date (default: today)
+
+    Returns:
+        Number of payments newly flagged as SCADUTO
+    """
+    as_of = as_of or date.today()
+    session.flush()
+
+    overdue = and_(
+        Pagamento.data_scadenza < as_of,
+        Pagamento.importo_pagato < Pagamento.importo,
+        Pagamento.stato.in_(OPEN_STATES),
+    )
+    result = cast(
+        CursorResult[Any],
+        session.execute(
+            update(Pagamento)
+            .where(overdue)
+            .values(stato=StatoPagamento.SCADUTO)
+            .execution_options(synchronize_session=False)
+        ),
+    )
+    marked = result.rowcount
+
+    if table_available(session.connection(), PaymentDue.__tablename__):
+        session.execute(
+            update(PaymentDue)
+            .where(PaymentDue.data_scadenza < as_of, PaymentDue.stato.in_(OPEN_STATES))
+            .values(stato=StatoPagamento.SCADUTO)
+            .execution_options(synchronize_session=False)
+        )
+        session.execute(
+            update(PaymentDue)
+            .where(PaymentDue.aging_as_of != as_of)
+            .values(
+                aging_bucket=aging_bucket_expression(PaymentDue.data_scadenza, as_of),
+                aging_as_of=as_of,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    # Loaded instances would otherwise keep their pre-update state
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, PaymentDue):
+            session.expire(obj)
+        elif marked and isinstance(obj, Pagamento):
+            session.expire(obj, ["stato", "updated_at"])
+
+    logger.info("overdue_payments_marked", as_of=as_of.isoformat(), marked=marked)
+    return int(marked or 0)
+
+
+def _changed_payments(flushed: FlushedObjects) -> set[int]:
+    """Payments touched by a flush, directly or through a ``PaymentAllocation``."""
+    payment_ids: set[int] = set()
+    for obj in flushed:
+        if isinstance(obj, Pagamento):
+            payment_ids.add(obj.id)
+        elif isinstance(obj, PaymentAllocation):
+            payment_ids.add(obj.payment_id)
+    return payment_ids
+
+
+def install_due_index_listeners() -> None:
+    """Register the index with the side-table maintenance hooks (idempotent)."""
+    register_side_table(
+        SideTable(
+            name=PaymentDue.__tablename__,
+            collect=_changed_payments,
+            sync=sync_payments,
+            rebuild=rebuild_payment_due_index,
+            model=PaymentDue,
+            source_tables=(Pagamento.__tablename__,),
+        )
+    )
+
+
+install_due_index_listeners()
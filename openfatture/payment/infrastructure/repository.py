@@ -330,6 +330,19 @@ class PaymentRepository:
 
         return list(self.session.execute(stmt).scalars())
 
+    def mark_overdue(self, as_of: date | None = None) -> int:
+        """Flag every overdue payment as SCADUTO in one statement.
+
+        Args:
+            as_of: Reference date (default: today)
+
+        Returns:
+            Number of payments newly flagged
+        """
+        from .due_index import mark_overdue_payments
+
+        return mark_overdue_payments(self.session, as_of)
+
     def update(self, payment: "Pagamento") -> "Pagamento":
         """Flush changes to a payment entity."""
 
@@ -343,6 +356,13 @@ class PaymentRepository:
         self.session.flush()
         return allocation
 
+    def add_allocations(self, allocations: list[PaymentAllocation]) -> list[PaymentAllocation]:
+        """Persist several allocations with a single flush."""
+
+        self.session.add_all(allocations)
+        self.session.flush()
+        return allocations
+
     def get_allocation(self, payment_id: int, transaction_id: UUID) -> PaymentAllocation | None:
         """Fetch allocation for a specific payment/transaction pair."""
 
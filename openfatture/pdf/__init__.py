@@ -5,6 +5,7 @@ Enterprise-grade PDF generation for invoices with:
 - PDF/A compliance for 10-year legal storage
 - QR code support for pagoPa
 - Reusable components (header, footer, table)
+- Parallel batch generation with an optional ZIP bundle of the PDFs
 
 Example:
     >>> from openfatture.pdf import PDFGenerator
@@ -13,12 +14,15 @@ Example:
     >>> pdf_path = generator.generate(fattura, output_path="fattura_001.pdf")
 """
 
+from openfatture.pdf.batch import BatchPDFGenerator, BatchPDFResult
 from openfatture.pdf.generator import PDFGenerator, PDFGeneratorConfig
 from openfatture.pdf.templates.branded import BrandedTemplate
 from openfatture.pdf.templates.minimalist import MinimalistTemplate
 from openfatture.pdf.templates.professional import ProfessionalTemplate
 
 __all__ = [
+    "BatchPDFGenerator",
+    "BatchPDFResult",
     "PDFGenerator",
     "PDFGeneratorConfig",
     "MinimalistTemplate",
@@ -0,0 +1,287 @@
+"""Parallel PDF generation for invoice and preventivo batches.
+
+Month-end runs print hundreds of documents: :class:`BatchPDFGenerator` renders
+them in a process pool so they scale with the available cores. Each worker
+keeps its generators (templates and styles), decoded logos and encoded QR codes
+for the whole batch, and fonts are loaded once when the worker starts.
+
+Documents are converted to plain dictionaries in the calling process (where the
+database session lives), so workers never touch the ORM. The optional bundle
+is a ZIP file of the PDFs rendered by the workers, in input order (each
+document stays a separate PDF; they are not merged into one file).
+
+Example:
+    >>> generator = BatchPDFGenerator(PDFGeneratorConfig(template="professional"))
+    >>> result = generator.generate(fatture, "out/", bundle_path="out/ottobre.zip")
+    >>> print(f"{result.succeeded}/{result.total} PDF generated")
+"""
+
+from __future__ import annotations
+
+import os
+import zipfile
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Any, Literal
+
+from reportlab.pdfbase import pdfmetrics
+
+from openfatture.pdf.generator import PDFGenerator, PDFGeneratorConfig
+from openfatture.pdf.preventivo_generator import PreventivoPDFGenerator
+from openfatture.platform.logging import get_logger
+
+logger = get_logger(__name__)
+
+DocumentKind = Literal["fattura", "preventivo"]
+
+# Fonts used by the templates and components
+_FONTS = ("Helvetica", "Helvetica-Bold")
+
+# Per-process generators, keyed by document kind and configuration
+_generators: dict[tuple[str, str], PDFGenerator | PreventivoPDFGenerator] = {}
+
+
+@dataclass
+class BatchPDFResult:
+    """Result of a batch PDF generation."""
+
+    total: int = 0
+    paths: list[Path] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    bundle_path: Path | None = None
+
+    @property
+    def succeeded(self) -> int:
+        """Number of documents generated."""
+        return len(self.paths)
+
+    @property
+    def failed(self) -> int:
+        """Number of documents that could not be generated."""
+        return self.total - self.succeeded
+
+
+@dataclass(frozen=True)
+class _Job:
+    kind: DocumentKind
+    config_json: str
+    data: dict[str, Any]
+    output_path: str
+
+
+def _init_worker() -> None:
+    """Load the fonts once per worker process."""
+    for font in _FONTS:
+        pdfmetrics.getFont(font)
+
+
+def _get_generator(kind: str, config_json: str) -> PDFGenerator | PreventivoPDFGenerator:
+    generator = _generators.get((kind, config_json))
+    if generator is None:
+        config = PDFGeneratorConfig.model_validate_json(config_json)
+        generator = PDFGenerator(config) if kind == "fattura" else PreventivoPDFGenerator(config)
+        _generators[(kind, config_json)] = generator
+    return generator
+
+
+def _render_document(job: _Job) -> Path:
+    generator = _get_generator(job.kind, job.config_json)
+    return generator.render(job.data, job.output_path)
+
+
+def _write_bundle(paths: list[Path], bundle_path: str | Path) -> Path:
+    """Bundle the rendered PDFs in one ZIP file, in the given order."""
+    output_file = Path(bundle_path)
+    with zipfile.ZipFile(output_file, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for path in paths:
+            bundle.write(path, arcname=path.name)
+    return output_file
+
+
+class BatchPDFGenerator:
+    """Generate PDFs for many invoices or preventivi in parallel.
+
+    Example:
+        >>> generator = BatchPDFGenerator(config, max_workers=4)
+        >>> result = generator.generate_preventivi(preventivi, "preventivi/")
+    """
+
+    def __init__(
+        self,
+        config: PDFGeneratorConfig | None = None,
+        max_workers: int | None = None,
+        mp_context: BaseContext | None = None,
+    ):
+        """Initialize the batch generator.
+
+        Args:
+            config: PDF generator configuration (uses defaults if None)
+            max_workers: Worker processes (default: number of CPUs); with 1 the
+                documents are rendered in the calling process
+            mp_context: Multiprocessing context of the pool (default: platform default)
+
+        Raises:
+            ValueError: If max_workers < 1
+        """
+        if max_workers is not None and max_workers < 1:
+            raise ValueError(f"Invalid max_workers: {max_workers} (must be positive)")
+
+        self.config = config or PDFGeneratorConfig()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.mp_context = mp_context
+        self._config_json = self.config.model_dump_json()
+        # Validates the template name up front
+        self._generator = PDFGenerator(self.config)
+        self._preventivo_generator = PreventivoPDFGenerator(self.config)
+
+    def generate(
+        self,
+        fatture: Iterable[Any],
+        output_dir: str | Path,
+        bundle_path: str | Path | None = None,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> BatchPDFResult:
+        """Generate one PDF per invoice.
+
+        Args:
+            fatture: Fattura model instances
+            output_dir: Directory of the PDFs (``fattura_<numero>_<anno>.pdf``)
+            bundle_path: Also bundle the generated PDFs in one ZIP file
+            progress_callback: Called with (completed, total) after each PDF
+
+        Returns:
+            BatchPDFResult with the generated paths (in input order) and errors
+        """
+        jobs = [
+            self._job(
+                "fattura",
+                self._generator._fattura_to_dict(fattura),
+                output_dir,
+                f"fattura_{fattura.numero}_{fattura.anno}.pdf",
+            )
+            for fattura in fatture
+        ]
+        return self._run(jobs, bundle_path, progress_callback)
+
+    def generate_preventivi(
+        self,
+        preventivi: Iterable[Any],
+        output_dir: str | Path,
+        bundle_path: str | Path | None = None,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> BatchPDFResult:
+        """Generate one PDF per preventivo.
+
+        Args:
+            preventivi: Preventivo model instances
+            output_dir: Directory of the PDFs (``preventivo_<numero>_<anno>.pdf``)
+            bundle_path: Also bundle the generated PDFs in one ZIP file
+            progress_callback: Called with (completed, total) after each PDF
+
+        Returns:
+            BatchPDFResult with the generated paths (in input order) and errors
+        """
+        jobs = [
+            self._job(
+                "preventivo",
+                self._preventivo_generator._preventivo_to_dict(preventivo),
+                output_dir,
+                f"preventivo_{preventivo.numero}_{preventivo.anno}.pdf",
+            )
+            for preventivo in preventivi
+        ]
+        return self._run(jobs, bundle_path, progress_callback)
+
+    def _job(
+        self, kind: DocumentKind, data: dict[str, Any], output_dir: str | Path, filename: str
+    ) -> _Job:
+        return _Job(
+            kind=kind,
+            config_json=self._config_json,
+            data=data,
+            output_path=str(Path(output_dir) / filename),
+        )
+
+    def _run(
+        self,
+        jobs: list[_Job],
+        bundle_path: str | Path | None,
+        progress_callback: Callable[[int, int], None] | None,
+    ) -> BatchPDFResult:
+        result = BatchPDFResult(total=len(jobs))
+        if not jobs:
+            return result
+
+        for job in jobs:
+            Path(job.output_path).parent.mkdir(parents=True, exist_ok=True)
+        if bundle_path is not None:
+            Path(bundle_path).parent.mkdir(parents=True, exist_ok=True)
+
+        workers = min(self.max_workers, len(jobs))
+        logger.info(
+            "pdf_batch_started",
+            documents=len(jobs),
+            workers=workers,
+            bundle=str(bundle_path) if bundle_path else None,
+        )
+
+        if workers == 1:
+            with _InlineExecutor() as executor:
+                self._collect(executor, jobs, result, progress_callback)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=self.mp_context, initializer=_init_worker
+            ) as executor:
+                self._collect(executor, jobs, result, progress_callback)
+
+        if bundle_path is not None:
+            try:
+                result.bundle_path = _write_bundle(result.paths, bundle_path)
+            except OSError as e:
+                result.errors.append(f"{Path(bundle_path).name}: {e}")
+                logger.error("pdf_batch_bundle_failed", error=str(e))
+
+        logger.info(
+            "pdf_batch_completed",
+            documents=result.total,
+            succeeded=result.succeeded,
+            failed=result.failed,
+        )
+        return result
+
+    def _collect(
+        self,
+        executor: Executor,
+        jobs: list[_Job],
+        result: BatchPDFResult,
+        progress_callback: Callable[[int, int], None] | None,
+    ) -> None:
+        futures = {executor.submit(_render_document, job): i for i, job in enumerate(jobs)}
+        paths: dict[int, Path] = {}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                paths[index] = future.result()
+            except Exception as e:
+                error = f"{Path(jobs[index].output_path).name}: {e}"
+                result.errors.append(error)
+                logger.error("pdf_batch_document_failed", error=error)
+            if progress_callback:
+                progress_callback(completed, len(jobs))
+
+        result.paths = [paths[i] for i in sorted(paths)]
+
+
+class _InlineExecutor(Executor):
+    """Executor running tasks in the calling process (for single-worker batches)."""
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future[Any]:
+        future: Future[Any] = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
@@ -1,10 +1,37 @@
 """Header component for PDF invoices."""
 
+import os
+from functools import lru_cache
+
 from reportlab.lib.colors import HexColor
 from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen.canvas import Canvas
 
 
+@lru_cache(maxsize=16)
+def _decode_logo(logo_path: str, mtime_ns: int) -> ImageReader:
+    image = ImageReader(logo_path)
+    # Decode now, so every later invoice reuses the pixel data
+    image.getRGBData()
+    return image
+
+
+def load_logo(logo_path: str) -> ImageReader | None:
+    """Load a logo image, decoded once per process and file version.
+
+    Args:
+        logo_path: Path to the logo
+
+    Returns:
+        The decoded image, or None if the file is missing or invalid
+    """
+    try:
+        return _decode_logo(logo_path, os.stat(logo_path).st_mtime_ns)
+    except Exception:
+        return None
+
+
 def draw_header(
     canvas: Canvas,
     y_position: float,
@@ -33,10 +60,11 @@ def draw_header(
     color = HexColor(primary_color)
 
     # Logo (if provided)
-    if logo_path:
+    logo = load_logo(logo_path) if logo_path else None
+    if logo is not None:
         try:
             canvas.drawImage(
-                logo_path,
+                logo,
                 2 * cm,
                 y_position - 2 * cm,
                 width=3 * cm,
@@ -171,12 +171,27 @@ class PDFGenerator:
         if output_path is None:
             output_path = f"fattura_{fattura.numero}_{fattura.anno}.pdf"
 
+        return self.render(fattura_data, output_path)
+
+    def render(self, fattura_data: dict[str, Any], output_path: str | Path) -> Path:
+        """Generate PDF from invoice data (as returned by ``_fattura_to_dict``).
+
+        Unlike :meth:`generate` this needs no database session, so it can run in
+        a worker process (see :class:`~openfatture.pdf.batch.BatchPDFGenerator`).
+
+        Args:
+            fattura_data: Invoice data dictionary
+            output_path: Output file path
+
+        Returns:
+            Path to generated PDF
+        """
         output_file = Path(output_path)
 
         logger.info(
             "generating_pdf",
-            fattura_id=fattura.id,
-            numero=f"{fattura.numero}/{fattura.anno}",
+            fattura_id=fattura_data["id"],
+            numero=f"{fattura_data['numero']}/{fattura_data['anno']}",
             output_path=str(output_file),
         )
 
@@ -185,8 +200,8 @@ class PDFGenerator:
 
         # Set PDF metadata
         canvas.setAuthor(self.config.company_name or "OpenFatture")
-        canvas.setTitle(f"Fattura {fattura.numero}/{fattura.anno}")
-        canvas.setSubject(f"Fattura per {fattura.cliente.denominazione}")
+        canvas.setTitle(f"Fattura {fattura_data['numero']}/{fattura_data['anno']}")
+        canvas.setSubject(f"Fattura per {fattura_data['cliente']['denominazione']}")
         canvas.setCreator("OpenFatture - AI-Powered Invoicing")
 
         # Draw invoice
@@ -197,7 +212,7 @@ class PDFGenerator:
 
         logger.info(
             "pdf_generated_successfully",
-            fattura_id=fattura.id,
+            fattura_id=fattura_data["id"],
             output_path=str(output_file),
             file_size=output_file.stat().st_size,
         )
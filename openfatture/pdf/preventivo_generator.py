@@ -58,12 +58,24 @@ class PreventivoPDFGenerator:
         if output_path is None:
             output_path = f"preventivo_{preventivo.numero}_{preventivo.anno}.pdf"
 
+        return self.render(preventivo_data, output_path)
+
+    def render(self, preventivo_data: dict[str, Any], output_path: str | Path) -> Path:
+        """Generate PDF from preventivo data (as returned by ``_preventivo_to_dict``).
+
+        Args:
+            preventivo_data: Preventivo data dictionary
+            output_path: Output file path
+
+        Returns:
+            Path to generated PDF
+        """
         output_file = Path(output_path)
 
         logger.info(
             "generating_preventivo_pdf",
-            preventivo_id=preventivo.id,
-            numero=f"{preventivo.numero}/{preventivo.anno}",
+            preventivo_id=preventivo_data["id"],
+            numero=f"{preventivo_data['numero']}/{preventivo_data['anno']}",
             output_path=str(output_file),
         )
 
@@ -72,8 +84,8 @@ class PreventivoPDFGenerator:
 
         # Set PDF metadata
         canvas.setAuthor(self.config.company_name or "OpenFatture")
-        canvas.setTitle(f"Preventivo {preventivo.numero}/{preventivo.anno}")
-        canvas.setSubject(f"Preventivo per {preventivo.cliente.denominazione}")
+        canvas.setTitle(f"Preventivo {preventivo_data['numero']}/{preventivo_data['anno']}")
+        canvas.setSubject(f"Preventivo per {preventivo_data['cliente']['denominazione']}")
         canvas.setCreator("OpenFatture - AI-Powered Invoicing")
 
         # Draw preventivo
@@ -84,7 +96,7 @@ class PreventivoPDFGenerator:
 
         logger.info(
             "preventivo_pdf_generated_successfully",
-            preventivo_id=preventivo.id,
+            preventivo_id=preventivo_data["id"],
             output_path=str(output_file),
             file_size=output_file.stat().st_size,
         )
@@ -235,6 +235,15 @@ class Settings(BaseSettings):
         default=True,
         description="Enable automatic email notifications",
     )
+    email_outbox_path: Path | None = Field(
+        default=None,
+        description="SQLite file of the email outbox (default: email_outbox.db in data_dir)",
+    )
+    email_outbox_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="SMTP connections used at once when draining the email outbox",
+    )
 
     # Localization
     locale: str = Field(
@@ -326,6 +335,19 @@ class Settings(BaseSettings):
         default=None,
         description="Comma-separated dotted paths to custom global event listeners",
     )
+    hook_workers: int = Field(
+        default=0,
+        ge=0,
+        description="Run hooks concurrently on a worker pool of this size (0 = one at a time)",
+    )
+
+    # Observability
+    metrics_port: int | None = Field(
+        default=None,
+        ge=0,
+        le=65535,
+        description="Serve Prometheus metrics on http://127.0.0.1:<port>/metrics (off if unset)",
+    )
 
     # Debug configuration
     debug_config: DebugConfig = Field(default_factory=DebugConfig)
@@ -2,7 +2,8 @@
 Email templates and sending for OpenFatture.
 
 Provides professional HTML + text email templates with i18n support
-for SDI notifications, batch operations, and PEC communications.
+for SDI notifications, batch operations, and PEC communications, and a
+durable outbox drained over pooled SMTP connections.
 """
 
 from openfatture.platform.email.models import (
@@ -13,6 +14,15 @@ from openfatture.platform.email.models import (
     FatturaInvioContext,
     NotificaSDIContext,
 )
+from openfatture.platform.email.outbox import (
+    PEC_ROUTE,
+    DrainResult,
+    EmailOutbox,
+    OutboxStatus,
+    OutboxWorker,
+    SMTPConnectionPool,
+    SMTPServerConfig,
+)
 from openfatture.platform.email.renderer import TemplateRenderer
 from openfatture.platform.email.sender import TemplatePECSender
 
@@ -25,4 +35,11 @@ __all__ = [
     "EmailTestContext",
     "TemplateRenderer",
     "TemplatePECSender",
+    "EmailOutbox",
+    "OutboxStatus",
+    "OutboxWorker",
+    "DrainResult",
+    "PEC_ROUTE",
+    "SMTPConnectionPool",
+    "SMTPServerConfig",
 ]
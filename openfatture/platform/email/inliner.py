@@ -0,0 +1,397 @@
+"""
+CSS inliner for email templates.
+
+Many email clients (Outlook, some webmail) drop ``<style>`` blocks, so every
+rule that can be resolved statically is copied into the ``style`` attribute of
+the elements it matches. Inlining runs on the Jinja template *source*, once per
+template and theme: rendered messages only fill in the variable data.
+
+Supported selectors are type, class, id and universal selectors combined with
+descendant and child combinators, which covers the email stylesheets. Rules
+with pseudo-classes, attribute selectors or inside at-rules (``@media``) cannot
+be inlined and are left to the ``<style>`` block, which is kept as is. Inline
+styles beat the ``<style>`` block, so a property such a rule may set on an
+element (``tr:last-child td { border-bottom: ... }``) is not inlined there
+either, unless the rule marks it ``!important``.
+
+Elements whose class or id depends on template logic (``{% if %}`` or
+``{{ }}`` in the tag) are not inlined either: their styles are only known at
+render time and also come from the ``<style>`` block.
+
+Usage:
+    html = inline_css('<p class="note">Hi</p>', ".note { color: red; }")
+    # '<p class="note" style="color: red">Hi</p>'
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from html.parser import HTMLParser
+from itertools import accumulate
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_COMPOUND = re.compile(r"^(?P<tag>\*|[a-zA-Z][\w-]*)?(?P<rest>(?:[.#][\w-]+)*)$")
+_IMPORTANT = re.compile(r"\s*!\s*important\s*$", re.IGNORECASE)
+_STYLE_ATTR = re.compile(r"""(\sstyle\s*=\s*)("[^"]*"|'[^']*')""", re.IGNORECASE)
+_TAG_END = re.compile(r"\s*/?>$")
+_JINJA_EXPR = re.compile(r"\{\{.*?\}\}", re.DOTALL)
+_JINJA_BLOCK = re.compile(r"\{%.*%\}", re.DOTALL)
+_PSEUDO_ELEMENT = re.compile(r"::|:(?:before|after|first-line|first-letter)\b", re.IGNORECASE)
+_PSEUDO_CLASS_OR_ATTRIBUTE = re.compile(r":[\w-]+(?:\([^)]*\))?|\[[^\]]*\]")
+_BARE_PSEUDO = re.compile(r"(^|[\s>+~])(?=[:\[])")
+
+# Elements that never get inline styles
+_SKIPPED_TAGS = frozenset({"html", "head", "meta", "title", "style", "link", "script", "base"})
+
+# Elements without end tag
+_VOID_TAGS = frozenset(
+    {"area", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+)
+
+
+@dataclass(frozen=True)
+class _Element:
+    tag: str
+    classes: frozenset[str]
+    id: str | None
+
+
+@dataclass(frozen=True)
+class _Compound:
+    tag: str | None
+    classes: frozenset[str]
+    ids: frozenset[str]
+
+    def matches(self, element: _Element) -> bool:
+        return (
+            (self.tag is None or self.tag == element.tag)
+            and self.classes <= element.classes
+            and all(id_ == element.id for id_ in self.ids)
+        )
+
+
+@dataclass(frozen=True)
+class _Rule:
+    compounds: tuple[_Compound, ...]
+    # combinators[i] joins compounds[i] and compounds[i + 1]: " " or ">"
+    combinators: tuple[str, ...]
+    specificity: tuple[int, int, int]
+    order: int
+    declarations: tuple[tuple[str, str, bool], ...]
+
+    def matches(self, ancestors: list[_Element]) -> bool:
+        """Check the rule against an element (last item) and its ancestors."""
+        if not self.compounds[-1].matches(ancestors[-1]):
+            return False
+        return self._match_up(len(self.compounds) - 2, ancestors, len(ancestors) - 2)
+
+    def _match_up(self, index: int, ancestors: list[_Element], position: int) -> bool:
+        if index < 0:
+            return True
+        compound = self.compounds[index]
+        if self.combinators[index] == ">":
+            return (
+                position >= 0
+                and compound.matches(ancestors[position])
+                and self._match_up(index - 1, ancestors, position - 1)
+            )
+        return any(
+            compound.matches(ancestors[p]) and self._match_up(index - 1, ancestors, p - 1)
+            for p in range(position, -1, -1)
+        )
+
+
+def _parse_selector(selector: str) -> tuple[tuple[_Compound, ...], tuple[str, ...]] | None:
+    """Parse a selector, or return None if it cannot be inlined."""
+    tokens = re.sub(r"\s*>\s*", " > ", selector.strip()).split()
+    compounds: list[_Compound] = []
+    combinators: list[str] = []
+    expect_compound = True
+
+    for token in tokens:
+        if token == ">":
+            if expect_compound:
+                return None
+            combinators[-1:] = [">"]
+            expect_compound = True
+            continue
+
+        match = _COMPOUND.match(token)
+        if not match or not token:
+            return None
+        tag = match.group("tag")
+        parts = re.findall(r"[.#][\w-]+", match.group("rest"))
+        compounds.append(
+            _Compound(
+                tag=None if tag in (None, "*") else tag.lower(),
+                classes=frozenset(p[1:] for p in parts if p[0] == "."),
+                ids=frozenset(p[1:] for p in parts if p[0] == "#"),
+            )
+        )
+        combinators.append(" ")
+        expect_compound = False
+
+    if expect_compound:
+        return None
+    return tuple(compounds), tuple(combinators[:-1])
+
+
+def _parse_declarations(body: str) -> tuple[tuple[str, str, bool], ...]:
+    declarations = []
+    for item in body.split(";"):
+        prop, sep, value = item.partition(":")
+        prop, value = prop.strip().lower(), value.strip()
+        if not sep or not prop or not value:
+            continue
+        important = bool(_IMPORTANT.search(value))
+        declarations.append((prop, _IMPORTANT.sub("", value), important))
+    return tuple(declarations)
+
+
+def _relax_selector(selector: str) -> str | None:
+    """
+    Widen a selector that cannot be inlined to one the inliner can match.
+
+    Pseudo-classes and attribute selectors are dropped and sibling combinators
+    become descendant ones, so the result matches at least the same elements.
+    Returns None for pseudo-elements, which style a generated box instead.
+    """
+    if _PSEUDO_ELEMENT.search(selector):
+        return None
+    selector = _PSEUDO_CLASS_OR_ATTRIBUTE.sub("", _BARE_PSEUDO.sub(r"\1*", selector))
+    tokens: list[str] = []
+    for token in re.sub(r"\s*([>+~])\s*", r" \1 ", selector).split():
+        if token in ("+", "~"):
+            # The subject shares the parent of the sibling: keep the parent
+            if tokens:
+                tokens.pop()
+            continue
+        tokens.append(token)
+    return " ".join(tokens)
+
+
+@dataclass(frozen=True)
+class _Stylesheet:
+    rules: tuple[_Rule, ...]
+    # Rules left to the <style> block, with relaxed selectors
+    kept: tuple[_Rule, ...]
+
+
+@lru_cache(maxsize=32)
+def parse_stylesheet(css: str) -> _Stylesheet:
+    """
+    Parse a stylesheet into the rules to inline and the rules it keeps.
+
+    Rules inside at-rules and with selectors that cannot be resolved statically
+    stay in the ``<style>`` block; they are returned with relaxed selectors to
+    find the elements they may apply to. Parsed stylesheets are cached, keyed
+    by their text.
+
+    Args:
+        css: Stylesheet text
+
+    Returns:
+        Inlinable and kept rules, each in document order
+    """
+    css = _COMMENT.sub("", css)
+    rules: list[_Rule] = []
+    kept: list[_Rule] = []
+    position = 0
+
+    while (brace := css.find("{", position)) != -1:
+        # Skip statements such as @import and @charset
+        prelude = css[position:brace].rsplit(";", 1)[-1].strip()
+
+        depth, end = 1, brace + 1
+        while depth and end < len(css):
+            depth += {"{": 1, "}": -1}.get(css[end], 0)
+            end += 1
+        body = css[brace + 1 : end - 1]
+        position = end
+
+        if prelude.startswith("@"):
+            # Conditional group rules (@media, @supports) nest style rules
+            if "{" in body:
+                nested = parse_stylesheet(body)
+                kept.extend(nested.rules + nested.kept)
+            continue
+
+        declarations = _parse_declarations(body)
+        if not declarations:
+            continue
+
+        for selector in prelude.split(","):
+            target = rules
+            parsed = _parse_selector(selector)
+            if parsed is None:
+                relaxed = _relax_selector(selector)
+                parsed = _parse_selector(relaxed) if relaxed else None
+                target = kept
+            if parsed is None:
+                continue
+            compounds, combinators = parsed
+            specificity = (
+                sum(len(c.ids) for c in compounds),
+                sum(len(c.classes) for c in compounds),
+                sum(c.tag is not None for c in compounds),
+            )
+            target.append(_Rule(compounds, combinators, specificity, len(target), declarations))
+
+    return _Stylesheet(tuple(rules), tuple(kept))
+
+
+def _compute_style(rules: tuple[_Rule, ...], ancestors: list[_Element]) -> dict[str, str]:
+    """Resolve the cascade of the matching rules for one element."""
+    matched = sorted(
+        (rule for rule in rules if rule.matches(ancestors)),
+        key=lambda rule: (rule.specificity, rule.order),
+    )
+    normal: dict[str, str] = {}
+    important: dict[str, str] = {}
+    for rule in matched:
+        for prop, value, is_important in rule.declarations:
+            if is_important:
+                important[prop] = f"{value} !important"
+            else:
+                normal.pop(prop, None)  # keep declaration order of the winner
+                normal[prop] = value
+    return normal | important
+
+
+def _overlaps(prop: str, other: str) -> bool:
+    """Check if two properties set a common value (``padding`` and ``padding-top``)."""
+    return prop == other or prop.startswith(f"{other}-") or other.startswith(f"{prop}-")
+
+
+def _drop_overridable(
+    kept: tuple[_Rule, ...], ancestors: list[_Element], style: dict[str, str]
+) -> dict[str, str]:
+    """
+    Leave to the <style> block the properties a kept rule may set on the element.
+
+    An inline declaration would beat the kept rule; only an ``!important`` kept
+    declaration still wins over a normal inline one.
+    """
+    overriding = [
+        (prop, is_important)
+        for rule in kept
+        if rule.matches(ancestors)
+        for prop, _, is_important in rule.declarations
+    ]
+    return {
+        prop: value
+        for prop, value in style.items()
+        if not any(
+            _overlaps(prop, other) and (not is_important or value.endswith("!important"))
+            for other, is_important in overriding
+        )
+    }
+
+
+class _InliningParser(HTMLParser):
+    """Collect the start tags to rewrite with their source offsets."""
+
+    def __init__(self, source: str, stylesheet: _Stylesheet) -> None:
+        super().__init__(convert_charrefs=False)
+        self.stylesheet = stylesheet
+        self.stack: list[_Element] = []
+        self.replacements: list[tuple[int, str, str]] = []
+        self._line_offsets = [0, *accumulate(len(line) for line in source.splitlines(True))]
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        element = self._visit(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._visit(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                return
+
+    def _visit(self, tag: str, attrs: list[tuple[str, str | None]]) -> _Element:
+        values = {name: value or "" for name, value in attrs}
+        raw = self.get_starttag_text() or ""
+        dynamic = "{%" in raw or any("{{" in values.get(name, "") for name in ("class", "id"))
+        element = _Element(
+            tag=tag,
+            classes=frozenset(values.get("class", "").split()),
+            id=values.get("id"),
+        )
+
+        if not dynamic and tag not in _SKIPPED_TAGS:
+            ancestors = [*self.stack, element]
+            style = _compute_style(self.stylesheet.rules, ancestors)
+            if style and self.stylesheet.kept:
+                style = _drop_overridable(self.stylesheet.kept, ancestors, style)
+            if style:
+                line, column = self.getpos()
+                offset = self._line_offsets[line - 1] + column
+                self.replacements.append((offset, raw, _merge_style(raw, style)))
+
+        if dynamic:
+            # Only the classes outside template logic are known statically
+            static = _JINJA_BLOCK.sub(" ", _JINJA_EXPR.sub(" ", values.get("class", "")))
+            element = _Element(tag=tag, classes=frozenset(static.split()), id=None)
+        return element
+
+
+def _merge_style(raw_tag: str, style: dict[str, str]) -> str:
+    """Add the computed declarations to a start tag; existing inline styles win."""
+    match = _STYLE_ATTR.search(raw_tag)
+    existing = match.group(2)[1:-1].strip().rstrip(";") if match else ""
+    overridden = {prop for prop, _, _ in _parse_declarations(existing)}
+    declarations = "; ".join(
+        f"{prop}: {value}"
+        for prop, value in style.items()
+        if prop not in overridden or value.endswith("!important")
+    )
+
+    if not declarations:
+        return raw_tag
+    if match:
+        merged = "; ".join(part for part in (declarations, existing) if part)
+        attribute = f'{match.group(1)}"{merged.replace(chr(34), "&quot;")}"'
+        return raw_tag[: match.start()] + attribute + raw_tag[match.end() :]
+
+    end = _TAG_END.search(raw_tag)
+    insert_at = end.start() if end else len(raw_tag)
+    attribute = f' style="{declarations.replace(chr(34), "&quot;")}"'
+    return raw_tag[:insert_at] + attribute + raw_tag[insert_at:]
+
+
+@lru_cache(maxsize=256)
+def inline_css(html: str, css: str) -> str:
+    """
+    Copy the rules of a stylesheet into the style attributes of an HTML document.
+
+    Works on plain HTML and on Jinja template sources. Results are cached,
+    keyed by document and stylesheet.
+
+    Args:
+        html: HTML document or template source
+        css: Stylesheet to inline
+
+    Returns:
+        The document with inline styles
+    """
+    stylesheet = parse_stylesheet(css)
+    if not stylesheet.rules:
+        return html
+
+    parser = _InliningParser(html, stylesheet)
+    parser.feed(html)
+    parser.close()
+
+    parts: list[str] = []
+    position = 0
+    for offset, raw, replacement in parser.replacements:
+        if html.startswith(raw, offset):
+            parts.append(html[position:offset])
+            parts.append(replacement)
+            position = offset + len(raw)
+    parts.append(html[position:])
+    return "".join(parts)
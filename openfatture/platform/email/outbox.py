@@ -0,0 +1,704 @@
+"""
+Durable email outbox.
+
+Messages are rendered and serialized when they are queued, and stored with
+their delivery state (attempts, next attempt time, last error) in a SQLite
+table. An :class:`OutboxWorker` drains the queue over pools of SMTP
+connections that stay open between messages, with a configurable number of
+concurrent deliveries.
+
+Every entry has a route naming the SMTP account that sends it: ``pec`` for the
+messages of :class:`TemplatePECSender`, the notifier's own route for payment
+reminders. A worker only claims the entries of the routes it has a pool for,
+so each message leaves through the server it was written for.
+
+Nothing is sent until a worker drains the queue. Payment reminders are drained
+by ``EmailNotifier.flush()`` at the end of each reminder run; the ``pec`` route
+needs a periodic job (cron, systemd timer) running::
+
+    OutboxWorker.from_settings(settings).drain()
+
+Delivery is at-least-once: an entry is leased while it is being sent and is
+picked up again only if the lease expires (the process died mid-send). Every
+entry carries a stable ``Message-ID``, so a message re-sent after a crash is
+recognised as a duplicate by the receiving clients, and a ``dedup_key`` makes
+queueing idempotent when a campaign is re-run.
+
+Usage:
+    outbox = EmailOutbox.from_settings(settings)
+    outbox.enqueue(email, sender=settings.pec_address, dedup_key="reminder:42")
+
+    worker = OutboxWorker.from_settings(settings, outbox)
+    result = worker.drain()
+    worker.close()
+"""
+
+import smtplib
+import sqlite3
+import ssl
+import time
+from collections.abc import Collection, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email import encoders
+from email.message import Message
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import make_msgid, parseaddr
+from enum import StrEnum
+from pathlib import Path
+from threading import BoundedSemaphore, Lock
+from typing import Self
+
+from openfatture.platform.config import Settings
+from openfatture.platform.email.models import EmailMessage
+from openfatture.platform.logging import get_logger
+from openfatture.platform.rate_limiter import RateLimiter
+from openfatture.platform.retry import RetryConfig
+
+logger = get_logger(__name__)
+
+# Route of the messages sent through the PEC account
+PEC_ROUTE = "pec"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dedup_key TEXT UNIQUE,
+    route TEXT NOT NULL DEFAULT 'pec',
+    sender TEXT NOT NULL,
+    recipients TEXT NOT NULL,
+    message BLOB NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_expires_at REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL
+);
+"""
+
+_INDEXES = """
+DROP INDEX IF EXISTS ix_email_outbox_due;
+CREATE INDEX IF NOT EXISTS ix_email_outbox_route_due
+    ON email_outbox (route, status, next_attempt_at);
+"""
+
+
+class OutboxStatus(StrEnum):
+    """Delivery state of an outbox entry."""
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class OutboxEntry:
+    """A message claimed for delivery."""
+
+    id: int
+    route: str
+    sender: str
+    recipients: list[str]
+    message: bytes
+    attempts: int
+
+
+@dataclass
+class DrainResult:
+    """Outcome of an outbox drain."""
+
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+    @property
+    def processed(self) -> int:
+        """Number of delivery attempts made."""
+        return self.sent + self.retried + self.failed
+
+
+def build_mime_message(
+    email: EmailMessage, sender: str, message_id: str | None = None
+) -> MIMEMultipart:
+    """
+    Build the multipart (text + HTML + attachments) MIME message of an email.
+
+    Args:
+        email: Email message
+        sender: From address
+        message_id: Message-ID header (omitted if None)
+
+    Returns:
+        The MIME message
+    """
+    msg = MIMEMultipart("alternative")
+    msg["From"] = sender
+    msg["To"] = ", ".join(email.recipients)
+    msg["Subject"] = email.subject
+    if message_id:
+        msg["Message-ID"] = message_id
+    if email.reply_to:
+        msg["Reply-To"] = email.reply_to
+
+    msg.attach(MIMEText(email.text_body, "plain", "utf-8"))
+    msg.attach(MIMEText(email.html_body, "html", "utf-8"))
+
+    for attachment in email.attachments:
+        part = MIMEBase("application", "octet-stream")
+        part.set_payload(attachment.content)
+        encoders.encode_base64(part)
+        part.add_header("Content-Disposition", f'attachment; filename="{attachment.filename}"')
+        msg.attach(part)
+
+    return msg
+
+
+class EmailOutbox:
+    """
+    SQLite-backed queue of outgoing emails with retry and backoff state.
+
+    Safe to share between threads; several processes can use the same file
+    (claims run in ``BEGIN IMMEDIATE`` transactions).
+    """
+
+    def __init__(self, path: Path | str, retry: RetryConfig | None = None) -> None:
+        """
+        Open (and create if needed) the outbox database.
+
+        Args:
+            path: SQLite database file
+            retry: Backoff between delivery attempts (default: 5 retries, from 1 minute
+                to 1 hour)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retry = retry or RetryConfig(max_retries=5, base_delay=60.0, max_delay=3600.0)
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(email_outbox)")}
+        if "route" not in columns:
+            # Outbox created before routes: every entry was a PEC message
+            self._conn.execute(
+                "ALTER TABLE email_outbox ADD COLUMN route TEXT NOT NULL DEFAULT 'pec'"
+            )
+        self._conn.executescript(_INDEXES)
+        self._lock = Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Self:
+        """Open the outbox configured in the settings (``email_outbox.db`` in the data dir)."""
+        return cls(settings.email_outbox_path or settings.data_dir / "email_outbox.db")
+
+    def enqueue(
+        self,
+        email: EmailMessage,
+        sender: str,
+        dedup_key: str | None = None,
+        route: str = PEC_ROUTE,
+    ) -> int:
+        """
+        Queue an email for delivery.
+
+        Args:
+            email: Email message
+            sender: From address
+            dedup_key: Idempotency key: queueing the same key again returns the
+                existing entry instead of adding a new one
+            route: SMTP account sending the message (see :class:`OutboxWorker`)
+
+        Returns:
+            Outbox entry id
+        """
+        return self.enqueue_message(
+            build_mime_message(email, sender), sender, email.recipients, dedup_key, route
+        )
+
+    def enqueue_message(
+        self,
+        message: Message,
+        sender: str,
+        recipients: list[str],
+        dedup_key: str | None = None,
+        route: str = PEC_ROUTE,
+    ) -> int:
+        """
+        Queue an already built MIME message for delivery.
+
+        A ``Message-ID`` is added if missing, so that every delivery attempt of
+        the entry carries the same one.
+
+        Args:
+            message: MIME message
+            sender: Envelope sender
+            recipients: Envelope recipients
+            dedup_key: Idempotency key (see :meth:`enqueue`)
+            route: SMTP account sending the message (see :meth:`enqueue`)
+
+        Returns:
+            Outbox entry id
+        """
+        if "Message-ID" not in message:
+            domain = parseaddr(sender)[1].rpartition("@")[2] or None
+            message["Message-ID"] = make_msgid("outbox", domain=domain)
+        now = time.time()
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO email_outbox (dedup_key, route, sender, recipients, message, "
+                "status, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(dedup_key) DO NOTHING",
+                (
+                    dedup_key,
+                    route,
+                    sender,
+                    "\n".join(recipients),
+                    message.as_bytes(),
+                    OutboxStatus.PENDING,
+                    now,
+                    now,
+                ),
+            )
+            if cursor.rowcount:
+                entry_id = int(cursor.lastrowid or 0)
+            else:
+                entry_id = self._conn.execute(
+                    "SELECT id FROM email_outbox WHERE dedup_key = ?", (dedup_key,)
+                ).fetchone()[0]
+
+        logger.debug("email_queued", entry_id=entry_id, route=route, dedup_key=dedup_key)
+        return entry_id
+
+    def claim(
+        self, limit: int = 100, lease: float = 300.0, routes: Collection[str] | None = None
+    ) -> list[OutboxEntry]:
+        """
+        Lease the entries due for delivery.
+
+        Pending entries whose next attempt is due are claimed, as well as entries
+        left in ``sending`` by a worker that died (expired lease).
+
+        Args:
+            limit: Maximum number of entries
+            lease: Seconds before an unacknowledged entry can be claimed again
+            routes: Only claim the entries of these routes (default: every route)
+
+        Returns:
+            Claimed entries, oldest first
+        """
+        now = time.time()
+        route_filter = ""
+        route_params: tuple[str, ...] = ()
+        if routes is not None:
+            route_params = tuple(routes)
+            route_filter = f"route IN ({', '.join('?' * len(route_params))}) AND "
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Abandoned entries that already used all their attempts
+                self._conn.execute(
+                    "UPDATE email_outbox SET status = ?, lease_expires_at = NULL, "
+                    "last_error = COALESCE(last_error, 'delivery interrupted') "
+                    "WHERE status = ? AND lease_expires_at <= ? AND attempts > ?",
+                    (OutboxStatus.FAILED, OutboxStatus.SENDING, now, self.retry.max_retries),
+                )
+                rows = self._conn.execute(
+                    "SELECT id, route, sender, recipients, message, attempts FROM email_outbox "
+                    f"WHERE {route_filter}((status = ? AND next_attempt_at <= ?) "
+                    "OR (status = ? AND lease_expires_at <= ?)) "
+                    "ORDER BY next_attempt_at, id LIMIT ?",
+                    (*route_params, OutboxStatus.PENDING, now, OutboxStatus.SENDING, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE email_outbox SET status = ?, attempts = attempts + 1, "
+                    "lease_expires_at = ? WHERE id = ?",
+                    [(OutboxStatus.SENDING, now + lease, row[0]) for row in rows],
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+        return [
+            OutboxEntry(
+                id=row[0],
+                route=row[1],
+                sender=row[2],
+                recipients=row[3].split("\n"),
+                message=row[4],
+                attempts=row[5] + 1,
+            )
+            for row in rows
+        ]
+
+    def mark_sent(self, entry_id: int) -> None:
+        """Record a successful delivery."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE email_outbox SET status = ?, sent_at = ?, lease_expires_at = NULL, "
+                "last_error = NULL WHERE id = ?",
+                (OutboxStatus.SENT, time.time(), entry_id),
+            )
+
+    def mark_failed(self, entry_id: int, error: str, permanent: bool = False) -> OutboxStatus:
+        """
+        Record a failed delivery and schedule the next attempt.
+
+        Args:
+            entry_id: Outbox entry id
+            error: Error message
+            permanent: Do not retry (e.g. recipient rejected by the server)
+
+        Returns:
+            ``PENDING`` if the entry will be retried, ``FAILED`` otherwise
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM email_outbox WHERE id = ?", (entry_id,)
+            ).fetchone()
+            attempts = row[0] if row else 0
+
+            if permanent or attempts > self.retry.max_retries:
+                status = OutboxStatus.FAILED
+                next_attempt_at = time.time()
+            else:
+                status = OutboxStatus.PENDING
+                next_attempt_at = time.time() + self.retry.calculate_delay(attempts - 1)
+
+            self._conn.execute(
+                "UPDATE email_outbox SET status = ?, next_attempt_at = ?, "
+                "lease_expires_at = NULL, last_error = ? WHERE id = ?",
+                (status, next_attempt_at, error, entry_id),
+            )
+        return status
+
+    def counts(self) -> dict[str, int]:
+        """Number of entries per status."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM email_outbox GROUP BY status"
+            ).fetchall()
+        return {status.value: 0 for status in OutboxStatus} | dict(rows)
+
+    def purge_sent(self, older_than: float = 30 * 86400) -> int:
+        """
+        Delete delivered entries.
+
+        Args:
+            older_than: Minimum age in seconds of the deleted entries (default: 30 days)
+
+        Returns:
+            Number of deleted entries
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM email_outbox WHERE status = ? AND sent_at <= ?",
+                (OutboxStatus.SENT, time.time() - older_than),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass(frozen=True)
+class SMTPServerConfig:
+    """Connection parameters of an SMTP server."""
+
+    host: str
+    port: int
+    username: str = ""
+    password: str = ""
+    use_ssl: bool = False
+    starttls: bool = False
+    timeout: float = 30.0
+
+    @classmethod
+    def for_pec(cls, settings: Settings) -> Self:
+        """PEC server (implicit TLS) configured in the settings."""
+        return cls(
+            host=settings.pec_smtp_server,
+            port=settings.pec_smtp_port,
+            username=settings.pec_address,
+            password=settings.pec_password,
+            use_ssl=True,
+        )
+
+    def connect(self) -> smtplib.SMTP:
+        """Open an authenticated connection."""
+        context = ssl.create_default_context()
+        server: smtplib.SMTP
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout, context=context)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                server.starttls(context=context)
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        return server
+
+
+class SMTPConnectionPool:
+    """
+    Pool of SMTP connections reused across messages.
+
+    At most ``max_size`` connections exist at once; callers beyond that wait for
+    a free one. Connections idle for longer than ``max_idle`` seconds are closed
+    (servers drop them anyway), and a connection dropped by the server is
+    re-opened once before the error is reported.
+    """
+
+    def __init__(self, config: SMTPServerConfig, max_size: int = 4, max_idle: float = 60.0):
+        """
+        Initialize the pool.
+
+        Args:
+            config: SMTP server
+            max_size: Maximum number of open connections
+            max_idle: Seconds after which an idle connection is closed
+
+        Raises:
+            ValueError: If max_size < 1
+        """
+        if max_size < 1:
+            raise ValueError(f"Invalid max_size: {max_size} (must be positive)")
+
+        self.config = config
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.connections_opened = 0
+        self._idle: list[tuple[smtplib.SMTP, float]] = []
+        self._slots = BoundedSemaphore(max_size)
+        self._lock = Lock()
+
+    def send(self, sender: str, recipients: list[str], message: bytes) -> None:
+        """
+        Send a serialized message on a pooled connection.
+
+        Args:
+            sender: Envelope sender
+            recipients: Envelope recipients
+            message: RFC 5322 message
+
+        Raises:
+            smtplib.SMTPException: If the server rejects the message
+            OSError: If the server cannot be reached
+        """
+        with self._slots:
+            server = self._checkout()
+            try:
+                self._sendmail(server, sender, recipients, message)
+            except smtplib.SMTPServerDisconnected:
+                # Connection closed by the server while idle: reconnect once
+                server = self._connect()
+                self._sendmail(server, sender, recipients, message)
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._discard(server)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = self.config.connect()
+        with self._lock:
+            self.connections_opened += 1
+        logger.debug("smtp_connection_opened", host=self.config.host)
+        return server
+
+    def _sendmail(
+        self, server: smtplib.SMTP, sender: str, recipients: list[str], message: bytes
+    ) -> None:
+        try:
+            server.sendmail(sender, recipients, message)
+        except smtplib.SMTPServerDisconnected:
+            self._discard(server)
+            raise
+        except smtplib.SMTPException:
+            # Rejected message: the session is still usable
+            self._checkin(server)
+            raise
+        except OSError:
+            self._discard(server)
+            raise
+        self._checkin(server)
+
+    def _checkout(self) -> smtplib.SMTP:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, last_used = self._idle.pop()
+            if now - last_used <= self.max_idle:
+                return server
+            self._discard(server)
+        return self._connect()
+
+    def _checkin(self, server: smtplib.SMTP) -> None:
+        with self._lock:
+            self._idle.append((server, time.monotonic()))
+
+    @staticmethod
+    def _discard(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+
+def _is_permanent(error: Exception) -> bool:
+    """Whether retrying the message cannot succeed (5xx reply or every recipient refused)."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False  # Fixed by the configuration, not by the message
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+class OutboxWorker:
+    """
+    Drain an :class:`EmailOutbox` over pooled SMTP connections.
+
+    Each entry is sent through the pool of its route; entries of routes without
+    a pool are left for the worker that serves them.
+
+    Usage:
+        with SMTPConnectionPool(SMTPServerConfig.for_pec(settings), max_size=4) as pool:
+            result = OutboxWorker(outbox, {PEC_ROUTE: pool}).drain()
+    """
+
+    def __init__(
+        self,
+        outbox: EmailOutbox,
+        pools: Mapping[str, SMTPConnectionPool],
+        concurrency: int | None = None,
+        batch_size: int = 100,
+        lease: float = 300.0,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            outbox: Outbox to drain
+            pools: SMTP connection pool of each route served by the worker
+            concurrency: Messages sent at once (default: total size of the pools)
+            batch_size: Entries claimed per round
+            lease: Seconds an entry stays leased to this worker
+            rate_limiter: Optional limit on the sending rate
+
+        Raises:
+            ValueError: If no pool is given, or concurrency or batch_size < 1
+        """
+        if not pools:
+            raise ValueError("At least one route pool is required")
+        concurrency = concurrency or sum(pool.max_size for pool in pools.values())
+        if concurrency < 1:
+            raise ValueError(f"Invalid concurrency: {concurrency} (must be positive)")
+        if batch_size < 1:
+            raise ValueError(f"Invalid batch_size: {batch_size} (must be positive)")
+
+        self.outbox = outbox
+        self.pools = dict(pools)
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.lease = lease
+        self.rate_limiter = rate_limiter
+
+    @classmethod
+    def from_settings(cls, settings: Settings, outbox: EmailOutbox | None = None) -> Self:
+        """Worker sending the ``pec`` route through the configured PEC server."""
+        concurrency = settings.email_outbox_concurrency
+        pool = SMTPConnectionPool(SMTPServerConfig.for_pec(settings), max_size=concurrency)
+        return cls(
+            outbox or EmailOutbox.from_settings(settings),
+            {PEC_ROUTE: pool},
+            concurrency=concurrency,
+        )
+
+    def drain(self, max_messages: int | None = None) -> DrainResult:
+        """
+        Deliver the due entries until none is left.
+
+        Entries rescheduled for a later attempt are not waited for.
+
+        Args:
+            max_messages: Stop after this many delivery attempts
+
+        Returns:
+            DrainResult with the number of sent, retried and failed messages
+        """
+        result = DrainResult()
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="email-outbox") as executor:
+            while max_messages is None or result.processed < max_messages:
+                limit = self.batch_size
+                if max_messages is not None:
+                    limit = min(limit, max_messages - result.processed)
+
+                entries = self.outbox.claim(limit, self.lease, routes=self.pools)
+                if not entries:
+                    break
+
+                for status in executor.map(self._deliver, entries):
+                    if status == OutboxStatus.SENT:
+                        result.sent += 1
+                    elif status == OutboxStatus.PENDING:
+                        result.retried += 1
+                    else:
+                        result.failed += 1
+
+        if result.processed:
+            logger.info(
+                "email_outbox_drained",
+                sent=result.sent,
+                retried=result.retried,
+                failed=result.failed,
+                duration_seconds=round(time.perf_counter() - start, 3),
+            )
+        return result
+
+    def close(self) -> None:
+        """Close the idle connections of every pool."""
+        for pool in self.pools.values():
+            pool.close()
+
+    def _deliver(self, entry: OutboxEntry) -> OutboxStatus:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(blocking=True)
+
+        try:
+            self.pools[entry.route].send(entry.sender, entry.recipients, entry.message)
+        except Exception as e:
+            status = self.outbox.mark_failed(entry.id, str(e), permanent=_is_permanent(e))
+            logger.warning(
+                "email_delivery_failed",
+                entry_id=entry.id,
+                route=entry.route,
+                attempt=entry.attempts,
+                status=status.value,
+                error=str(e),
+            )
+            return status
+
+        self.outbox.mark_sent(entry.id)
+        return OutboxStatus.SENT
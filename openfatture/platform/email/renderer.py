@@ -2,19 +2,24 @@
 Template renderer for emails with i18n and inline CSS.
 
 Renders Jinja2 templates with internationalization support and CSS inlining
-for email client compatibility.
+for email client compatibility. The theme CSS is inlined into the template
+sources and the compiled templates are shared by every renderer, so rendering a
+message only evaluates its variable data.
 """
 
 import json
 from datetime import date, datetime
 from decimal import Decimal
 from pathlib import Path
+from types import CodeType
 from typing import Any
 
 from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from jinja2.bccache import Bucket, BytecodeCache
 from pydantic import BaseModel
 
 from openfatture.platform.config import Settings
+from openfatture.platform.email.inliner import inline_css
 from openfatture.platform.email.styles import EmailBranding, EmailStyles
 
 
@@ -27,6 +32,46 @@ def _read_translation_file(path: Path) -> dict[str, Any]:
     return data
 
 
+class _CompiledTemplateCache(BytecodeCache):
+    """Compiled templates shared by every renderer of the process.
+
+    Buckets are keyed by template name and source checksum, so each theme
+    (whose inlined source differs) keeps its own compiled code.
+    """
+
+    def __init__(self) -> None:
+        self._code: dict[tuple[str, str], CodeType] = {}
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        code = self._code.get((bucket.key, bucket.checksum))
+        if code is not None:
+            bucket.code = code
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        if bucket.code is not None:
+            self._code[(bucket.key, bucket.checksum)] = bucket.code
+
+    def clear(self) -> None:
+        self._code.clear()
+
+
+_compiled_templates = _CompiledTemplateCache()
+
+
+class _InliningLoader(FileSystemLoader):
+    """Template loader that inlines the theme CSS into the HTML template sources."""
+
+    def __init__(self, searchpath: str | Path, css: str) -> None:
+        super().__init__(searchpath)
+        self.css = css
+
+    def get_source(self, environment: Environment, template: str) -> tuple[str, str, Any]:
+        source, filename, uptodate = super().get_source(environment, template)
+        if template.endswith(".html"):
+            source = inline_css(source, self.css)
+        return source, filename, uptodate
+
+
 class TemplateRenderer:
     """
     Email template renderer with i18n and inline CSS.
@@ -61,14 +106,16 @@ class TemplateRenderer:
         self.settings = settings
         self.locale = locale
         self.branding = branding or self._default_branding()
+        self.styles = EmailStyles.get_complete_css(self.branding)
 
-        # Setup Jinja2 environment
+        # Setup Jinja2 environment (CSS inlined in the sources, compiled code shared)
         templates_dir = Path(__file__).parent / "templates"
         self.env = Environment(
-            loader=FileSystemLoader(str(templates_dir)),
+            loader=_InliningLoader(templates_dir, self.styles),
             autoescape=True,
             trim_blocks=True,
             lstrip_blocks=True,
+            bytecode_cache=_compiled_templates,
         )
 
         # Load i18n translations
@@ -195,7 +242,7 @@ class TemplateRenderer:
         self.env.globals["cedente_telefono"] = self.settings.cedente_telefono
 
         # CSS styles
-        self.env.globals["styles"] = EmailStyles.get_complete_css(self.branding)
+        self.env.globals["styles"] = self.styles
 
         # Feature flags
         self.env.globals["show_links"] = True
@@ -227,10 +274,8 @@ class TemplateRenderer:
             if "title" not in context_dict:
                 context_dict["title"] = self.settings.app_name
 
-            html = template.render(**context_dict)
-
-            # Inline CSS for email client compatibility
-            return self._inline_css(html)
+            # CSS is already inlined in the compiled template
+            return template.render(**context_dict)
 
         except TemplateNotFound:
             raise FileNotFoundError(f"Template not found: {template_name}") from None
@@ -263,31 +308,6 @@ class TemplateRenderer:
         except TemplateNotFound:
             raise FileNotFoundError(f"Template not found: {template_name}") from None
 
-    def _inline_css(self, html: str) -> str:
-        """
-        Inline CSS for email client compatibility.
-
-        Converts <style> tags to inline style attributes.
-        Uses basic inlining - for production, consider premailer or css_inline.
-
-        Args:
-            html: HTML string with <style> tags
-
-        Returns:
-            HTML with inlined CSS
-        """
-        # For now, return as-is
-        # In production, use premailer or css_inline library:
-        # from premailer import transform
-        # return transform(html)
-
-        # Or use css_inline (faster):
-        # import css_inline
-        # inliner = css_inline.CSSInliner()
-        # return inliner.inline(html)
-
-        return html
-
     def preview(
         self,
         template_name: str,
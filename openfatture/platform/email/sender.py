@@ -9,10 +9,6 @@ import smtplib
 import ssl
 from collections.abc import Mapping
 from datetime import UTC, datetime
-from email import encoders
-from email.mime.base import MIMEBase
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from pathlib import Path
 from typing import Any
 
@@ -26,6 +22,7 @@ from openfatture.platform.email.models import (
     FatturaInvioContext,
     NotificaSDIContext,
 )
+from openfatture.platform.email.outbox import PEC_ROUTE, EmailOutbox, build_mime_message
 from openfatture.platform.email.renderer import TemplateRenderer
 from openfatture.platform.rate_limiter import RateLimiter
 from openfatture.platform.retry import RetryConfig, retry_sync
@@ -46,6 +43,7 @@ class TemplatePECSender:
     - Rate limiting (10 emails/minute default)
     - Retry with exponential backoff
     - Type-safe contexts with Pydantic
+    - Optional outbox for notifications and batch summaries
 
     Usage:
         sender = TemplatePECSender(settings)
@@ -59,6 +57,7 @@ class TemplatePECSender:
         rate_limit: RateLimiter | None = None,
         max_retries: int = 3,
         locale: str = "it",
+        outbox: EmailOutbox | None = None,
     ):
         """
         Initialize template PEC sender.
@@ -68,11 +67,16 @@ class TemplatePECSender:
             rate_limit: Custom rate limiter (default: 10 emails/minute)
             max_retries: Maximum retry attempts for transient errors
             locale: Language code for templates (it, en)
+            outbox: Queue notifications and batch summaries here instead of sending
+                them right away (invoices to SDI are always sent directly). They
+                are queued on the ``pec`` route and left to a periodic
+                ``OutboxWorker.from_settings(settings).drain()``
         """
         self.settings = settings
         self.rate_limiter = rate_limit or RateLimiter(max_calls=10, period=60)
         self.max_retries = max_retries
         self.locale = locale
+        self.outbox = outbox
 
         # Initialize template renderer
         self.renderer = TemplateRenderer(settings=settings, locale=locale)
@@ -245,7 +249,7 @@ class TemplatePECSender:
             recipients=recipients,
         )
 
-        return self._send_email(email)
+        return self._deliver(email)
 
     def send_test_email(self) -> tuple[bool, str | None]:
         """
@@ -369,7 +373,32 @@ class TemplatePECSender:
             recipients=[recipient],
         )
 
-        return self._send_email(email)
+        dedup_key = f"sdi-notification:{notification.identificativo_sdi}:{tipo_notifica.value}"
+        return self._deliver(email, dedup_key=dedup_key)
+
+    def _deliver(
+        self, email: EmailMessage, dedup_key: str | None = None
+    ) -> tuple[bool, str | None]:
+        """
+        Queue the email in the outbox if configured, otherwise send it now.
+
+        Args:
+            email: Email message to send
+            dedup_key: Outbox idempotency key
+
+        Returns:
+            Tuple[bool, Optional[str]]: (success, error_message)
+        """
+        if self.outbox is None:
+            return self._send_email(email)
+
+        try:
+            self.outbox.enqueue(
+                email, sender=self.settings.pec_address, dedup_key=dedup_key, route=PEC_ROUTE
+            )
+        except Exception as e:
+            return False, f"Failed to queue email: {e}"
+        return True, None
 
     def _send_email(self, email: EmailMessage) -> tuple[bool, str | None]:
         """
@@ -422,30 +451,7 @@ class TemplatePECSender:
         def _send_email() -> tuple[bool, str | None]:
             """Inner function that performs the actual send operation."""
             try:
-                # Create multipart message
-                msg = MIMEMultipart("alternative")
-                msg["From"] = self.settings.pec_address
-                msg["To"] = ", ".join(email.recipients)
-                msg["Subject"] = email.subject
-
-                # Add text part (plain text fallback)
-                text_part = MIMEText(email.text_body, "plain", "utf-8")
-                msg.attach(text_part)
-
-                # Add HTML part
-                html_part = MIMEText(email.html_body, "html", "utf-8")
-                msg.attach(html_part)
-
-                # Add attachments
-                for attachment in email.attachments:
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(attachment.content)
-                    encoders.encode_base64(part)
-                    part.add_header(
-                        "Content-Disposition",
-                        f'attachment; filename="{attachment.filename}"',
-                    )
-                    msg.attach(part)
+                msg = build_mime_message(email, self.settings.pec_address)
 
                 # Send via SMTP
                 context = ssl.create_default_context()
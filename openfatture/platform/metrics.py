@@ -2,26 +2,49 @@
 Structured metrics collection for monitoring and observability.
 
 Provides comprehensive metrics collection with support for:
-- Performance monitoring
+- Performance monitoring (streaming p50/p95/p99 latencies)
 - Error tracking
-- Usage statistics
+- Usage statistics (labeled counters)
 - Custom metrics
-- Export capabilities for dashboards
+- Export capabilities for dashboards (JSON, Prometheus text format)
+
+Memory is constant whatever the load: time series live in ring buffers and
+latency distributions in quantile sketches, so recording a value is O(1).
+:class:`MetricsServer` serves the Prometheus text format on a loopback address.
 """
 
+import functools
+import inspect
+import ipaddress
 import json
+import math
+import re
 import threading
 import time
-from collections import defaultdict
+from collections import deque
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from types import TracebackType
-from typing import Any
+from typing import Any, TypeVar, cast
 
 from openfatture.platform.logging import get_logger
 
 logger = get_logger(__name__)
 
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Sorted (name, value) pairs identifying one labeled child of a metric
+Labels = tuple[tuple[str, str], ...]
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(tags: dict[str, str] | None) -> Labels:
+    return tuple(sorted(tags.items())) if tags else ()
+
 
 @dataclass
 class MetricPoint:
@@ -36,11 +59,19 @@ class MetricPoint:
 
 @dataclass
 class MetricSeries:
-    """Time series data for a metric."""
+    """Time series data for a metric.
+
+    Points are kept in a ring buffer of ``max_points`` entries; points older than
+    ``retention_hours`` are dropped from its head as new points arrive.
+    """
 
     name: str
-    points: list[MetricPoint] = field(default_factory=list)
+    points: deque[MetricPoint] = field(default_factory=deque)
     retention_hours: int = 24
+    max_points: int = 10_000
+
+    def __post_init__(self) -> None:
+        self.points = deque(self.points, maxlen=self.max_points)
 
     def add_point(
         self,
@@ -51,45 +82,258 @@ class MetricSeries:
         """Add a new measurement point."""
         point = MetricPoint(name=self.name, value=value, tags=tags or {}, metadata=metadata or {})
         self.points.append(point)
+        self.expire(point.timestamp - timedelta(hours=self.retention_hours))
 
-        # Cleanup old points
-        cutoff = datetime.now() - timedelta(hours=self.retention_hours)
-        self.points = [p for p in self.points if p.timestamp > cutoff]
+    def expire(self, cutoff: datetime) -> int:
+        """Drop points recorded before ``cutoff``. Returns number of points removed."""
+        removed = 0
+        while self.points and self.points[0].timestamp <= cutoff:
+            self.points.popleft()
+            removed += 1
+        return removed
 
     def get_stats(self, hours: int = 1) -> dict[str, Any]:
         """Get statistics for the last N hours."""
         cutoff = datetime.now() - timedelta(hours=hours)
-        recent_points = [p for p in self.points if p.timestamp > cutoff]
-
-        if not recent_points:
+        values: list[float] = []
+        # Points are in time order: walk back from the newest one
+        for point in reversed(self.points):
+            if point.timestamp <= cutoff:
+                break
+            values.append(point.value)
+
+        if not values:
             return {"count": 0, "avg": 0, "min": 0, "max": 0}
 
-        values = [p.value for p in recent_points]
         return {
             "count": len(values),
             "avg": sum(values) / len(values),
             "min": min(values),
             "max": max(values),
-            "latest": values[-1] if values else 0,
+            "latest": values[0],
         }
 
 
+class QuantileSketch:
+    """Streaming quantile estimator with bounded relative error.
+
+    Values are counted in logarithmic buckets (bucket ``i`` covers
+    ``(gamma**(i-1), gamma**i]``), so recording is O(1), memory is bounded by
+    ``max_buckets`` and every quantile is within ``relative_accuracy`` of the
+    true value. Values <= 0 are counted as 0. Past ``max_buckets`` the two lowest
+    buckets are merged, which only degrades the smallest quantiles.
+
+    Example:
+        >>> sketch = QuantileSketch()
+        >>> for latency_ms in (12.0, 15.5, 230.0):
+        ...     sketch.add(latency_ms)
+        >>> sketch.quantile(0.95)
+    """
+
+    __slots__ = (
+        "relative_accuracy",
+        "max_buckets",
+        "gamma",
+        "_log_gamma",
+        "_buckets",
+        "_zero_count",
+        "count",
+        "sum",
+        "min",
+        "max",
+    )
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be in (0, 1), got {relative_accuracy}")
+        if max_buckets < 2:
+            raise ValueError(f"max_buckets must be at least 2, got {max_buckets}")
+
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._buckets: dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """Record one value."""
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        if value <= 0:
+            self._zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self._buckets
+        buckets[index] = buckets.get(index, 0) + 1
+        if len(buckets) > self.max_buckets:
+            lowest = min(buckets)
+            merged = buckets.pop(lowest)
+            buckets[min(buckets)] += merged
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile (0 <= q <= 1); 0.0 when empty."""
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be in [0, 1], got {q}")
+        if self.count == 0:
+            return 0.0
+
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket in relative terms
+                estimate = 2 * self.gamma**index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """Arithmetic mean of the recorded values (0.0 when empty)."""
+        return self.sum / self.count if self.count else 0.0
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add the values recorded by ``other`` (same relative accuracy) to this sketch."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        while len(self._buckets) > self.max_buckets:
+            lowest = min(self._buckets)
+            merged = self._buckets.pop(lowest)
+            self._buckets[min(self._buckets)] += merged
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def summary(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> dict[str, float]:
+        """Count, sum, avg, min, max and the requested quantiles (as ``p50``, ``p95``...)."""
+        result = {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+        }
+        for q in quantiles:
+            result[f"p{q * 100:g}"] = self.quantile(q)
+        return result
+
+
+class Counter:
+    """Monotonic counter with one value per label set."""
+
+    def __init__(self, name: str, description: str = "") -> None:
+        self.name = name
+        self.description = description
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, tags: dict[str, str] | None = None) -> None:
+        """Increment the counter of the given label set."""
+        if amount < 0:
+            raise ValueError(f"Counter {self.name} can only increase, got {amount}")
+        key = _labels(tags)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, tags: dict[str, str] | None = None) -> float:
+        """Value of one label set, or the total over all label sets if ``tags`` is None."""
+        if tags is None:
+            return sum(self._values.values())
+        return self._values.get(_labels(tags), 0)
+
+    def items(self) -> list[tuple[Labels, float]]:
+        """(labels, value) pairs of every label set."""
+        return list(self._values.items())
+
+
+class Histogram:
+    """Distribution of observed values (typically latencies) per label set."""
+
+    def __init__(self, name: str, description: str = "", relative_accuracy: float = 0.01) -> None:
+        self.name = name
+        self.description = description
+        self.relative_accuracy = relative_accuracy
+        self._sketches: dict[Labels, QuantileSketch] = {}
+
+    def observe(self, value: float, tags: dict[str, str] | None = None) -> None:
+        """Record one observation for the given label set."""
+        key = _labels(tags)
+        sketch = self._sketches.get(key)
+        if sketch is None:
+            sketch = self._sketches[key] = QuantileSketch(self.relative_accuracy)
+        sketch.add(value)
+
+    def sketch(self, tags: dict[str, str] | None = None) -> QuantileSketch:
+        """Sketch of one label set, or of all label sets merged if ``tags`` is None."""
+        if tags is not None:
+            return self._sketches.get(_labels(tags)) or QuantileSketch(self.relative_accuracy)
+        merged = QuantileSketch(self.relative_accuracy)
+        for sketch in self._sketches.values():
+            merged.merge(sketch)
+        return merged
+
+    def items(self) -> list[tuple[Labels, QuantileSketch]]:
+        """(labels, sketch) pairs of every label set."""
+        return list(self._sketches.items())
+
+
+def _prometheus_name(name: str) -> str:
+    name = re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _prometheus_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    rendered = ",".join(
+        '{}="{}"'.format(
+            _prometheus_name(key),
+            value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for key, value in pairs
+    )
+    return "{" + rendered + "}"
+
+
 class MetricsCollector:
     """
     Thread-safe metrics collector for application monitoring.
 
     Features:
-    - Time-series data collection
+    - Time-series data collection (bounded ring buffers)
+    - Labeled counters and latency histograms (p50/p95/p99 at constant memory)
     - Automatic cleanup of old data
     - Thread-safe operations
     - Export capabilities (JSON, Prometheus format)
     - Performance monitoring helpers
     """
 
-    def __init__(self) -> None:
-        self._series: dict[str, MetricSeries] = defaultdict(lambda: MetricSeries("default"))
+    def __init__(self, max_points: int = 10_000) -> None:
+        """Initialize the collector.
+
+        Args:
+            max_points: Ring buffer size of each time series
+        """
+        self.max_points = max_points
+        self._series: dict[str, MetricSeries] = {}
         self._lock = threading.RLock()
-        self._counters: dict[str, int] = defaultdict(int)
+        self._counters: dict[str, Counter] = {}
+        self._histograms: dict[str, Histogram] = {}
         self._gauges: dict[str, float] = {}
 
         logger.info("metrics_collector_initialized")
@@ -103,17 +347,20 @@ class MetricsCollector:
     ) -> None:
         """Record a metric measurement."""
         with self._lock:
-            if name not in self._series:
-                self._series[name] = MetricSeries(name)
-            self._series[name].add_point(value, tags, metadata)
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = MetricSeries(name, max_points=self.max_points)
+            series.add_point(value, tags, metadata)
 
     def increment_counter(
         self, name: str, amount: int = 1, tags: dict[str, str] | None = None
     ) -> None:
-        """Increment a counter metric."""
+        """Increment a counter metric (one value per label set)."""
         with self._lock:
-            self._counters[name] += amount
-            self.record_metric(f"{name}_total", self._counters[name], tags)
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters[name] = Counter(name)
+            counter.inc(amount, tags)
 
     def set_gauge(self, name: str, value: float, tags: dict[str, str] | None = None) -> None:
         """Set a gauge metric value."""
@@ -121,11 +368,22 @@ class MetricsCollector:
             self._gauges[name] = value
             self.record_metric(name, value, tags)
 
+    def observe(self, name: str, value: float, tags: dict[str, str] | None = None) -> None:
+        """Record an observation in a histogram (streaming percentiles)."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(name)
+            histogram.observe(value, tags)
+
     def record_timing(
         self, name: str, duration_ms: float, tags: dict[str, str] | None = None
     ) -> None:
-        """Record a timing measurement."""
-        self.record_metric(f"{name}_duration_ms", duration_ms, tags)
+        """Record a timing measurement (``<name>_duration_ms`` histogram and series)."""
+        metric_name = f"{name}_duration_ms"
+        with self._lock:
+            self.observe(metric_name, duration_ms, tags)
+            self.record_metric(metric_name, duration_ms, tags)
 
     def record_error(
         self, error_type: str, error_message: str, context: dict[str, Any] | None = None
@@ -139,19 +397,59 @@ class MetricsCollector:
             context=context,
         )
 
+    def get_counter(self, name: str, tags: dict[str, str] | None = None) -> float:
+        """Value of a counter for one label set (or summed over all label sets)."""
+        with self._lock:
+            counter = self._counters.get(name)
+            return counter.value(tags) if counter else 0
+
+    def get_percentiles(
+        self,
+        name: str,
+        tags: dict[str, str] | None = None,
+        quantiles: Iterable[float] = DEFAULT_QUANTILES,
+    ) -> dict[str, float]:
+        """Summary (count, avg, min, max, p50, p95, p99...) of a histogram.
+
+        Args:
+            name: Histogram name (``<operation>_duration_ms`` for timings)
+            tags: Label set to report (None merges all label sets)
+            quantiles: Quantiles to estimate
+        """
+        with self._lock:
+            histogram = self._histograms.get(name)
+            sketch = histogram.sketch(tags) if histogram else QuantileSketch()
+            return sketch.summary(quantiles)
+
     def get_metric_stats(self, name: str, hours: int = 1) -> dict[str, Any]:
-        """Get statistics for a metric."""
+        """Get statistics for a metric.
+
+        For timings, the p50/p95/p99 keys cover every observation since startup
+        (the other keys cover the last ``hours``).
+        """
         with self._lock:
-            if name in self._series:
-                return self._series[name].get_stats(hours)
-            return {"count": 0, "avg": 0, "min": 0, "max": 0}
+            stats: dict[str, Any] = (
+                self._series[name].get_stats(hours)
+                if name in self._series
+                else {"count": 0, "avg": 0, "min": 0, "max": 0}
+            )
+            histogram = self._histograms.get(name)
+            if histogram is not None:
+                sketch = histogram.sketch()
+                for q in DEFAULT_QUANTILES:
+                    stats[f"p{q * 100:g}"] = sketch.quantile(q)
+            return stats
 
     def get_all_metrics(self) -> dict[str, Any]:
         """Get all current metrics data."""
         with self._lock:
             result: dict[str, Any] = {
-                "counters": dict(self._counters),
+                "counters": {name: counter.value() for name, counter in self._counters.items()},
                 "gauges": dict(self._gauges),
+                "histograms": {
+                    name: histogram.sketch().summary()
+                    for name, histogram in self._histograms.items()
+                },
                 "series_stats": {},
             }
 
@@ -167,43 +465,54 @@ class MetricsCollector:
         return json.dumps(data, indent=2, default=str)
 
     def export_prometheus(self) -> str:
-        """Export metrics in Prometheus format."""
-        lines = []
-        timestamp_ms = int(time.time() * 1000)
+        """Export metrics in the Prometheus text exposition format.
+
+        Counters are exported as ``<name>_total``, histograms as summaries
+        (p50/p95/p99, ``_sum`` and ``_count``) and other series as gauges
+        holding their latest value.
+        """
+        lines: list[str] = []
 
         with self._lock:
             # Counters
-            for name, value in self._counters.items():
-                lines.append(f"# HELP {name} Counter metric")
-                lines.append(f"# TYPE {name} counter")
-                lines.append(f"{name}_total {value} {timestamp_ms}")
-
-            # Gauges
-            for name, gauge_value in self._gauges.items():
-                lines.append(f"# HELP {name} Gauge metric")
-                lines.append(f"# TYPE {name} gauge")
-                lines.append(f"{name} {gauge_value} {timestamp_ms}")
-
-            # Series (latest values)
+            for name, counter in self._counters.items():
+                family = _prometheus_name(name.removesuffix("_total"))
+                lines.append(f"# HELP {family} {counter.description or 'Counter metric'}")
+                lines.append(f"# TYPE {family} counter")
+                for labels, value in counter.items():
+                    lines.append(f"{family}_total{_prometheus_labels(labels)} {value:g}")
+
+            # Histograms (summaries)
+            for name, histogram in self._histograms.items():
+                family = _prometheus_name(name)
+                lines.append(f"# HELP {family} {histogram.description or 'Latency summary'}")
+                lines.append(f"# TYPE {family} summary")
+                for labels, sketch in histogram.items():
+                    for q in DEFAULT_QUANTILES:
+                        quantile_labels = _prometheus_labels(labels, (("quantile", f"{q:g}"),))
+                        lines.append(f"{family}{quantile_labels} {sketch.quantile(q):g}")
+                    rendered = _prometheus_labels(labels)
+                    lines.append(f"{family}_sum{rendered} {sketch.sum:g}")
+                    lines.append(f"{family}_count{rendered} {sketch.count}")
+
+            # Gauges and other series (latest values)
+            latest = dict(self._gauges)
             for name, series in self._series.items():
-                if series.points:
-                    latest = series.points[-1]
-                    lines.append(f"# HELP {name} Time series metric")
-                    lines.append(f"# TYPE {name} gauge")
-                    lines.append(f"{name} {latest.value} {timestamp_ms}")
+                if name not in latest and name not in self._histograms and series.points:
+                    latest[name] = series.points[-1].value
+            for name, value in latest.items():
+                family = _prometheus_name(name)
+                lines.append(f"# HELP {family} Gauge metric")
+                lines.append(f"# TYPE {family} gauge")
+                lines.append(f"{family} {value:g}")
 
-        return "\n".join(lines)
+        return "\n".join(lines) + "\n"
 
     def cleanup_old_data(self, max_age_hours: int = 48) -> int:
         """Clean up old metric data. Returns number of points removed."""
         with self._lock:
-            removed_count = 0
             cutoff = datetime.now() - timedelta(hours=max_age_hours)
-
-            for series in self._series.values():
-                old_count = len(series.points)
-                series.points = [p for p in series.points if p.timestamp > cutoff]
-                removed_count += old_count - len(series.points)
+            removed_count = sum(series.expire(cutoff) for series in self._series.values())
 
             logger.info("metrics_cleanup_completed", removed_points=removed_count)
             return removed_count
@@ -253,26 +562,162 @@ class MetricsTimer:
                 )
 
 
+def timed(operation_name: str, tags: dict[str, str] | None = None) -> Callable[[F], F]:
+    """Decorator timing every call of a function (sync or async) with :class:`MetricsTimer`.
+
+    Example:
+        >>> @timed("xml_build")
+        ... def build(self, fattura): ...
+    """
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with MetricsTimer(operation_name, tags):
+                    return await func(*args, **kwargs)
+
+            return cast(F, async_wrapper)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with MetricsTimer(operation_name, tags):
+                return func(*args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class MetricsServer:
+    """Local HTTP endpoint serving :meth:`MetricsCollector.export_prometheus` on ``/metrics``.
+
+    The server only binds to loopback addresses: expose it further through a
+    reverse proxy or an agent running on the same host.
+
+    Example:
+        >>> with MetricsServer(port=9464):
+        ...     ...  # curl http://127.0.0.1:9464/metrics
+    """
+
+    def __init__(
+        self,
+        collector: MetricsCollector | None = None,
+        host: str = "127.0.0.1",
+        port: int = 9464,
+    ) -> None:
+        """Initialize the server (call :meth:`start` to listen).
+
+        Args:
+            collector: Collector to export (global collector if None)
+            host: Loopback address to bind
+            port: TCP port (0 picks a free port)
+
+        Raises:
+            ValueError: If host is not a loopback address
+        """
+        if not _is_loopback(host):
+            raise ValueError(f"Metrics endpoint must bind to a loopback address, got {host!r}")
+        self.collector = collector or get_metrics_collector()
+        self.host = host
+        self.port = port
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """(host, port) the server listens on."""
+        if self._server is None:
+            return self.host, self.port
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> None:
+        """Start serving in a daemon thread (no-op if already started)."""
+        if self._server is not None:
+            return
+
+        collector = self.collector
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = collector.export_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug("metrics_scrape", client=self.client_address[0], request=args[0])
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-server", daemon=True
+        )
+        self._thread.start()
+        host, port = self.address
+        logger.info("metrics_server_started", url=f"http://{host}:{port}/metrics")
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self._server = None
+        self._thread = None
+        logger.info("metrics_server_stopped")
+
+    def __enter__(self) -> "MetricsServer":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+
 # Convenience functions for common metrics
 def record_ai_request(
     provider: str, model: str, tokens: int, duration_ms: float, success: bool
 ) -> None:
     """Record AI API request metrics."""
     collector = get_metrics_collector()
-    collector.record_metric(
-        "ai_requests_total", 1, {"provider": provider, "model": model, "success": str(success)}
+    collector.increment_counter(
+        "ai_requests", tags={"provider": provider, "model": model, "success": str(success)}
     )
     collector.record_timing(
         "ai_request_duration", duration_ms, {"provider": provider, "model": model}
     )
-    collector.record_metric("ai_tokens_used", tokens, {"provider": provider, "model": model})
+    collector.increment_counter("ai_tokens_used", tokens, {"provider": provider, "model": model})
 
 
 def record_invoice_operation(operation: str, duration_ms: float, success: bool) -> None:
     """Record invoice operation metrics."""
     collector = get_metrics_collector()
-    collector.record_metric(
-        "invoice_operations_total", 1, {"operation": operation, "success": str(success)}
+    collector.increment_counter(
+        "invoice_operations", tags={"operation": operation, "success": str(success)}
     )
     collector.record_timing("invoice_operation_duration", duration_ms, {"operation": operation})
 
@@ -283,5 +728,5 @@ def record_payment_reconciliation(
     """Record payment reconciliation metrics."""
     collector = get_metrics_collector()
     collector.record_timing("payment_reconciliation_duration", duration_ms)
-    collector.record_metric("payment_transactions_processed", transactions_processed)
-    collector.record_metric("payment_matches_found", matches_found)
+    collector.increment_counter("payment_transactions_processed", transactions_processed)
+    collector.increment_counter("payment_matches_found", matches_found)
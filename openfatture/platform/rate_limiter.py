@@ -2,15 +2,26 @@
 Rate limiting utilities for API calls and email sending.
 
 Prevents exceeding rate limits of external services (PEC servers, APIs).
+
+The blocking limiters (:class:`RateLimiter`, :class:`SlidingWindowRateLimiter`)
+poll with ``time.sleep``. Async code should use :class:`AsyncTokenBucket`,
+:class:`AsyncGCRALimiter` or :class:`KeyedRateLimiter` instead: waiters are parked
+on futures in FIFO order and woken by a single timer exactly when capacity frees
+up. With a :class:`SQLiteLimiterState` several processes share one quota.
 """
 
+import asyncio
+import json
+import sqlite3
 import time
+from abc import ABC, abstractmethod
 from collections import deque
 from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta
 from functools import wraps
+from pathlib import Path
 from threading import Lock
-from typing import ParamSpec, TypeVar
+from typing import Literal, ParamSpec, TypeVar
 
 P = ParamSpec("P")
 R = TypeVar("R")
@@ -318,7 +329,6 @@ def retry_with_backoff_async(
             # ... async code that might fail
             pass
     """
-    import asyncio
 
     def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
         @wraps(func)
@@ -349,6 +359,468 @@ def retry_with_backoff_async(
     return decorator
 
 
+# Tolerance for floating point drift when comparing token counts and times
+_EPSILON = 1e-9
+
+
+class SQLiteLimiterState:
+    """
+    Limiter state shared between processes through a SQLite database.
+
+    Every reservation runs in its own ``BEGIN IMMEDIATE`` transaction, so CLI
+    commands and workers on the same machine draw from one provider quota. The
+    transaction may wait for other processes: the asyncio limiters run it in a
+    worker thread.
+
+    Usage:
+        state = SQLiteLimiterState(Path.home() / ".openfatture" / "rate_limits.db")
+        limiter = AsyncTokenBucket(rate=1, burst=5, state=state, key="openai")
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """
+        Open (and create if needed) the state database.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, state TEXT NOT NULL)"
+        )
+        self._lock = Lock()
+
+    def get(self, key: str) -> list[float] | None:
+        """
+        Read the state stored for a key.
+
+        Args:
+            key: Limiter key
+
+        Returns:
+            The stored state, or None if the key was never used
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(
+        self, key: str, update: Callable[[list[float] | None], tuple[list[float], float]]
+    ) -> float:
+        """
+        Atomically read, update and store the state of a key.
+
+        Args:
+            key: Limiter key
+            update: Function mapping the current state to (new state, result)
+
+        Returns:
+            The result returned by ``update``
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT state FROM rate_limits WHERE key = ?", (key,)
+                ).fetchone()
+                state, result = update(json.loads(row[0]) if row else None)
+                self._conn.execute(
+                    "INSERT INTO rate_limits (key, state) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET state = excluded.state",
+                    (key, json.dumps(state)),
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return result
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class AsyncRateLimiter(ABC):
+    """
+    Base class of the asyncio rate limiters.
+
+    Callers that cannot be served right away wait on a future, in FIFO order; a
+    single timer wakes the head of the queue when its tokens are available, so
+    no coroutine polls. A limiter serves one event loop at a time (waiters left
+    behind by a closed loop are dropped).
+
+    Subclasses implement :meth:`_reserve` on a small list of floats, which is kept
+    in memory or in a :class:`SQLiteLimiterState`.
+    """
+
+    kind = "limiter"
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        *,
+        state: SQLiteLimiterState | None = None,
+        key: str = "default",
+    ) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Tokens granted per second
+            burst: Maximum tokens that can be taken at once (bucket capacity)
+            state: Shared state store (default: this process only)
+            key: Key of the limiter in the shared state store
+
+        Raises:
+            ValueError: If rate or burst is not positive
+        """
+        if rate <= 0:
+            raise ValueError(f"Invalid rate: {rate} (must be positive)")
+        if burst <= 0:
+            raise ValueError(f"Invalid burst: {burst} (must be positive)")
+
+        self.rate = rate
+        self.burst = burst
+        self.key = key
+        self._state_store = state
+        self._state: list[float] | None = None
+        self._lock = Lock()
+        self._waiters: deque[tuple[float, asyncio.Future[None]]] = deque()
+        self._timer: asyncio.TimerHandle | None = None
+        self._waking: asyncio.Task[None] | None = None
+
+    @abstractmethod
+    def _reserve(
+        self, state: list[float] | None, tokens: float, now: float
+    ) -> tuple[list[float], float]:
+        """
+        Try to take tokens.
+
+        Args:
+            state: Current state (None before the first reservation)
+            tokens: Tokens requested
+            now: Current time in seconds
+
+        Returns:
+            Tuple of (new state, delay): a delay of 0 means the tokens were taken,
+            otherwise the seconds to wait before they are available
+        """
+        pass
+
+    def _clock(self) -> float:
+        # Wall clock time is comparable between processes, the monotonic one is not
+        return time.time() if self._state_store is not None else time.monotonic()
+
+    def _take(self, tokens: float) -> float:
+        if self._state_store is not None:
+            return self._state_store.update(
+                f"{self.kind}:{self.key}", lambda state: self._reserve(state, tokens, self._clock())
+            )
+        with self._lock:
+            self._state, delay = self._reserve(self._state, tokens, self._clock())
+        return delay
+
+    async def _take_async(self, tokens: float) -> float:
+        if self._state_store is None:
+            return self._take(tokens)
+        # The shared transaction may wait for other processes: off the event loop
+        return await asyncio.to_thread(self._take, tokens)
+
+    def _check_tokens(self, tokens: float) -> None:
+        if tokens <= 0 or tokens > self.burst:
+            raise ValueError(f"Invalid tokens: {tokens} (must be in (0, {self.burst}])")
+
+    def _prune(self) -> None:
+        # Drop cancelled waiters and waiters of a closed event loop from the head
+        while self._waiters:
+            future = self._waiters[0][1]
+            if not future.done() and not future.get_loop().is_closed():
+                break
+            self._waiters.popleft()
+        if not self._waiters and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _wake(self) -> None:
+        self._timer = None
+        self._prune()
+        if self._state_store is not None:
+            if self._waiters and (self._waking is None or self._waking.done()):
+                loop = self._waiters[0][1].get_loop()
+                self._waking = loop.create_task(self._wake_shared())
+            return
+        while self._waiters:
+            tokens, future = self._waiters[0]
+            delay = self._take(tokens)
+            if delay > 0:
+                self._timer = future.get_loop().call_later(delay, self._wake)
+                return
+            self._waiters.popleft()
+            future.set_result(None)
+            self._prune()
+
+    async def _wake_shared(self) -> None:
+        # Same as _wake, with the reservations in a worker thread
+        while self._waiters:
+            tokens, future = self._waiters[0]
+            delay = await self._take_async(tokens)
+            if delay > 0:
+                self._timer = future.get_loop().call_later(delay, self._wake)
+                return
+            # A waiter cancelled during the reservation leaves its tokens unused
+            if not future.done():
+                future.set_result(None)
+            self._prune()
+
+    async def acquire(self, tokens: float = 1, timeout: float | None = None) -> bool:
+        """
+        Wait until tokens are available and take them.
+
+        Args:
+            tokens: Tokens to take
+            timeout: Maximum time to wait in seconds (None waits forever)
+
+        Returns:
+            True if the tokens were taken, False on timeout (returned right away
+            when nobody is queued and the wait would exceed the timeout)
+
+        Raises:
+            ValueError: If tokens is not in (0, burst]
+        """
+        self._check_tokens(tokens)
+        self._prune()
+        if not self._waiters:
+            delay = await self._take_async(tokens)
+            if delay == 0:
+                return True
+            if timeout is not None and delay > timeout:
+                return False
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append((tokens, future))
+        if self._waiters[0][1] is future and self._timer is None:
+            self._wake()
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except TimeoutError:
+            return future.done() and not future.cancelled()
+        finally:
+            if future.cancelled():
+                was_head = bool(self._waiters) and self._waiters[0][1] is future
+                self._waiters = deque(w for w in self._waiters if w[1] is not future)
+                if was_head:
+                    if self._timer is not None:
+                        self._timer.cancel()
+                    self._wake()
+        return True
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Take tokens without waiting (never overtakes queued waiters).
+
+        With a shared state store the transaction runs in the calling thread.
+
+        Args:
+            tokens: Tokens to take
+
+        Returns:
+            True if the tokens were taken, False otherwise
+        """
+        self._check_tokens(tokens)
+        self._prune()
+        return not self._waiters and self._take(tokens) == 0
+
+    def get_wait_time(self, tokens: float = 1) -> float:
+        """
+        Get the time to wait before tokens are available, ignoring queued waiters.
+
+        Args:
+            tokens: Tokens to take
+
+        Returns:
+            Seconds to wait, or 0 if the tokens are available now
+        """
+        self._check_tokens(tokens)
+        if self._state_store is not None:
+            state = self._state_store.get(f"{self.kind}:{self.key}")
+        else:
+            with self._lock:
+                state = self._state
+        return self._reserve(state, tokens, self._clock())[1]
+
+    def reset(self) -> None:
+        """Refill the limiter (queued waiters are served again from a full bucket)."""
+        if self._state_store is not None:
+            self._state_store.update(f"{self.kind}:{self.key}", lambda state: ([], 0.0))
+        else:
+            with self._lock:
+                self._state = None
+
+
+class AsyncTokenBucket(AsyncRateLimiter):
+    """
+    Asyncio token bucket: ``burst`` tokens, refilled continuously at ``rate`` per second.
+
+    Usage:
+        limiter = AsyncTokenBucket(rate=10 / 60, burst=10)  # 10 calls per minute
+
+        await limiter.acquire()
+    """
+
+    kind = "token_bucket"
+
+    def _reserve(
+        self, state: list[float] | None, tokens: float, now: float
+    ) -> tuple[list[float], float]:
+        available, updated = state if state else (self.burst, now)
+        available = min(self.burst, available + max(0.0, now - updated) * self.rate)
+        if available + _EPSILON >= tokens:
+            return [available - tokens, now], 0.0
+        return [available, now], (tokens - available) / self.rate
+
+
+class AsyncGCRALimiter(AsyncRateLimiter):
+    """
+    Asyncio Generic Cell Rate Algorithm limiter.
+
+    Equivalent to a token bucket, but stores a single timestamp: the theoretical
+    arrival time (TAT) of the next request. Requests are spaced ``1 / rate``
+    seconds apart, with up to ``burst`` requests allowed ahead of schedule.
+
+    Usage:
+        limiter = AsyncGCRALimiter(rate=50, burst=5)
+
+        await limiter.acquire()
+    """
+
+    kind = "gcra"
+
+    def _reserve(
+        self, state: list[float] | None, tokens: float, now: float
+    ) -> tuple[list[float], float]:
+        interval = 1 / self.rate
+        tat = max(state[0], now) if state else now
+        new_tat = tat + tokens * interval
+        allowed_at = new_tat - self.burst * interval
+        if allowed_at <= now + _EPSILON:
+            return [new_tat], 0.0
+        return [tat], allowed_at - now
+
+
+_ALGORITHMS: dict[str, type[AsyncRateLimiter]] = {
+    "token_bucket": AsyncTokenBucket,
+    "gcra": AsyncGCRALimiter,
+}
+
+
+class KeyedRateLimiter:
+    """
+    Independent asyncio limiters per key (provider, tool, ...), created on first use.
+
+    Usage:
+        limiter = KeyedRateLimiter(rate=1, burst=5)
+        limiter.configure("anthropic", rate=0.5, burst=2)
+
+        await limiter.acquire("openai")
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        *,
+        algorithm: Literal["token_bucket", "gcra"] = "token_bucket",
+        state: SQLiteLimiterState | None = None,
+    ) -> None:
+        """
+        Initialize the keyed limiter.
+
+        Args:
+            rate: Default tokens per second of each key
+            burst: Default burst of each key
+            algorithm: "token_bucket" or "gcra"
+            state: Shared state store (default: this process only)
+
+        Raises:
+            ValueError: If the algorithm is unknown
+        """
+        if algorithm not in _ALGORITHMS:
+            raise ValueError(f"Unknown rate limiting algorithm: {algorithm}")
+
+        self.rate = rate
+        self.burst = burst
+        self.algorithm = algorithm
+        self._state_store = state
+        self._limits: dict[str, tuple[float, float]] = {}
+        self._limiters: dict[str, AsyncRateLimiter] = {}
+
+    def configure(self, key: str, rate: float, burst: float) -> None:
+        """
+        Override the rate and burst of one key.
+
+        Args:
+            key: Limiter key
+            rate: Tokens per second
+            burst: Maximum tokens taken at once
+        """
+        self._limits[key] = (rate, burst)
+        self._limiters.pop(key, None)
+
+    def limiter(self, key: str) -> AsyncRateLimiter:
+        """
+        Get the limiter of a key, creating it on first use.
+
+        Args:
+            key: Limiter key
+
+        Returns:
+            The limiter of the key
+        """
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            rate, burst = self._limits.get(key, (self.rate, self.burst))
+            limiter = _ALGORITHMS[self.algorithm](rate, burst, state=self._state_store, key=key)
+            self._limiters[key] = limiter
+        return limiter
+
+    async def acquire(self, key: str, tokens: float = 1, timeout: float | None = None) -> bool:
+        """
+        Wait until tokens of a key are available and take them.
+
+        Returns:
+            True if the tokens were taken, False on timeout
+        """
+        return await self.limiter(key).acquire(tokens, timeout)
+
+    def try_acquire(self, key: str, tokens: float = 1) -> bool:
+        """
+        Take tokens of a key without waiting.
+
+        Returns:
+            True if the tokens were taken, False otherwise
+        """
+        return self.limiter(key).try_acquire(tokens)
+
+    def get_wait_time(self, key: str, tokens: float = 1) -> float:
+        """
+        Get the time to wait before tokens of a key are available.
+
+        Returns:
+            Seconds to wait, or 0 if the tokens are available now
+        """
+        return self.limiter(key).get_wait_time(tokens)
+
+
 # Pre-configured rate limiters for common use cases
 
 # PEC email rate limiter (conservative: 10 emails per minute)
@@ -4,6 +4,8 @@ from pathlib import Path
 
 from lxml import etree
 
+from openfatture.platform.metrics import timed
+
 
 class FatturaPAValidator:
     """
@@ -52,6 +54,7 @@ class FatturaPAValidator:
             schema_doc = etree.parse(f)
             self._schema = etree.XMLSchema(schema_doc)
 
+    @timed("xml_validation")
     def validate(self, xml_content: str) -> tuple[bool, str | None]:
         """
         Validate XML content against FatturaPA XSD.
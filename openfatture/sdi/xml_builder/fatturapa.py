@@ -8,6 +8,7 @@ from typing import cast
 from lxml import etree
 
 from openfatture.platform.config import Settings
+from openfatture.platform.metrics import timed
 from openfatture.storage.database.models import Fattura
 
 
@@ -35,6 +36,7 @@ class FatturaPABuilder:
         """
         self.settings = settings
 
+    @timed("xml_build")
     def build(self, fattura: Fattura, output_path: Path | None = None) -> str:
         """
         Build FatturaPA XML from invoice model.
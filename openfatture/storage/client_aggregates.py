@@ -0,0 +1,288 @@
+"""Maintenance of the denormalized per-client totals (``cliente_aggregates``).
+
+Each client has one row with its invoice count, invoiced total, outstanding
+balance, last invoice date and average days-to-pay. The rows are kept current
+inside the writing transaction:
+
+- after every ORM flush, the rows of the clients touched by the flush (through
+  their invoices, payments or payment allocations) are recomputed with one
+  ``INSERT ... SELECT``
+- the table is backfilled when it is created
+
+:func:`check_client_aggregates` compares the stored rows with a fresh
+computation, and :func:`rebuild_client_aggregates` repairs any drift (e.g. after
+bulk SQL that bypassed the ORM).
+
+Example:
+    >>> from openfatture.storage.client_aggregates import check_client_aggregates
+    >>> with engine.connect() as connection:
+    ...     mismatches = check_client_aggregates(connection)
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, cast
+
+from sqlalchemy import (
+    Connection,
+    Insert,
+    Select,
+    delete,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from openfatture.payment.domain.payment_allocation import PaymentAllocation
+from openfatture.platform.datetime import utc_now
+from openfatture.platform.logging import get_logger
+
+from .database.models import (
+    Cliente,
+    ClienteAggregate,
+    Fattura,
+    Pagamento,
+    StatoFattura,
+    StatoPagamento,
+)
+from .side_tables import (
+    FlushedObjects,
+    SideTable,
+    register_side_table,
+    resync_rows,
+    session_has_table,
+)
+
+logger = get_logger(__name__)
+
+AGGREGATE_FIELDS = (
+    "num_fatture",
+    "totale_fatturato",
+    "residuo",
+    "ultima_fattura",
+    "giorni_medi_pagamento",
+)
+
+
+@dataclass(frozen=True)
+class AggregateMismatch:
+    """A stored aggregate value that differs from the recomputed one."""
+
+    cliente_id: int
+    field: str
+    stored: Any
+    expected: Any
+
+
+def _days_between(later: Any, earlier: Any, dialect: str) -> ColumnElement[Any]:
+    if dialect == "sqlite":
+        return func.julianday(later) - func.julianday(earlier)
+    # PostgreSQL and most others: date - date is a number of days
+    return cast(ColumnElement[Any], later - earlier)
+
+
+def _aggregate_source(dialect: str, cliente_ids: list[int] | None) -> Select[Any]:
+    """Select one aggregate row per client (optionally restricted to ``cliente_ids``)."""
+    of_client = Fattura.cliente_id == Cliente.id
+    paid_to = Fattura.id == Pagamento.fattura_id
+
+    num_fatture = select(func.count(Fattura.id)).where(of_client).scalar_subquery()
+    totale_fatturato = (
+        select(func.coalesce(func.sum(Fattura.totale), 0))
+        .where(of_client, Fattura.stato != StatoFattura.BOZZA)
+        .scalar_subquery()
+    )
+    ultima_fattura = select(func.max(Fattura.data_emissione)).where(of_client).scalar_subquery()
+    residuo = (
+        select(func.coalesce(func.sum(Pagamento.importo - Pagamento.importo_pagato), 0))
+        .select_from(Pagamento)
+        .join(Fattura, paid_to)
+        .where(
+            of_client,
+            Pagamento.stato != StatoPagamento.PAGATO,
+            Pagamento.importo_pagato < Pagamento.importo,
+        )
+        .scalar_subquery()
+    )
+    giorni_medi = (
+        select(func.avg(_days_between(Pagamento.data_pagamento, Fattura.data_emissione, dialect)))
+        .select_from(Pagamento)
+        .join(Fattura, paid_to)
+        .where(of_client, Pagamento.data_pagamento.isnot(None))
+        .scalar_subquery()
+    )
+
+    stmt = select(
+        Cliente.id.label("cliente_id"),
+        num_fatture.label("num_fatture"),
+        totale_fatturato.label("totale_fatturato"),
+        residuo.label("residuo"),
+        ultima_fattura.label("ultima_fattura"),
+        giorni_medi.label("giorni_medi_pagamento"),
+    )
+    if cliente_ids is not None:
+        stmt = stmt.where(Cliente.id.in_(cliente_ids))
+    return stmt
+
+
+def _insert_rows(dialect: str, cliente_ids: list[int] | None) -> Insert:
+    now = utc_now()
+    source = _aggregate_source(dialect, cliente_ids).add_columns(
+        literal(now, ClienteAggregate.created_at.type),
+        literal(now, ClienteAggregate.updated_at.type),
+    )
+    return insert(ClienteAggregate).from_select(
+        ["cliente_id", *AGGREGATE_FIELDS, "created_at", "updated_at"],
+        source,
+        include_defaults=False,
+    )
+
+
+def sync_clients(connection: Connection, cliente_ids: Iterable[int | None]) -> None:
+    """Recompute the aggregate rows of the given clients."""
+    dialect = connection.dialect.name
+    resync_rows(
+        connection,
+        ClienteAggregate,
+        ClienteAggregate.cliente_id,
+        cliente_ids,
+        lambda chunk: _insert_rows(dialect, chunk),
+    )
+
+
+def rebuild_client_aggregates(connection: Connection) -> int:
+    """Recompute every client's aggregate row.
+
+    Returns:
+        Number of clients aggregated
+    """
+    connection.execute(delete(ClienteAggregate))
+    result = connection.execute(_insert_rows(connection.dialect.name, None))
+    logger.debug("client_aggregates_rebuilt", rows=result.rowcount)
+    return int(result.rowcount or 0)
+
+
+def check_client_aggregates(connection: Connection) -> list[AggregateMismatch]:
+    """Compare the stored aggregates with a fresh computation.
+
+    Returns:
+        One entry per differing field; missing or orphan rows are reported with
+        ``field="row"``
+    """
+    expected = {
+        row.cliente_id: row
+        for row in connection.execute(_aggregate_source(connection.dialect.name, None))
+    }
+    stored = {
+        row.cliente_id: row
+        for row in connection.execute(
+            select(
+                ClienteAggregate.cliente_id,
+                *(getattr(ClienteAggregate, f) for f in AGGREGATE_FIELDS),
+            )
+        )
+    }
+
+    mismatches: list[AggregateMismatch] = []
+    for cliente_id in sorted(expected.keys() | stored.keys()):
+        if cliente_id not in stored or cliente_id not in expected:
+            mismatches.append(
+                AggregateMismatch(cliente_id, "row", cliente_id in stored, cliente_id in expected)
+            )
+            continue
+        for field in AGGREGATE_FIELDS:
+            have = getattr(stored[cliente_id], field)
+            want = getattr(expected[cliente_id], field)
+            if not _same(have, want):
+                mismatches.append(AggregateMismatch(cliente_id, field, have, want))
+
+    logger.info("client_aggregates_checked", clients=len(expected), mismatches=len(mismatches))
+    return mismatches
+
+
+def _same(stored: Any, expected: Any) -> bool:
+    if stored is None or expected is None:
+        return stored is None and expected is None
+    if isinstance(stored, float) or isinstance(expected, float):
+        return abs(float(stored) - float(expected)) < 1e-6
+    if isinstance(stored, Decimal) or isinstance(expected, Decimal):
+        return Decimal(str(stored)).quantize(Decimal("0.01")) == Decimal(str(expected)).quantize(
+            Decimal("0.01")
+        )
+    return bool(stored == expected)
+
+
+def has_client_aggregates(session: Session) -> bool:
+    """Whether the session's database has the ``cliente_aggregates`` table."""
+    return session_has_table(session, ClienteAggregate.__tablename__)
+
+
+@dataclass(frozen=True)
+class _ChangedRows:
+    """Rows touched by a flush that affect client aggregates."""
+
+    cliente_ids: set[int | None]
+    fattura_ids: set[int | None]
+    payment_ids: set[int | None]
+
+
+def _changed_rows(flushed: FlushedObjects) -> _ChangedRows | None:
+    cliente_ids: set[int | None] = set()
+    fattura_ids: set[int | None] = set()
+    payment_ids: set[int | None] = set()
+    for obj in flushed:
+        if isinstance(obj, Cliente):
+            cliente_ids.add(obj.id)
+        elif isinstance(obj, Fattura):
+            cliente_ids.add(obj.cliente_id)
+            # Invoice moved to another client: refresh the previous one too
+            cliente_ids.update(inspect(obj).attrs.cliente_id.history.deleted or ())
+        elif isinstance(obj, Pagamento):
+            fattura_ids.add(obj.fattura_id)
+            fattura_ids.update(inspect(obj).attrs.fattura_id.history.deleted or ())
+        elif isinstance(obj, PaymentAllocation):
+            payment_ids.add(obj.payment_id)
+    if not (cliente_ids or fattura_ids or payment_ids):
+        return None
+    return _ChangedRows(cliente_ids, fattura_ids, payment_ids)
+
+
+def _sync_changed_rows(connection: Connection, changed: _ChangedRows) -> None:
+    cliente_ids, fattura_ids = changed.cliente_ids, changed.fattura_ids
+    if changed.payment_ids:
+        fattura_ids.update(
+            connection.execute(
+                select(Pagamento.fattura_id).where(Pagamento.id.in_(changed.payment_ids))
+            ).scalars()
+        )
+    if fattura_ids:
+        cliente_ids.update(
+            connection.execute(
+                select(Fattura.cliente_id).where(Fattura.id.in_(fattura_ids))
+            ).scalars()
+        )
+    sync_clients(connection, cliente_ids)
+
+
+def install_client_aggregate_listeners() -> None:
+    """Register the table with the side-table maintenance hooks (idempotent)."""
+    register_side_table(
+        SideTable(
+            name=ClienteAggregate.__tablename__,
+            collect=_changed_rows,
+            sync=_sync_changed_rows,
+            rebuild=rebuild_client_aggregates,
+            model=ClienteAggregate,
+            source_tables=(Fattura.__tablename__, Pagamento.__tablename__),
+        )
+    )
+
+
+install_client_aggregate_listeners()
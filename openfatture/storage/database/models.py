@@ -12,6 +12,7 @@ from sqlalchemy import (
     Date,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -265,7 +266,10 @@ class Fattura(IntPKMixin, Base):
     )
 
     # Cliente
-    cliente_id: Mapped[int] = mapped_column(ForeignKey("clienti.id"), nullable=False)
+    # active_history: reassignments report the previous client to cliente_aggregates
+    cliente_id: Mapped[int] = mapped_column(
+        ForeignKey("clienti.id"), nullable=False, active_history=True
+    )
     cliente: Mapped[Cliente] = relationship(back_populates="fatture")
 
     # Preventivo (optional - if invoice was generated from a quote)
@@ -389,7 +393,9 @@ class Pagamento(IntPKMixin, Base):
 
     __tablename__ = "pagamenti"
 
-    fattura_id: Mapped[int] = mapped_column(ForeignKey("fatture.id"), nullable=False)
+    fattura_id: Mapped[int] = mapped_column(
+        ForeignKey("fatture.id"), nullable=False, active_history=True
+    )
     fattura: Mapped[Fattura] = relationship(back_populates="pagamenti")
 
     # Importo
@@ -488,6 +494,71 @@ class Pagamento(IntPKMixin, Base):
             self.stato = StatoPagamento.PAGATO
 
 
+class ClienteAggregate(Base):
+    """Denormalized per-client totals: one row per client.
+
+    Maintained in the same transaction as invoice and payment writes by
+    ``openfatture.storage.client_aggregates``, so dashboards and reports read a
+    single row instead of aggregating the client's whole history.
+    """
+
+    __tablename__ = "cliente_aggregates"
+
+    cliente_id: Mapped[int] = mapped_column(
+        ForeignKey("clienti.id", ondelete="CASCADE"), primary_key=True
+    )
+    cliente: Mapped[Cliente] = relationship(viewonly=True)
+
+    # All invoices, drafts included
+    num_fatture: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Invoiced total, drafts excluded
+    totale_fatturato: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), nullable=False, default=Decimal("0.00")
+    )
+    # Outstanding balance of the client's payments
+    residuo: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), nullable=False, default=Decimal("0.00")
+    )
+    ultima_fattura: Mapped[date | None] = mapped_column(Date)
+    # Average days from invoice issue to payment (paid payments only)
+    giorni_medi_pagamento: Mapped[float | None] = mapped_column(Float)
+
+    def __repr__(self) -> str:
+        return f"<ClienteAggregate(cliente_id={self.cliente_id}, num_fatture={self.num_fatture}, totale_fatturato={self.totale_fatturato}, residuo={self.residuo})>"
+
+
+class PaymentDue(Base):
+    """Due-date index: one row per payment with an outstanding balance.
+
+    Kept in sync with ``pagamenti`` on every flush and re-aged nightly by
+    ``openfatture.payment.infrastructure.due_index``, so dashboards and reminders
+    read due dates, residuals and aging buckets without recomputing them from
+    every payment. Fully paid payments have no row.
+    """
+
+    __tablename__ = "payment_due_index"
+    __table_args__ = (Index("ix_payment_due_index_bucket_due", "aging_bucket", "data_scadenza"),)
+
+    payment_id: Mapped[int] = mapped_column(
+        ForeignKey("pagamenti.id", ondelete="CASCADE"), primary_key=True
+    )
+    fattura_id: Mapped[int] = mapped_column(ForeignKey("fatture.id"), nullable=False, index=True)
+    fattura: Mapped[Fattura] = relationship(viewonly=True)
+
+    data_scadenza: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    importo: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    importo_pagato: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    residuo: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    stato: Mapped[StatoPagamento] = mapped_column(Enum(StatoPagamento), nullable=False)
+
+    # AgingBucket value as of ``aging_as_of``
+    aging_bucket: Mapped[str] = mapped_column(String(16), nullable=False)
+    aging_as_of: Mapped[date] = mapped_column(Date, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PaymentDue(payment_id={self.payment_id}, data_scadenza={self.data_scadenza}, residuo={self.residuo}, aging_bucket='{self.aging_bucket}')>"
+
+
 class LogSDI(IntPKMixin, Base):
     """SDI notification log."""
 
@@ -658,6 +729,27 @@ class EventLog(IntPKMixin, Base):
         return f"<EventLog(id={self.id}, event_type='{self.event_type}', entity={self.entity_type}:{self.entity_id}, occurred_at='{self.occurred_at}')>"
 
 
+class EventRollup(Base):
+    """Hourly event counts per event type and entity type.
+
+    Maintained in the same transaction as the events by
+    ``openfatture.storage.event_rollups``, so activity reports sum one row per
+    hour instead of scanning ``event_log``. Events without an entity are counted
+    under ``entity_type = ""``.
+    """
+
+    __tablename__ = "event_rollups"
+
+    # Start of the hour (UTC, naive)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(100), primary_key=True)
+    entity_type: Mapped[str] = mapped_column(String(50), primary_key=True, default="")
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<EventRollup(bucket_start='{self.bucket_start}', event_type='{self.event_type}', entity_type='{self.entity_type}', event_count={self.event_count})>"
+
+
 def _register_payment_allocation_model() -> None:
     """Register PaymentAllocation on the shared Base for relationship resolution.
 
@@ -669,4 +761,16 @@ def _register_payment_allocation_model() -> None:
     assert PaymentAllocation.__tablename__ == "payment_allocations"
 
 
+def _register_side_tables() -> None:
+    """Install the maintenance hooks of the derived side tables.
+
+    Each module registers its side table on import.
+    """
+    import openfatture.payment.infrastructure.due_index  # noqa: F401
+    import openfatture.storage.client_aggregates  # noqa: F401
+    import openfatture.storage.event_rollups  # noqa: F401
+    import openfatture.storage.search  # noqa: F401
+
+
 _register_payment_allocation_model()
+_register_side_tables()
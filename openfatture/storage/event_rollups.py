@@ -0,0 +1,348 @@
+"""Hourly event rollups and SQL-side event counting.
+
+``event_rollups`` holds one row per (hour, event type, entity type) with the
+number of events that occurred in that hour. The rows are kept current inside
+the writing transaction:
+
+- after every ORM flush, the events added (or deleted) by the flush are counted
+  per bucket and applied with one ``INSERT ... ON CONFLICT DO UPDATE``
+- the table is backfilled when it is created
+
+:func:`count_events` answers grouped counts over a time range with ``GROUP BY``
+in the database: whole hours are summed from the rollups and the partial hours
+at the edges of the range are counted on ``event_log`` (indexed by
+``occurred_at``), so results are exact without loading any event. Without the
+rollup table the whole range is grouped on ``event_log``.
+
+Buckets use the UTC wall-clock time of ``occurred_at``. Bulk SQL that bypasses
+the ORM (e.g. retention clean-ups) should be followed by
+:func:`rebuild_event_rollups`.
+
+Example:
+    >>> counts = count_events(session, period="day", start=datetime(2025, 1, 1))
+    >>> counts[("2025-01-02",)]
+    42
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import Connection, delete, func, insert, inspect, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from openfatture.platform.datetime import utc_now
+from openfatture.platform.logging import get_logger
+
+from .database.models import EventLog, EventRollup
+from .side_tables import FlushedObjects, SideTable, register_side_table, session_has_table
+
+logger = get_logger(__name__)
+
+# Bucket keys of count_events(period=...): (SQLite strftime, PostgreSQL to_char)
+PERIOD_FORMATS = {
+    "hour": ("%Y-%m-%d %H:00", "YYYY-MM-DD HH24:00"),
+    "day": ("%Y-%m-%d", "YYYY-MM-DD"),
+    "month": ("%Y-%m", "YYYY-MM"),
+}
+GROUP_COLUMNS = ("event_type", "entity_type")
+
+_HOUR = timedelta(hours=1)
+
+RollupKey = tuple[datetime, str, str]
+
+
+def _utc_wall(value: datetime) -> datetime:
+    """Naive UTC time of ``value`` (naive values are taken as UTC already)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+def _hour_floor(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _hour_ceil(value: datetime) -> datetime:
+    floor = _hour_floor(value)
+    return floor if floor == value else floor + _HOUR
+
+
+def _occurred_at(dialect: str) -> ColumnElement[Any]:
+    """``event_log.occurred_at`` as naive UTC time."""
+    if dialect == "postgresql":
+        return func.timezone("UTC", EventLog.occurred_at)
+    # SQLite stores the UTC wall-clock time as text
+    return EventLog.occurred_at.expression
+
+
+def _hour_of(column: ColumnElement[Any], dialect: str) -> ColumnElement[Any]:
+    """Truncate a naive timestamp to the hour (same storage format as ``bucket_start``)."""
+    if dialect == "postgresql":
+        return func.date_trunc("hour", column)
+    return func.strftime("%Y-%m-%d %H:00:00.000000", column)
+
+
+def period_key(column: ColumnElement[Any], period: str, dialect: str) -> ColumnElement[str]:
+    """Format a naive timestamp as the bucket key of ``period`` (e.g. ``"2025-01-02"``)."""
+    sqlite_format, postgres_format = PERIOD_FORMATS[period]
+    if dialect == "postgresql":
+        return func.to_char(func.date_trunc(period, column), postgres_format)
+    return func.strftime(sqlite_format, column)
+
+
+# ----------------------------------------------------------------------------
+# Counting
+# ----------------------------------------------------------------------------
+
+
+def count_events(
+    session: Session,
+    *,
+    period: str | None = None,
+    by: Sequence[str] = (),
+    event_type: str | None = None,
+    entity_type: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> dict[tuple[Any, ...], int]:
+    """Count events grouped by time bucket and/or columns, in the database.
+
+    Args:
+        session: Active SQLAlchemy session
+        period: Bucket the counts by ``"hour"``, ``"day"`` or ``"month"``
+        by: Also group by any of ``"event_type"``, ``"entity_type"``
+        event_type: Only count events of this type
+        entity_type: Only count events of this entity type
+        start: Only count events that occurred at or after this time
+        end: Only count events that occurred at or before this time
+
+    Returns:
+        ``{key: count}`` where ``key`` is the bucket key (if ``period``) followed
+        by the ``by`` values; ``()`` holds the total without grouping. Events
+        without an entity have ``entity_type`` None.
+    """
+    if period is not None and period not in PERIOD_FORMATS:
+        raise ValueError(f"Unknown period {period!r}, expected one of {sorted(PERIOD_FORMATS)}")
+    unknown = set(by) - set(GROUP_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot group events by {sorted(unknown)}")
+
+    lower = _utc_wall(start) if start is not None else None
+    upper = _utc_wall(end) if end is not None else None
+
+    # (use rollups, lower bound, upper bound, upper bound inclusive)
+    ranges: list[tuple[bool, datetime | None, datetime | None, bool]]
+    first = _hour_ceil(lower) if lower is not None else None
+    last = _hour_floor(upper) if upper is not None else None
+    if not has_event_rollups(session) or (first is not None and last is not None and first >= last):
+        ranges = [(False, lower, upper, True)]
+    else:
+        # Whole hours from the rollups, partial hours at the edges from event_log
+        ranges = [(True, first, last, False)]
+        if lower is not None and first is not None and lower < first:
+            ranges.append((False, lower, first, False))
+        if upper is not None:
+            ranges.append((False, last, upper, True))
+
+    dialect = session.get_bind().dialect.name
+    entity_index = ((1 if period else 0) + by.index("entity_type")) if "entity_type" in by else -1
+    counts: Counter[tuple[Any, ...]] = Counter()
+    for rollups, low, high, inclusive in ranges:
+        stmt = _grouped_counts(
+            dialect, rollups, period, by, event_type, entity_type, low, high, inclusive
+        )
+        for row in session.execute(stmt):
+            key = tuple(row[:-1])
+            if entity_index >= 0 and key[entity_index] == "":
+                key = key[:entity_index] + (None,) + key[entity_index + 1 :]
+            counts[key] += int(row[-1] or 0)
+    return {key: n for key, n in counts.items() if n}
+
+
+def _grouped_counts(
+    dialect: str,
+    rollups: bool,
+    period: str | None,
+    by: Sequence[str],
+    event_type: str | None,
+    entity_type: str | None,
+    lower: datetime | None,
+    upper: datetime | None,
+    upper_inclusive: bool,
+) -> Any:
+    model: Any
+    time_column: ColumnElement[Any]
+    if rollups:
+        model, time_column = EventRollup, EventRollup.bucket_start.expression
+        counted: ColumnElement[Any] = func.sum(EventRollup.event_count)
+    else:
+        model, time_column = EventLog, _occurred_at(dialect)
+        counted = func.count()
+
+    keys: list[ColumnElement[Any]] = []
+    if period:
+        keys.append(period_key(time_column, period, dialect))
+    keys.extend(getattr(model, name) for name in by)
+    stmt = select(*keys, counted).select_from(model)
+    if keys:
+        stmt = stmt.group_by(*keys)
+
+    if event_type:
+        stmt = stmt.where(model.event_type == event_type)
+    if entity_type:
+        stmt = stmt.where(model.entity_type == entity_type)
+
+    column = EventRollup.bucket_start if rollups else EventLog.occurred_at
+    if lower is not None:
+        stmt = stmt.where(column >= _bound(lower, rollups, dialect))
+    if upper is not None:
+        bound = _bound(upper, rollups, dialect)
+        stmt = stmt.where(column <= bound if upper_inclusive else column < bound)
+    return stmt
+
+
+def _bound(value: datetime, rollups: bool, dialect: str) -> datetime:
+    # bucket_start is naive UTC; occurred_at is timezone-aware except on SQLite
+    if rollups or dialect == "sqlite":
+        return value
+    return value.replace(tzinfo=UTC)
+
+
+# ----------------------------------------------------------------------------
+# Maintenance
+# ----------------------------------------------------------------------------
+
+
+def apply_rollup_deltas(connection: Connection, deltas: Mapping[RollupKey, int]) -> None:
+    """Add ``deltas`` (``{(hour, event_type, entity_type): n}``) to the rollups."""
+    now = utc_now()
+    rows: list[dict[str, Any]] = [
+        {
+            "bucket_start": bucket_start,
+            "event_type": event_type,
+            "entity_type": entity_type,
+            "event_count": n,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for (bucket_start, event_type, entity_type), n in deltas.items()
+        if n
+    ]
+    if not rows:
+        return
+    dialect = connection.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        _recount_buckets(connection, {row["bucket_start"] for row in rows})
+        return
+    upsert = (sqlite_insert if dialect == "sqlite" else pg_insert)(EventRollup)
+    connection.execute(
+        upsert.on_conflict_do_update(
+            index_elements=["bucket_start", "event_type", "entity_type"],
+            set_={
+                "event_count": EventRollup.event_count + upsert.excluded.event_count,
+                "updated_at": upsert.excluded.updated_at,
+            },
+        ),
+        rows,
+    )
+
+
+def _rollup_source(dialect: str) -> Any:
+    hour = _hour_of(_occurred_at(dialect), dialect)
+    entity = func.coalesce(EventLog.entity_type, "")
+    now = utc_now()
+    return select(
+        hour,
+        EventLog.event_type,
+        entity,
+        func.count(),
+        literal(now, EventRollup.created_at.type),
+        literal(now, EventRollup.updated_at.type),
+    ).group_by(hour, EventLog.event_type, entity)
+
+
+_ROLLUP_COLUMNS = [
+    "bucket_start",
+    "event_type",
+    "entity_type",
+    "event_count",
+    "created_at",
+    "updated_at",
+]
+
+
+def _recount_buckets(connection: Connection, hours: set[datetime]) -> None:
+    """Recount whole hours from ``event_log`` (databases without upserts)."""
+    dialect = connection.dialect.name
+    for hour in sorted(hours):
+        connection.execute(delete(EventRollup).where(EventRollup.bucket_start == hour))
+        source = _rollup_source(dialect).where(
+            EventLog.occurred_at >= _bound(hour, False, dialect),
+            EventLog.occurred_at < _bound(hour + _HOUR, False, dialect),
+        )
+        connection.execute(insert(EventRollup).from_select(_ROLLUP_COLUMNS, source))
+
+
+def rebuild_event_rollups(connection: Connection) -> int:
+    """Recompute every rollup row from ``event_log``.
+
+    Returns:
+        Number of rollup rows
+    """
+    connection.execute(delete(EventRollup))
+    result = connection.execute(
+        insert(EventRollup).from_select(_ROLLUP_COLUMNS, _rollup_source(connection.dialect.name))
+    )
+    logger.debug("event_rollups_rebuilt", rows=result.rowcount)
+    return int(result.rowcount or 0)
+
+
+def has_event_rollups(session: Session) -> bool:
+    """Whether the session's database has the ``event_rollups`` table."""
+    return session_has_table(session, EventRollup.__tablename__)
+
+
+def _rollup_key(event_log: EventLog) -> RollupKey | None:
+    # Read the loaded state only: deleted rows can no longer be refreshed
+    state = inspect(event_log).dict
+    occurred_at = state.get("occurred_at")
+    event_type = state.get("event_type")
+    if occurred_at is None or event_type is None:
+        return None
+    return _hour_floor(_utc_wall(occurred_at)), event_type, state.get("entity_type") or ""
+
+
+def _rollup_deltas(flushed: FlushedObjects) -> Counter[RollupKey] | None:
+    """Per-bucket event count changes of a flush."""
+    deltas: Counter[RollupKey] = Counter()
+    for objects, step in ((flushed.new, 1), (flushed.deleted, -1)):
+        for obj in objects:
+            if isinstance(obj, EventLog):
+                key = _rollup_key(obj)
+                if key is not None:
+                    deltas[key] += step
+    return deltas if any(deltas.values()) else None
+
+
+def install_event_rollup_listeners() -> None:
+    """Register the table with the side-table maintenance hooks (idempotent)."""
+    register_side_table(
+        SideTable(
+            name=EventRollup.__tablename__,
+            collect=_rollup_deltas,
+            sync=apply_rollup_deltas,
+            rebuild=rebuild_event_rollups,
+            model=EventRollup,
+            source_tables=(EventLog.__tablename__,),
+        )
+    )
+
+
+install_event_rollup_listeners()
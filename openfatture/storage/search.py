@@ -0,0 +1,511 @@
+"""Indexed, typo-tolerant search over clients, products and invoices.
+
+On SQLite the searchable columns are mirrored into FTS5 tables using the
+``trigram`` tokenizer:
+
+- ``search_clienti``: denominazione, partita IVA, codice fiscale
+- ``search_prodotti``: codice, descrizione, categoria
+- ``search_fatture``: numero/anno, client name, note
+- ``search_events``: JSON payload of the event log
+
+The tables are created (and backfilled) together with the schema and kept
+current after every flush (see :mod:`openfatture.storage.side_tables`). A query
+is split into trigrams matched with ``OR``, so rows sharing most trigrams rank
+first by BM25 even with a typo ("Rosi" finds "Rossi"); the candidates are then
+re-scored with rapidfuzz.
+Substring filters (``LIKE '%abc%'``) on the mirror tables are served by the
+trigram index too.
+
+Other databases, or SQLite builds without FTS5, report
+:meth:`SearchIndex.available` as False and callers keep their ``LIKE`` queries.
+
+Example:
+    >>> index = SearchIndex(session)
+    >>> if index.available():
+    ...     hit = index.search_clients("rosi srl", limit=5)[0]
+    ...     hit.denominazione, hit.fatture_count
+    ('Rossi SRL', 12)
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from rapidfuzz import fuzz
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    Connection,
+    Engine,
+    Insert,
+    Integer,
+    MetaData,
+    Select,
+    String,
+    Table,
+    Text,
+    cast,
+    delete,
+    event,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.orm import Session
+
+from openfatture.platform.logging import get_logger
+
+from .database.base import metadata as base_metadata
+from .database.models import Cliente, EventLog, Fattura, Prodotto
+from .side_tables import (
+    FlushedObjects,
+    SideTable,
+    register_side_table,
+    resync_rows,
+    session_has_table,
+    set_table_available,
+)
+
+logger = get_logger(__name__)
+
+# Candidates scoring below this (rapidfuzz partial ratio, 0-100) are dropped:
+# one typo in a four-letter word still scores 75
+DEFAULT_MIN_SCORE = 75.0
+# FTS candidates fetched per requested result before re-scoring
+CANDIDATES_PER_RESULT = 10
+MIN_CANDIDATES = 100
+
+# Side-table name of the mirror tables as a whole
+SEARCH_INDEX = "search_index"
+_fts_metadata = MetaData()
+
+SEARCH_CLIENTI = Table(
+    "search_clienti",
+    _fts_metadata,
+    Column("rowid", Integer, primary_key=True),
+    Column("denominazione", Text),
+    Column("partita_iva", Text),
+    Column("codice_fiscale", Text),
+)
+SEARCH_PRODOTTI = Table(
+    "search_prodotti",
+    _fts_metadata,
+    Column("rowid", Integer, primary_key=True),
+    Column("codice", Text),
+    Column("descrizione", Text),
+    Column("categoria", Text),
+)
+SEARCH_FATTURE = Table(
+    "search_fatture",
+    _fts_metadata,
+    Column("rowid", Integer, primary_key=True),
+    Column("numero", Text),
+    Column("cliente", Text),
+    Column("note", Text),
+)
+SEARCH_EVENTS = Table(
+    "search_events",
+    _fts_metadata,
+    Column("rowid", Integer, primary_key=True),
+    Column("event_data", Text),
+)
+SEARCH_TABLES = (SEARCH_CLIENTI, SEARCH_PRODOTTI, SEARCH_FATTURE, SEARCH_EVENTS)
+
+
+@dataclass(frozen=True)
+class ClientHit:
+    """Client search result with its invoice count."""
+
+    id: int
+    denominazione: str
+    partita_iva: str
+    codice_fiscale: str
+    email: str
+    fatture_count: int
+    score: float = 100.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class ProductHit:
+    """Product search result."""
+
+    id: int
+    codice: str
+    descrizione: str
+    categoria: str | None
+    score: float = 100.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class InvoiceHit:
+    """Invoice search result."""
+
+    id: int
+    numero: str
+    anno: int
+    cliente: str
+    score: float = 100.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _trigram_query(query: str) -> str | None:
+    """Build an FTS5 ``OR`` query of the trigrams of every word (None if too short)."""
+    grams: dict[str, None] = {}
+    for word in query.lower().split():
+        for start in range(len(word) - 2):
+            grams[word[start : start + 3]] = None
+    if not grams:
+        return None
+    return " OR ".join('"' + gram.replace('"', '""') + '"' for gram in grams)
+
+
+def _score(query: str, values: Iterable[str | None]) -> float:
+    needle = query.lower()
+    return max((fuzz.partial_ratio(needle, v.lower()) for v in values if v), default=0.0)
+
+
+def _contains(column: ColumnElement[Any], fragment: str) -> ColumnElement[bool]:
+    """Substring ``LIKE`` on ``column`` that matches ``fragment`` literally.
+
+    Wildcards are escaped only when present: FTS5 answers ``LIKE`` from the
+    trigram index only without an ``ESCAPE`` clause.
+    """
+    if "%" not in fragment and "_" not in fragment:
+        return column.like(f"%{fragment}%")
+    escaped = fragment.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.like(f"%{escaped}%", escape="\\")
+
+
+def contains_ids(table: Table, column: str, fragment: str) -> Select[tuple[int]]:
+    """Select the ids whose mirrored ``column`` contains ``fragment`` (case-insensitive).
+
+    Fragments of three or more characters are answered by the trigram index.
+    """
+    return select(table.c.rowid).where(_contains(table.c[column], fragment))
+
+
+class SearchIndex:
+    """Ranked search over the FTS5 mirror tables of a session's database."""
+
+    def __init__(self, session: Session, min_score: float = DEFAULT_MIN_SCORE) -> None:
+        """Initialize the search index.
+
+        Args:
+            session: Active SQLAlchemy session
+            min_score: Minimum rapidfuzz score (0-100) of a hit
+        """
+        self.session = session
+        self.min_score = min_score
+
+    def available(self) -> bool:
+        """Whether the session's database has the search tables."""
+        try:
+            bind = self.session.get_bind()
+        except Exception:
+            return False
+        if not isinstance(bind, Engine | Connection) or bind.dialect.name != "sqlite":
+            return False
+        return session_has_table(self.session, SEARCH_INDEX)
+
+    def rank(
+        self,
+        table: Table,
+        query: str,
+        limit: int,
+        *,
+        columns: Sequence[str] | None = None,
+        within: Select[Any] | None = None,
+    ) -> dict[int, float]:
+        """Return ``{id: score}`` of the best matches for ``query``, best first.
+
+        Args:
+            table: One of the ``SEARCH_*`` tables
+            query: Free-text query
+            limit: Maximum number of ids
+            columns: Mirror columns to match (default: all)
+            within: Select of the source ids eligible for ranking; it is applied
+                in the candidate query, so filters do not compete with the
+                candidate limit
+        """
+        query = query.strip()
+        searched = [
+            c for c in table.c if c.name != "rowid" and (columns is None or c.name in columns)
+        ]
+        match = _trigram_query(query)
+        if match is None:
+            # Shorter than a trigram: substring scan of the mirror table
+            stmt = select(table.c.rowid, *searched).where(
+                or_(*(_contains(c, query) for c in searched))
+            )
+        else:
+            if columns is not None:
+                match = "{" + " ".join(c.name for c in searched) + "} : (" + match + ")"
+            stmt = (
+                select(table.c.rowid, *searched)
+                .where(text(f"{table.name} MATCH :match").bindparams(match=match))
+                .order_by(text("rank"))
+            )
+        if within is not None:
+            stmt = stmt.where(table.c.rowid.in_(within))
+        candidates = max(limit * CANDIDATES_PER_RESULT, MIN_CANDIDATES)
+        rows = self.session.execute(stmt.limit(candidates)).all()
+
+        scored = [(row[0], _score(query, row[1:])) for row in rows]
+        scored = [(rowid, score) for rowid, score in scored if score >= self.min_score]
+        scored.sort(key=lambda item: -item[1])
+        return dict(scored[:limit])
+
+    def search_clients(self, query: str | None, limit: int = 10) -> list[ClientHit]:
+        """Search clients by name, partita IVA or codice fiscale.
+
+        Without a query, returns the first clients in alphabetical order.
+        """
+        stmt = select(
+            Cliente.id,
+            Cliente.denominazione,
+            Cliente.partita_iva,
+            Cliente.codice_fiscale,
+            Cliente.email,
+        )
+        ranked: dict[int, float] = {}
+        if query and query.strip():
+            ranked = self.rank(SEARCH_CLIENTI, query, limit)
+            if not ranked:
+                return []
+            stmt = stmt.where(Cliente.id.in_(ranked))
+        else:
+            stmt = stmt.order_by(Cliente.denominazione).limit(limit)
+        rows = self.session.execute(stmt).all()
+
+        counts = dict(
+            self.session.execute(
+                select(Fattura.cliente_id, func.count(Fattura.id))
+                .where(Fattura.cliente_id.in_([row.id for row in rows]))
+                .group_by(Fattura.cliente_id)
+            ).all()
+        )
+        hits = [
+            ClientHit(
+                id=row.id,
+                denominazione=row.denominazione,
+                partita_iva=row.partita_iva or "",
+                codice_fiscale=row.codice_fiscale or "",
+                email=row.email or "",
+                fatture_count=int(counts.get(row.id, 0)),
+                score=ranked.get(row.id, 100.0),
+            )
+            for row in rows
+        ]
+        if ranked:
+            hits.sort(key=lambda hit: (-hit.score, hit.denominazione))
+        return hits
+
+    def search_products(self, query: str, limit: int = 20) -> list[ProductHit]:
+        """Search products by codice, descrizione or categoria."""
+        ranked = self.rank(SEARCH_PRODOTTI, query, limit)
+        if not ranked:
+            return []
+        rows = self.session.execute(
+            select(Prodotto.id, Prodotto.codice, Prodotto.descrizione, Prodotto.categoria).where(
+                Prodotto.id.in_(ranked)
+            )
+        ).all()
+        hits = [
+            ProductHit(
+                id=row.id,
+                codice=row.codice,
+                descrizione=row.descrizione,
+                categoria=row.categoria,
+                score=ranked[row.id],
+            )
+            for row in rows
+        ]
+        return sorted(hits, key=lambda hit: (-hit.score, hit.codice))
+
+    def search_invoices(self, query: str, limit: int = 20) -> list[InvoiceHit]:
+        """Search invoices by numero, client name or notes."""
+        ranked = self.rank(SEARCH_FATTURE, query, limit)
+        if not ranked:
+            return []
+        rows = self.session.execute(
+            select(Fattura.id, Fattura.numero, Fattura.anno, Cliente.denominazione)
+            .join(Cliente, Cliente.id == Fattura.cliente_id)
+            .where(Fattura.id.in_(ranked))
+        ).all()
+        hits = [
+            InvoiceHit(
+                id=row.id,
+                numero=row.numero,
+                anno=row.anno,
+                cliente=row.denominazione,
+                score=ranked[row.id],
+            )
+            for row in rows
+        ]
+        return sorted(hits, key=lambda hit: (-hit.score, -hit.anno, hit.numero))
+
+
+# ----------------------------------------------------------------------------
+# Index maintenance
+# ----------------------------------------------------------------------------
+
+
+def _has_search_tables(connection: Connection) -> bool:
+    if connection.dialect.name != "sqlite":
+        return False
+    names = set(
+        connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'search%'")
+        ).scalars()
+    )
+    return all(table.name in names for table in SEARCH_TABLES)
+
+
+def _source(table: Table, ids: list[int] | None) -> Insert:
+    """``INSERT ... SELECT`` filling ``table`` from its source rows."""
+    columns: tuple[Any, ...]
+    if table is SEARCH_CLIENTI:
+        columns = (Cliente.id, Cliente.denominazione, Cliente.partita_iva, Cliente.codice_fiscale)
+    elif table is SEARCH_PRODOTTI:
+        columns = (Prodotto.id, Prodotto.codice, Prodotto.descrizione, Prodotto.categoria)
+    elif table is SEARCH_EVENTS:
+        columns = (EventLog.id, EventLog.event_data)
+    else:
+        columns = (
+            Fattura.id,
+            Fattura.numero + "/" + cast(Fattura.anno, String),
+            Cliente.denominazione,
+            Fattura.note,
+        )
+    key = columns[0]
+    stmt = select(*columns)
+    if table is SEARCH_FATTURE:
+        stmt = stmt.join(Cliente, Cliente.id == Fattura.cliente_id)
+    if ids is not None:
+        stmt = stmt.where(key.in_(ids))
+    return insert(table).from_select([c.name for c in table.c], stmt)
+
+
+def sync_search_rows(connection: Connection, table: Table, ids: Iterable[int | None]) -> None:
+    """Replace the mirror rows of the given source ids."""
+    resync_rows(connection, table, table.c.rowid, ids, lambda chunk: _source(table, chunk))
+
+
+def rebuild_search_index(connection: Connection) -> None:
+    """Rebuild every search table from its source table."""
+    for table in SEARCH_TABLES:
+        connection.execute(delete(table))
+        connection.execute(_source(table, None))
+    logger.debug("search_index_rebuilt")
+
+
+def create_search_tables(connection: Connection) -> bool:
+    """Create the FTS5 tables if missing, backfilling them on creation.
+
+    Returns:
+        True if the search index is available on this connection
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    existed = _has_search_tables(connection)
+    try:
+        for table in SEARCH_TABLES:
+            columns = ", ".join(c.name for c in table.c if c.name != "rowid")
+            connection.execute(
+                text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {table.name} "
+                    f"USING fts5({columns}, tokenize='trigram')"
+                )
+            )
+    except Exception as exc:
+        # SQLite built without FTS5 or older than 3.34: keep the LIKE queries
+        logger.warning("search_index_unavailable", error=str(exc))
+        set_table_available(connection.engine, SEARCH_INDEX, False)
+        return False
+    if not existed:
+        rebuild_search_index(connection)
+    set_table_available(connection.engine, SEARCH_INDEX, True)
+    return True
+
+
+def drop_search_tables(connection: Connection) -> None:
+    """Drop the FTS5 tables."""
+    if connection.dialect.name != "sqlite":
+        return
+    for table in SEARCH_TABLES:
+        connection.execute(text(f"DROP TABLE IF EXISTS {table.name}"))
+    set_table_available(connection.engine, SEARCH_INDEX, None)
+
+
+def _create_after_schema(target: Any, connection: Connection, **kw: Any) -> None:
+    create_search_tables(connection)
+
+
+def _drop_before_schema(target: Any, connection: Connection, **kw: Any) -> None:
+    drop_search_tables(connection)
+
+
+_SOURCES = (
+    (Cliente, SEARCH_CLIENTI),
+    (Prodotto, SEARCH_PRODOTTI),
+    (Fattura, SEARCH_FATTURE),
+    (EventLog, SEARCH_EVENTS),
+)
+
+
+def _changed_rows(flushed: FlushedObjects) -> dict[Table, set[int]]:
+    """Source ids touched by a flush, per mirror table."""
+    changed: dict[Table, set[int]] = {}
+    for obj in flushed:
+        for model, table in _SOURCES:
+            if isinstance(obj, model):
+                changed.setdefault(table, set()).add(obj.id)
+                break
+    return changed
+
+
+def _sync_changed_rows(connection: Connection, changed: dict[Table, set[int]]) -> None:
+    clienti = changed.get(SEARCH_CLIENTI)
+    if clienti:
+        # Invoices index their client's name
+        changed.setdefault(SEARCH_FATTURE, set()).update(
+            connection.execute(select(Fattura.id).where(Fattura.cliente_id.in_(clienti))).scalars()
+        )
+    for table, ids in changed.items():
+        sync_search_rows(connection, table, ids)
+
+
+def install_search_index_listeners() -> None:
+    """Register the schema hooks and the flush maintenance of the search tables (idempotent)."""
+    hooks = (
+        (base_metadata, "after_create", _create_after_schema),
+        (base_metadata, "before_drop", _drop_before_schema),
+    )
+    for target, name, fn in hooks:
+        if not event.contains(target, name, fn):
+            event.listen(target, name, fn)
+    # Created and backfilled by the schema hooks above
+    register_side_table(
+        SideTable(
+            name=SEARCH_INDEX,
+            collect=_changed_rows,
+            sync=_sync_changed_rows,
+            rebuild=rebuild_search_index,
+            exists=_has_search_tables,
+        )
+    )
+
+
+install_search_index_listeners()
@@ -0,0 +1,213 @@
+"""Shared maintenance of derived side tables.
+
+Some tables only hold data derived from other tables and are kept current
+inside the writing transaction: the payment due-date index, the full-text
+search mirrors, the per-client aggregates and the hourly event rollups. They
+share the machinery provided here:
+
+- a single ``after_flush`` hook on :class:`Session` that collects the flushed
+  objects once and dispatches them to every registered side table present on
+  the flushing database
+- a per-engine cache of which side tables exist
+- a backfill when a side table is created, deferred to the end of
+  ``create_all()`` when its source tables are created after it
+- :func:`resync_rows`, the chunked ``DELETE`` + ``INSERT ... SELECT`` replacing
+  the rows derived from a set of source ids
+
+Example:
+    >>> register_side_table(
+    ...     SideTable(
+    ...         name="payment_due_index",
+    ...         collect=_changed_payments,
+    ...         sync=sync_payments,
+    ...         rebuild=rebuild_payment_due_index,
+    ...         model=PaymentDue,
+    ...         source_tables=("pagamenti",),
+    ...     )
+    ... )
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Connection, Engine, Insert, delete, event, inspect
+from sqlalchemy.orm import QueryableAttribute, Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from openfatture.platform.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Source ids per DELETE / INSERT ... SELECT pair
+SYNC_CHUNK_SIZE = 500
+
+_PENDING_BACKFILL = "side_tables_pending_backfill"
+
+
+@dataclass(frozen=True)
+class FlushedObjects:
+    """Objects written by one flush."""
+
+    new: tuple[Any, ...]
+    dirty: tuple[Any, ...]
+    deleted: tuple[Any, ...]
+
+    def __iter__(self) -> Iterator[Any]:
+        return chain(self.new, self.dirty, self.deleted)
+
+
+@dataclass(frozen=True)
+class SideTable[T]:
+    """A derived table maintained after every flush.
+
+    Attributes:
+        name: Table name, also the key of its cached availability
+        collect: Extract the changes relevant to the table from a flush;
+            returns None (or an empty value) when there is nothing to sync.
+            Runs before any SQL is issued
+        sync: Apply the collected changes on the flushing connection
+        rebuild: Recompute the whole table from its sources
+        model: Mapped class whose table creation triggers the backfill (None
+            when the table is created and backfilled elsewhere)
+        source_tables: Tables read by the backfill
+        exists: Detect the table on a connection (default: inspector lookup)
+    """
+
+    name: str
+    collect: Callable[[FlushedObjects], T | None]
+    sync: Callable[[Connection, T], None]
+    rebuild: Callable[[Connection], Any]
+    model: type[Any] | None = None
+    source_tables: tuple[str, ...] = ()
+    exists: Callable[[Connection], bool] | None = None
+
+
+_registry: dict[str, SideTable[Any]] = {}
+_available: WeakKeyDictionary[Engine, dict[str, bool]] = WeakKeyDictionary()
+
+
+def register_side_table(side_table: SideTable[Any]) -> None:
+    """Maintain ``side_table`` after every flush (idempotent, replaces by name)."""
+    _registry[side_table.name] = side_table
+    if side_table.model is not None:
+        hooks = (
+            (side_table.model.__table__, "after_create", _backfill_after_create),
+            (side_table.model.metadata, "after_create", _backfill_after_schema),
+        )
+        for target, name, fn in hooks:
+            if not event.contains(target, name, fn):
+                event.listen(target, name, fn)
+
+
+def table_available(connection: Connection, name: str) -> bool:
+    """Whether side table ``name`` exists on the connection's database (cached per engine)."""
+    known = _available.setdefault(connection.engine, {})
+    available = known.get(name)
+    if available is None:
+        side_table = _registry.get(name)
+        if side_table is not None and side_table.exists is not None:
+            available = side_table.exists(connection)
+        else:
+            available = inspect(connection).has_table(name)
+        known[name] = available
+    return available
+
+
+def session_has_table(session: Session, name: str) -> bool:
+    """Whether side table ``name`` exists on the session's database.
+
+    Checked on a separate connection, so the session's transaction is not
+    started just to answer it.
+    """
+    try:
+        bind = session.get_bind()
+    except Exception:
+        return False
+    if not isinstance(bind, Engine | Connection):
+        return False
+    engine = bind.engine
+    available = _available.get(engine, {}).get(name)
+    if available is None:
+        with engine.connect() as connection:
+            available = table_available(connection, name)
+    return available
+
+
+def set_table_available(engine: Engine, name: str, available: bool | None) -> None:
+    """Record whether side table ``name`` exists on ``engine`` (None forgets it)."""
+    known = _available.setdefault(engine, {})
+    if available is None:
+        known.pop(name, None)
+    else:
+        known[name] = available
+
+
+def resync_rows(
+    connection: Connection,
+    target: Any,
+    key: ColumnElement[Any] | QueryableAttribute[Any],
+    ids: Iterable[int | None],
+    source: Callable[[list[int]], Insert],
+) -> None:
+    """Replace the rows derived from the given source ids.
+
+    Args:
+        connection: Connection of the writing transaction
+        target: Side table (or mapped class) holding the derived rows
+        key: Column of ``target`` holding the source id
+        ids: Source ids (None entries are ignored)
+        source: ``INSERT ... SELECT`` of the rows of a chunk of ids
+    """
+    unique = sorted({i for i in ids if i is not None})
+    for start in range(0, len(unique), SYNC_CHUNK_SIZE):
+        chunk = unique[start : start + SYNC_CHUNK_SIZE]
+        connection.execute(delete(target).where(key.in_(chunk)))
+        connection.execute(source(chunk))
+
+
+def _sync_after_flush(session: Session, flush_context: Any) -> None:
+    flushed = FlushedObjects(tuple(session.new), tuple(session.dirty), tuple(session.deleted))
+    connection: Connection | None = None
+    for side_table in list(_registry.values()):
+        changes = side_table.collect(flushed)
+        if not changes:
+            continue
+        if connection is None:
+            connection = session.connection()
+        if table_available(connection, side_table.name):
+            side_table.sync(connection, changes)
+
+
+def _backfill_after_create(target: Any, connection: Connection, **kw: Any) -> None:
+    side_table = _registry.get(target.name)
+    if side_table is None:
+        return
+    set_table_available(connection.engine, side_table.name, True)
+    inspector = inspect(connection)
+    if all(inspector.has_table(name) for name in side_table.source_tables):
+        side_table.rebuild(connection)
+    else:
+        # Created before its sources by create_all(): backfill once they exist
+        connection.info.setdefault(_PENDING_BACKFILL, set()).add(side_table.name)
+
+
+def _backfill_after_schema(target: Any, connection: Connection, **kw: Any) -> None:
+    for name in sorted(connection.info.pop(_PENDING_BACKFILL, ())):
+        side_table = _registry.get(name)
+        if side_table is not None:
+            side_table.rebuild(connection)
+            logger.debug("side_table_backfilled", table=name)
+
+
+def install_side_table_listeners() -> None:
+    """Register the shared flush hook (idempotent)."""
+    if not event.contains(Session, "after_flush", _sync_after_flush):
+        event.listen(Session, "after_flush", _sync_after_flush)
+
+
+install_side_table_listeners()
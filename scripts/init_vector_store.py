@@ -99,7 +99,14 @@ async def main() -> None:
         print(f"      • {source.id}: {source.description} ({status})")
 
     try:
-        kb_count = await kb_indexer.index_sources()
+        kb_reports = await kb_indexer.sync_sources()
+        for report in kb_reports:
+            print(
+                f"      • {report.source_id}: {report.chunks_total} chunks "
+                f"({report.chunks_embedded} embedded, {report.chunks_skipped} skipped, "
+                f"{report.chunks_deleted} deleted, {report.chunks_per_second:.0f} chunks/s)"
+            )
+        kb_count = sum(report.chunks_total for report in kb_reports)
         print(f"\n Knowledge base indicizzata: {kb_count} chunks")
         print(f" Totale documenti KB collection: {kb_vector_store.count()}")
     except Exception as e:
@@ -119,6 +126,13 @@ async def main() -> None:
     for key, value in kb_stats.items():
         print(f"   • {key}: {value}")
 
+    cache = getattr(embeddings, "cache", None)
+    if cache is not None and hasattr(cache, "get_stats"):
+        cache_stats = cache.get_stats()
+        print("\nEmbedding Cache:")
+        print(f"   • hits: {cache_stats['hits']} / misses: {cache_stats['misses']}")
+        print(f"   • size: {cache_stats['size']} / {cache_stats['max_entries']}")
+
     print("\n" + "=" * 80)
     print("VECTOR STORE INIZIALIZZATO CON SUCCESSO!")
     print("=" * 80)
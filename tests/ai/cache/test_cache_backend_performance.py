@@ -0,0 +1,65 @@
+"""Benchmark of warm-start cache hits per backend.
+
+Simulates what a short-lived CLI invocation sees: responses were cached by a
+previous process, a fresh cache object is opened, and the first lookups are
+measured. ``memory`` is included as the baseline — it is always cold after a
+restart, so every lookup misses and the LLM call has to be repeated.
+
+Run with:
+    pytest tests/ai/cache/test_cache_backend_performance.py -m performance -s
+"""
+
+import pytest
+
+from openfatture.ai.cache import LRUCache, SQLiteCache
+from openfatture.ai.domain.response import AgentResponse, UsageMetrics
+from tests.performance.utils import measure_async_function
+
+ENTRIES = 1000
+
+
+def _response(index: int) -> AgentResponse:
+    return AgentResponse(
+        content=f"Il fatturato di marzo è {index * 10} EUR. " * 20,
+        model="mock-1",
+        provider="mock",
+        usage=UsageMetrics(prompt_tokens=200, completion_tokens=150, total_tokens=350),
+        latency_ms=1200.0,
+    )
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+async def test_warm_start_hit_latency(backend, tmp_path):
+    """Measure open + first-hit latency after a simulated process restart."""
+
+    def open_cache():
+        if backend == "sqlite":
+            return SQLiteCache(tmp_path / "cache.sqlite3", namespace="llm", max_size=ENTRIES)
+        return LRUCache(max_size=ENTRIES, cleanup_interval=0)
+
+    writer = open_cache()
+    for index in range(ENTRIES):
+        await writer.set(f"key-{index}", _response(index))
+    await writer.shutdown()
+
+    reader = open_cache()
+    keys = iter(f"key-{index}" for index in range(ENTRIES))
+
+    async def lookup():
+        return await reader.get(next(keys))
+
+    metrics = await measure_async_function(lookup, iterations=200, warmup=1)
+    stats = reader.get_stats()
+
+    print(
+        f"\n[{backend}] warm-start get p50={metrics.median_latency_ms:.3f}ms "
+        f"p95={metrics.p95_latency_ms:.3f}ms hit_rate={stats['hit_rate']:.0%}"
+    )
+
+    if backend == "sqlite":
+        assert stats["hit_rate"] == 1.0
+        assert metrics.p95_latency_ms < 50
+    else:
+        assert stats["hits"] == 0
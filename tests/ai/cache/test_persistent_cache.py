@@ -0,0 +1,212 @@
+"""Tests for the SQLite and Redis cache strategies."""
+
+import fnmatch
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from openfatture.ai.cache import (
+    CacheConfig,
+    LRUCache,
+    RedisCache,
+    SQLiteCache,
+    ToolResultCache,
+    create_cache_strategy,
+)
+from openfatture.ai.cache.persistent import decode_value, encode_value
+from openfatture.ai.domain.response import AgentResponse, UsageMetrics
+from openfatture.ai.tools.models import ToolResult
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of ``redis.asyncio.Redis`` we use."""
+
+    def __init__(self):
+        self.values: dict[str, tuple[str, float | None]] = {}
+        self.sorted_sets: dict[str, dict[str, float]] = {}
+
+    def _alive(self, key):
+        entry = self.values.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.values[key]
+            return None
+        return entry
+
+    async def get(self, key):
+        entry = self._alive(key)
+        return entry[0].encode() if entry else None
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = (value, time.monotonic() + ex if ex else None)
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += self.values.pop(key, None) is not None
+            removed += self.sorted_sets.pop(key, None) is not None
+        return removed
+
+    async def exists(self, key):
+        return int(self._alive(key) is not None)
+
+    async def zadd(self, key, mapping):
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+
+    async def zcard(self, key):
+        return len(self.sorted_sets.get(key, {}))
+
+    async def zrem(self, key, *members):
+        zset = self.sorted_sets.get(key, {})
+        return sum(zset.pop(member, None) is not None for member in members)
+
+    async def zpopmin(self, key, count=1):
+        zset = self.sorted_sets.get(key, {})
+        popped = sorted(zset.items(), key=lambda item: item[1])[:count]
+        for member, _ in popped:
+            del zset[member]
+        return [(member.encode(), score) for member, score in popped]
+
+    async def zrange(self, key, start, end):
+        members = sorted(self.sorted_sets.get(key, {}).items(), key=lambda item: item[1])
+        return [member.encode() for member, _ in members]
+
+    async def scan_iter(self, match="*"):
+        for key in list(self.values) + list(self.sorted_sets):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+
+def _response(content: str = "Fattura 12/2025 emessa") -> AgentResponse:
+    return AgentResponse(
+        content=content,
+        model="mock-1",
+        provider="mock",
+        usage=UsageMetrics(prompt_tokens=10, completion_tokens=5, total_tokens=15),
+        timestamp=datetime(2025, 3, 1, 12, 0),
+        latency_ms=420.0,
+    )
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_cache(request, tmp_path):
+    """Factory for each persistent backend; repeated calls share storage."""
+    server = FakeRedis()
+
+    def make(namespace="llm", max_size=10, default_ttl=3600):
+        if request.param == "sqlite":
+            return SQLiteCache(
+                tmp_path / "cache.sqlite3",
+                namespace=namespace,
+                max_size=max_size,
+                default_ttl=default_ttl,
+            )
+        return RedisCache(
+            namespace=namespace, max_size=max_size, default_ttl=default_ttl, client=server
+        )
+
+    return make
+
+
+@pytest.mark.asyncio
+class TestPersistentCache:
+    """Behaviour shared by the SQLite and Redis strategies."""
+
+    async def test_values_survive_new_instances(self, make_cache):
+        await make_cache().set("k", _response())
+
+        restored = await make_cache().get("k")
+
+        assert restored == _response()
+        assert isinstance(restored.usage, UsageMetrics)
+
+    async def test_namespaces_are_isolated(self, make_cache):
+        llm, tool = make_cache("llm"), make_cache("tool")
+        await llm.set("k", {"answer": 1})
+
+        await tool.clear()
+
+        assert await tool.get("k") is None
+        assert await llm.get("k") == {"answer": 1}
+
+    async def test_ttl_expiry(self, make_cache):
+        cache = make_cache(default_ttl=1)
+        await cache.set("short", "value")
+        await cache.set("long", "value", ttl=3600)
+
+        with patch("time.time", return_value=time.time() + 5):
+            with patch("time.monotonic", return_value=time.monotonic() + 5):
+                assert await cache.get("short") is None
+                assert not await cache.exists("short")
+                assert await cache.get("long") == "value"
+
+    async def test_size_bound_evicts_least_recently_used(self, make_cache):
+        cache = make_cache(max_size=3)
+        for key in ["a", "b", "c"]:
+            await cache.set(key, key)
+            time.sleep(0.002)
+        await cache.get("a")
+        time.sleep(0.002)
+
+        await cache.set("d", "d")
+
+        assert await cache.get("b") is None
+        assert [await cache.get(key) for key in ["a", "c", "d"]] == ["a", "c", "d"]
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["size"] == 3
+
+    async def test_unserializable_values_are_skipped(self, make_cache):
+        cache = make_cache()
+
+        await cache.set("k", object())
+
+        assert await cache.get("k") is None
+
+    async def test_delete_and_stats(self, make_cache):
+        cache = make_cache()
+        await cache.set("k", [1, 2, 3])
+
+        assert await cache.get("k") == [1, 2, 3]
+        assert await cache.delete("k")
+        assert await cache.get("k") is None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_decode_refuses_foreign_types():
+    raw = encode_value(_response()).replace("openfatture.ai.domain.response", "os")
+
+    with pytest.raises(ValueError):
+        decode_value(raw)
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_shares_results_through_sqlite(tmp_path):
+    def make_tool_cache():
+        return ToolResultCache(
+            cache=SQLiteCache(tmp_path / "cache.sqlite3", namespace="tool"),
+            tag_store=SQLiteCache(tmp_path / "cache.sqlite3", namespace="tool_tags"),
+        )
+
+    result = ToolResult(success=True, data={"count": 3}, tool_name="search_invoices")
+    await make_tool_cache().cache_result("search_invoices", {"query": "marzo"}, result)
+
+    cached = await make_tool_cache().get_cached_result("search_invoices", {"query": "marzo"})
+
+    assert cached is not None
+    assert cached.cache_hit is True
+    assert cached.data == {"count": 3}
+
+
+@pytest.mark.asyncio
+async def test_create_cache_strategy_follows_backend(tmp_path):
+    memory = create_cache_strategy(CacheConfig(cleanup_interval=0), namespace="llm")
+    sqlite = create_cache_strategy(
+        CacheConfig(backend="sqlite", sqlite_path=tmp_path / "c.sqlite3"), namespace="llm"
+    )
+
+    assert isinstance(memory, LRUCache)
+    assert isinstance(sqlite, SQLiteCache)
+    assert sqlite.default_ttl == 3600
@@ -0,0 +1,183 @@
+"""Tests for the semantic and hybrid response cache strategies."""
+
+from collections import Counter
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from openfatture.ai.cache import CacheConfig, CachedProvider, SemanticIndex
+from openfatture.ai.cache.semantic import normalize_prompt, response_agreement
+from openfatture.ai.domain.message import Message, Role
+from openfatture.ai.domain.response import AgentResponse, ResponseStatus
+from openfatture.ai.providers.base import BaseLLMProvider
+from openfatture.ai.rag.embeddings import EmbeddingStrategy
+
+VOCABULARY = ["fatturato", "marzo", "aprile", "iva", "cliente", "rossi", "quanto", "ho"]
+
+
+def _bag_of_words(text: str) -> list[float]:
+    """Tiny deterministic embedding: word counts over ``VOCABULARY``."""
+    counts = Counter(word.strip("?!.,") for word in text.split())
+    return [float(counts[word]) for word in VOCABULARY] + [0.1]
+
+
+@pytest.fixture
+def embedder():
+    """Mock embedding strategy backed by ``_bag_of_words``."""
+    strategy = MagicMock(spec=EmbeddingStrategy)
+    strategy.model_name = "bow"
+    strategy.dimension = len(VOCABULARY) + 1
+    strategy.embed_text = AsyncMock(side_effect=_bag_of_words)
+    return strategy
+
+
+@pytest.fixture
+def mock_provider():
+    """Provider answering with a numbered response per call."""
+    provider = MagicMock(spec=BaseLLMProvider)
+    provider.provider_name = "mock"
+    provider.model = "mock-1"
+    provider.temperature = 0.7
+    provider.max_tokens = 2000
+
+    async def mock_generate(messages, **kwargs):
+        return AgentResponse(
+            content=f"Risposta {provider.generate.await_count}",
+            status=ResponseStatus.SUCCESS,
+            model="mock-1",
+            provider="mock",
+            latency_ms=250.0,
+        )
+
+    provider.generate = AsyncMock(side_effect=mock_generate)
+    return provider
+
+
+def _ask(text: str) -> list[Message]:
+    return [Message(role=Role.USER, content=text)]
+
+
+class TestSemanticIndex:
+    """Test the in-memory nearest-neighbour index."""
+
+    @pytest.mark.asyncio
+    async def test_search_respects_threshold_and_scope(self, embedder):
+        index = SemanticIndex(embedder, similarity_threshold=0.9, max_size=10)
+        vector = await index.embed("Quanto ho fatturato a marzo?")
+        index.add("k1", vector, "Quanto ho fatturato a marzo?", scope="s1")
+
+        paraphrase = await index.embed("quanto ho   FATTURATO a marzo")
+        other = await index.embed("iva cliente rossi")
+
+        assert index.search(paraphrase, scope="s1").key == "k1"
+        assert index.search(paraphrase, scope="s2") is None
+        assert index.search(other, scope="s1") is None
+
+    @pytest.mark.asyncio
+    async def test_eviction_and_delete_keep_rows_compact(self, embedder):
+        index = SemanticIndex(embedder, similarity_threshold=0.99, max_size=3, initial_capacity=1)
+        words = ["marzo", "aprile", "iva", "cliente"]
+        vectors = {word: await index.embed(word) for word in words}
+        for word in words:
+            index.add(word, vectors[word], word, scope="s")
+
+        assert index.size() == 3
+        assert index.search(vectors["marzo"], scope="s") is None  # evicted first
+
+        assert index.delete("aprile")
+        assert index.search(vectors["cliente"], scope="s").key == "cliente"
+        assert index.search(vectors["iva"], scope="s").key == "iva"
+        assert index.get_stats()["evictions"] == 1
+
+    def test_normalization_and_agreement(self):
+        assert normalize_prompt("  Quanto\tho  FATTURATO ") == "quanto ho fatturato"
+        assert response_agreement("IVA al 22%", "iva al 22%") == 1.0
+        assert response_agreement("IVA al 22%", "Reverse charge") == 0.0
+
+
+@pytest.mark.asyncio
+class TestSemanticCachedProvider:
+    """Test CachedProvider with the semantic and hybrid strategies."""
+
+    async def test_paraphrase_is_served_from_cache(self, mock_provider, embedder):
+        config = CacheConfig(
+            strategy="semantic",
+            similarity_threshold=0.9,
+            cleanup_interval=0,
+            semantic_verify_rate=0.0,
+        )
+        cached = CachedProvider(mock_provider, config, embedder=embedder)
+
+        try:
+            first = await cached.generate(_ask("Quanto ho fatturato a marzo?"))
+            second = await cached.generate(_ask("quanto ho fatturato a MARZO"))
+            third = await cached.generate(_ask("Quanto ho fatturato ad aprile?"))
+
+            assert second.content == first.content
+            assert third.content != first.content
+            assert mock_provider.generate.await_count == 2
+
+            stats = cached.get_cache_stats()
+            assert stats["hits"] == 1
+            assert stats["total_requests"] == 3
+            assert stats["latency_saved_ms"] == 250.0
+            assert stats["semantic"]["semantic_hits"] == 1
+        finally:
+            await cached.shutdown()
+
+    async def test_semantic_match_requires_same_history(self, mock_provider, embedder):
+        config = CacheConfig(strategy="semantic", cleanup_interval=0, semantic_verify_rate=0.0)
+        cached = CachedProvider(mock_provider, config, embedder=embedder)
+
+        try:
+            await cached.generate(_ask("Quanto ho fatturato a marzo?"))
+            await cached.generate(_ask("Quanto ho fatturato a marzo?"), system_prompt="Sii breve")
+
+            assert mock_provider.generate.await_count == 2
+        finally:
+            await cached.shutdown()
+
+    async def test_hybrid_checks_exact_key_before_embedding(self, mock_provider, embedder):
+        config = CacheConfig(strategy="hybrid", cleanup_interval=0, semantic_verify_rate=0.0)
+        cached = CachedProvider(mock_provider, config, embedder=embedder)
+
+        try:
+            await cached.generate(_ask("Quanto ho fatturato a marzo?"))
+            embedder.embed_text.reset_mock()
+
+            await cached.generate(_ask("Quanto ho fatturato a marzo?"))
+
+            embedder.embed_text.assert_not_awaited()
+            assert cached.get_cache_stats()["semantic"]["exact_hits"] == 1
+        finally:
+            await cached.shutdown()
+
+    async def test_sampled_hits_detect_false_hits(self, mock_provider, embedder):
+        config = CacheConfig(strategy="semantic", cleanup_interval=0, semantic_verify_rate=1.0)
+        cached = CachedProvider(mock_provider, config, embedder=embedder)
+
+        try:
+            await cached.generate(_ask("Quanto ho fatturato a marzo?"))
+            fresh = await cached.generate(_ask("quanto ho fatturato a marzo"))
+
+            assert fresh.content == "Risposta 2"
+            semantic = cached.get_cache_stats()["semantic"]
+            assert semantic["verified_hits"] == 1
+            assert semantic["false_hits"] == 1
+            assert semantic["false_hit_samples"][0]["matched_prompt"] == (
+                "Quanto ho fatturato a marzo?"
+            )
+        finally:
+            await cached.shutdown()
+
+    async def test_embedding_failure_falls_back_to_provider(self, mock_provider, embedder):
+        embedder.embed_text.side_effect = RuntimeError("embeddings down")
+        config = CacheConfig(strategy="semantic", cleanup_interval=0)
+        cached = CachedProvider(mock_provider, config, embedder=embedder)
+
+        try:
+            response = await cached.generate(_ask("Quanto ho fatturato a marzo?"))
+
+            assert response.content == "Risposta 1"
+        finally:
+            await cached.shutdown()
@@ -0,0 +1,260 @@
+"""Tests for event-driven invalidation of cached tool results."""
+
+import asyncio
+import threading
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from openfatture.ai.cache import LRUCache, SQLiteCache, ToolResultCache, tool_cache
+from openfatture.ai.cache.invalidation import event_dependency_tags, tool_dependency_tags
+from openfatture.ai.tools.models import ToolResult
+from openfatture.events import (
+    ClientUpdatedEvent,
+    GlobalEventBus,
+    InvoiceCreatedEvent,
+    InvoiceSentEvent,
+    InvoiceStatusChangedEvent,
+    InvoiceUpdatedEvent,
+)
+from openfatture.payment.application.events import (
+    InMemoryEventBus,
+    TransactionMatchedEvent,
+    TransactionUnmatchedEvent,
+)
+from openfatture.payment.application.listeners import create_event_bus
+from openfatture.payment.domain.enums import MatchType
+
+INVOICE_12 = {"id": 12, "numero": "12", "cliente": {"id": 3, "denominazione": "Rossi SRL"}}
+CLIENT_3 = {"id": 3, "denominazione": "Rossi SRL", "fatture_recenti": [{"id": 12}, {"id": 9}]}
+
+
+def _result(tool_name: str, data) -> ToolResult:
+    return ToolResult(success=True, data=data, tool_name=tool_name)
+
+
+async def _fill(cache: ToolResultCache) -> None:
+    await cache.cache_result(
+        "get_invoice_details", {"fattura_id": 12}, _result("get_invoice_details", INVOICE_12)
+    )
+    await cache.cache_result(
+        "get_invoice_details", {"fattura_id": 13}, _result("get_invoice_details", {"id": 13})
+    )
+    await cache.cache_result(
+        "get_client_details", {"cliente_id": 3}, _result("get_client_details", CLIENT_3)
+    )
+    await cache.cache_result(
+        "get_client_details", {"cliente_id": 4}, _result("get_client_details", {"id": 4})
+    )
+    await cache.cache_result("search_invoices", {"anno": 2025}, _result("search_invoices", []))
+    await cache.cache_result("get_client_stats", {}, _result("get_client_stats", {"n": 2}))
+
+
+async def _cached(cache: ToolResultCache) -> set[str]:
+    lookups = {
+        "invoice:12": ("get_invoice_details", {"fattura_id": 12}),
+        "invoice:13": ("get_invoice_details", {"fattura_id": 13}),
+        "client:3": ("get_client_details", {"cliente_id": 3}),
+        "client:4": ("get_client_details", {"cliente_id": 4}),
+        "search_invoices": ("search_invoices", {"anno": 2025}),
+        "client_stats": ("get_client_stats", {}),
+    }
+    return {
+        name
+        for name, (tool, params) in lookups.items()
+        if await cache.get_cached_result(tool, params) is not None
+    }
+
+
+def _invoice_sent(invoice_id: int) -> InvoiceSentEvent:
+    return InvoiceSentEvent(
+        invoice_id=invoice_id,
+        invoice_number=str(invoice_id),
+        recipient="ABC1234",
+        pec_address="sdi@pec.it",
+        xml_path="/tmp/fattura.xml",
+    )
+
+
+def test_dependency_tags():
+    assert tool_dependency_tags("get_invoice_details", {"fattura_id": 12}, INVOICE_12) == {
+        "tool:get_invoice_details",
+        "invoice:12",
+        "client:3",
+    }
+    assert tool_dependency_tags("get_client_details", {"cliente_id": 3}, CLIENT_3) == {
+        "tool:get_client_details",
+        "client:3",
+        "invoice:12",
+        "invoice:9",
+    }
+    assert tool_dependency_tags("search_knowledge", {"q": "iva"}, []) == {"tool:search_knowledge"}
+
+    created = InvoiceCreatedEvent(
+        invoice_id=20,
+        invoice_number="20",
+        client_id=3,
+        client_name="Rossi SRL",
+        total_amount=Decimal("100"),
+    )
+    assert event_dependency_tags(created) == {"invoices", "invoice:20", "client:3"}
+    assert event_dependency_tags(object()) == set()
+
+
+@pytest.mark.asyncio
+class TestEventDrivenInvalidation:
+    """Only results depending on changed entities are dropped."""
+
+    async def test_invoice_event_drops_dependent_results(self):
+        bus = GlobalEventBus()
+        cache = ToolResultCache()
+        cache.subscribe(bus)
+        await _fill(cache)
+
+        bus.publish(_invoice_sent(12))
+
+        assert await _cached(cache) == {"invoice:13", "client:4", "client_stats"}
+        assert cache.get_stats()["stale_results_dropped"] == 3
+
+    async def test_client_update_keeps_invoice_details(self):
+        bus = GlobalEventBus()
+        cache = ToolResultCache()
+        cache.subscribe(bus)
+        await _fill(cache)
+
+        bus.publish(ClientUpdatedEvent(client_id=4, client_name="Bianchi", updated_fields=["pec"]))
+
+        assert await _cached(cache) == {"invoice:12", "invoice:13", "client:3"}
+
+    async def test_payment_events_from_payment_bus(self):
+        bus = InMemoryEventBus()
+        cache = ToolResultCache()
+        cache.subscribe(bus)
+        status = {"invoice_id": 12, "payments": [{"payment_id": 5}]}
+        await cache.cache_result(
+            "get_payment_status", {"fattura_id": 12}, _result("get_payment_status", status)
+        )
+        await cache.cache_result(
+            "get_payment_status", {"fattura_id": 13}, _result("get_payment_status", {})
+        )
+
+        bus.publish(
+            TransactionMatchedEvent(
+                transaction_id=uuid4(),
+                payment_id=6,
+                matched_amount=Decimal("10"),
+                match_type=MatchType.MANUAL,
+                confidence=None,
+            )
+        )
+
+        assert await cache.get_cached_result("get_payment_status", {"fattura_id": 12})
+        # No payment rows: depends on every payment change
+        assert await cache.get_cached_result("get_payment_status", {"fattura_id": 13}) is None
+
+    async def test_payment_buses_invalidate_the_global_tool_cache(self, monkeypatch):
+        monkeypatch.setattr(tool_cache, "_tool_cache", ToolResultCache())
+        cache = tool_cache.get_tool_cache()
+        await cache.cache_result("get_payment_stats", {}, _result("get_payment_stats", {"paid": 1}))
+
+        bus = InMemoryEventBus()
+        tool_cache.subscribe_tool_cache(bus)
+        bus.publish(
+            TransactionMatchedEvent(
+                transaction_id=uuid4(),
+                payment_id=5,
+                matched_amount=Decimal("10"),
+                match_type=MatchType.MANUAL,
+                confidence=None,
+            )
+        )
+
+        assert await cache.get_cached_result("get_payment_stats", {}) is None
+
+    def test_create_event_bus_forwards_to_the_tool_cache(self):
+        bus = create_event_bus()
+
+        for event_type in (TransactionMatchedEvent, TransactionUnmatchedEvent):
+            assert bus.has_listener(event_type, tool_cache._invalidate_global_tool_cache)
+
+    async def test_invoice_update_and_status_change_drop_invoice_results(self):
+        bus = GlobalEventBus()
+        cache = ToolResultCache()
+        cache.subscribe(bus)
+        await _fill(cache)
+
+        bus.publish(
+            InvoiceUpdatedEvent(invoice_id=13, invoice_number="13", updated_fields=["note"])
+        )
+        assert await _cached(cache) == {"invoice:12", "client:3", "client:4", "client_stats"}
+
+        bus.publish(
+            InvoiceStatusChangedEvent(
+                invoice_id=12, invoice_number="12", old_status="bozza", new_status="da_inviare"
+            )
+        )
+        assert await _cached(cache) == {"client:4", "client_stats"}
+
+    async def test_event_from_worker_thread(self):
+        bus = GlobalEventBus()
+        cache = ToolResultCache()
+        cache.subscribe(bus)
+        await _fill(cache)
+        await cache.get_cached_result("search_invoices", {"anno": 2025})  # binds the loop
+
+        await asyncio.to_thread(bus.publish, _invoice_sent(13))
+        await asyncio.sleep(0)
+
+        assert await _cached(cache) == {"invoice:12", "client:3", "client:4", "client_stats"}
+
+    async def test_invalidate_tool_cache_is_per_tool(self):
+        cache = ToolResultCache()
+        await _fill(cache)
+
+        await cache.invalidate_tool_cache("get_client_details")
+
+        assert await _cached(cache) == {
+            "invoice:12",
+            "invoice:13",
+            "search_invoices",
+            "client_stats",
+        }
+
+    async def test_evicted_tag_versions_do_not_revive_results(self):
+        tag_store = LRUCache(max_size=2, default_ttl=None, cleanup_interval=0)
+        cache = ToolResultCache(tag_store=tag_store)
+        await cache.cache_result("search_invoices", {"anno": 2025}, _result("search_invoices", []))
+
+        # Invalidate, then push the new version out of the tag store
+        await cache.invalidate_tags(["tool:search_invoices"])
+        await tag_store.set("tag:other-1", "x")
+        await tag_store.set("tag:other-2", "x")
+
+        assert await cache.get_cached_result("search_invoices", {"anno": 2025}) is None
+
+
+def test_invalidation_is_shared_across_processes(tmp_path):
+    """An event in one process invalidates results cached by another."""
+    path = tmp_path / "cache.sqlite3"
+
+    def open_cache() -> ToolResultCache:
+        return ToolResultCache(
+            cache=SQLiteCache(path, namespace="tool"),
+            tag_store=SQLiteCache(path, namespace="tool_tags"),
+        )
+
+    reader = open_cache()
+    asyncio.run(_fill(reader))
+
+    # Publisher without a running event loop, as in synchronous CLI commands
+    def publish() -> None:
+        bus = GlobalEventBus()
+        open_cache().subscribe(bus)
+        bus.publish(ClientUpdatedEvent(client_id=3, client_name="Rossi", updated_fields=[]))
+
+    thread = threading.Thread(target=publish)
+    thread.start()
+    thread.join()
+
+    assert asyncio.run(_cached(reader)) == {"invoice:13", "client:4"}
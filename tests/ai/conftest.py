@@ -34,6 +34,17 @@ def init_test_database() -> Generator[None, None, None]:
         db_base.SessionLocal = None
 
 
+@pytest.fixture(autouse=True)
+def isolate_rag_update_queue(tmp_path, monkeypatch) -> None:
+    """Keep the RAG auto-update queue files out of the working directory."""
+    monkeypatch.setenv(
+        "OPENFATTURE_RAG_AUTO_UPDATE_QUEUE_DB_PATH", str(tmp_path / "rag_update_queue.sqlite3")
+    )
+    monkeypatch.setenv(
+        "OPENFATTURE_RAG_AUTO_UPDATE_QUEUE_PERSIST_PATH", str(tmp_path / "rag_update_queue.json")
+    )
+
+
 @pytest.fixture(scope="session")
 def openai_api_available():
     """Check if OpenAI API key is configured."""
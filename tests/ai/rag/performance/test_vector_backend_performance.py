@@ -0,0 +1,105 @@
+"""Benchmarks comparing the ChromaDB and embedded NumPy vector backends.
+
+Measures, for 10k / 100k / 1M stored vectors (384-d, MiniLM-sized):
+- cold open (what every short-lived CLI invocation pays)
+- unfiltered top-k query latency
+- filtered top-k query latency (client equality + amount range, as used by
+  ``SemanticRetriever``)
+
+The 100k and 1M tiers are marked ``slow``; ChromaDB ingestion at 1M takes a
+long time.
+
+Run with:
+    pytest tests/ai/rag/performance/test_vector_backend_performance.py -m "performance and not slow" -s
+    pytest tests/ai/rag/performance/test_vector_backend_performance.py -m performance -s
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from openfatture.ai.rag.backends.chroma import ChromaBackend
+from openfatture.ai.rag.backends.numpy_backend import NumpyBackend
+from tests.performance.utils import measure_sync_function
+
+DIMENSION = 384
+INGEST_BATCH = 5000
+
+SIZES = [
+    pytest.param(10_000, id="10k"),
+    pytest.param(100_000, id="100k", marks=pytest.mark.slow),
+    pytest.param(1_000_000, id="1M", marks=pytest.mark.slow),
+]
+
+BACKENDS = [
+    pytest.param("chromadb", id="chromadb"),
+    pytest.param("numpy", id="numpy"),
+    pytest.param("numpy-hnsw", id="numpy-hnsw"),
+]
+
+
+def _open_backend(kind: str, directory, dimension: int = DIMENSION):
+    if kind == "chromadb":
+        pytest.importorskip("chromadb")
+        return ChromaBackend(directory, "bench", dimension)
+    if kind == "numpy-hnsw":
+        pytest.importorskip("hnswlib")
+        return NumpyBackend(directory, "bench", dimension, use_hnsw=True)
+    return NumpyBackend(directory, "bench", dimension)
+
+
+def _populate(backend, size: int, rng: np.random.Generator) -> None:
+    for start in range(0, size, INGEST_BATCH):
+        count = min(INGEST_BATCH, size - start)
+        vectors = rng.standard_normal((count, DIMENSION), dtype=np.float32)
+        ids = [f"doc-{start + i}" for i in range(count)]
+        metadatas = [
+            {
+                "type": "invoice",
+                "client_id": (start + i) % 500,
+                "amount": float((start + i) % 10_000),
+            }
+            for i in range(count)
+        ]
+        backend.add(ids, vectors.tolist(), ids, metadatas)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_backend_query_latency(kind, size, tmp_path):
+    """Compare cold-open and top-k latency across backends and collection sizes."""
+    rng = np.random.default_rng(42)
+    backend = _open_backend(kind, tmp_path)
+
+    ingest_start = time.perf_counter()
+    _populate(backend, size, rng)
+    ingest_s = time.perf_counter() - ingest_start
+    del backend
+
+    open_start = time.perf_counter()
+    backend = _open_backend(kind, tmp_path)
+    open_ms = (time.perf_counter() - open_start) * 1000
+    assert backend.count() == size
+
+    query = rng.standard_normal(DIMENSION, dtype=np.float32).tolist()
+    where = {"$and": [{"client_id": 7}, {"amount": {"$gte": 1000.0}}]}
+
+    def query_unfiltered():
+        return backend.query(query, top_k=10)
+
+    def query_filtered():
+        return backend.query(query, top_k=10, where=where)
+
+    unfiltered = measure_sync_function(query_unfiltered, iterations=20, warmup=2)
+    filtered = measure_sync_function(query_filtered, iterations=20, warmup=2)
+
+    print(
+        f"\n[{kind} @ {size:,}] ingest={ingest_s:.1f}s open={open_ms:.1f}ms "
+        f"query p50={unfiltered.median_latency_ms:.2f}ms p95={unfiltered.p95_latency_ms:.2f}ms "
+        f"filtered p50={filtered.median_latency_ms:.2f}ms"
+    )
+
+    assert len(query_unfiltered()) == 10
+    assert all(hit.metadata["client_id"] == 7 for hit in query_filtered())
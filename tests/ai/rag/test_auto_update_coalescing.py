@@ -0,0 +1,269 @@
+"""Tests for coalescing, debouncing and durability of the RAG auto-update queue.
+
+Run with: pytest tests/ai/rag/test_auto_update_coalescing.py -v
+"""
+
+import json
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from openfatture.ai.rag.auto_update import (
+    AutoIndexingService,
+    AutoUpdateConfig,
+    ChangeTracker,
+    ChangeType,
+    EntityChange,
+    ReindexQueue,
+)
+from openfatture.ai.rag.config import RAGConfig
+from openfatture.ai.rag.embeddings import EmbeddingStrategy
+from openfatture.ai.rag.vector_store import VectorStore
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Enabled config with the durable queue in a temporary directory."""
+    return AutoUpdateConfig(
+        enabled=True,
+        batch_size=2,
+        debounce_seconds=5,
+        max_queue_size=10,
+        queue_db_path=tmp_path / "queue.sqlite3",
+        queue_persist_path=tmp_path / "queue.json",
+    )
+
+
+@pytest.fixture
+def make_tracker(config):
+    """Factory building trackers that share ``config`` (and its queue file)."""
+
+    def make() -> ChangeTracker:
+        with patch(
+            "openfatture.ai.rag.auto_update.tracker.get_auto_update_config",
+            return_value=config,
+        ):
+            return ChangeTracker()
+
+    return make
+
+
+def _change(entity_id: int, change_type: ChangeType = ChangeType.UPDATE, entity="invoice"):
+    return EntityChange(
+        entity_type=entity,
+        entity_id=entity_id,
+        change_type=change_type,
+        timestamp=datetime.now(UTC),
+    )
+
+
+class TestChangeCoalescing:
+    """Test last-write-wins coalescing and the debounce window."""
+
+    def test_repeated_changes_collapse_to_latest(self, make_tracker):
+        tracker = make_tracker()
+
+        for _ in range(3):
+            tracker.track_change("invoice", 1, ChangeType.UPDATE)
+        tracker.track_change("invoice", 2, ChangeType.CREATE)
+        tracker.track_change("invoice", 1, ChangeType.DELETE)
+
+        pending = tracker.get_pending_changes()
+        stats = tracker.get_queue_stats()
+
+        assert [(c.entity_id, c.change_type) for c in pending] == [
+            (2, ChangeType.CREATE),
+            (1, ChangeType.DELETE),
+        ]
+        assert stats["tracked_total"] == 5
+        assert stats["coalesced_total"] == 3
+
+    def test_ready_changes_wait_for_settle_window(self, make_tracker):
+        tracker = make_tracker()
+        tracker.track_change("invoice", 1, ChangeType.UPDATE)
+
+        now = datetime.now(UTC)
+
+        assert tracker.get_ready_changes(settle_seconds=5, now=now) == []
+        ready = tracker.get_ready_changes(settle_seconds=5, now=now + timedelta(seconds=6))
+        assert [c.entity_id for c in ready] == [1]
+
+    def test_backpressure_skips_settle_window(self, make_tracker):
+        tracker = make_tracker()
+        for entity_id in range(8):
+            tracker.track_change("invoice", entity_id, ChangeType.UPDATE)
+
+        ready = tracker.get_ready_changes(settle_seconds=60, batch_size=3)
+
+        assert [c.entity_id for c in ready] == [0, 1, 2]
+
+    def test_overflow_drops_least_recently_changed(self, make_tracker):
+        tracker = make_tracker()
+        for entity_id in range(15):
+            tracker.track_change("invoice", entity_id, ChangeType.UPDATE)
+
+        stats = tracker.get_queue_stats()
+
+        assert stats["total_pending"] == 10
+        assert stats["dropped_total"] == 5
+        assert tracker.get_pending_changes()[0].entity_id == 5
+
+    def test_reprocessing_keeps_entities_changed_meanwhile(self, make_tracker):
+        tracker = make_tracker()
+        tracker.track_change("invoice", 1, ChangeType.UPDATE)
+        tracker.track_change("invoice", 2, ChangeType.UPDATE)
+        batch = tracker.get_pending_changes()
+
+        tracker.track_change("invoice", 2, ChangeType.UPDATE)  # arrives mid-flush
+        tracker.mark_changes_processed(batch)
+
+        assert [c.entity_id for c in tracker.get_pending_changes()] == [2]
+
+
+class TestDurableQueue:
+    """Test the write-through SQLite queue."""
+
+    def test_pending_changes_survive_restart(self, make_tracker):
+        tracker = make_tracker()
+        tracker.track_change("invoice", 1, ChangeType.CREATE, metadata={"numero": "1"})
+        tracker.track_change("client", 7, ChangeType.UPDATE)
+        tracker.track_change("invoice", 1, ChangeType.UPDATE)
+        tracker.mark_processed("client", [7])
+
+        restored = make_tracker().get_pending_changes()
+
+        assert [(c.entity_type, c.entity_id, c.change_type) for c in restored] == [
+            ("invoice", 1, ChangeType.UPDATE)
+        ]
+
+    def test_legacy_json_queue_is_imported_once(self, config, make_tracker):
+        legacy = {"invoice": [_change(3, ChangeType.CREATE).to_dict()]}
+        config.queue_persist_path.write_text(json.dumps(legacy), encoding="utf-8")
+
+        tracker = make_tracker()
+
+        assert [c.entity_id for c in tracker.get_pending_changes()] == [3]
+        assert not config.queue_persist_path.exists()
+        assert [c.entity_id for c in make_tracker().get_pending_changes()] == [3]
+
+    def test_persistence_disabled_writes_nothing(self, config, make_tracker):
+        config.persist_queue_on_shutdown = False
+
+        make_tracker().track_change("invoice", 1, ChangeType.UPDATE)
+
+        assert not config.queue_db_path.exists()
+
+
+@pytest.mark.asyncio
+class TestQueueFlush:
+    """Test ReindexQueue flushing and backpressure stats."""
+
+    @pytest.fixture
+    def queue(self, config, make_tracker):
+        tracker = make_tracker()
+        callback = AsyncMock()
+        with (
+            patch(
+                "openfatture.ai.rag.auto_update.queue.get_auto_update_config",
+                return_value=config,
+            ),
+            patch(
+                "openfatture.ai.rag.auto_update.queue.get_change_tracker",
+                return_value=tracker,
+            ),
+        ):
+            return ReindexQueue(reindex_callback=callback)
+
+    async def test_flush_drains_all_ready_batches(self, queue):
+        for entity_id in range(5):
+            queue.tracker.track_change("invoice", entity_id, ChangeType.UPDATE)
+
+        assert await queue.flush() == 0  # still inside the debounce window
+        assert await queue.flush(force=True) == 5
+
+        assert queue.reindex_callback.await_count == 3
+        assert queue.tracker.get_pending_changes() == []
+        assert queue.get_stats()["total_batches"] == 3
+
+    async def test_get_stats_reports_backpressure(self, queue):
+        for entity_id in range(9):
+            queue.tracker.track_change("invoice", entity_id, ChangeType.UPDATE)
+        queue.tracker.track_change("invoice", 0, ChangeType.UPDATE)
+
+        backpressure = queue.get_stats()["backpressure"]
+
+        assert backpressure["pending"] == 9
+        assert backpressure["utilization"] == pytest.approx(0.9)
+        assert backpressure["active"] is True
+        assert backpressure["ready"] == 9
+        assert backpressure["coalesced_total"] == 1
+        assert backpressure["oldest_pending_age_seconds"] >= 0
+
+
+@pytest.mark.asyncio
+class TestBatchedReindex:
+    """Test that a flushed batch is re-embedded in one call."""
+
+    @pytest.fixture
+    def service(self):
+        service = AutoIndexingService(vector_store=MagicMock())
+        service.invoice_indexer = MagicMock()
+        service.invoice_indexer.index_invoices = AsyncMock(return_value=[])
+        service.invoice_indexer.index_invoice = AsyncMock()
+        service.invoice_indexer.delete_invoices = AsyncMock()
+        return service
+
+    async def test_callback_batches_indexing_and_deletes(self, service):
+        changes = [
+            _change(1, ChangeType.CREATE),
+            _change(2, ChangeType.UPDATE),
+            _change(3, ChangeType.DELETE),
+            _change(9, ChangeType.UPDATE, entity="client"),
+        ]
+
+        with patch.object(service, "_client_invoice_ids", return_value=[2, 3, 4]):
+            await service._reindex_callback(changes)
+
+        service.invoice_indexer.delete_invoices.assert_awaited_once_with([3])
+        service.invoice_indexer.index_invoices.assert_awaited_once_with([1, 2, 4])
+        service.invoice_indexer.index_invoice.assert_not_awaited()
+
+    async def test_batch_failure_falls_back_to_single_invoices(self, service):
+        service.invoice_indexer.index_invoices.side_effect = RuntimeError("embedding API down")
+        service.invoice_indexer.index_invoice.side_effect = [ValueError("gone"), "invoice-2"]
+
+        await service._reindex_callback([_change(1), _change(2)])
+
+        assert service.invoice_indexer.index_invoice.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_upsert_documents_embeds_once_and_keeps_index_metadata(tmp_path):
+    strategy = MagicMock(spec=EmbeddingStrategy)
+    strategy.dimension = 3
+    strategy.model_name = "mock-embedder"
+    strategy.embed_batch = AsyncMock(
+        side_effect=lambda texts: [[float(len(t)), 1.0, 0.0] for t in texts]
+    )
+    store = VectorStore(
+        RAGConfig(persist_directory=tmp_path, collection_name="upsert", vector_backend="numpy"),
+        strategy,
+    )
+    await store.add_documents(["old text"], [{"type": "invoice", "n": 1}], ids=["invoice-1"])
+    indexed_at = store.get_document("invoice-1")["metadata"]["indexed_at"]
+    strategy.embed_batch.reset_mock()
+
+    await store.upsert_documents(
+        documents=["new text", "another"],
+        metadatas=[{"type": "invoice", "n": 2}, {"type": "invoice", "n": 3}],
+        ids=["invoice-1", "invoice-2"],
+    )
+
+    strategy.embed_batch.assert_awaited_once()
+    updated = store.get_document("invoice-1")
+    assert updated["document"] == "new text"
+    assert updated["metadata"]["n"] == 2
+    assert updated["metadata"]["indexed_at"] == indexed_at
+    assert "updated_at" in updated["metadata"]
+    assert store.count() == 2
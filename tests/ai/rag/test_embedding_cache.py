@@ -0,0 +1,148 @@
+"""Tests for the persistent SQLite embedding cache.
+
+Run with: pytest tests/ai/rag/test_embedding_cache.py -v
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from openfatture.ai.rag.config import RAGConfig
+from openfatture.ai.rag.embedding_cache import (
+    SQLiteEmbeddingCache,
+    create_embedding_cache,
+    embedding_cache_key,
+)
+from openfatture.ai.rag.embeddings import OpenAIEmbeddings, create_embeddings
+
+
+def _batch_response(texts):
+    response = MagicMock()
+    response.data = [MagicMock(embedding=[float(len(text)), 0.5]) for text in texts]
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SQLiteEmbeddingCache(tmp_path / "emb.sqlite3", max_entries=3)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.asyncio
+class TestSQLiteEmbeddingCache:
+    """Test the cache storage itself."""
+
+    async def test_roundtrip_preserves_float32_values(self, cache):
+        await cache.set("k", [0.25, -1.5, 3.0])
+
+        assert await cache.get("k") == [0.25, -1.5, 3.0]
+        assert await cache.get("missing") is None
+
+    async def test_get_many_omits_misses(self, cache):
+        await cache.set_many({"a": [1.0], "b": [2.0]})
+
+        found = await cache.get_many(["a", "b", "c", "a"])
+
+        assert found == {"a": [1.0], "b": [2.0]}
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+    async def test_evicts_least_recently_used(self, cache):
+        for key, value in (("a", 1.0), ("b", 2.0), ("c", 3.0)):
+            await cache.set(key, [value])
+        # Touch "a" so "b" becomes the LRU entry
+        await cache.get("a")
+
+        await cache.set("d", [4.0])
+
+        assert cache.size() == 3
+        assert await cache.get("b") is None
+        assert await cache.get("a") == [1.0]
+        assert cache.get_stats()["evictions"] == 1
+
+    async def test_persists_across_instances(self, tmp_path):
+        path = tmp_path / "emb.sqlite3"
+        first = SQLiteEmbeddingCache(path)
+        await first.set("k", [0.5])
+        first.close()
+
+        second = SQLiteEmbeddingCache(path)
+        assert await second.get("k") == [0.5]
+        second.close()
+
+    async def test_lazy_open_does_not_touch_filesystem(self, tmp_path):
+        path = tmp_path / "nested" / "emb.sqlite3"
+        SQLiteEmbeddingCache(path)
+
+        assert not path.exists()
+
+
+@pytest.mark.asyncio
+class TestCachedEmbeddingStrategies:
+    """Test that embed_batch only sends cache misses to the model."""
+
+    async def test_embed_batch_only_requests_misses(self, cache):
+        with patch("openai.AsyncOpenAI") as mock_openai_class:
+            mock_client = MagicMock()
+            mock_client.embeddings.create = AsyncMock(
+                side_effect=lambda input, model: _batch_response(input)
+            )
+            mock_openai_class.return_value = mock_client
+
+            embeddings = OpenAIEmbeddings(api_key="test-key", cache=cache)
+
+            first = await embeddings.embed_batch(["a", "bb", "a"])
+            second = await embeddings.embed_batch(["bb", "ccc"])
+
+            assert first == [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+            assert second == [[2.0, 0.5], [3.0, 0.5]]
+            calls = mock_client.embeddings.create.call_args_list
+            assert calls[0].kwargs["input"] == ["a", "bb"]
+            assert calls[1].kwargs["input"] == ["ccc"]
+
+    async def test_batch_and_single_paths_share_entries(self, cache):
+        with patch("openai.AsyncOpenAI") as mock_openai_class:
+            mock_client = MagicMock()
+            mock_client.embeddings.create = AsyncMock(
+                side_effect=lambda input, model: _batch_response(input)
+            )
+            mock_openai_class.return_value = mock_client
+
+            embeddings = OpenAIEmbeddings(api_key="test-key", cache=cache)
+            await embeddings.embed_batch(["hello"])
+
+            assert await embeddings.embed_text("hello") == [5.0, 0.5]
+            assert mock_client.embeddings.create.call_count == 1
+
+    async def test_key_depends_on_model(self):
+        assert embedding_cache_key("m1", "text") != embedding_cache_key("m2", "text")
+
+
+class TestEmbeddingCacheFactory:
+    """Test cache wiring through configuration."""
+
+    def test_default_path_under_persist_directory(self, tmp_path):
+        config = RAGConfig(persist_directory=tmp_path, embedding_cache_max_entries=10)
+
+        cache = create_embedding_cache(config)
+
+        assert cache.path == tmp_path / "embedding_cache.sqlite3"
+        assert cache.max_entries == 10
+
+    def test_create_embeddings_attaches_persistent_cache(self, tmp_path):
+        config = RAGConfig(persist_directory=tmp_path)
+
+        with patch("openai.AsyncOpenAI"):
+            embeddings = create_embeddings(config, api_key="test-key")
+
+        assert isinstance(embeddings.cache, SQLiteEmbeddingCache)
+
+    def test_caching_disabled(self, tmp_path):
+        config = RAGConfig(persist_directory=tmp_path, enable_caching=False)
+
+        with patch("openai.AsyncOpenAI"):
+            embeddings = create_embeddings(config, api_key="test-key")
+
+        assert embeddings.cache is None
@@ -0,0 +1,238 @@
+"""Tests for hybrid BM25 + vector retrieval.
+
+Covers tokenisation and rank fusion, the BM25 index, ``VectorStore.hybrid_search``
+on both backends and the hybrid code paths of ``SemanticRetriever``.
+
+Run with: pytest tests/ai/rag/test_hybrid_retrieval.py -v
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from openfatture.ai.rag.config import RAGConfig
+from openfatture.ai.rag.embeddings import EmbeddingStrategy
+from openfatture.ai.rag.lexical import (
+    BM25Index,
+    is_identifier_query,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+from openfatture.ai.rag.retrieval import SemanticRetriever
+from openfatture.ai.rag.vector_store import VectorStore
+
+INVOICES = [
+    (
+        "invoice-1",
+        "Fattura 1/2025\nCliente: Rossi SRL\nServizi:\n- Sviluppo sito web\nP.IVA: IT01234567890",
+        {"type": "invoice", "invoice_id": 1, "client_id": 1, "date": "2025-01-10", "amount": 500.0},
+    ),
+    (
+        "invoice-2",
+        "Fattura 2/2025\nCliente: Bianchi SPA\nServizi:\n- Consulenza fiscale",
+        {
+            "type": "invoice",
+            "invoice_id": 2,
+            "client_id": 2,
+            "date": "2025-03-05",
+            "amount": 2500.0,
+        },
+    ),
+    (
+        "invoice-3",
+        "Fattura 12/2025\nCliente: Rossi SRL\nServizi:\n- Manutenzione sito web",
+        {"type": "invoice", "invoice_id": 3, "client_id": 1, "date": "2025-06-20", "amount": 900.0},
+    ),
+    (
+        "kb-1",
+        "Regime forfettario: fattura senza IVA",
+        {"type": "knowledge"},
+    ),
+]
+
+
+class TestLexicalPrimitives:
+    """Test tokenisation, identifier detection and rank fusion."""
+
+    def test_tokenize_normalises_numbers_and_vat_prefixes(self):
+        assert tokenize("Fattura 001/2025") == ["fattura", "1", "2025"]
+        assert tokenize("P.IVA IT01234567890") == ["p", "iva", "it01234567890", "1234567890"]
+
+    def test_identifier_query_detection(self):
+        assert is_identifier_query("fattura n. 12/2025")
+        assert is_identifier_query("P.IVA IT01234567890")
+        assert not is_identifier_query("fatture sviluppo web 2025")
+        assert not is_identifier_query("fattura")
+
+    def test_reciprocal_rank_fusion_rewards_agreement(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+
+        assert [doc_id for doc_id, _ in fused] == ["b", "a", "d", "c"]
+        assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+
+class TestBM25Index:
+    """Test the in-memory BM25 index."""
+
+    @pytest.fixture
+    def index(self):
+        index = BM25Index()
+        index.add_many(
+            [doc_id for doc_id, _, _ in INVOICES],
+            [text for _, text, _ in INVOICES],
+            [metadata for _, _, metadata in INVOICES],
+        )
+        return index
+
+    def test_rare_terms_rank_first(self, index):
+        hits = index.search("fattura 12/2025", top_k=3)
+
+        assert hits[0][0] == "invoice-3"
+
+    def test_candidates_restrict_scoring(self, index):
+        candidates = index.filter_ids({"date": {"$gte": "2025-02-01", "$lte": "2025-12-31"}})
+
+        assert candidates == {"invoice-2", "invoice-3"}
+        assert {doc_id for doc_id, _ in index.search("sito web", 5, candidates)} == {"invoice-3"}
+        assert index.search("sito web", 5, candidates=set()) == []
+
+    def test_replace_and_remove_keep_postings_consistent(self, index):
+        index.add("invoice-3", "Fattura 12/2025 Noleggio attrezzatura", {"type": "invoice"})
+        index.remove("invoice-1")
+
+        assert len(index) == 3
+        assert index.search("sito web", top_k=5) == []
+        assert index.search("noleggio", top_k=5)[0][0] == "invoice-3"
+
+
+def _embed(text):
+    """Embedding that only depends on text length."""
+    return [float(len(text)), 1.0, 0.0]
+
+
+@pytest.fixture
+def embedding_strategy():
+    """Mock embedding strategy backed by ``_embed``."""
+    strategy = MagicMock(spec=EmbeddingStrategy)
+    strategy.dimension = 3
+    strategy.model_name = "mock-embedder"
+    strategy.embed_text = AsyncMock(side_effect=_embed)
+    strategy.embed_batch = AsyncMock(side_effect=lambda texts: [_embed(t) for t in texts])
+    return strategy
+
+
+@pytest.fixture(params=["numpy", "chromadb"])
+def store(request, tmp_path, embedding_strategy):
+    """Vector store on each backend, pre-populated with ``INVOICES``."""
+    if request.param == "chromadb":
+        pytest.importorskip("chromadb")
+
+    config = RAGConfig(
+        persist_directory=tmp_path,
+        collection_name="hybrid",
+        vector_backend=request.param,
+        similarity_threshold=0.0,
+    )
+    store = VectorStore(config, embedding_strategy)
+    store.backend.add(
+        ids=[doc_id for doc_id, _, _ in INVOICES],
+        embeddings=[_embed(text) for _, text, _ in INVOICES],
+        documents=[text for _, text, _ in INVOICES],
+        metadatas=[metadata for _, _, metadata in INVOICES],
+    )
+    return store
+
+
+@pytest.mark.asyncio
+class TestHybridSearch:
+    """Test VectorStore.hybrid_search."""
+
+    async def test_identifier_query_skips_embedding(self, store, embedding_strategy):
+        results = await store.hybrid_search("fattura n. 12/2025", top_k=1)
+
+        assert [r["id"] for r in results] == ["invoice-3"]
+        assert results[0]["similarity"] == pytest.approx(1.0)
+        embedding_strategy.embed_text.assert_not_awaited()
+
+    async def test_vat_lookup_without_country_prefix(self, store, embedding_strategy):
+        results = await store.hybrid_search("P.IVA 01234567890", top_k=1)
+
+        assert results[0]["id"] == "invoice-1"
+        embedding_strategy.embed_text.assert_not_awaited()
+
+    async def test_free_text_query_fuses_both_rankings(self, store, embedding_strategy):
+        results = await store.hybrid_search("manutenzione sito web", top_k=2)
+
+        assert results[0]["id"] == "invoice-3"
+        assert results[0]["score"] > results[1]["score"]
+        embedding_strategy.embed_text.assert_awaited_once()
+
+    async def test_range_filter_is_applied_before_scoring(self, store):
+        filters = {
+            "$and": [
+                {"type": "invoice"},
+                {"date": {"$gte": "2025-02-01", "$lte": "2025-12-31"}},
+            ]
+        }
+
+        results = await store.hybrid_search("fattura", top_k=5, filters=filters)
+
+        assert {r["id"] for r in results} == {"invoice-2", "invoice-3"}
+
+    async def test_lexical_index_follows_writes(self, store):
+        assert len(store.lexical_index) == 4
+
+        await store.update_document("invoice-2", document="Fattura 2/2025 Noleggio furgone")
+        await store.delete_documents(["invoice-1"])
+
+        assert [r["id"] for r in await store.hybrid_search("furgone", top_k=1)] == ["invoice-2"]
+        assert store.find_documents({"client_id": 1})[0]["id"] == "invoice-3"
+
+    async def test_lexical_index_follows_out_of_band_writes(self, store):
+        assert len(store.lexical_index) == 4
+
+        # Another process rewrites a document: the count does not change
+        store.backend.update(
+            ["invoice-2"],
+            [_embed("Fattura 2/2025 Noleggio furgone")],
+            ["Fattura 2/2025 Noleggio furgone"],
+            [dict(INVOICES[1][2])],
+        )
+
+        assert [r["id"] for r in await store.hybrid_search("furgone", top_k=1)] == ["invoice-2"]
+
+
+@pytest.mark.asyncio
+class TestSemanticRetrieverHybrid:
+    """Test the hybrid code paths of SemanticRetriever."""
+
+    async def test_client_lookup_without_query_uses_metadata_only(self, store, embedding_strategy):
+        retriever = SemanticRetriever(store)
+
+        results = await retriever.retrieve_by_client(client_id=1)
+
+        assert [r.invoice_id for r in results] == [3, 1]
+        embedding_strategy.embed_text.assert_not_awaited()
+
+    async def test_client_filter_matches_integer_metadata(self, store):
+        retriever = SemanticRetriever(store)
+
+        results = await retriever.retrieve("sito web", top_k=5, client_id=2)
+
+        assert [r.invoice_id for r in results] == [2]
+
+    async def test_date_range_and_amount_filters(self, store):
+        retriever = SemanticRetriever(store)
+
+        by_date = await retriever.retrieve_by_date_range("fattura", "2025-01-01", "2025-02-28")
+        by_amount = await retriever.retrieve_high_value_invoices("fattura", min_amount=800)
+
+        assert [r.invoice_id for r in by_date] == [1]
+        assert [r.invoice_id for r in by_amount] == [2, 3]
+
+    async def test_vector_mode_uses_plain_search(self, store, embedding_strategy):
+        retriever = SemanticRetriever(store, mode="vector")
+
+        await retriever.retrieve("fattura n. 12/2025")
+
+        embedding_strategy.embed_text.assert_awaited_once()
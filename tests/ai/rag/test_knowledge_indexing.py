@@ -0,0 +1,146 @@
+"""Tests for incremental knowledge-base indexing.
+
+Run with: pytest tests/ai/rag/test_knowledge_indexing.py -v
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from openfatture.ai.rag.config import RAGConfig
+from openfatture.ai.rag.embeddings import EmbeddingStrategy
+from openfatture.ai.rag.knowledge_indexer import KnowledgeIndexer
+from openfatture.ai.rag.vector_store import VectorStore
+
+GUIDE = """# Regime forfettario
+Il regime forfettario prevede un'imposta sostitutiva del 15%.
+
+# Reverse charge
+Nel reverse charge l'IVA è assolta dal committente.
+"""
+
+
+@pytest.fixture
+def embedding_strategy():
+    """Mock embedding strategy that records every batch."""
+    strategy = MagicMock(spec=EmbeddingStrategy)
+    strategy.dimension = 3
+    strategy.model_name = "mock-embedder"
+    strategy.embed_batch = AsyncMock(
+        side_effect=lambda texts: [[float(len(t)), 1.0, 0.0] for t in texts]
+    )
+    return strategy
+
+
+@pytest.fixture
+def kb_dir(tmp_path):
+    """Knowledge base with a markdown guide, a plaintext note and a missing file."""
+    (tmp_path / "guide.md").write_text(GUIDE, encoding="utf-8")
+    (tmp_path / "note.txt").write_text("Bollo virtuale da 2 euro.", encoding="utf-8")
+    manifest = {
+        "sources": [
+            {"id": "guide", "type": "markdown", "path": "guide.md", "tags": ["iva"]},
+            {"id": "note", "type": "text", "path": "note.txt"},
+            {"id": "gone", "type": "markdown", "path": "missing.md"},
+            {"id": "off", "type": "markdown", "path": "guide.md", "enabled": False},
+        ]
+    }
+    (tmp_path / "sources.json").write_text(json.dumps(manifest), encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def make_indexer(kb_dir, embedding_strategy):
+    """Factory building indexers that share one vector store."""
+    config = RAGConfig(
+        persist_directory=kb_dir / "store",
+        collection_name="kb",
+        vector_backend="numpy",
+        batch_size=2,
+        indexing_concurrency=2,
+    )
+    store = VectorStore(config, embedding_strategy)
+
+    def make() -> KnowledgeIndexer:
+        return KnowledgeIndexer(
+            config=config,
+            vector_store=store,
+            manifest_path=kb_dir / "sources.json",
+            base_path=kb_dir,
+        )
+
+    return make
+
+
+@pytest.mark.asyncio
+class TestKnowledgeIndexing:
+    """Test the incremental read → diff → embed → GC pipeline."""
+
+    async def test_first_run_embeds_all_chunks_in_batches(self, make_indexer, embedding_strategy):
+        reports = await make_indexer().sync_sources()
+
+        assert [r.source_id for r in reports] == ["guide", "note", "gone"]
+        assert [r.chunks_total for r in reports] == [2, 1, 0]
+        assert reports[2].missing
+        # Three chunks, batch size two, batches shared across sources
+        assert [len(call.args[0]) for call in embedding_strategy.embed_batch.await_args_list] == [
+            2,
+            1,
+        ]
+        assert all(r.duration_seconds >= 0 for r in reports)
+
+    async def test_unchanged_sources_are_not_re_embedded(self, make_indexer, embedding_strategy):
+        await make_indexer().index_sources()
+        embedding_strategy.embed_batch.reset_mock()
+
+        total = await make_indexer().index_sources()
+
+        assert total == 3
+        embedding_strategy.embed_batch.assert_not_awaited()
+
+    async def test_changed_source_reembeds_only_new_chunks_and_collects_stale_ones(
+        self, kb_dir, make_indexer, embedding_strategy
+    ):
+        indexer = make_indexer()
+        await indexer.index_sources()
+        embedding_strategy.embed_batch.reset_mock()
+
+        (kb_dir / "guide.md").write_text(
+            GUIDE.replace("15%", "5% per le startup"), encoding="utf-8"
+        )
+        report = (await indexer.sync_sources(["guide"]))[0]
+
+        assert (report.chunks_embedded, report.chunks_skipped, report.chunks_deleted) == (1, 1, 1)
+        embedding_strategy.embed_batch.assert_awaited_once()
+        stored = indexer.vector_store.find_metadata({"knowledge_source": "guide"})
+        assert len(stored) == 2
+        assert indexer.vector_store.count() == 3
+
+    async def test_metadata_change_triggers_reindex(self, kb_dir, make_indexer):
+        await make_indexer().index_sources()
+        manifest = json.loads((kb_dir / "sources.json").read_text(encoding="utf-8"))
+        manifest["sources"][1]["metadata"] = {"law_reference": "DPR 642/72"}
+        (kb_dir / "sources.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+        indexer = make_indexer()
+        report = (await indexer.sync_sources(["note"]))[0]
+
+        assert report.chunks_embedded == 1
+        stored = indexer.vector_store.find_metadata({"knowledge_source": "note"})
+        assert [m["law_reference"] for m in stored.values()] == ["DPR 642/72"]
+
+    async def test_index_source_reports_single_source(self, make_indexer):
+        indexer = make_indexer()
+
+        assert await indexer.index_source("note") == 1
+        assert await indexer.index_source("off") == 0
+        with pytest.raises(ValueError):
+            await indexer.index_source("unknown")
+
+
+def test_streamed_markdown_sections_match_parser():
+    sections = list(KnowledgeIndexer._iter_markdown_sections(iter(GUIDE.splitlines())))
+
+    assert sections == KnowledgeIndexer._parse_markdown(GUIDE)
+    assert [s["title"] for s in sections] == ["Regime forfettario", "Reverse charge"]
@@ -0,0 +1,217 @@
+"""Tests for pluggable vector backends.
+
+Covers the shared ChromaDB-style filter evaluation, the embedded NumPy backend
+and ``VectorStore`` running on top of it.
+
+Run with: pytest tests/ai/rag/test_vector_backends.py -v
+"""
+
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from openfatture.ai.rag.backends import create_vector_backend, matches_where
+from openfatture.ai.rag.backends.numpy_backend import NumpyBackend
+from openfatture.ai.rag.config import RAGConfig
+from openfatture.ai.rag.embeddings import EmbeddingStrategy
+from openfatture.ai.rag.vector_store import VectorStore
+
+INVOICES = [
+    ("invoice-1", [1.0, 0.0, 0.0], {"type": "invoice", "client_id": 1, "amount": 100.0}),
+    ("invoice-2", [0.9, 0.1, 0.0], {"type": "invoice", "client_id": 2, "amount": 2500.0}),
+    ("invoice-3", [0.0, 1.0, 0.0], {"type": "invoice", "client_id": 1, "amount": 900.0}),
+    ("kb-1", [1.0, 0.0, 0.1], {"type": "knowledge", "date": "2025-01-01"}),
+]
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = NumpyBackend(tmp_path, "test", dimension=3, initial_capacity=2)
+    backend.add(
+        ids=[doc_id for doc_id, _, _ in INVOICES],
+        embeddings=[vector for _, vector, _ in INVOICES],
+        documents=[f"doc {doc_id}" for doc_id, _, _ in INVOICES],
+        metadatas=[metadata for _, _, metadata in INVOICES],
+    )
+    yield backend
+    backend.close()
+
+
+class TestMatchesWhere:
+    """Test ChromaDB where-dialect evaluation."""
+
+    def test_equality_and_logical_operators(self):
+        metadata = {"type": "invoice", "client_id": 7, "amount": 120.0}
+
+        assert matches_where(metadata, {"type": "invoice"})
+        assert matches_where(metadata, {"$and": [{"type": "invoice"}, {"client_id": 7}]})
+        assert matches_where(metadata, {"$or": [{"type": "x"}, {"client_id": {"$in": [7, 8]}}]})
+        assert not matches_where(metadata, {"$and": [{"type": "invoice"}, {"client_id": 8}]})
+
+    def test_range_operators_on_numbers_and_iso_dates(self):
+        metadata = {"amount": 120.0, "date": "2025-03-15"}
+
+        assert matches_where(metadata, {"amount": {"$gte": 100, "$lt": 200}})
+        assert matches_where(metadata, {"date": {"$gte": "2025-01-01", "$lte": "2025-12-31"}})
+        assert not matches_where(metadata, {"amount": {"$gt": 120.0}})
+
+    def test_missing_field_and_type_mismatch_do_not_match(self):
+        assert not matches_where({"type": "invoice"}, {"amount": {"$gte": 0}})
+        assert not matches_where({"amount": "n/a"}, {"amount": {"$gte": 0}})
+        assert not matches_where({"flag": 1}, {"flag": True})
+
+    def test_unknown_operator_raises(self):
+        with pytest.raises(ValueError, match="Unsupported filter operator"):
+            matches_where({"amount": 1}, {"amount": {"$regex": "x"}})
+
+
+class TestNumpyBackend:
+    """Test the embedded NumPy backend."""
+
+    def test_query_ranks_by_cosine_similarity(self, backend):
+        hits = backend.query([1.0, 0.0, 0.0], top_k=2)
+
+        assert [hit.id for hit in hits] == ["invoice-1", "kb-1"]
+        assert hits[0].similarity == pytest.approx(1.0)
+        assert hits[0].document == "doc invoice-1"
+
+    def test_query_applies_equality_and_range_filters(self, backend):
+        where = {"$and": [{"type": "invoice"}, {"amount": {"$gte": 500}}]}
+
+        hits = backend.query([1.0, 0.0, 0.0], top_k=5, where=where)
+
+        assert [hit.id for hit in hits] == ["invoice-2", "invoice-3"]
+
+    def test_query_with_no_candidates(self, backend):
+        assert backend.query([1.0, 0.0, 0.0], top_k=5, where={"client_id": 99}) == []
+
+    def test_existing_ids_are_not_duplicated(self, backend):
+        backend.add(["invoice-1"], [[0.0, 0.0, 1.0]], ["dup"], [{"type": "invoice"}])
+
+        assert backend.count() == 4
+        assert backend.get(ids=["invoice-1"])[0].document == "doc invoice-1"
+
+    def test_delete_reuses_slots(self, backend):
+        backend.delete(["invoice-1", "unknown"])
+        backend.add(["invoice-5"], [[0.0, 0.0, 1.0]], ["new"], [{"type": "invoice"}])
+
+        assert backend.count() == 4
+        assert backend.query([0.0, 0.0, 1.0], top_k=1)[0].id == "invoice-5"
+        assert backend.get(ids=["invoice-1"]) == []
+
+    def test_update_replaces_vector_and_metadata(self, backend):
+        backend.update(["invoice-3"], [[0.0, 0.0, 1.0]], ["updated"], [{"type": "archived"}])
+
+        assert backend.query([0.0, 0.0, 1.0], top_k=1)[0].id == "invoice-3"
+        assert backend.get(where={"type": "archived"})[0].document == "updated"
+        assert [r.id for r in backend.get(where={"client_id": 1})] == ["invoice-1"]
+
+    def test_persists_across_reopen(self, backend, tmp_path):
+        backend.delete(["kb-1"])
+        backend.close()
+
+        reopened = NumpyBackend(tmp_path, "test", dimension=3)
+
+        assert reopened.count() == 3
+        assert reopened.query([0.0, 1.0, 0.0], top_k=1)[0].id == "invoice-3"
+        reopened.close()
+
+    def test_dimension_mismatch_raises(self, backend, tmp_path):
+        backend.close()
+
+        with pytest.raises(ValueError, match="3-d"):
+            NumpyBackend(tmp_path, "test", dimension=4)
+
+    def test_reset(self, backend):
+        backend.reset()
+
+        assert backend.count() == 0
+        assert backend.query([1.0, 0.0, 0.0], top_k=3) == []
+
+    def test_hnsw_index_matches_flat_results(self, tmp_path):
+        pytest.importorskip("hnswlib")
+        hnsw = NumpyBackend(tmp_path, "hnsw", dimension=3, use_hnsw=True)
+        hnsw.add(
+            ids=[doc_id for doc_id, _, _ in INVOICES],
+            embeddings=[vector for _, vector, _ in INVOICES],
+            documents=[doc_id for doc_id, _, _ in INVOICES],
+            metadatas=[metadata for _, _, metadata in INVOICES],
+        )
+
+        assert hnsw.query([0.0, 1.0, 0.0], top_k=1)[0].id == "invoice-3"
+        hnsw.delete(["invoice-3"])
+        assert hnsw.query([0.0, 1.0, 0.0], top_k=1)[0].id != "invoice-3"
+        assert hnsw.describe()["index"] == "hnsw"
+        hnsw.close()
+
+    def test_hnsw_falls_back_to_exact_search_without_hnswlib(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(sys.modules, "hnswlib", None)
+
+        flat = NumpyBackend(tmp_path, "hnsw", dimension=3, use_hnsw=True)
+        flat.add(
+            ids=[doc_id for doc_id, _, _ in INVOICES],
+            embeddings=[vector for _, vector, _ in INVOICES],
+            documents=[doc_id for doc_id, _, _ in INVOICES],
+            metadatas=[metadata for _, _, metadata in INVOICES],
+        )
+
+        assert flat.query([0.0, 1.0, 0.0], top_k=1)[0].id == "invoice-3"
+        assert flat.describe()["index"] == "flat"
+        assert not (tmp_path / "hnsw.numpy" / "hnsw.bin").exists()
+        flat.close()
+
+
+@pytest.mark.asyncio
+class TestVectorStoreOnNumpyBackend:
+    """Test VectorStore running on the NumPy backend."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        strategy = MagicMock(spec=EmbeddingStrategy)
+        strategy.dimension = 3
+        strategy.model_name = "mock-embedder"
+
+        def embed(text):
+            return [float(len(text)), 1.0, 0.0]
+
+        strategy.embed_text = AsyncMock(side_effect=embed)
+        strategy.embed_batch = AsyncMock(side_effect=lambda texts: [embed(t) for t in texts])
+
+        config = RAGConfig(
+            persist_directory=tmp_path,
+            collection_name="store",
+            vector_backend="numpy",
+            similarity_threshold=0.0,
+        )
+        return VectorStore(config, strategy)
+
+    async def test_factory_selects_numpy_backend(self, store):
+        assert isinstance(store.backend, NumpyBackend)
+        assert store.collection is None
+        assert store.get_stats()["backend"] == "numpy"
+
+    async def test_add_search_update_delete(self, store):
+        await store.add_documents(
+            documents=["short", "a much longer text"],
+            metadatas=[{"type": "invoice", "year": 2025}, {"type": "invoice", "year": 2024}],
+            ids=["a", "b"],
+        )
+
+        results = await store.search("short", top_k=2, filters={"year": 2024})
+        assert [r["id"] for r in results] == ["b"]
+        assert results[0]["metadata"]["embedding_model"] == "mock-embedder"
+
+        await store.update_document("a", metadata={"year": 2024})
+        assert store.get_document("a")["metadata"]["year"] == 2024
+
+        deleted = await store.delete_by_filter({"year": 2024})
+        assert deleted == 2
+        assert store.count() == 0
+
+    async def test_unknown_backend_rejected(self, tmp_path):
+        config = RAGConfig(persist_directory=tmp_path)
+        config.vector_backend = "faiss"  # type: ignore[assignment]
+
+        with pytest.raises(ValueError, match="Unsupported vector backend"):
+            create_vector_backend(config, dimension=3)
@@ -0,0 +1,115 @@
+"""Tests for IndexedSessionStore (SQLite metadata index + FTS5 search)."""
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from openfatture.ai.session import ChatSession, SessionStatus, get_session_store
+from openfatture.ai.session.file_store import FileSessionStore
+from openfatture.ai.session.indexed_store import IndexedSessionStore
+
+
+def _session(title: str, *messages: str, hours_ago: int = 0) -> ChatSession:
+    session = ChatSession()
+    session.metadata.title = title
+    for content in messages:
+        session.add_user_message(content)
+    session.metadata.updated_at = datetime.now() - timedelta(hours=hours_ago)
+    return session
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> IndexedSessionStore:
+    store = IndexedSessionStore(sessions_dir=tmp_path)
+    yield store
+    store.close()
+
+
+def test_factory_returns_indexed_store(tmp_path: Path):
+    assert isinstance(get_session_store(sessions_dir=tmp_path), IndexedSessionStore)
+    assert type(get_session_store(sessions_dir=tmp_path, indexed=False)) is FileSessionStore
+
+
+def test_listing_reads_only_the_index(store: IndexedSessionStore):
+    old = _session("Vecchia", "ciao", hours_ago=5)
+    new = _session("Nuova", "ciao", hours_ago=1)
+    archived = _session("Archiviata", hours_ago=2)
+    archived.archive()
+    archived.metadata.updated_at = datetime.now() - timedelta(hours=2)
+    for session in (old, new, archived):
+        store.save(session)
+
+    with patch("openfatture.ai.session.models.ChatSession.from_json") as from_json:
+        summaries = store.list_summaries()
+        stats = store.get_stats()
+    from_json.assert_not_called()
+
+    assert [s.metadata.title for s in summaries] == ["Nuova", "Archiviata", "Vecchia"]
+    assert summaries[0].metadata.message_count == 1
+    assert [s.id for s in store.list_summaries(status=SessionStatus.ARCHIVED)] == [archived.id]
+    assert stats == {"total": 3, "active": 2, "archived": 1, "deleted": 0}
+
+    recent = store.list_sessions(limit=1)
+    assert [s.id for s in recent] == [new.id]
+    assert recent[0].messages[0].content == "ciao"
+
+
+def test_full_text_search(store: IndexedSessionStore):
+    match = _session("IVA", "Come registro la fattura 12 di Rossi SRL?", hours_ago=3)
+    title_match = _session("Fatturazione Rossi", "domanda generica", hours_ago=1)
+    other = _session("Altro", "Scadenze di pagamento")
+    deleted = _session("Rossi eliminata", "fattura Rossi")
+    for session in (match, title_match, other, deleted):
+        store.save(session)
+    store.delete(deleted.id)
+
+    assert [s.id for s in store.search_sessions("rossi")] == [title_match.id, match.id]
+    assert [s.id for s in store.search_sessions("fatt rossi")] == [title_match.id, match.id]
+    assert [s.id for s in store.search_summaries("Pagamento")] == [other.id]
+    assert store.search_sessions("fattura 99") == []
+    assert store.search_sessions('"); DROP TABLE sessions; --') == []
+
+
+def test_index_tracks_files_written_elsewhere(tmp_path: Path, store: IndexedSessionStore):
+    legacy = FileSessionStore(sessions_dir=tmp_path)
+    session = _session("Da altro processo", "nota di credito")
+    legacy.save(session)
+
+    assert [s.id for s in store.search_sessions("credito")] == [session.id]
+
+    session.metadata.title = "Rinominata"
+    legacy.save(session)
+    assert store.list_summaries()[0].metadata.title == "Rinominata"
+
+    (tmp_path / f"{session.id}.json").unlink()
+    assert store.list_summaries() == []
+    assert store.search_sessions("credito") == []
+
+
+def test_index_is_rebuilt_from_existing_files(tmp_path: Path):
+    session = _session("Esistente", "preventivo")
+    (tmp_path / f"{session.id}.json").write_text(json.dumps(session.export_json()))
+
+    store = IndexedSessionStore(sessions_dir=tmp_path)
+    try:
+        assert [s.id for s in store.search_sessions("preventivo")] == [session.id]
+    finally:
+        store.close()
+
+
+def test_maintenance_uses_index(store: IndexedSessionStore):
+    stale = _session("Ferma", hours_ago=24 * 40)
+    fresh = _session("Attiva")
+    for session in (stale, fresh):
+        store.save(session)
+
+    assert store.archive_old_sessions(days_old=30) == 1
+    assert store.load(stale.id).status == SessionStatus.ARCHIVED
+
+    store.delete(fresh.id)
+    assert store.cleanup_deleted() == 1
+    assert not store.exists(fresh.id)
+    assert store.get_stats() == {"total": 1, "active": 0, "archived": 1, "deleted": 0}
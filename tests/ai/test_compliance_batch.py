@@ -0,0 +1,213 @@
+"""Tests for the batch compliance engine and the compiled SDI pattern table."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+import openfatture.storage.database.base as db_base
+from openfatture.ai.agents.compliance import (
+    BatchComplianceEngine,
+    ComplianceChecker,
+    ComplianceLevel,
+    SDIPatternDatabase,
+    SDIPatternMatcher,
+)
+from openfatture.ai.domain.response import AgentResponse
+from openfatture.storage.database.models import Cliente, Fattura, Pagamento, RigaFattura
+
+DESCRIZIONE = "Sviluppo modulo fatturazione elettronica con integrazione SDI, 8 ore"
+
+
+def _fattura(cliente: Cliente, numero: int, giorno: date, imponibile: Decimal) -> Fattura:
+    iva = imponibile * Decimal("0.22")
+    fattura = Fattura(
+        numero=str(numero),
+        anno=giorno.year,
+        data_emissione=giorno,
+        cliente=cliente,
+        imponibile=imponibile,
+        iva=iva,
+        totale=imponibile + iva,
+    )
+    fattura.righe.append(
+        RigaFattura(
+            numero_riga=1,
+            descrizione=DESCRIZIONE,
+            quantita=Decimal("1"),
+            prezzo_unitario=imponibile,
+            aliquota_iva=Decimal("22"),
+            imponibile=imponibile,
+            iva=iva,
+            totale=imponibile + iva,
+        )
+    )
+    fattura.pagamenti.append(
+        Pagamento(importo=imponibile + iva, data_scadenza=giorno + timedelta(days=30))
+    )
+    return fattura
+
+
+@pytest.fixture
+def invoice_ids(runtime_session) -> list[int]:
+    """Invoices of a foreign client without issues and of a client with a malformed P.IVA."""
+    estero = Cliente(
+        denominazione="Müller GmbH",
+        nazione="DE",
+        partita_iva="DE1234567890",
+        pec="mueller@pec.it",
+        indirizzo="Hauptstrasse 1",
+        cap="10115",
+        comune="Berlin",
+    )
+    errato = Cliente(
+        denominazione="Bianchi S.p.A.",
+        nazione="IT",
+        partita_iva="1234567890",
+        codice_destinatario="ABC1234",
+        indirizzo="Via Roma 1",
+        cap="20100",
+        comune="Milano",
+        provincia="MI",
+    )
+    start = date(2025, 3, 3)
+    importi = [Decimal(v) for v in ("310", "290", "305", "295", "300", "2400")]
+    fatture = [
+        _fattura(cliente, 2 * n + offset, start + timedelta(days=7 * n), importo)
+        for n, importo in enumerate(importi)
+        for offset, cliente in enumerate((estero, errato), start=1)
+    ]
+    runtime_session.add_all(fatture)
+    runtime_session.commit()
+    return [f.id for f in fatture]
+
+
+@pytest.fixture
+def provider(mock_provider, mocker):
+    mock_provider.generate.return_value = AgentResponse(content="Descrizioni adeguate")
+    mocker.patch(
+        "openfatture.ai.agents.compliance.heuristics.create_provider", return_value=mock_provider
+    )
+    return mock_provider
+
+
+def _comparable(report) -> dict:
+    data = report.to_dict()
+    del data["timestamp"]
+    data["patterns"] = [p.pattern_name for p in report.sdi_pattern_matches]
+    data["anomalies"] = [(a.code, a.field) for a in report.heuristic_anomalies]
+    return data
+
+
+class TestBatchComplianceEngine:
+    @pytest.mark.asyncio
+    async def test_reports_match_single_invoice_checks(self, invoice_ids, provider):
+        checker = ComplianceChecker(level=ComplianceLevel.ADVANCED)
+
+        batch = await checker.check_batch(invoice_ids)
+
+        assert list(batch) == invoice_ids
+        for invoice_id in invoice_ids:
+            single = await checker.check_invoice(invoice_id)
+            assert _comparable(batch[invoice_id]) == _comparable(single)
+
+        assert batch[invoice_ids[0]].is_compliant
+        assert not batch[invoice_ids[1]].is_compliant
+        # The last invoice of each client is far above its history
+        outlier = batch[invoice_ids[-2]]
+        assert [a.code for a in outlier.heuristic_anomalies] == ["HEUR001"]
+
+    @pytest.mark.asyncio
+    async def test_queries_do_not_grow_with_batch_size(self, invoice_ids, provider):
+        checker = ComplianceChecker(level=ComplianceLevel.ADVANCED)
+        statements: list[str] = []
+        event.listen(
+            db_base.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+
+        reports = await BatchComplianceEngine(checker).check(invoice_ids)
+
+        assert len(reports) == len(invoice_ids)
+        selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        # Invoices, lines, payments, clients, history ranking, history rows and their lines/payments
+        assert len(selects) <= 8
+
+    @pytest.mark.asyncio
+    async def test_only_flagged_invoices_are_reviewed(self, invoice_ids, provider):
+        checker = ComplianceChecker(level=ComplianceLevel.ADVANCED)
+
+        reports = await BatchComplianceEngine(checker, review_concurrency=2).check(invoice_ids)
+
+        flagged = [r for r in reports.values() if r.get_errors() or r.get_warnings()]
+        assert 0 < len(flagged) < len(reports)
+        assert provider.generate.await_count == len(flagged)
+
+    @pytest.mark.asyncio
+    async def test_missing_invoices_are_skipped(self, invoice_ids):
+        checker = ComplianceChecker(level=ComplianceLevel.STANDARD)
+
+        reports = await checker.check_batch([invoice_ids[0], 9999, invoice_ids[1]])
+
+        assert list(reports) == [invoice_ids[0], invoice_ids[1]]
+        assert all(not r.heuristic_anomalies for r in reports.values())
+
+    def test_invalid_arguments(self):
+        checker = ComplianceChecker(level=ComplianceLevel.BASIC)
+        with pytest.raises(ValueError):
+            BatchComplianceEngine(checker, review_concurrency=0)
+
+
+def test_pattern_matcher_matches_each_pattern_separately():
+    patterns = SDIPatternDatabase().get_all_patterns()
+    matcher = SDIPatternMatcher(patterns)
+    values = ["1234567890", "ABC12", "abcdefg", "00100", "rm", "Roma", "", None]
+
+    def expected(fattura) -> list[str]:
+        names = []
+        for pattern in patterns:
+            hit = False
+            for check in pattern.field_checks:
+                if "cliente." in check:
+                    value = getattr(fattura.cliente, check.replace("cliente.", ""), None)
+                    hit = hit or bool(
+                        value and any(r.match(str(value)) for r in pattern.compiled_patterns)
+                    )
+                elif "righe" in check:
+                    hit = hit or any(
+                        r.search(str(riga.descrizione))
+                        for riga in fattura.righe
+                        for r in pattern.compiled_patterns
+                    )
+            if hit:
+                names.append(pattern.pattern_name)
+        return names
+
+    for index, value in enumerate(values):
+        cliente = SimpleNamespace(
+            id=index % 3,
+            partita_iva=value,
+            codice_fiscale=value,
+            codice_destinatario=value,
+            pec=value,
+            cap=value,
+            provincia=value,
+            indirizzo=value,
+            comune=value,
+        )
+        fattura = SimpleNamespace(cliente=cliente, righe=[SimpleNamespace(descrizione=value)])
+
+        assert [p.pattern_name for p in matcher.match(fattura)] == expected(fattura)
+        assert matcher.match(fattura, {}) == matcher.match(fattura)
+
+    client_cache: dict[int, frozenset[int]] = {}
+    # Client results are computed once per client id
+    fattura = SimpleNamespace(cliente=SimpleNamespace(id=1, partita_iva="1234567890"), righe=[])
+    matcher.match(fattura, client_cache)
+    fattura.cliente.partita_iva = "12345678903"
+    assert [p.pattern_name for p in matcher.match(fattura, client_cache)] == [
+        "P.IVA Cliente Non Valida"
+    ]
@@ -0,0 +1,176 @@
+"""Tests for token-budgeted conversation packing."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from openfatture.ai.context.packing import (
+    TOKEN_COUNTS_KEY,
+    ContextPacker,
+    message_tokens,
+)
+from openfatture.ai.domain.context import ChatContext
+from openfatture.ai.domain.message import ConversationHistory, Message, Role
+from openfatture.ai.providers.anthropic import AnthropicProvider
+from openfatture.ai.runtime.prompt import build_chat_system_prompt
+from openfatture.ai.session.models import ChatSession
+
+
+def _provider(name: str = "openai") -> MagicMock:
+    provider = MagicMock()
+    provider.provider_name = name
+    provider.model = "test-model"
+    # One token per word keeps budgets easy to reason about
+    provider.count_tokens = MagicMock(side_effect=lambda text: len(text.split()))
+    return provider
+
+
+def _turns(n: int, words: int = 6) -> list[Message]:
+    messages = []
+    for i in range(n):
+        role = Role.USER if i % 2 == 0 else Role.ASSISTANT
+        messages.append(Message(role=role, content=" ".join([f"m{i}"] * words)))
+    return messages
+
+
+def test_counts_are_cached_per_tokenizer():
+    provider = _provider()
+    packer = ContextPacker(provider, budget_tokens=1000)
+    message = Message(role=Role.USER, content="fattura numero 12 del cliente Rossi")
+
+    assert packer.count(message) == 6 + 4
+    assert packer.count(message) == 10
+    assert provider.count_tokens.call_count == 1
+    assert message.metadata[TOKEN_COUNTS_KEY] == {"openai:test-model": 10}
+
+    # A different tokenizer gets its own entry
+    assert message_tokens(message) == len(message.content) // 4 + 4
+    assert set(message.metadata[TOKEN_COUNTS_KEY]) == {"openai:test-model", "approx"}
+
+
+def test_pack_keeps_recent_messages_within_budget():
+    packer = ContextPacker(_provider(), budget_tokens=44)
+    system = Message(role=Role.SYSTEM, content="regole")
+    messages = [system, *_turns(6)]  # 5 + 6 * 10 tokens
+
+    packed = packer.pack(messages)
+
+    assert packed.messages == [system, *messages[4:]]
+    assert packed.evicted == messages[1:4]
+    assert packed.tokens == 35 <= packer.budget_tokens
+
+
+def test_pack_never_starts_with_orphan_tool_result():
+    packer = ContextPacker(_provider(), budget_tokens=20)
+    messages = [
+        Message(role=Role.USER, content="stato fattura 12"),
+        Message(role=Role.ASSISTANT, content="", tool_calls=[{"id": "1"}]),
+        Message(role=Role.TOOL, content="pagata il 3 marzo", tool_call_id="1"),
+        Message(role=Role.ASSISTANT, content="La fattura 12 risulta pagata"),
+    ]
+
+    packed = packer.pack(messages)
+
+    assert packed.messages == messages[3:]
+
+
+def test_most_recent_message_is_kept_even_if_over_budget():
+    packed = ContextPacker(_provider(), budget_tokens=5).pack(_turns(3, words=50))
+
+    assert len(packed.messages) == 1
+    assert len(packed.evicted) == 2
+
+
+def test_provider_default_budgets():
+    assert ContextPacker(_provider("anthropic")).budget_tokens > (
+        ContextPacker(_provider("ollama")).budget_tokens
+    )
+    assert ContextPacker(_provider(), budget_tokens=123).budget_tokens == 123
+
+
+@pytest.mark.asyncio
+async def test_summaries_are_cached_and_extended_incrementally():
+    summarizer = AsyncMock(side_effect=lambda previous, evicted: f"{previous}+{len(evicted)}")
+    packer = ContextPacker(
+        _provider(), budget_tokens=40, summarizer=summarizer, summary_max_tokens=10
+    )
+    history = _turns(5)
+
+    first = await packer.apack(history)
+    again = await packer.apack(history)
+    longer = await packer.apack([*history, *_turns(1)])
+
+    assert first.summary == again.summary == "None+2"
+    assert longer.summary == "None+2+1"
+    assert summarizer.await_count == 2
+    assert packer.get_stats()["summary_cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pack_context_sets_summary_without_touching_caller_history():
+    summarizer = AsyncMock(return_value="L'utente ha chiesto le fatture di marzo")
+    packer = ContextPacker(_provider(), budget_tokens=30, summarizer=summarizer)
+    history = ConversationHistory(messages=_turns(6))
+    context = ChatContext(user_input="e aprile?", conversation_history=history)
+
+    await packer.pack_context(context)
+
+    assert len(history.messages) == 6
+    assert len(context.conversation_history.messages) < 6
+    assert "Riepilogo della conversazione precedente:" in build_chat_system_prompt(context)
+    assert "fatture di marzo" in build_chat_system_prompt(context)
+
+
+def test_session_truncation_uses_content_tokens():
+    session = ChatSession(max_tokens=100)
+    session.add_system_message("regole")
+    for _ in range(10):
+        session.add_user_message("x" * 80)  # 24 tokens each
+    # Usage totals include the prompt and must not evict the whole history
+    session.add_assistant_message("ok", tokens=5000)
+
+    assert session.messages[0].role == Role.SYSTEM
+    assert len(session.messages) == 1 + 3 + 1
+    assert all(TOKEN_COUNTS_KEY in m.metadata for m in session.messages)
+
+
+def test_session_truncation_keeps_the_newest_message():
+    session = ChatSession(max_tokens=50)
+    session.add_user_message("breve")
+
+    message = session.add_user_message("x" * 400)  # 100+ tokens alone
+
+    assert session.messages == [message]
+
+
+def test_session_truncation_drops_tool_results_with_their_request():
+    session = ChatSession(max_messages=4)
+    session.add_user_message("fatture scadute?")
+    session.add_assistant_message(
+        "", tool_calls=[{"id": "c1", "function": {"name": "search_invoices"}}]
+    )
+    session.add_message(Role.TOOL, "[...]", tool_call_id="c1")
+    session.add_message(Role.TOOL, "[...]", tool_call_id="c1")
+    session.add_assistant_message("Due fatture scadute.")
+    session.add_user_message("grazie")
+
+    # The tool turn (3 messages) does not fit next to the last two
+    assert [m.role for m in session.messages] == [Role.ASSISTANT, Role.USER]
+    assert session.messages[-1].content == "grazie"
+
+
+@pytest.mark.asyncio
+async def test_anthropic_count_tokens_does_not_block_on_async_client():
+    provider = AnthropicProvider.__new__(AnthropicProvider)
+    provider.model = "claude-test"
+    counted = asyncio.Event()
+
+    async def count_tokens(text):
+        counted.set()
+        return 999
+
+    provider.client = MagicMock(count_tokens=count_tokens)
+
+    assert provider.count_tokens("a" * 40) == 10
+    assert not counted.is_set()
@@ -0,0 +1,132 @@
+"""Tests for the cached business-context snapshot used by chat enrichment."""
+
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from openfatture.ai.context.enrichment import ContextManager
+from openfatture.ai.context.snapshot import (
+    BusinessSnapshot,
+    BusinessSnapshotCache,
+    load_business_snapshot,
+)
+from openfatture.ai.domain.context import ChatContext
+from openfatture.events import ClientUpdatedEvent, GlobalEventBus
+from openfatture.storage.database.models import Fattura, StatoFattura, TipoDocumento
+
+
+def _snapshot(label: str = "v1") -> BusinessSnapshot:
+    return BusinessSnapshot(
+        current_year_stats={"anno": 2025, "totale_fatture": 1},
+        recent_invoices_summary=f"fatture {label}",
+        recent_clients_summary=f"clienti {label}",
+    )
+
+
+def test_load_uses_aggregates(runtime_session, seed_cliente):
+    year = datetime.now().year
+    for numero, stato, totale in [
+        ("1", StatoFattura.BOZZA, "100.00"),
+        ("2", StatoFattura.INVIATA, "250.50"),
+        ("3", StatoFattura.INVIATA, "49.50"),
+    ]:
+        runtime_session.add(
+            Fattura(
+                numero=numero,
+                anno=year,
+                data_emissione=date(year, 1, int(numero)),
+                cliente_id=seed_cliente.id,
+                tipo_documento=TipoDocumento.TD01,
+                stato=stato,
+                totale=Decimal(totale),
+            )
+        )
+    runtime_session.commit()
+
+    snapshot = load_business_snapshot(limit=2)
+
+    stats = snapshot.current_year_stats
+    assert stats["totale_fatture"] == 3
+    assert stats["per_stato"]["inviata"] == 2
+    assert stats["per_stato"]["accettata"] == 0
+    assert stats["importo_totale"] == pytest.approx(400.0)
+    assert snapshot.recent_invoices_summary == (
+        f"Ultime 2 fatture:\n"
+        f"- 3/{year}: Acme Corporation - €49.50 (inviata)\n"
+        f"- 2/{year}: Acme Corporation - €250.50 (inviata)"
+    )
+    assert snapshot.recent_clients_summary == (
+        "Ultimi 1 clienti:\n- Acme Corporation (12345678901): 3 fatture"
+    )
+
+
+def test_load_on_empty_database(runtime_db):
+    snapshot = load_business_snapshot()
+
+    assert snapshot.current_year_stats["totale_fatture"] == 0
+    assert snapshot.recent_invoices_summary == "Nessuna fattura trovata"
+    assert snapshot.recent_clients_summary == "Nessun cliente trovato"
+
+
+class TestBusinessSnapshotCache:
+    """Caching, expiry and event-driven invalidation."""
+
+    def test_snapshot_is_shared_until_ttl(self):
+        loader = MagicMock(side_effect=[_snapshot("v1"), _snapshot("v2")])
+        cache = BusinessSnapshotCache(ttl_seconds=30, loader=loader)
+
+        assert cache.get().recent_invoices_summary == "fatture v1"
+        assert cache.get().recent_invoices_summary == "fatture v1"
+        with patch("time.monotonic", return_value=cache.get().computed_at + 31):
+            assert cache.get().recent_invoices_summary == "fatture v2"
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (2, 2)
+
+    def test_domain_events_invalidate(self):
+        loader = MagicMock(side_effect=[_snapshot("v1"), _snapshot("v2")])
+        cache = BusinessSnapshotCache(ttl_seconds=300, loader=loader)
+        bus = GlobalEventBus()
+        cache.subscribe(bus)
+        cache.get()
+
+        bus.publish(ClientUpdatedEvent(client_id=1, client_name="Acme", updated_fields=["pec"]))
+
+        assert cache.get().recent_clients_summary == "clienti v2"
+        assert cache.get_stats()["invalidations"] == 1
+
+    def test_invalidation_during_load_is_not_cached(self):
+        def racing_loader():
+            cache.invalidate()
+            return _snapshot("stale")
+
+        cache = BusinessSnapshotCache(ttl_seconds=300, loader=racing_loader)
+
+        assert cache.get().recent_invoices_summary == "fatture stale"
+        cache._loader = MagicMock(return_value=_snapshot("fresh"))
+        assert cache.get().recent_invoices_summary == "fatture fresh"
+
+
+@pytest.mark.asyncio
+async def test_enrich_context_hits_db_once_per_ttl():
+    loader = MagicMock(return_value=_snapshot())
+    manager = ContextManager(snapshot_cache=BusinessSnapshotCache(ttl_seconds=60, loader=loader))
+
+    first = await manager.enrich_context(ChatContext(user_input="ciao"))
+    second = await manager.enrich_context(ChatContext(user_input="fatture?"))
+
+    assert loader.call_count == 1
+    assert first.recent_invoices_summary == second.recent_invoices_summary == "fatture v1"
+    assert second.current_year_stats == {"anno": 2025, "totale_fatture": 1}
+
+
+@pytest.mark.asyncio
+async def test_enrich_context_degrades_when_db_missing():
+    loader = MagicMock(side_effect=RuntimeError("Database not initialized"))
+    manager = ContextManager(snapshot_cache=BusinessSnapshotCache(loader=loader))
+
+    context = await manager.enrich_context(ChatContext(user_input="ciao"))
+
+    assert context.recent_invoices_summary is None
@@ -0,0 +1,161 @@
+"""Concurrent execution of independent tool calls."""
+
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from openfatture.ai.domain.context import ChatContext
+from openfatture.ai.domain.response import AgentResponse, ResponseStatus, ToolCall
+from openfatture.ai.orchestration.native_tools import NativeToolOrchestrator
+from openfatture.ai.tools.models import Tool
+from openfatture.ai.tools.registry import ToolRegistry, execute_tool_calls, is_parallel_safe
+
+DELAY = 0.2
+
+
+@pytest.fixture
+def registry():
+    """Registry with slow sync reads, a write tool and a confirmation tool."""
+    events: list[str] = []
+    in_flight = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def slow_read(name: str):
+        def read(**kwargs):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            events.append(f"start:{name}")
+            time.sleep(DELAY)
+            events.append(f"end:{name}")
+            with lock:
+                in_flight["now"] -= 1
+            return {"tool": name, **kwargs}
+
+        return read
+
+    def write(**kwargs):
+        events.append("write")
+        return {"written": True}
+
+    registry = ToolRegistry()
+    for name in ["get_stats_a", "get_stats_b", "get_stats_c"]:
+        registry.register(Tool(name=name, description=name, func=slow_read(name), tags=["stats"]))
+    registry.register(Tool(name="save_note", description="w", func=write, tags=["write"]))
+    registry.register(
+        Tool(
+            name="confirm_me",
+            description="c",
+            func=slow_read("confirm_me"),
+            requires_confirmation=True,
+        )
+    )
+    registry.events = events
+    registry.in_flight = in_flight
+    return registry
+
+
+def test_parallel_safety_classification(registry):
+    assert is_parallel_safe(registry.get_tool("get_stats_a"))
+    assert not is_parallel_safe(registry.get_tool("save_note"))
+    assert not is_parallel_safe(registry.get_tool("confirm_me"))
+    assert not is_parallel_safe(None)
+    assert not is_parallel_safe(MagicMock())
+
+
+@pytest.mark.asyncio
+async def test_independent_reads_run_concurrently_in_order(registry):
+    calls = [("get_stats_a", {"x": 1}), ("get_stats_b", {}), ("get_stats_c", {})]
+
+    started = time.perf_counter()
+    results = await execute_tool_calls(registry, calls)
+    elapsed = time.perf_counter() - started
+
+    assert [r.data["tool"] for r in results] == ["get_stats_a", "get_stats_b", "get_stats_c"]
+    assert results[0].data["x"] == 1
+    assert registry.in_flight["max"] == 3
+    assert elapsed < DELAY * 2.5
+
+
+@pytest.mark.asyncio
+async def test_mutating_and_confirmation_tools_are_barriers(registry):
+    calls = [
+        ("get_stats_a", {}),
+        ("save_note", {}),
+        ("get_stats_b", {}),
+        ("confirm_me", {}),
+        ("get_stats_c", {}),
+    ]
+
+    results = await execute_tool_calls(registry, calls)
+
+    assert all(result.success for result in results)
+    assert registry.in_flight["max"] == 1
+    assert registry.events == [
+        "start:get_stats_a",
+        "end:get_stats_a",
+        "write",
+        "start:get_stats_b",
+        "end:get_stats_b",
+        "start:confirm_me",
+        "end:confirm_me",
+        "start:get_stats_c",
+        "end:get_stats_c",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_exceptions_stay_in_their_slot(registry):
+    async def execute_tool(tool_name, parameters, confirm=False):
+        if tool_name == "get_stats_b":
+            raise RuntimeError("registry down")
+        return await registry.execute_tool(tool_name, parameters, confirm)
+
+    flaky = MagicMock()
+    flaky.get_tool.side_effect = registry.get_tool
+    flaky.execute_tool = AsyncMock(side_effect=execute_tool)
+
+    results = await execute_tool_calls(flaky, [("get_stats_b", {}), ("get_stats_a", {})])
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1].success
+
+
+@pytest.mark.asyncio
+async def test_native_orchestrator_runs_turn_concurrently(registry):
+    provider = MagicMock()
+    provider.provider_name = "openai"
+    provider.model = "gpt-test"
+    provider.generate = AsyncMock(
+        side_effect=[
+            AgentResponse(
+                content="",
+                status=ResponseStatus.SUCCESS,
+                tool_calls=[
+                    ToolCall(id="1", name="get_stats_a", arguments={}),
+                    ToolCall(id="2", name="get_stats_b", arguments={}),
+                    ToolCall(id="3", name="get_stats_c", arguments={}),
+                ],
+            ),
+            AgentResponse(content="done", status=ResponseStatus.SUCCESS),
+        ]
+    )
+    orchestrator = NativeToolOrchestrator(provider, registry)
+    context = ChatContext(user_input="stats")
+
+    response = await orchestrator.execute(context, messages=[])
+
+    assert response.content == "done"
+    assert registry.in_flight["max"] == 3
+    tool_messages = provider.generate.await_args_list[1].kwargs["messages"][1:]
+    assert [m.tool_call_id for m in tool_messages] == ["1", "2", "3"]
+    assert [r["tool"] for r in context.tool_results] == [
+        "get_stats_a",
+        "get_stats_b",
+        "get_stats_c",
+    ]
+    assert orchestrator.get_metrics()["tool_calls_succeeded"] == 3
@@ -0,0 +1,166 @@
+"""Tests for memoized prompt prefixes, tool schemas and provider prompt caching."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from openfatture.ai.domain.context import ChatContext
+from openfatture.ai.domain.message import Message, Role
+from openfatture.ai.domain.prompt import SystemPrompt
+from openfatture.ai.domain.response import UsageMetrics
+from openfatture.ai.orchestration.react import ReActOrchestrator
+from openfatture.ai.providers.anthropic import AnthropicProvider
+from openfatture.ai.providers.openai import OpenAIProvider
+from openfatture.ai.runtime.prompt import build_chat_system_prompt
+from openfatture.ai.tools.models import Tool
+from openfatture.ai.tools.registry import ToolRegistry
+
+
+def _registry(*names: str) -> ToolRegistry:
+    registry = ToolRegistry()
+    for name in names:
+        registry.register(Tool(name=name, description=f"{name} tool", func=lambda: None))
+    return registry
+
+
+class TestToolSchemaMemoization:
+    def test_schemas_are_serialized_once_per_version(self):
+        registry = _registry("search_invoices", "get_client_details")
+
+        first = registry.get_anthropic_tools()
+        second = registry.get_anthropic_tools()
+
+        assert first == second
+        assert first is not second
+        assert all(a is b for a, b in zip(first, second, strict=True))
+        assert registry.get_openai_functions()[0]["function"]["name"] == "search_invoices"
+
+    def test_registry_changes_rebuild_schemas(self):
+        registry = _registry("search_invoices")
+        version = registry.version
+        registry.get_openai_functions()
+
+        registry.register(Tool(name="get_due_dates", description="d", func=lambda: None))
+        assert registry.version == version + 1
+        assert len(registry.get_openai_functions()) == 2
+
+        registry.get_tool("search_invoices").enabled = False
+        assert [t["name"] for t in registry.get_anthropic_tools()] == ["get_due_dates"]
+
+
+def test_chat_system_prompt_has_stable_prefix():
+    march = ChatContext(user_input="a", available_tools=["x", "y"])
+    march.current_year_stats = {"anno": 2025, "totale_fatture": 3, "importo_totale": 10}
+    april = ChatContext(user_input="b", available_tools=["x", "y"])
+    april.relevant_documents = ["Fattura 12/2025"]
+
+    first = build_chat_system_prompt(march)
+    second = build_chat_system_prompt(april)
+
+    assert isinstance(first, SystemPrompt)
+    assert first.cacheable_prefix is second.cacheable_prefix
+    assert "Hai accesso a 2 tools" in first.cacheable_prefix
+    assert first.startswith(first.cacheable_prefix)
+    assert "Fatture totali: 3" in first[len(first.cacheable_prefix) :]
+    assert build_chat_system_prompt(ChatContext(user_input="c")) == (
+        build_chat_system_prompt(ChatContext(user_input="c")).cacheable_prefix
+    )
+
+
+def test_react_prompt_prefix_memoized_per_registry_version():
+    registry = _registry("search_invoices")
+    orchestrator = ReActOrchestrator(provider=MagicMock(), tool_registry=registry)
+    context = ChatContext(user_input="a")
+    context.current_year_stats = {"anno": 2025}
+
+    first = orchestrator._build_react_system_prompt(context)
+    second = orchestrator._build_react_system_prompt(ChatContext(user_input="b"))
+    assert first.cacheable_prefix is second.cacheable_prefix
+    assert "CONTESTO SISTEMA" in first and "CONTESTO SISTEMA" not in second
+
+    registry.register(Tool(name="get_due_dates", description="d", func=lambda: None))
+    third = orchestrator._build_react_system_prompt(context)
+    assert "get_due_dates" in third.cacheable_prefix
+
+
+class TestAnthropicPromptCaching:
+    @pytest.fixture
+    def provider(self) -> AnthropicProvider:
+        provider = AnthropicProvider(api_key="test-key", model="claude-4.5-sonnet")
+        response = SimpleNamespace(
+            content=[SimpleNamespace(type="text", text="ok")],
+            usage=SimpleNamespace(
+                input_tokens=50,
+                output_tokens=20,
+                cache_read_input_tokens=1000,
+                cache_creation_input_tokens=0,
+            ),
+            stop_reason="end_turn",
+        )
+        provider.client = MagicMock()
+        provider.client.messages.create = AsyncMock(return_value=response)
+        return provider
+
+    @pytest.mark.asyncio
+    async def test_stable_prefix_is_marked_and_cached_usage_reported(self, provider):
+        tools = _registry("search_invoices").get_anthropic_tools()
+
+        response = await provider.generate(
+            messages=[Message(role=Role.USER, content="ciao")],
+            system_prompt=SystemPrompt("Istruzioni", "\nContesto del turno"),
+            tools=tools,
+        )
+
+        kwargs = provider.client.messages.create.await_args.kwargs
+        assert kwargs["system"] == [
+            {"type": "text", "text": "Istruzioni", "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": "\nContesto del turno"},
+        ]
+        assert kwargs["tools"] == tools
+        usage = response.usage
+        assert (usage.prompt_tokens, usage.cached_prompt_tokens) == (1050, 1000)
+        assert usage.total_tokens == 1070
+        uncached = UsageMetrics(prompt_tokens=1050, completion_tokens=20, total_tokens=1070)
+        assert usage.estimated_cost_usd < provider.estimate_cost(uncached)
+
+    @pytest.mark.asyncio
+    async def test_last_tool_marked_without_system_prompt(self, provider):
+        registry = _registry("search_invoices", "get_due_dates")
+        tools = registry.get_anthropic_tools()
+
+        await provider.generate(messages=[Message(role=Role.USER, content="ciao")], tools=tools)
+
+        sent = provider.client.messages.create.await_args.kwargs["tools"]
+        assert sent[-1]["cache_control"] == {"type": "ephemeral"}
+        # Shared registry schemas are not mutated
+        assert "cache_control" not in registry.get_anthropic_tools()[-1]
+
+    @pytest.mark.asyncio
+    async def test_caching_disabled_sends_plain_system(self, provider):
+        provider.enable_prompt_caching = False
+
+        await provider.generate(
+            messages=[Message(role=Role.USER, content="ciao")], system_prompt="Istruzioni"
+        )
+
+        assert provider.client.messages.create.await_args.kwargs["system"] == "Istruzioni"
+
+
+def test_openai_reports_cached_prompt_tokens():
+    # Skip __init__: loading the tiktoken encoding needs network access
+    provider = OpenAIProvider.__new__(OpenAIProvider)
+    provider.model = "gpt-4o"
+    usage = SimpleNamespace(
+        prompt_tokens=2000,
+        completion_tokens=100,
+        total_tokens=2100,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+    )
+
+    metrics = provider._build_usage_metrics(usage)
+
+    assert metrics.cached_prompt_tokens == 1536
+    assert metrics.estimated_cost_usd < provider.estimate_cost(
+        UsageMetrics(prompt_tokens=2000, completion_tokens=100, total_tokens=2100)
+    )
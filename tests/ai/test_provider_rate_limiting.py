@@ -0,0 +1,62 @@
+"""Tests for per-provider request rate limiting."""
+
+import time
+
+import pytest
+
+from openfatture.ai.config import AISettings
+from openfatture.ai.providers import factory
+from openfatture.ai.providers.factory import create_provider, get_provider_rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def clear_limiters(monkeypatch):
+    monkeypatch.setattr(factory, "_rate_limiters", {})
+
+
+def _settings(**overrides) -> AISettings:
+    return AISettings(provider="ollama", ollama_model="llama3.2", **overrides)
+
+
+def test_rate_limiting_disabled_by_default():
+    provider = create_provider(settings=_settings())
+
+    assert provider.rate_limiter is None
+
+
+def test_providers_share_one_limiter():
+    settings = _settings(requests_per_minute=120)
+
+    first = create_provider(settings=settings)
+    second = create_provider(settings=settings)
+
+    assert first.rate_limiter is not None
+    assert first.rate_limiter is second.rate_limiter
+    assert first.rate_limiter.limiter("ollama").rate == 2
+
+
+def test_shared_state_file(tmp_path):
+    settings = _settings(requests_per_minute=1, rate_limit_state_path=tmp_path / "limits.db")
+    limiter = get_provider_rate_limiter(settings)
+    assert limiter is not None
+
+    assert limiter.try_acquire("ollama") is True
+    # Another process (simulated by a fresh limiter on the same file) sees the quota used
+    factory._rate_limiters.clear()
+    other = get_provider_rate_limiter(settings)
+    assert other is not limiter
+    assert other is not None
+    assert other.try_acquire("ollama") is False
+
+
+@pytest.mark.asyncio
+async def test_throttle_waits_for_quota():
+    provider = create_provider(settings=_settings(requests_per_minute=600))
+    assert provider.rate_limiter is not None
+    provider.rate_limiter.configure("ollama", rate=20, burst=1)
+
+    start = time.monotonic()
+    for _ in range(3):
+        await provider._throttle()
+
+    assert time.monotonic() - start >= 0.09
@@ -446,3 +446,51 @@ def test_invoice_timeline_shows_all_events(test_client, test_db):
 
     finally:
         db.close()
+
+
+def test_invoice_commands_publish_update_status_and_delete_events(test_client, test_db):
+    """Every invoice write use-case publishes an event."""
+    from openfatture.billing.application.invoice_commands import (
+        create_invoice,
+        create_riga,
+        delete_invoice,
+        update_invoice,
+        update_invoice_status,
+    )
+    from openfatture.cli.lifespan import get_event_bus
+    from openfatture.events import (
+        InvoiceCreatedEvent,
+        InvoiceDeletedEvent,
+        InvoiceStatusChangedEvent,
+        InvoiceUpdatedEvent,
+    )
+
+    published = []
+    event_bus = get_event_bus()
+    assert event_bus is not None
+    for event_type in (
+        InvoiceCreatedEvent,
+        InvoiceUpdatedEvent,
+        InvoiceStatusChangedEvent,
+        InvoiceDeletedEvent,
+    ):
+        event_bus.subscribe(event_type, published.append)
+
+    invoice_id = create_invoice(test_client)["invoice_id"]
+    assert create_riga(invoice_id, "Consulenza", 1, 100.0)["success"]
+    assert update_invoice(invoice_id, note="Acconto")["success"]
+    assert update_invoice_status(invoice_id, "da_inviare")["success"]
+    assert update_invoice_status(invoice_id, "bozza")["success"]
+    assert delete_invoice(invoice_id, force=True)["success"]
+
+    assert [type(e).__name__ for e in published] == [
+        "InvoiceCreatedEvent",
+        "InvoiceUpdatedEvent",
+        "InvoiceUpdatedEvent",
+        "InvoiceStatusChangedEvent",
+        "InvoiceStatusChangedEvent",
+        "InvoiceDeletedEvent",
+    ]
+    assert all(e.invoice_id == invoice_id for e in published)
+    assert [e.updated_fields for e in published[1:3]] == [["righe"], ["note"]]
+    assert (published[3].old_status, published[3].new_status) == ("bozza", "da_inviare")
@@ -9,7 +9,6 @@ import pytest
 
 from openfatture.events.analytics import EventAnalytics
 from openfatture.events.repository import EventRepository
-from openfatture.storage.database.models import EventLog
 
 
 class TestEventAnalytics:
@@ -37,27 +36,9 @@ class TestEventAnalytics:
 
     def test_get_daily_activity(self, analytics: EventAnalytics, mock_repo: Mock) -> None:
         """Test daily activity aggregation."""
-        # Mock events
         now = datetime.now()
-        events = [
-            EventLog(
-                event_id="1",
-                event_type="TestEvent",
-                event_data='{"test": "data"}',
-                occurred_at=now - timedelta(days=1),
-                entity_type="invoice",
-                entity_id=1,
-            ),
-            EventLog(
-                event_id="2",
-                event_type="TestEvent",
-                event_data='{"test": "data2"}',
-                occurred_at=now - timedelta(days=1),
-                entity_type="invoice",
-                entity_id=2,
-            ),
-        ]
-        mock_repo.get_all.return_value = events
+        day = (now - timedelta(days=1)).strftime("%Y-%m-%d")
+        mock_repo.count_by_period.return_value = [(day, 2)]
 
         result = analytics.get_daily_activity(days=7)
 
@@ -68,17 +49,8 @@ class TestEventAnalytics:
     def test_get_weekly_activity(self, analytics: EventAnalytics, mock_repo: Mock) -> None:
         """Test weekly activity aggregation."""
         now = datetime.now()
-        events = [
-            EventLog(
-                event_id="1",
-                event_type="TestEvent",
-                event_data='{"test": "data"}',
-                occurred_at=now - timedelta(weeks=1),
-                entity_type=None,
-                entity_id=None,
-            ),
-        ]
-        mock_repo.get_all.return_value = events
+        week_ago = now - timedelta(weeks=1)
+        mock_repo.count_by_period.return_value = [(week_ago.strftime("%Y-%m-%d"), 1)]
 
         result = analytics.get_weekly_activity(weeks=4)
 
@@ -90,17 +62,8 @@ class TestEventAnalytics:
     def test_get_monthly_activity(self, analytics: EventAnalytics, mock_repo: Mock) -> None:
         """Test monthly activity aggregation."""
         now = datetime.now()
-        events = [
-            EventLog(
-                event_id="1",
-                event_type="TestEvent",
-                event_data='{"test": "data"}',
-                occurred_at=now - timedelta(days=30),
-                entity_type=None,
-                entity_id=None,
-            ),
-        ]
-        mock_repo.get_all.return_value = events
+        month_ago = now - timedelta(days=30)
+        mock_repo.count_by_period.return_value = [(month_ago.strftime("%Y-%m"), 1)]
 
         result = analytics.get_monthly_activity(months=3)
 
@@ -155,33 +118,7 @@ class TestEventAnalytics:
 
     def test_get_top_entities(self, analytics: EventAnalytics, mock_repo: Mock) -> None:
         """Test getting top entities by activity."""
-        events = [
-            EventLog(
-                event_id="1",
-                event_type="TestEvent",
-                event_data='{"test": "data"}',
-                occurred_at=datetime.now(),
-                entity_type="invoice",
-                entity_id=1,
-            ),
-            EventLog(
-                event_id="2",
-                event_type="TestEvent",
-                event_data='{"test": "data"}',
-                occurred_at=datetime.now(),
-                entity_type="invoice",
-                entity_id=1,
-            ),
-            EventLog(
-                event_id="3",
-                event_type="TestEvent",
-                event_data='{"test": "data"}',
-                occurred_at=datetime.now(),
-                entity_type="invoice",
-                entity_id=2,
-            ),
-        ]
-        mock_repo.get_all.return_value = events
+        mock_repo.count_by_entity.return_value = [(1, 2), (2, 1)]
 
         result = analytics.get_top_entities("invoice", limit=2)
 
@@ -246,34 +183,8 @@ class TestEventAnalytics:
 
     def test_get_hourly_distribution(self, analytics: EventAnalytics, mock_repo: Mock) -> None:
         """Test hourly distribution calculation."""
-        now = datetime.now()
-        events = [
-            EventLog(
-                event_id="1",
-                event_type="TestEvent",
-                event_data='{"test": "data"}',
-                occurred_at=now.replace(hour=9),
-                entity_type=None,
-                entity_id=None,
-            ),
-            EventLog(
-                event_id="2",
-                event_type="TestEvent",
-                event_data='{"test": "data"}',
-                occurred_at=now.replace(hour=9),
-                entity_type=None,
-                entity_id=None,
-            ),
-            EventLog(
-                event_id="3",
-                event_type="TestEvent",
-                event_data='{"test": "data"}',
-                occurred_at=now.replace(hour=15),
-                entity_type=None,
-                entity_id=None,
-            ),
-        ]
-        mock_repo.get_all.return_value = events
+        day = datetime.now().strftime("%Y-%m-%d")
+        mock_repo.count_by_period.return_value = [(f"{day} 09:00", 2), (f"{day} 15:00", 1)]
 
         result = analytics.get_hourly_distribution(days=1)
 
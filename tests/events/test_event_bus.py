@@ -301,3 +301,45 @@ def test_event_inheritance(event_bus):
 
     # Base handler should receive all events
     assert len(all_events_received) == 2
+
+
+def test_dispatch_cache_follows_subscriptions(event_bus):
+    """Test that cached handler lists are rebuilt after subscribe/unsubscribe."""
+    calls = []
+
+    def base_handler(event: BaseEvent):
+        calls.append("base")
+
+    def child_handler(event: ChildTestEvent):
+        calls.append("child")
+
+    event_bus.subscribe(BaseEvent, base_handler)
+    event_bus.publish(ChildTestEvent())
+    assert calls == ["base"]
+
+    event_bus.subscribe(ChildTestEvent, child_handler, priority=5)
+    event_bus.publish(ChildTestEvent())
+    event_bus.publish(TestEvent())
+    assert calls == ["base", "child", "base", "base"]
+
+    event_bus.unsubscribe(BaseEvent, base_handler)
+    event_bus.publish(ChildTestEvent())
+    assert calls[-1:] == ["child"] and len(calls) == 5
+
+
+def test_publish_many_groups_by_type(event_bus):
+    """Test batched publishing delivers every event, grouped by type."""
+    received = []
+
+    def handler(event: TestEvent):
+        received.append(event.message)
+
+    event_bus.subscribe(TestEvent, handler)
+    event_bus.publish_many(
+        [TestEvent(message="a"), ChildTestEvent(message="b"), TestEvent(message="c")]
+    )
+
+    assert received == ["a", "c", "b"]
+    assert event_bus.get_stats()["events_published"] == {"TestEvent": 2, "ChildTestEvent": 1}
+    event_bus.publish_many([])
+    assert event_bus.get_stats()["total_events"] == 3
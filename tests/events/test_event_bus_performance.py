@@ -0,0 +1,74 @@
+"""Microbenchmark of GlobalEventBus dispatch throughput.
+
+Compares the per-publish linear scan over every subscription (the previous
+resolution strategy) with the cached dispatch table and ``publish_many``.
+
+Run with: pytest tests/events/test_event_bus_performance.py -v -m performance -s
+"""
+
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from openfatture.events.base import BaseEvent, GlobalEventBus, _HandlerRegistration
+
+EVENTS = 5_000
+SUBSCRIBED_TYPES = 30
+
+
+@dataclass(frozen=True)
+class BenchEvent(BaseEvent):
+    value: int = 0
+
+
+class LinearScanEventBus(GlobalEventBus):
+    """Bus resolving handlers with an isinstance scan on every publish."""
+
+    def _get_handlers_for_event(self, event: BaseEvent) -> tuple[_HandlerRegistration, ...]:
+        handlers: list[_HandlerRegistration] = []
+        for event_type, registrations in self._handlers.items():
+            if isinstance(event, event_type):
+                handlers.extend(registrations)
+        handlers.sort(key=lambda r: r.priority, reverse=True)
+        return tuple(handlers)
+
+
+def _populated(bus: GlobalEventBus) -> GlobalEventBus:
+    # Unrelated subscriptions, like persistence, hooks, RAG and metrics listeners
+    for i in range(SUBSCRIBED_TYPES):
+        event_type = type(f"OtherEvent{i}", (BaseEvent,), {})
+        bus.subscribe(event_type, lambda event: None)
+    bus.subscribe(BaseEvent, lambda event: None, priority=-50)
+    bus.subscribe(BenchEvent, lambda event: None, priority=10)
+    return bus
+
+
+def _events_per_second(publish) -> float:
+    events = [BenchEvent(value=i) for i in range(EVENTS)]
+    start = time.perf_counter()
+    publish(events)
+    return EVENTS / (time.perf_counter() - start)
+
+
+@pytest.mark.performance
+def test_dispatch_throughput():
+    """Cached dispatch and publish_many beat the linear scan."""
+    linear = _populated(LinearScanEventBus())
+    cached = _populated(GlobalEventBus())
+
+    def publish_each(bus):
+        return lambda events: [bus.publish(event) for event in events]
+
+    before = _events_per_second(publish_each(linear))
+    after = _events_per_second(publish_each(cached))
+    batched = _events_per_second(cached.publish_many)
+
+    print(
+        f"\nlinear scan: {before:,.0f} ev/s | cached: {after:,.0f} ev/s | "
+        f"publish_many: {batched:,.0f} ev/s"
+    )
+    assert batched > before
+    assert [r.priority for r in cached._handlers_for_type(BenchEvent)] == [
+        r.priority for r in linear._get_handlers_for_event(BenchEvent())
+    ]
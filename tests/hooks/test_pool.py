@@ -0,0 +1,252 @@
+"""Tests for the hook worker pool and persistent hooks."""
+
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass
+from textwrap import dedent
+
+import pytest
+
+from openfatture.events.base import BaseEvent, GlobalEventBus
+from openfatture.hooks.executor import HookExecutionError, HookExecutor
+from openfatture.hooks.listeners import HookEventBridge
+from openfatture.hooks.models import HookConfig
+from openfatture.hooks.pool import HookWorkerPool
+from openfatture.hooks.registry import HookRegistry
+
+
+@dataclass(frozen=True)
+class InvoiceCreatedEvent(BaseEvent):
+    """Test event matching post-invoice-create hooks."""
+
+    invoice_number: str = "001/2025"
+
+
+@pytest.fixture
+def temp_hooks_dir(tmp_path):
+    hooks_dir = tmp_path / "hooks"
+    hooks_dir.mkdir()
+    return hooks_dir
+
+
+@pytest.fixture
+def executor(temp_hooks_dir):
+    return HookExecutor(hooks_dir=temp_hooks_dir)
+
+
+@pytest.fixture
+def pool(executor):
+    pool = HookWorkerPool(executor, max_workers=4, max_pending=8)
+    yield pool
+    pool.shutdown(wait=False)
+
+
+def _hook(hooks_dir, name: str, body: str, **options) -> HookConfig:
+    script_path = hooks_dir / name
+    script_path.write_text(dedent(body))
+    script_path.chmod(0o755)
+    return HookConfig(name=script_path.stem, script_path=script_path, **options)
+
+
+SLEEP_HOOK = """\
+    #!/bin/bash
+    sleep 0.5
+    echo "done ${OPENFATTURE_INVOICE_NUMBER}"
+    """
+
+PERSISTENT_HOOK = """\
+    #!/usr/bin/env python3
+    # PERSISTENT: true
+    import json, os, sys
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        number = request["data"]["invoice_number"]
+        if number == "crash":
+            sys.exit(3)
+        if number == "garbage":
+            print("not json", flush=True)
+            continue
+        reply = {"stdout": f"{os.getpid()} {request['event_type']} {number}"}
+        if number == "fail":
+            reply["exit_code"] = 2
+        print(json.dumps(reply), flush=True)
+    """
+
+
+def test_hooks_run_concurrently(temp_hooks_dir, pool):
+    hooks = [_hook(temp_hooks_dir, f"slow-{i}.sh", SLEEP_HOOK) for i in range(4)]
+
+    start = time.perf_counter()
+    results = pool.map(hooks, InvoiceCreatedEvent(invoice_number="042"))
+    elapsed = time.perf_counter() - start
+
+    assert [r.stdout for r in results] == ["done 042"] * 4
+    assert all(r.success for r in results)
+    # Sequential execution would take ~2s
+    assert elapsed < 1.5
+    assert pool.pending == 0
+
+
+def test_submit_blocks_when_pending_limit_reached(temp_hooks_dir, executor):
+    hook = _hook(temp_hooks_dir, "slow.sh", SLEEP_HOOK)
+    with HookWorkerPool(executor, max_workers=1, max_pending=1) as pool:
+        first = pool.submit(hook, InvoiceCreatedEvent())
+        submitted = threading.Event()
+
+        def submit_second() -> None:
+            pool.submit(hook, InvoiceCreatedEvent()).result()
+            submitted.set()
+
+        thread = threading.Thread(target=submit_second)
+        thread.start()
+        assert not submitted.wait(0.2)
+        assert not first.done()
+
+        thread.join(timeout=5)
+        assert first.result().success
+        assert submitted.is_set()
+
+
+def test_timeout_kills_hook(temp_hooks_dir, pool):
+    hook = _hook(temp_hooks_dir, "hang.sh", "#!/bin/bash\nsleep 30\n", timeout_seconds=1)
+
+    start = time.perf_counter()
+    result = pool.submit(hook, InvoiceCreatedEvent()).result()
+
+    assert result.timed_out
+    assert not result.success
+    assert time.perf_counter() - start < 5
+
+
+def test_fail_on_error_propagates_through_future(temp_hooks_dir, pool):
+    hook = _hook(temp_hooks_dir, "fail.sh", "#!/bin/bash\nexit 4\n", fail_on_error=True)
+
+    with pytest.raises(HookExecutionError) as exc_info:
+        pool.submit(hook, InvoiceCreatedEvent()).result()
+    assert exc_info.value.result.exit_code == 4
+
+
+def test_persistent_hook_reuses_process(temp_hooks_dir, pool):
+    hook = _hook(temp_hooks_dir, "indexer.py", PERSISTENT_HOOK, persistent=True)
+
+    results = [
+        pool.submit(hook, InvoiceCreatedEvent(invoice_number=str(n))).result() for n in range(3)
+    ]
+
+    pids = {r.stdout.split()[0] for r in results}
+    assert len(pids) == 1
+    assert [r.stdout.split(maxsplit=1)[1] for r in results] == [
+        f"InvoiceCreatedEvent {n}" for n in range(3)
+    ]
+
+    failed = pool.submit(hook, InvoiceCreatedEvent(invoice_number="fail")).result()
+    assert failed.exit_code == 2
+    assert not failed.success
+    assert failed.stdout.split()[0] in pids
+
+
+def test_persistent_hook_restarts_after_crash_or_bad_response(temp_hooks_dir, pool):
+    hook = _hook(temp_hooks_dir, "indexer.py", PERSISTENT_HOOK, persistent=True)
+    first_pid = pool.submit(hook, InvoiceCreatedEvent()).result().stdout.split()[0]
+
+    crashed = pool.submit(hook, InvoiceCreatedEvent(invoice_number="crash")).result()
+    assert not crashed.success
+    assert "exited with code 3" in (crashed.error or "")
+
+    garbage = pool.submit(hook, InvoiceCreatedEvent(invoice_number="garbage")).result()
+    assert garbage.exit_code == 1
+    assert "Invalid persistent hook response" in garbage.stderr
+
+    recovered = pool.submit(hook, InvoiceCreatedEvent()).result()
+    assert recovered.success
+    assert recovered.stdout.split()[0] != first_pid
+
+
+def test_persistent_hook_runs_once_without_pool(temp_hooks_dir, executor):
+    hook = _hook(temp_hooks_dir, "indexer.py", PERSISTENT_HOOK, persistent=True)
+
+    result = executor.execute_hook(hook, InvoiceCreatedEvent(invoice_number="7"))
+
+    assert result.success
+    assert result.stdout.endswith("InvoiceCreatedEvent 7")
+
+
+@pytest.mark.asyncio
+async def test_execute_hook_async_runs_concurrently(temp_hooks_dir, executor):
+    hooks = [_hook(temp_hooks_dir, f"slow-{i}.sh", SLEEP_HOOK) for i in range(3)]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(executor.execute_hook_async(h, InvoiceCreatedEvent()) for h in hooks)
+    )
+
+    assert all(r.success for r in results)
+    assert time.perf_counter() - start < 1.4
+
+
+@pytest.mark.asyncio
+async def test_pool_run_from_async_code(temp_hooks_dir, pool):
+    hooks = [_hook(temp_hooks_dir, f"slow-{i}.sh", SLEEP_HOOK) for i in range(2)]
+
+    results = await pool.run(hooks, InvoiceCreatedEvent(invoice_number="9"))
+
+    assert [r.stdout for r in results] == ["done 9", "done 9"]
+
+
+def test_bridge_dispatches_to_pool(temp_hooks_dir, executor):
+    output = temp_hooks_dir / "out.json"
+    _hook(
+        temp_hooks_dir,
+        "post-invoice-create.sh",
+        f"""\
+        #!/bin/bash
+        echo "$OPENFATTURE_EVENT_DATA" > {output}
+        """,
+    )
+    registry = HookRegistry(hooks_dir=temp_hooks_dir)
+    bridge = HookEventBridge(executor=executor, registry=registry, max_workers=2)
+    event_bus = GlobalEventBus()
+    bridge.register(event_bus)
+
+    event_bus.publish(InvoiceCreatedEvent(invoice_number="100"))
+    bridge.close()
+
+    assert json.loads(output.read_text())["invoice_number"] == "100"
+
+
+def test_bridge_waits_for_fail_on_error_hooks(temp_hooks_dir, executor):
+    _hook(
+        temp_hooks_dir,
+        "post-invoice-create.sh",
+        "#!/bin/bash\nexit 1\n",
+    )
+    registry = HookRegistry(hooks_dir=temp_hooks_dir)
+    registry.get_hook("post-invoice-create").fail_on_error = True
+    bridge = HookEventBridge(executor=executor, registry=registry, max_workers=2)
+    try:
+        with pytest.raises(HookExecutionError):
+            bridge.handle_event(InvoiceCreatedEvent())
+    finally:
+        bridge.close()
+
+
+def test_registry_memoizes_event_hooks(temp_hooks_dir):
+    _hook(temp_hooks_dir, "post-invoice-create.sh", "#!/bin/bash\n")
+    registry = HookRegistry(hooks_dir=temp_hooks_dir)
+
+    first = registry.get_hooks_for_event("InvoiceCreatedEvent")
+    assert [h.name for h in first] == ["post-invoice-create"]
+    assert registry.get_hooks_for_event("InvoiceCreatedEvent")[0] is first[0]
+
+    registry.disable_hook("post-invoice-create")
+    assert registry.get_hooks_for_event("InvoiceCreatedEvent") == []
+    registry.enable_hook("post-invoice-create")
+    assert len(registry.get_hooks_for_event("InvoiceCreatedEvent")) == 1
+
+    _hook(temp_hooks_dir, "on-invoice-create.sh", "#!/bin/bash\n")
+    assert len(registry.get_hooks_for_event("InvoiceCreatedEvent")) == 1
+    registry.reload()
+    assert len(registry.get_hooks_for_event("InvoiceCreatedEvent")) == 2
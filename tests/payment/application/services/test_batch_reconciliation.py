@@ -0,0 +1,167 @@
+"""Tests for single-transaction, conflict-free batch reconciliation."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
+from openfatture.payment.application.services.reconciliation_service import (
+    ReconciliationService,
+)
+from openfatture.payment.domain.enums import MatchType, TransactionStatus
+from openfatture.payment.domain.models import BankTransaction
+from openfatture.payment.domain.payment_allocation import PaymentAllocation
+from openfatture.payment.domain.value_objects import MatchResult, ReconciliationResult
+from openfatture.payment.infrastructure.repository import (
+    BankTransactionRepository,
+    PaymentRepository,
+)
+from openfatture.storage.database.models import Pagamento, StatoPagamento
+
+
+@pytest.fixture
+def payments(db_session, sample_fattura) -> list[Pagamento]:
+    payments = [
+        Pagamento(
+            fattura_id=sample_fattura.id,
+            importo=Decimal(importo),
+            data_scadenza=date.today() + timedelta(days=30),
+        )
+        for importo in ("1000.00", "1000.00")
+    ]
+    db_session.add_all(payments)
+    db_session.commit()
+    return payments
+
+
+@pytest.fixture
+def transactions(db_session, bank_account) -> list[BankTransaction]:
+    transactions = [
+        BankTransaction(
+            id=uuid4(),
+            account_id=bank_account.id,
+            date=date.today() - timedelta(days=days),
+            amount=Decimal("1000.00"),
+            description=f"Bonifico {days}",
+        )
+        for days in (2, 1)
+    ]
+    db_session.add_all(transactions)
+    db_session.commit()
+    return transactions
+
+
+def _match(tx: BankTransaction, payment: Pagamento, confidence: float) -> MatchResult:
+    return MatchResult(
+        transaction=tx,
+        payment=payment,
+        confidence=confidence,
+        match_type=MatchType.EXACT,
+        match_reason="test",
+    )
+
+
+def _service(db_session, mocker, matches, event_bus=None) -> ReconciliationService:
+    matching_service = mocker.Mock()
+    matching_service.match_batch = mocker.AsyncMock(
+        return_value=ReconciliationResult(
+            matched_count=len(matches),
+            review_count=0,
+            unmatched_count=0,
+            total_count=len(matches),
+            matches=matches,
+        )
+    )
+    return ReconciliationService(
+        tx_repo=BankTransactionRepository(db_session),
+        payment_repo=PaymentRepository(db_session),
+        matching_service=matching_service,
+        session=db_session,
+        event_bus=event_bus,
+    )
+
+
+@pytest.mark.asyncio
+async def test_conflicting_matches_fall_back_to_next_candidate(
+    db_session, mocker, payments, transactions
+):
+    first, second = payments
+    early, late = transactions
+    # Both transactions prefer the first payment; the stronger claim wins it
+    matches = [
+        (early, [_match(early, first, 0.90), _match(early, second, 0.88)]),
+        (late, [_match(late, first, 0.95)]),
+    ]
+    event_bus = mocker.Mock()
+    commit = mocker.spy(db_session, "commit")
+    service = _service(db_session, mocker, matches, event_bus)
+
+    result = await service.reconcile_batch(account_id=1, single_transaction=True)
+
+    assert commit.call_count == 1
+    assert (late.matched_payment_id, early.matched_payment_id) == (first.id, second.id)
+    assert early.status == late.status == TransactionStatus.MATCHED
+    assert first.stato == second.stato == StatoPagamento.PAGATO
+    assert early.raw_data["reconciliation"]["payment_id"] == second.id
+    allocations = db_session.scalars(select(PaymentAllocation)).all()
+    assert sorted(a.payment_id for a in allocations) == sorted([first.id, second.id])
+    assert result.matched_count == 2
+    assert result.total_amount_matched == Decimal("2000.00")
+    assert event_bus.publish.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_transactions_without_capacity_are_deferred_to_review(
+    db_session, mocker, payments, transactions
+):
+    first, _ = payments
+    early, late = transactions
+    matches = [
+        (early, [_match(early, first, 0.90)]),
+        (late, [_match(late, first, 0.92)]),
+    ]
+    service = _service(db_session, mocker, matches)
+
+    result = await service.reconcile_batch(account_id=1, single_transaction=True)
+
+    assert late.status == TransactionStatus.MATCHED
+    assert early.status == TransactionStatus.UNMATCHED
+    assert (result.matched_count, result.review_count) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_rolls_back_without_events(db_session, mocker, payments, transactions):
+    first, second = payments
+    early, late = transactions
+    matches = [
+        (early, [_match(early, first, 0.90)]),
+        (late, [_match(late, second, 0.90)]),
+    ]
+    event_bus = mocker.Mock()
+    service = _service(db_session, mocker, matches, event_bus)
+    mocker.patch.object(service.payment_repo, "add_allocations", side_effect=RuntimeError("disk"))
+
+    with pytest.raises(RuntimeError, match="Batch reconciliation failed"):
+        await service.reconcile_batch(account_id=1, single_transaction=True)
+
+    db_session.refresh(first)
+    db_session.refresh(early)
+    assert first.importo_pagato == Decimal("0.00")
+    assert early.status == TransactionStatus.UNMATCHED
+    event_bus.publish.assert_not_called()
+
+
+def test_plan_splits_partial_payments_across_capacity(db_session, mocker, payments, transactions):
+    first, _ = payments
+    first.importo_pagato = Decimal("600.00")
+    early, late = transactions
+    service = _service(db_session, mocker, [])
+
+    plan = service.plan_batch(
+        [(early, [_match(early, first, 0.9)]), (late, [_match(late, first, 0.8)])],
+        min_confidence=0.85,
+    )
+
+    assert [(p.transaction, p.amount) for p in plan] == [(early, Decimal("400.00"))]
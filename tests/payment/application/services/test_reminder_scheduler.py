@@ -107,6 +107,7 @@ class TestReminderScheduler:
         """Mock INotifier."""
         notifier = mocker.Mock()
         notifier.send_reminder = AsyncMock(return_value=True)
+        notifier.flush = AsyncMock()
         return notifier
 
     @pytest.fixture
@@ -318,6 +319,8 @@ class TestReminderScheduler:
         # Verify notifications sent
         assert count == 2
         assert mock_notifier.send_reminder.call_count == 2
+        # Queued reminders are delivered at the end of the run
+        mock_notifier.flush.assert_awaited_once()
 
         # Verify reminders marked as sent
         assert reminder1.mark_sent.called
@@ -0,0 +1,139 @@
+"""Tests for the materialized payment due-date index."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from openfatture.payment.application.services.payment_overview import collect_payment_aging
+from openfatture.payment.domain.enums import AgingBucket, MatchType
+from openfatture.payment.domain.models import BankTransaction
+from openfatture.payment.domain.payment_allocation import PaymentAllocation
+from openfatture.payment.infrastructure.due_index import rebuild_payment_due_index
+from openfatture.payment.infrastructure.repository import PaymentRepository
+from openfatture.storage.database.base import Base
+from openfatture.storage.database.models import Pagamento, PaymentDue, StatoPagamento
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def payments(db_session, sample_fattura) -> dict[int, Pagamento]:
+    payments = {
+        days: Pagamento(
+            fattura_id=sample_fattura.id,
+            importo=Decimal("100.00"),
+            data_scadenza=TODAY - timedelta(days=days),
+        )
+        for days in (-10, 0, 1, 45, 120)
+    }
+    db_session.add_all(payments.values())
+    db_session.commit()
+    return payments
+
+
+def _index(session: Session) -> dict[int, PaymentDue]:
+    session.expire_all()
+    return {row.payment_id: row for row in session.scalars(select(PaymentDue))}
+
+
+def test_index_follows_payment_changes(db_session, payments):
+    index = _index(db_session)
+    assert len(index) == 5
+    assert index[payments[45].id].aging_bucket == AgingBucket.DAYS_31_60
+    assert index[payments[0].id].aging_bucket == AgingBucket.CURRENT
+
+    payments[1].apply_payment(Decimal("40.00"))
+    payments[120].apply_payment(Decimal("100.00"))
+    db_session.delete(payments[-10])
+    db_session.commit()
+
+    index = _index(db_session)
+    assert payments[120].id not in index
+    assert len(index) == 3
+    partial = index[payments[1].id]
+    assert (partial.residuo, partial.stato) == (Decimal("60.00"), StatoPagamento.PAGATO_PARZIALE)
+
+
+def test_allocation_rows_refresh_their_payment(db_session, payments, bank_account):
+    payment = payments[0]
+    tx = BankTransaction(
+        id=uuid4(),
+        account_id=bank_account.id,
+        date=TODAY,
+        amount=Decimal("25.00"),
+        description="Bonifico",
+    )
+    db_session.add(tx)
+    db_session.commit()
+
+    # Bulk-style update of the payment row: only the allocation is flushed by the ORM
+    db_session.execute(
+        Pagamento.__table__.update()
+        .where(Pagamento.__table__.c.id == payment.id)
+        .values(importo_pagato=Decimal("25.00"))
+    )
+    db_session.add(
+        PaymentAllocation(
+            payment_id=payment.id,
+            transaction_id=tx.id,
+            amount=Decimal("25.00"),
+            match_type=MatchType.MANUAL,
+        )
+    )
+    db_session.commit()
+
+    assert _index(db_session)[payment.id].residuo == Decimal("75.00")
+
+
+def test_mark_overdue_is_set_based(db_session, payments):
+    repo = PaymentRepository(db_session)
+    payments[45].apply_payment(Decimal("10.00"))
+    db_session.commit()
+
+    marked = repo.mark_overdue(TODAY + timedelta(days=5))
+    db_session.commit()
+
+    assert marked == 4
+    assert payments[-10].stato == StatoPagamento.DA_PAGARE
+    assert payments[45].stato == StatoPagamento.SCADUTO
+    index = _index(db_session)
+    assert index[payments[0].id].stato == StatoPagamento.SCADUTO
+    assert index[payments[0].id].aging_bucket == AgingBucket.DAYS_1_30
+    assert index[payments[1].id].aging_as_of == TODAY + timedelta(days=5)
+    assert repo.mark_overdue(TODAY + timedelta(days=5)) == 0
+
+
+def test_aging_summary_reads_index(db_session, payments):
+    totals = {t.bucket: (t.count, t.residual) for t in collect_payment_aging(db_session)}
+
+    assert totals == {
+        AgingBucket.CURRENT: (2, Decimal("200.00")),
+        AgingBucket.DAYS_1_30: (1, Decimal("100.00")),
+        AgingBucket.DAYS_31_60: (1, Decimal("100.00")),
+        AgingBucket.DAYS_61_90: (0, Decimal("0.00")),
+        AgingBucket.OVER_90: (1, Decimal("100.00")),
+    }
+
+
+def test_index_is_backfilled_when_created(db_session, payments):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(
+        engine, tables=[t for t in Base.metadata.sorted_tables if t.name != "payment_due_index"]
+    )
+    with engine.begin() as conn:
+        for table in ("clienti", "fatture", "pagamenti"):
+            rows = [
+                dict(r._mapping) for r in db_session.execute(Base.metadata.tables[table].select())
+            ]
+            conn.execute(Base.metadata.tables[table].insert(), rows)
+
+    Base.metadata.create_all(engine)
+
+    with engine.connect() as conn:
+        assert len(conn.execute(select(PaymentDue.payment_id)).all()) == 5
+        assert rebuild_payment_due_index(conn) == 5
+    engine.dispose()
@@ -0,0 +1,216 @@
+"""Tests for parallel batch PDF generation."""
+
+import os
+import re
+import time
+import zipfile
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from openfatture.pdf import BatchPDFGenerator, PDFGenerator, PDFGeneratorConfig
+from openfatture.pdf.components import header, qrcode
+
+
+def _cliente() -> SimpleNamespace:
+    return SimpleNamespace(
+        denominazione="ACME S.r.l.",
+        partita_iva="12345678901",
+        codice_fiscale=None,
+        indirizzo="Via Roma",
+        numero_civico="1",
+        cap="00100",
+        comune="Roma",
+        provincia="RM",
+    )
+
+
+def _riga() -> SimpleNamespace:
+    return SimpleNamespace(
+        descrizione="Consulenza",
+        quantita=Decimal("2"),
+        prezzo_unitario=Decimal("100.00"),
+        unita_misura="ore",
+        aliquota_iva=Decimal("22"),
+        imponibile=Decimal("200.00"),
+        iva=Decimal("44.00"),
+        totale=Decimal("244.00"),
+    )
+
+
+def _fattura(numero: int) -> SimpleNamespace:
+    pagamento = SimpleNamespace(
+        modalita="MP05",
+        data_scadenza=date(2025, 11, 30),
+        iban="IT60X0542811101000000123456",
+        bic_swift=None,
+        importo=Decimal("244.00"),
+    )
+    return SimpleNamespace(
+        id=numero,
+        numero=str(numero),
+        anno=2025,
+        data_emissione=date(2025, 10, 31),
+        tipo_documento=SimpleNamespace(value="TD01"),
+        stato=SimpleNamespace(value="da_inviare"),
+        imponibile=Decimal("200.00"),
+        iva=Decimal("44.00"),
+        totale=Decimal("244.00"),
+        ritenuta_acconto=None,
+        aliquota_ritenuta=None,
+        importo_bollo=None,
+        note=None,
+        cliente=_cliente(),
+        righe=[_riga()],
+        pagamenti=[pagamento],
+    )
+
+
+def _preventivo(numero: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=numero,
+        numero=str(numero),
+        anno=2025,
+        data_emissione=date(2025, 10, 1),
+        data_scadenza=date(2025, 10, 31),
+        validita_giorni=30,
+        imponibile=Decimal("200.00"),
+        iva=Decimal("44.00"),
+        totale=Decimal("244.00"),
+        stato=SimpleNamespace(value="bozza"),
+        note=None,
+        condizioni="Pagamento a 30 giorni",
+        cliente=_cliente(),
+        righe=[_riga()],
+    )
+
+
+def _page_count(pdf: bytes) -> int:
+    return len(re.findall(rb"/Type /Page\b(?!s)", pdf))
+
+
+def test_generates_invoices_and_bundle_in_worker_processes(tmp_path):
+    config = PDFGeneratorConfig(company_name="Studio Rossi", enable_qr_code=True)
+    generator = BatchPDFGenerator(config, max_workers=2)
+    progress: list[tuple[int, int]] = []
+
+    result = generator.generate(
+        [_fattura(n) for n in range(1, 6)],
+        tmp_path / "pdf",
+        bundle_path=tmp_path / "archivio.zip",
+        progress_callback=lambda done, total: progress.append((done, total)),
+    )
+
+    assert result.errors == []
+    assert result.succeeded == 5
+    assert [p.name for p in result.paths] == [f"fattura_{n}_2025.pdf" for n in range(1, 6)]
+    assert all(p.stat().st_size > 0 for p in result.paths)
+    assert progress[-1] == (5, 5)
+
+    assert result.bundle_path == tmp_path / "archivio.zip"
+    with zipfile.ZipFile(result.bundle_path) as bundle:
+        assert bundle.namelist() == [p.name for p in result.paths]
+        third = bundle.read("fattura_3_2025.pdf")
+    assert third == result.paths[2].read_bytes()
+    assert _page_count(third) == 1
+    assert b"Fattura 3/2025" in third
+
+
+def test_generates_preventivi_in_process(tmp_path):
+    generator = BatchPDFGenerator(max_workers=1)
+
+    result = generator.generate_preventivi(
+        [_preventivo(n) for n in range(1, 4)], tmp_path, bundle_path=tmp_path / "all.zip"
+    )
+
+    assert [p.name for p in result.paths] == [f"preventivo_{n}_2025.pdf" for n in range(1, 4)]
+    assert result.bundle_path is not None
+    with zipfile.ZipFile(result.bundle_path) as bundle:
+        assert bundle.namelist() == [p.name for p in result.paths]
+
+
+def test_failed_documents_are_reported(tmp_path):
+    # A directory in place of the output file makes that document fail
+    (tmp_path / "fattura_2_2025.pdf").mkdir()
+    generator = BatchPDFGenerator(max_workers=1)
+
+    result = generator.generate(
+        [_fattura(n) for n in range(1, 4)], tmp_path, bundle_path=tmp_path / "archivio.zip"
+    )
+
+    assert result.total == 3
+    assert result.failed == 1
+    assert [p.name for p in result.paths] == ["fattura_1_2025.pdf", "fattura_3_2025.pdf"]
+    assert result.errors[0].startswith("fattura_2_2025.pdf:")
+    # The bundle holds the documents that were generated
+    assert result.bundle_path is not None
+    with zipfile.ZipFile(result.bundle_path) as bundle:
+        assert bundle.namelist() == ["fattura_1_2025.pdf", "fattura_3_2025.pdf"]
+
+
+def test_empty_batch_and_invalid_arguments(tmp_path):
+    assert BatchPDFGenerator(max_workers=1).generate([], tmp_path).total == 0
+    with pytest.raises(ValueError):
+        BatchPDFGenerator(max_workers=0)
+    with pytest.raises(ValueError, match="Invalid template"):
+        BatchPDFGenerator(PDFGeneratorConfig(template="unknown"))
+
+
+def test_qr_codes_are_memoized_by_payload(tmp_path):
+    generator = PDFGenerator(PDFGeneratorConfig(enable_qr_code=True))
+    fattura = _fattura(7)
+    qrcode._qr_modules.cache_clear()
+
+    first = generator.generate(fattura, str(tmp_path / "a.pdf"))
+    second = generator.generate(fattura, str(tmp_path / "b.pdf"))
+
+    info = qrcode._qr_modules.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+    assert first.stat().st_size == second.stat().st_size
+
+
+def test_logo_is_decoded_once_per_file_version(tmp_path):
+    logo_path = tmp_path / "logo.png"
+    Image.new("RGB", (60, 40), "navy").save(logo_path)
+
+    first = header.load_logo(str(logo_path))
+    assert first is not None
+    assert header.load_logo(str(logo_path)) is first
+
+    # Replaced logo: decoded again
+    Image.new("RGB", (30, 30), "red").save(logo_path)
+    stat = logo_path.stat()
+    os.utime(logo_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    replaced = header.load_logo(str(logo_path))
+    assert replaced is not None and replaced is not first
+    assert replaced.getSize() == (30, 30)
+
+    assert header.load_logo(str(tmp_path / "missing.png")) is None
+
+
+@pytest.mark.performance
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs at least 2 CPUs")
+def test_batch_scales_with_cores(tmp_path):
+    """Run with: pytest tests/pdf/test_batch_pdf_generator.py -m performance -s"""
+    fatture = [_fattura(n) for n in range(1, 201)]
+    config = PDFGeneratorConfig(enable_qr_code=True)
+
+    start = time.perf_counter()
+    single = PDFGenerator(config)
+    for fattura in fatture:
+        single.generate(fattura, str(tmp_path / f"single_{fattura.numero}.pdf"))
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = BatchPDFGenerator(config).generate(fatture, tmp_path / "batch")
+    parallel = time.perf_counter() - start
+
+    print(
+        f"\n200 invoices: sequential {sequential:.2f}s, "
+        f"batch on {os.cpu_count()} CPUs {parallel:.2f}s"
+    )
+    assert result.succeeded == 200
+    assert parallel < sequential
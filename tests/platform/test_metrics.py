@@ -0,0 +1,193 @@
+"""Tests for the metrics engine: ring buffers, quantile sketches, labels and export."""
+
+import asyncio
+import random
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+
+import pytest
+
+from openfatture.platform import metrics
+from openfatture.platform.metrics import (
+    MetricPoint,
+    MetricsCollector,
+    MetricSeries,
+    MetricsServer,
+    QuantileSketch,
+    timed,
+)
+
+
+@pytest.fixture
+def collector(monkeypatch) -> MetricsCollector:
+    collector = MetricsCollector(max_points=100)
+    monkeypatch.setattr(metrics, "_metrics_collector", collector)
+    return collector
+
+
+def _exact_quantile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class TestQuantileSketch:
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(42)
+        values = [rng.lognormvariate(3, 1.2) for _ in range(20_000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.5, 0.9, 0.95, 0.99, 0.999):
+            exact = _exact_quantile(values, q)
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+        assert sketch.count == len(values)
+        assert sketch.mean == pytest.approx(sum(values) / len(values))
+        assert sketch.quantile(0) == pytest.approx(min(values), rel=0.02)
+        assert sketch.quantile(1) == pytest.approx(max(values), rel=0.02)
+
+    def test_memory_is_bounded(self):
+        sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=64)
+        for exponent in range(-6, 12):
+            for _ in range(100):
+                sketch.add(10.0**exponent)
+
+        assert len(sketch._buckets) <= 64
+        assert sketch.quantile(0.99) == pytest.approx(1e11, rel=0.02)
+
+    def test_zero_values_and_merge(self):
+        first, second = QuantileSketch(), QuantileSketch()
+        for _ in range(50):
+            first.add(0.0)
+            second.add(100.0)
+
+        first.merge(second)
+
+        assert first.count == 100
+        assert first.quantile(0.25) == 0.0
+        assert first.quantile(0.75) == pytest.approx(100.0, rel=0.01)
+        with pytest.raises(ValueError):
+            first.merge(QuantileSketch(relative_accuracy=0.05))
+        with pytest.raises(ValueError):
+            first.quantile(1.5)
+
+    def test_empty_sketch(self):
+        summary = QuantileSketch().summary()
+        assert summary == {
+            "count": 0,
+            "sum": 0.0,
+            "avg": 0.0,
+            "min": 0.0,
+            "max": 0.0,
+            "p50": 0.0,
+            "p95": 0.0,
+            "p99": 0.0,
+        }
+
+
+class TestMetricSeries:
+    def test_ring_buffer_keeps_latest_points(self):
+        series = MetricSeries("latency", max_points=10)
+        for value in range(25):
+            series.add_point(float(value))
+
+        assert len(series.points) == 10
+        assert series.get_stats()["min"] == 15
+        assert series.get_stats()["latest"] == 24
+
+    def test_expired_points_are_dropped(self):
+        old = MetricPoint(name="latency", value=1.0, timestamp=datetime.now() - timedelta(days=2))
+        series = MetricSeries("latency", points=[old], retention_hours=24)
+
+        series.add_point(5.0)
+
+        assert [p.value for p in series.points] == [5.0]
+        assert series.get_stats(hours=1)["count"] == 1
+
+
+class TestMetricsCollector:
+    def test_labeled_counters(self, collector):
+        collector.increment_counter("tool_calls", tags={"tool": "search"})
+        collector.increment_counter("tool_calls", 2, tags={"tool": "search"})
+        collector.increment_counter("tool_calls", tags={"tool": "create"})
+
+        assert collector.get_counter("tool_calls", {"tool": "search"}) == 3
+        assert collector.get_counter("tool_calls") == 4
+        assert collector.get_all_metrics()["counters"] == {"tool_calls": 4}
+
+    def test_timings_expose_percentiles(self, collector):
+        for ms in range(1, 101):
+            collector.record_timing("xml_build", float(ms), {"profile": "TD01"})
+        collector.record_timing("xml_build", 1000.0, {"profile": "TD04"})
+
+        td01 = collector.get_percentiles("xml_build_duration_ms", {"profile": "TD01"})
+        assert td01["count"] == 100
+        assert td01["p50"] == pytest.approx(50, rel=0.03)
+        assert td01["p99"] == pytest.approx(99, rel=0.03)
+        assert collector.get_percentiles("xml_build_duration_ms")["max"] == 1000.0
+
+        stats = collector.get_metric_stats("xml_build_duration_ms")
+        assert stats["count"] == 100  # ring buffer of 100 points
+        assert stats["p99"] == pytest.approx(99, rel=0.03)
+
+    def test_export_prometheus(self, collector):
+        collector.increment_counter("ai_requests", tags={"provider": "openai", "model": 'gpt"x'})
+        collector.record_timing("tool_execution", 12.5, {"tool": "search"})
+        collector.set_gauge("queue-depth", 3)
+        collector.record_metric("payment_matches_found", 7)
+
+        text = collector.export_prometheus()
+
+        assert "# TYPE ai_requests counter" in text
+        assert 'ai_requests_total{model="gpt\\"x",provider="openai"} 1' in text
+        assert "# TYPE tool_execution_duration_ms summary" in text
+        assert 'tool_execution_duration_ms{tool="search",quantile="0.99"} 12.5' in text
+        assert 'tool_execution_duration_ms_count{tool="search"} 1' in text
+        assert "queue_depth 3" in text
+        assert "payment_matches_found 7" in text
+        # Timings are exported once, as a summary
+        assert text.count("# TYPE tool_execution_duration_ms ") == 1
+
+    def test_timed_decorator(self, collector):
+        @timed("sync_op")
+        def sync_op(x: int) -> int:
+            return x * 2
+
+        @timed("async_op", {"kind": "test"})
+        async def async_op() -> str:
+            return "ok"
+
+        @timed("failing_op")
+        def failing_op() -> None:
+            raise RuntimeError("boom")
+
+        assert sync_op(2) == 4
+        assert asyncio.run(async_op()) == "ok"
+        with pytest.raises(RuntimeError):
+            failing_op()
+
+        assert collector.get_percentiles("sync_op_duration_ms")["count"] == 1
+        assert collector.get_percentiles("async_op_duration_ms", {"kind": "test"})["count"] == 1
+        assert collector.get_counter("errors_operation_failed") == 1
+
+
+class TestMetricsServer:
+    def test_serves_metrics_on_localhost(self, collector):
+        collector.increment_counter("invoices_built")
+
+        with MetricsServer(collector, port=0) as server:
+            host, port = server.address
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"http://{host}:{port}/other", timeout=5)
+
+        assert "invoices_built_total 1" in body
+        assert content_type.startswith("text/plain; version=0.0.4")
+
+    @pytest.mark.parametrize("host", ["0.0.0.0", "192.168.1.10", "example.com"])
+    def test_rejects_non_loopback_hosts(self, host):
+        with pytest.raises(ValueError, match="loopback"):
+            MetricsServer(MetricsCollector(), host=host)
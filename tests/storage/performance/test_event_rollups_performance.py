@@ -0,0 +1,100 @@
+"""Performance comparison of the event rollups against Python-side grouping.
+
+Benchmarks for:
+- Daily activity over 90 days (load every event vs ``GROUP BY`` on rollups)
+- Event statistics by type and entity type
+
+Run with: pytest tests/storage/performance/test_event_rollups_performance.py -v -m performance
+"""
+
+import random
+from collections import defaultdict
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from openfatture.events.repository import EventRepository
+from openfatture.storage.database.models import EventLog
+from openfatture.storage.event_rollups import rebuild_event_rollups
+from tests.performance.utils import assert_performance_target, measure_sync_function
+
+EVENT_TYPES = ["InvoiceCreatedEvent", "InvoiceSentEvent", "ClientCreatedEvent", "AICommandEvent"]
+ENTITY_TYPES = ["invoice", "invoice", "client", None]
+
+
+@pytest.fixture
+def perf_db_with_events(perf_db_session):
+    """Database with 20,000 events spread over 90 days."""
+    rng = random.Random(42)
+    now = datetime.now(UTC)
+    rows = []
+    for _ in range(20_000):
+        kind = rng.randrange(len(EVENT_TYPES))
+        occurred_at = now - timedelta(seconds=rng.randrange(90 * 24 * 3600))
+        rows.append(
+            {
+                "event_id": str(uuid4()),
+                "event_type": EVENT_TYPES[kind],
+                "event_data": f'{{"invoice_number": "{rng.randrange(1000)}/2025"}}',
+                "occurred_at": occurred_at,
+                "published_at": occurred_at,
+                "entity_type": ENTITY_TYPES[kind],
+                "entity_id": rng.randrange(500) if ENTITY_TYPES[kind] else None,
+                "created_at": occurred_at,
+                "updated_at": occurred_at,
+            }
+        )
+    perf_db_session.execute(EventLog.__table__.insert(), rows)
+    rebuild_event_rollups(perf_db_session.connection())
+    perf_db_session.commit()
+    return perf_db_session
+
+
+def _legacy_daily_activity(session, start_date: datetime) -> list[tuple[str, int]]:
+    events = session.query(EventLog).filter(EventLog.occurred_at >= start_date).all()
+    counts: dict[str, int] = defaultdict(int)
+    for event in events:
+        counts[event.occurred_at.strftime("%Y-%m-%d")] += 1
+    return sorted(counts.items())
+
+
+@pytest.mark.performance
+class TestEventRollupPerformance:
+    """Compare SQL-side event counting with loading the events."""
+
+    def test_daily_activity_vs_python_grouping(self, perf_db_with_events):
+        """Daily activity from the rollups beats grouping loaded events (target: <50ms)."""
+        session = perf_db_with_events
+        repo = EventRepository(session)
+        start_date = (datetime.now(UTC) - timedelta(days=90)).replace(tzinfo=None)
+
+        def legacy():
+            session.expire_all()
+            return _legacy_daily_activity(session, start_date)
+
+        def rollups():
+            return repo.count_by_period("day", start_date=start_date)
+
+        legacy_metrics = measure_sync_function(legacy, iterations=5, warmup=1)
+        rollup_metrics = measure_sync_function(rollups, iterations=30, warmup=5)
+
+        legacy_metrics.print_summary()
+        rollup_metrics.print_summary()
+        assert rollups() == legacy()
+        assert rollup_metrics.median_latency_ms < legacy_metrics.median_latency_ms
+        assert_performance_target(rollup_metrics, target_ms=50.0, percentile="median")
+
+    def test_stats_by_type_and_entity(self, perf_db_with_events):
+        """Event statistics over 30 days (target: <50ms)."""
+        repo = EventRepository(perf_db_with_events)
+        start_date = datetime.now(UTC) - timedelta(days=30)
+
+        metrics = measure_sync_function(
+            lambda: repo.get_stats(start_date=start_date), iterations=30, warmup=5
+        )
+
+        metrics.print_summary()
+        stats = repo.get_stats(start_date=start_date)
+        assert stats["total_events"] == sum(stats["events_by_type"].values())
+        assert_performance_target(metrics, target_ms=50.0, percentile="median")
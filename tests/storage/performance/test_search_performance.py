@@ -0,0 +1,74 @@
+"""Performance comparison of the full-text search index against LIKE scans.
+
+Benchmarks for:
+- Client search with invoice counts (``ilike`` + ``len(c.fatture)`` vs index)
+- Invoice search by client name
+
+Run with: pytest tests/storage/performance/test_search_performance.py -v -m performance
+"""
+
+import pytest
+
+from openfatture.storage.database.models import Cliente, Fattura
+from openfatture.storage.search import SearchIndex
+from tests.performance.utils import assert_performance_target, measure_sync_function
+
+
+def _legacy_client_search(session, query: str, limit: int = 10) -> list[dict]:
+    pattern = f"%{query.lower()}%"
+    clienti = (
+        session.query(Cliente)
+        .filter(
+            Cliente.denominazione.ilike(pattern)
+            | Cliente.partita_iva.ilike(pattern)
+            | Cliente.codice_fiscale.ilike(pattern)
+        )
+        .order_by(Cliente.denominazione)
+        .limit(limit)
+        .all()
+    )
+    return [{"id": c.id, "fatture_count": len(c.fatture)} for c in clienti]
+
+
+@pytest.mark.performance
+class TestSearchIndexPerformance:
+    """Compare indexed search with the LIKE queries it replaces."""
+
+    def test_client_search_vs_like_scan(self, perf_db_with_invoices_medium):
+        """Indexed client search beats the LIKE scan it replaces (target: <50ms)."""
+        session, clienti, _ = perf_db_with_invoices_medium
+        index = SearchIndex(session)
+        assert index.available()
+        query = clienti[0].denominazione.split()[0]
+
+        def legacy():
+            session.expire_all()
+            return _legacy_client_search(session, query)
+
+        def indexed():
+            session.expire_all()
+            return index.search_clients(query, limit=10)
+
+        legacy_metrics = measure_sync_function(legacy, iterations=30, warmup=5)
+        indexed_metrics = measure_sync_function(indexed, iterations=30, warmup=5)
+
+        legacy_metrics.print_summary()
+        indexed_metrics.print_summary()
+        assert indexed()
+        assert indexed_metrics.median_latency_ms < legacy_metrics.median_latency_ms
+        assert_performance_target(indexed_metrics, target_ms=50.0, percentile="median")
+
+    def test_invoice_search_by_client_name(self, perf_db_with_invoices_medium):
+        """Indexed invoice search by client name (target: <50ms)."""
+        session, clienti, _ = perf_db_with_invoices_medium
+        index = SearchIndex(session)
+        query = clienti[0].denominazione
+
+        metrics = measure_sync_function(
+            lambda: index.search_invoices(query, limit=20), iterations=30, warmup=5
+        )
+
+        metrics.print_summary()
+        expected = session.query(Fattura).filter(Fattura.cliente_id == clienti[0].id).count()
+        assert len(index.search_invoices(query, limit=20)) >= min(expected, 1)
+        assert_performance_target(metrics, target_ms=50.0, percentile="median")
@@ -0,0 +1,164 @@
+"""Tests for the denormalized per-client aggregates."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, update
+
+from openfatture.billing.application.client_commands import rebuild_client_aggregates
+from openfatture.billing.application.client_queries import get_client_details, get_client_stats
+from openfatture.storage.client_aggregates import check_client_aggregates
+from openfatture.storage.database.base import Base
+from openfatture.storage.database.models import (
+    Cliente,
+    ClienteAggregate,
+    Fattura,
+    Pagamento,
+    StatoFattura,
+    StatoPagamento,
+)
+
+
+def _fattura(cliente: Cliente, numero: str, totale: str, **kwargs) -> Fattura:
+    return Fattura(
+        numero=numero,
+        anno=2025,
+        data_emissione=kwargs.pop("data_emissione", date(2025, 1, 10)),
+        cliente_id=cliente.id,
+        totale=Decimal(totale),
+        stato=kwargs.pop("stato", StatoFattura.INVIATA),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def cliente(db_session) -> Cliente:
+    cliente = Cliente(denominazione="Rossi SRL", partita_iva="12345678903")
+    db_session.add(cliente)
+    db_session.commit()
+    return cliente
+
+
+def _aggregate(session, cliente_id: int) -> ClienteAggregate:
+    session.expire_all()
+    aggregate = session.get(ClienteAggregate, cliente_id)
+    assert aggregate is not None
+    return aggregate
+
+
+def test_new_client_has_empty_aggregate(db_session, cliente):
+    aggregate = _aggregate(db_session, cliente.id)
+
+    assert (aggregate.num_fatture, aggregate.totale_fatturato) == (0, Decimal("0.00"))
+    assert aggregate.ultima_fattura is None
+    assert aggregate.giorni_medi_pagamento is None
+
+
+def test_invoice_and_payment_writes_update_aggregate(db_session, cliente):
+    fattura = _fattura(cliente, "1", "1220.00")
+    db_session.add_all([fattura, _fattura(cliente, "2", "500.00", stato=StatoFattura.BOZZA)])
+    db_session.flush()
+    pagamento = Pagamento(
+        fattura_id=fattura.id, importo=Decimal("1220.00"), data_scadenza=date(2025, 2, 10)
+    )
+    db_session.add(pagamento)
+    db_session.commit()
+
+    aggregate = _aggregate(db_session, cliente.id)
+    assert aggregate.num_fatture == 2
+    assert aggregate.totale_fatturato == Decimal("1220.00")
+    assert aggregate.residuo == Decimal("1220.00")
+    assert aggregate.ultima_fattura == date(2025, 1, 10)
+
+    pagamento.apply_payment(Decimal("1220.00"))
+    pagamento.data_pagamento = date(2025, 2, 9)
+    db_session.commit()
+
+    aggregate = _aggregate(db_session, cliente.id)
+    assert aggregate.residuo == Decimal("0.00")
+    assert aggregate.giorni_medi_pagamento == pytest.approx(30.0)
+
+
+def test_moving_an_invoice_refreshes_both_clients(db_session, cliente):
+    other = Cliente(denominazione="Bianchi SpA", partita_iva="98765432109")
+    fattura = _fattura(cliente, "1", "100.00")
+    db_session.add_all([other, fattura])
+    db_session.commit()
+
+    fattura.cliente_id = other.id
+    db_session.commit()
+
+    assert _aggregate(db_session, cliente.id).num_fatture == 0
+    assert _aggregate(db_session, other.id).num_fatture == 1
+
+
+def test_checker_reports_and_rebuild_repairs_drift(db_session, cliente):
+    db_session.add(_fattura(cliente, "1", "100.00"))
+    db_session.commit()
+    connection = db_session.connection()
+    assert check_client_aggregates(connection) == []
+
+    # Bulk SQL bypasses the ORM hooks
+    db_session.execute(update(Fattura).values(totale=Decimal("150.00")))
+    mismatches = check_client_aggregates(connection)
+
+    assert [(m.cliente_id, m.field) for m in mismatches] == [(cliente.id, "totale_fatturato")]
+    assert mismatches[0].expected == Decimal("150.00")
+
+
+def test_table_is_backfilled_when_created():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(
+        engine, tables=[t for t in Base.metadata.sorted_tables if t.name != "cliente_aggregates"]
+    )
+    with engine.begin() as conn:
+        conn.execute(Cliente.__table__.insert(), [{"denominazione": "Rossi SRL"}])
+        conn.execute(
+            Fattura.__table__.insert(),
+            [
+                {
+                    "numero": "1",
+                    "anno": 2025,
+                    "data_emissione": date(2025, 1, 10),
+                    "cliente_id": 1,
+                    "totale": Decimal("100.00"),
+                    "stato": StatoFattura.INVIATA.name,
+                }
+            ],
+        )
+
+    Base.metadata.create_all(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(ClienteAggregate.__table__.select()).one().num_fatture == 1
+        assert check_client_aggregates(conn) == []
+    engine.dispose()
+
+
+def test_queries_and_rebuild_command_read_aggregates(runtime_session, seed_fattura):
+    seed_fattura.stato = StatoFattura.INVIATA
+    runtime_session.add(
+        Pagamento(
+            fattura_id=seed_fattura.id,
+            importo=Decimal("1220.00"),
+            importo_pagato=Decimal("200.00"),
+            stato=StatoPagamento.PAGATO_PARZIALE,
+            data_scadenza=date(2025, 2, 15),
+        )
+    )
+    runtime_session.commit()
+
+    stats = get_client_stats()
+    assert stats["totale_clienti"] == 1
+    assert stats["con_pec"] == 1
+    assert stats["fatturato_totale"] == 1220.0
+    assert stats["residuo_totale"] == 1020.0
+
+    details = get_client_details(seed_fattura.cliente_id)
+    assert details["fatture_count"] == 1
+    assert details["totali"]["residuo"] == 1020.0
+    assert [f["numero"] for f in details["fatture_recenti"]] == ["1"]
+
+    assert rebuild_client_aggregates(check_only=True) == {"success": True, "mismatches": []}
+    assert rebuild_client_aggregates()["rebuilt"] == 1
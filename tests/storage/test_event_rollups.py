@@ -0,0 +1,179 @@
+"""Tests for the hourly event rollups and SQL-side event counting."""
+
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.orm import Session
+
+from openfatture.events.repository import EventRepository
+from openfatture.storage import side_tables
+from openfatture.storage.database.base import Base
+from openfatture.storage.database.models import EventLog, EventRollup
+from openfatture.storage.event_rollups import count_events, rebuild_event_rollups
+from openfatture.storage.search import SearchIndex
+
+BASE = datetime(2025, 3, 10, 8, 0, tzinfo=UTC)
+# (minutes after BASE, event type, entity type)
+EVENTS = [
+    (5, "InvoiceCreatedEvent", "invoice"),
+    (20, "InvoiceCreatedEvent", "invoice"),
+    (59, "InvoiceSentEvent", "invoice"),
+    (60, "ClientCreatedEvent", "client"),
+    (95, "InvoiceCreatedEvent", "invoice"),
+    (130, "AICommandStartedEvent", None),
+    (24 * 60 + 10, "InvoiceCreatedEvent", "invoice"),
+    (40 * 24 * 60, "ClientCreatedEvent", "client"),
+]
+
+
+def _event(minutes: int, event_type: str, entity_type: str | None, payload: str = "{}"):
+    return EventLog(
+        event_id=str(uuid4()),
+        event_type=event_type,
+        event_data=payload,
+        occurred_at=BASE + timedelta(minutes=minutes),
+        entity_type=entity_type,
+        entity_id=1 if entity_type else None,
+    )
+
+
+@pytest.fixture
+def events(db_session) -> list[EventLog]:
+    events = [_event(*spec) for spec in EVENTS]
+    db_session.add_all(events)
+    db_session.commit()
+    return events
+
+
+def _rollups(session: Session) -> dict[tuple[datetime, str, str], int]:
+    session.expire_all()
+    return {
+        (row.bucket_start, row.event_type, row.entity_type): row.event_count
+        for row in session.scalars(select(EventRollup))
+    }
+
+
+def _expected(start: datetime | None, end: datetime | None, key) -> Counter:
+    counts: Counter = Counter()
+    for minutes, event_type, entity_type in EVENTS:
+        occurred_at = BASE + timedelta(minutes=minutes)
+        if (start is None or occurred_at >= start) and (end is None or occurred_at <= end):
+            counts[key(occurred_at, event_type, entity_type)] += 1
+    return counts
+
+
+def test_flush_increments_hourly_buckets(db_session, events):
+    rollups = _rollups(db_session)
+
+    hour = BASE.replace(tzinfo=None)
+    assert rollups[(hour, "InvoiceCreatedEvent", "invoice")] == 2
+    assert rollups[(hour + timedelta(hours=1), "InvoiceCreatedEvent", "invoice")] == 1
+    assert rollups[(hour + timedelta(hours=2), "AICommandStartedEvent", "")] == 1
+    assert sum(rollups.values()) == len(EVENTS)
+
+    db_session.add(_event(30, "InvoiceCreatedEvent", "invoice"))
+    db_session.delete(events[2])
+    db_session.commit()
+
+    rollups = _rollups(db_session)
+    assert rollups[(hour, "InvoiceCreatedEvent", "invoice")] == 3
+    assert rollups[(hour, "InvoiceSentEvent", "invoice")] == 0
+
+
+@pytest.mark.parametrize(
+    ("start", "end"),
+    [
+        (None, None),
+        (BASE + timedelta(minutes=10), None),
+        (None, BASE + timedelta(minutes=100)),
+        (BASE + timedelta(minutes=10), BASE + timedelta(minutes=100)),
+        (BASE + timedelta(minutes=20), BASE + timedelta(minutes=59)),
+        (BASE + timedelta(hours=1), BASE + timedelta(hours=2)),
+    ],
+)
+def test_counts_are_exact_at_partial_hours(db_session, events, start, end):
+    by_day = count_events(db_session, period="day", start=start, end=end)
+    assert by_day == {
+        (day,): n
+        for (day,), n in _expected(start, end, lambda at, *_: (at.strftime("%Y-%m-%d"),)).items()
+    }
+
+    by_type = count_events(db_session, by=("event_type", "entity_type"), start=start, end=end)
+    assert by_type == dict(_expected(start, end, lambda _, *columns: tuple(columns)))
+
+
+def test_counts_without_rollup_table_group_event_log(db_session, events, monkeypatch):
+    expected = count_events(db_session, period="hour", by=("entity_type",))
+    db_session.execute(delete(EventRollup))
+
+    with monkeypatch.context() as patch:
+        patch.setitem(side_tables._available[db_session.get_bind()], "event_rollups", False)
+        assert count_events(db_session, period="hour", by=("entity_type",)) == expected
+
+    assert rebuild_event_rollups(db_session.connection()) == 7
+    assert count_events(db_session, period="hour", by=("entity_type",)) == expected
+
+
+def test_count_events_rejects_unknown_grouping(db_session):
+    with pytest.raises(ValueError, match="period"):
+        count_events(db_session, period="week")
+    with pytest.raises(ValueError, match="entity_id"):
+        count_events(db_session, by=("entity_id",))
+
+
+def test_repository_reports(db_session, events):
+    repo = EventRepository(db_session)
+
+    assert repo.count(event_type="InvoiceCreatedEvent") == 4
+    assert (
+        repo.count(start_date=BASE + timedelta(minutes=30), end_date=BASE + timedelta(days=1)) == 4
+    )
+    assert repo.count_by_period("month") == [("2025-03", 7), ("2025-04", 1)]
+    assert repo.count_by_period("hour", entity_type="client") == [
+        ("2025-03-10 09:00", 1),
+        ("2025-04-19 08:00", 1),
+    ]
+
+    stats = repo.get_stats()
+    assert stats["total_events"] == len(EVENTS)
+    assert stats["events_by_entity"] == {"invoice": 5, "client": 2}
+    assert stats["oldest_event"]["event_type"] == "InvoiceCreatedEvent"
+
+    assert repo.count_by_entity("invoice") == [(1, 5)]
+
+
+def test_payload_search_uses_trigram_index(db_session):
+    db_session.add_all(
+        [
+            _event(0, "InvoiceSentEvent", "invoice", '{"recipient": "Rossi SRL"}'),
+            _event(1, "InvoiceSentEvent", "invoice", '{"recipient": "Bianchi SpA"}'),
+        ]
+    )
+    db_session.commit()
+
+    assert SearchIndex(db_session).available()
+    repo = EventRepository(db_session)
+    assert [e.event_data for e in repo.search("rossi")] == ['{"recipient": "Rossi SRL"}']
+    assert len(repo.search("SRL")) == 1
+    assert len(repo.search("recipient")) == 2
+    assert repo.search("Verdi") == []
+
+
+def test_rollups_are_backfilled_when_created(db_session, events):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(
+        engine, tables=[t for t in Base.metadata.sorted_tables if t.name != "event_rollups"]
+    )
+    with engine.begin() as conn:
+        rows = [dict(r._mapping) for r in db_session.execute(EventLog.__table__.select())]
+        conn.execute(EventLog.__table__.insert(), rows)
+
+    Base.metadata.create_all(engine)
+
+    with engine.connect() as conn:
+        total = conn.execute(select(EventRollup.event_count)).scalars().all()
+        assert sum(total) == len(EVENTS)
+    engine.dispose()
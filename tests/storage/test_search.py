@@ -0,0 +1,161 @@
+"""Tests for the full-text search index."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from openfatture.billing.application.client_queries import search_clients
+from openfatture.billing.application.invoice_queries import search_invoices
+from openfatture.storage.database.models import Cliente, Fattura, Prodotto
+from openfatture.storage.search import (
+    SEARCH_CLIENTI,
+    SEARCH_PRODOTTI,
+    SearchIndex,
+    contains_ids,
+)
+
+
+@pytest.fixture
+def catalog(db_session):
+    rossi = Cliente(denominazione="Rossi Consulting SRL", partita_iva="12345678903")
+    bianchi = Cliente(denominazione="Bianchi Impianti SpA", codice_fiscale="BNCMRA80A01H501U")
+    db_session.add_all([rossi, bianchi])
+    db_session.flush()
+    db_session.add_all(
+        [
+            Fattura(
+                numero=str(n),
+                anno=2025,
+                data_emissione=date(2025, 1, n),
+                cliente_id=rossi.id,
+                note="Manutenzione server" if n == 1 else None,
+            )
+            for n in (1, 2, 3)
+        ]
+        + [
+            Prodotto(
+                codice="CONS-001",
+                descrizione="Consulenza sistemistica",
+                prezzo_unitario=Decimal("80.00"),
+            ),
+            Prodotto(
+                codice="HW-042",
+                descrizione="Switch di rete",
+                prezzo_unitario=Decimal("120.00"),
+            ),
+        ]
+    )
+    db_session.commit()
+    return rossi, bianchi
+
+
+def test_index_is_available_on_sqlite(db_session):
+    assert SearchIndex(db_session).available()
+
+
+def test_client_search_tolerates_typos(db_session, catalog):
+    rossi, _ = catalog
+    index = SearchIndex(db_session)
+
+    hits = index.search_clients("rosi consultng", limit=5)
+
+    assert [hit.id for hit in hits] == [rossi.id]
+    assert hits[0].fatture_count == 3
+    assert index.search_clients("BNCMRA80", limit=5)[0].denominazione == "Bianchi Impianti SpA"
+    assert index.search_clients("zzzzzz", limit=5) == []
+
+
+def test_index_follows_orm_changes(db_session, catalog):
+    rossi, bianchi = catalog
+    index = SearchIndex(db_session)
+
+    rossi.denominazione = "Verdi Consulting SRL"
+    db_session.delete(bianchi)
+    db_session.commit()
+
+    assert index.search_clients("rossi", limit=5) == []
+    assert index.search_clients("bianchi", limit=5) == []
+    assert [hit.cliente for hit in index.search_invoices("verdi", limit=5)] == [
+        "Verdi Consulting SRL"
+    ] * 3
+
+
+def test_invoice_search_ranks_note_matches(db_session, catalog):
+    hits = SearchIndex(db_session).search_invoices("manutenzone", limit=5)
+
+    assert [(hit.numero, hit.anno) for hit in hits] == [("1", 2025)]
+
+
+def test_product_contains_uses_mirror_table(db_session, catalog):
+    ids = db_session.scalars(contains_ids(SEARCH_PRODOTTI, "descrizione", "SISTEM")).all()
+
+    assert [db_session.get(Prodotto, i).codice for i in ids] == ["CONS-001"]
+    assert SearchIndex(db_session).search_products("swich", limit=5)[0].codice == "HW-042"
+
+
+def test_like_wildcards_match_literally(db_session, catalog):
+    db_session.add_all(
+        [
+            Prodotto(codice="A_B", descrizione="x", prezzo_unitario=Decimal("1.00")),
+            Prodotto(codice="AXB", descrizione="y", prezzo_unitario=Decimal("1.00")),
+        ]
+    )
+    db_session.commit()
+
+    ids = db_session.scalars(contains_ids(SEARCH_PRODOTTI, "codice", "a_b")).all()
+    assert [db_session.get(Prodotto, i).codice for i in ids] == ["A_B"]
+    assert db_session.scalars(contains_ids(SEARCH_PRODOTTI, "codice", "100%")).all() == []
+    # Shorter than a trigram: substring scan of the mirror
+    assert SearchIndex(db_session, min_score=0).rank(SEARCH_CLIENTI, "%", limit=5) == {}
+
+
+def test_query_functions_keep_their_output(db_session, catalog):
+    clients = search_clients("rossi", session=db_session)
+    assert clients["clienti"][0]["fatture_count"] == 3
+    assert set(clients["clienti"][0]) == {
+        "id",
+        "denominazione",
+        "partita_iva",
+        "codice_fiscale",
+        "email",
+        "fatture_count",
+    }
+    assert search_clients(None, session=db_session)["count"] == 2
+
+    invoices = search_invoices("server", anno=2025, session=db_session)
+    assert [f["numero"] for f in invoices["fatture"]] == ["1"]
+    assert search_invoices("server", anno=2024, session=db_session)["count"] == 0
+
+
+def test_invoice_query_filters_apply_before_ranking(db_session, catalog):
+    rossi, bianchi = catalog
+    db_session.add_all(
+        Fattura(
+            numero=str(n),
+            anno=2024,
+            data_emissione=date(2024, 1, 1),
+            cliente_id=rossi.id,
+            note="Manutenzione server",
+        )
+        for n in range(100, 400)
+    )
+    db_session.add(
+        Fattura(
+            numero="9",
+            anno=2025,
+            data_emissione=date(2025, 2, 1),
+            cliente_id=bianchi.id,
+            note="Rinnovo licenze e manutenzione server della sede di Bologna",
+        )
+    )
+    db_session.commit()
+
+    invoices = search_invoices("manutenzione server", cliente_id=bianchi.id, session=db_session)
+    assert [f["numero"] for f in invoices["fatture"]] == ["9"]
+    assert search_invoices("server", anno=2025, limit=5, session=db_session)["count"] == 2
+
+
+def test_invoice_query_matches_numero_and_note_only(db_session, catalog):
+    assert search_invoices("rossi consulting", session=db_session)["count"] == 0
+    assert SearchIndex(db_session).search_invoices("rossi consulting", limit=5)
@@ -0,0 +1,48 @@
+"""Tests for the shared side-table maintenance hooks."""
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from openfatture.storage import side_tables
+from openfatture.storage.database.models import Cliente
+from openfatture.storage.side_tables import (
+    SideTable,
+    register_side_table,
+    set_table_available,
+)
+
+
+def test_one_flush_hook_dispatches_to_every_side_table():
+    assert event.contains(Session, "after_flush", side_tables._sync_after_flush)
+    assert {"payment_due_index", "search_index", "cliente_aggregates", "event_rollups"} <= set(
+        side_tables._registry
+    )
+
+
+def test_sync_runs_only_for_relevant_flushes_and_present_tables(db_session, monkeypatch):
+    synced: list[set[int]] = []
+    monkeypatch.setattr(side_tables, "_registry", dict(side_tables._registry))
+    register_side_table(
+        SideTable(
+            name="clienti_shadow",
+            collect=lambda flushed: {o.id for o in flushed if isinstance(o, Cliente)},
+            sync=lambda connection, ids: synced.append(ids),
+            rebuild=lambda connection: None,
+        )
+    )
+    engine = db_session.get_bind()
+
+    set_table_available(engine, "clienti_shadow", False)
+    db_session.add(Cliente(denominazione="Rossi SRL"))
+    db_session.commit()
+    assert synced == []
+
+    set_table_available(engine, "clienti_shadow", True)
+    cliente = Cliente(denominazione="Bianchi SpA")
+    db_session.add(cliente)
+    db_session.commit()
+    assert synced == [{cliente.id}]
+
+    db_session.flush()
+    assert synced == [{cliente.id}]
+    set_table_available(engine, "clienti_shadow", None)
@@ -0,0 +1,392 @@
+"""Unit tests for the email outbox, the pooled SMTP worker and the CSS inliner."""
+
+import re
+import smtplib
+import sqlite3
+import time
+from email import message_from_bytes
+from threading import Lock
+
+import pytest
+
+from openfatture.billing.batch.processor import BatchResult
+from openfatture.payment.application.notifications.notifier import (
+    EmailNotifier,
+    SMTPConfig,
+)
+from openfatture.platform.email import (
+    PEC_ROUTE,
+    EmailOutbox,
+    OutboxStatus,
+    OutboxWorker,
+    SMTPConnectionPool,
+    SMTPServerConfig,
+)
+from openfatture.platform.email.inliner import inline_css
+from openfatture.platform.email.models import EmailMessage
+from openfatture.platform.email.renderer import TemplateRenderer
+from openfatture.platform.email.sender import TemplatePECSender
+from openfatture.platform.retry import RetryConfig
+
+pytestmark = pytest.mark.unit
+
+
+class FakeSMTP:
+    """In-memory SMTP connection recording the delivered messages."""
+
+    lock = Lock()
+    delivered: list[tuple[str, list[str], bytes]] = []
+    instances: list["FakeSMTP"] = []
+    # Recipient -> exception raised when sending to it
+    failures: dict[str, Exception] = {}
+
+    def __init__(self, host: str = "") -> None:
+        self.host = host
+        self.sent: list[str] = []
+        self.closed = False
+        self.drop_next = False
+        with self.lock:
+            self.instances.append(self)
+
+    def sendmail(self, sender: str, recipients: list[str], message: bytes) -> dict:
+        if self.closed or self.drop_next:
+            self.closed = True
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        error = self.failures.get(recipients[0])
+        if error is not None:
+            raise error
+        time.sleep(0.001)
+        with self.lock:
+            self.delivered.append((sender, recipients, message))
+        self.sent.extend(recipients)
+        return {}
+
+    def quit(self) -> None:
+        self.closed = True
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    monkeypatch.setattr(FakeSMTP, "delivered", [])
+    monkeypatch.setattr(FakeSMTP, "instances", [])
+    monkeypatch.setattr(FakeSMTP, "failures", {})
+    monkeypatch.setattr(SMTPServerConfig, "connect", lambda self: FakeSMTP(self.host))
+    return FakeSMTP
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = EmailOutbox(
+        tmp_path / "outbox.db",
+        retry=RetryConfig(max_retries=2, base_delay=30.0, max_delay=60.0, jitter=False),
+    )
+    yield outbox
+    outbox.close()
+
+
+def _email(recipient: str = "cliente@example.com", subject: str = "Promemoria") -> EmailMessage:
+    return EmailMessage(
+        subject=subject,
+        html_body="<p>Fattura in scadenza</p>",
+        text_body="Fattura in scadenza",
+        recipients=[recipient],
+    )
+
+
+def _pool(max_size: int = 2, host: str = "smtp.example.com") -> SMTPConnectionPool:
+    return SMTPConnectionPool(SMTPServerConfig(host, 465), max_size=max_size)
+
+
+def _sent_by(fake_smtp, host: str) -> list[str]:
+    return [r for smtp in fake_smtp.instances if smtp.host == host for r in smtp.sent]
+
+
+class TestEmailOutbox:
+    def test_enqueue_and_claim(self, outbox):
+        first = outbox.enqueue(_email(), sender="studio@pec.example.com")
+        outbox.enqueue(_email("altro@example.com"), sender="studio@pec.example.com")
+
+        entries = outbox.claim(limit=10)
+
+        assert [e.id for e in entries][0] == first
+        assert entries[1].recipients == ["altro@example.com"]
+        assert entries[0].attempts == 1
+        message = message_from_bytes(entries[0].message)
+        assert message["Subject"] == "Promemoria"
+        assert message["Message-ID"].endswith("@pec.example.com>")
+        # Leased entries are not handed out twice
+        assert outbox.claim(limit=10) == []
+        assert outbox.counts()["sending"] == 2
+
+    def test_dedup_key_makes_enqueue_idempotent(self, outbox):
+        first = outbox.enqueue(_email(), sender="a@example.com", dedup_key="reminder:1")
+        second = outbox.enqueue(_email(), sender="a@example.com", dedup_key="reminder:1")
+
+        assert first == second
+        assert outbox.counts()["pending"] == 1
+
+    def test_failed_delivery_is_retried_with_backoff(self, outbox):
+        entry_id = outbox.enqueue(_email(), sender="a@example.com")
+
+        outbox.claim()
+        assert outbox.mark_failed(entry_id, "451 try later") == OutboxStatus.PENDING
+        # Not due before the backoff delay
+        assert outbox.claim() == []
+
+        with outbox._lock:
+            row = outbox._conn.execute(
+                "SELECT next_attempt_at - ?, last_error FROM email_outbox WHERE id = ?",
+                (time.time(), entry_id),
+            ).fetchone()
+        assert 25 < row[0] <= 30
+        assert row[1] == "451 try later"
+
+    def test_attempts_are_bounded(self, outbox):
+        entry_id = outbox.enqueue(_email(), sender="a@example.com")
+
+        statuses = []
+        for _ in range(3):
+            outbox._conn.execute("UPDATE email_outbox SET next_attempt_at = 0")
+            assert len(outbox.claim()) == 1
+            statuses.append(outbox.mark_failed(entry_id, "timeout"))
+
+        assert statuses == [OutboxStatus.PENDING, OutboxStatus.PENDING, OutboxStatus.FAILED]
+        assert outbox.mark_failed(entry_id, "550 no such user", permanent=True) == "failed"
+
+    def test_expired_lease_is_reclaimed_after_crash(self, outbox):
+        outbox.enqueue(_email(), sender="a@example.com")
+        assert len(outbox.claim(lease=0.0)) == 1
+
+        # The worker died: the entry is handed out again, counting the attempt
+        reclaimed = outbox.claim()
+        assert len(reclaimed) == 1
+        assert reclaimed[0].attempts == 2
+
+        outbox.mark_sent(reclaimed[0].id)
+        assert outbox.counts() == {"pending": 0, "sending": 0, "sent": 1, "failed": 0}
+        assert outbox.purge_sent(older_than=0) == 1
+
+    def test_claim_filters_by_route(self, outbox):
+        outbox.enqueue(_email("pec@example.com"), sender="a@example.com")
+        outbox.enqueue(_email("reminder@example.com"), sender="b@example.com", route="reminders")
+
+        [entry] = outbox.claim(routes=["reminders"])
+
+        assert (entry.route, entry.recipients) == ("reminders", ["reminder@example.com"])
+        assert [e.route for e in outbox.claim()] == [PEC_ROUTE]
+
+    def test_outbox_without_routes_is_migrated(self, tmp_path):
+        path = tmp_path / "old.db"
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            "CREATE TABLE email_outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "dedup_key TEXT UNIQUE, sender TEXT NOT NULL, recipients TEXT NOT NULL, "
+            "message BLOB NOT NULL, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "next_attempt_at REAL NOT NULL, lease_expires_at REAL, last_error TEXT, "
+            "created_at REAL NOT NULL, sent_at REAL);"
+            "INSERT INTO email_outbox (sender, recipients, message, status, next_attempt_at, "
+            "created_at) VALUES ('a@example.com', 'c@example.com', x'00', 'pending', 0, 0);"
+        )
+        conn.close()
+
+        outbox = EmailOutbox(path)
+        [entry] = outbox.claim()
+        outbox.close()
+
+        assert entry.route == PEC_ROUTE
+
+
+class TestOutboxWorker:
+    def test_drains_over_pooled_connections(self, outbox, fake_smtp):
+        for n in range(20):
+            outbox.enqueue(_email(f"cliente{n}@example.com"), sender="a@example.com")
+        pool = _pool(max_size=3)
+
+        result = OutboxWorker(outbox, {PEC_ROUTE: pool}, batch_size=7).drain()
+
+        assert (result.sent, result.retried, result.failed) == (20, 0, 0)
+        assert len(fake_smtp.delivered) == 20
+        assert pool.connections_opened <= 3
+        assert outbox.counts()["sent"] == 20
+
+        # A second drain has nothing to do
+        assert OutboxWorker(outbox, {PEC_ROUTE: pool}).drain().processed == 0
+        pool.close()
+        assert all(smtp.closed for smtp in fake_smtp.instances)
+
+    def test_reconnects_when_server_drops_connection(self, outbox, fake_smtp):
+        pool = _pool(max_size=1)
+        outbox.enqueue(_email(), sender="a@example.com")
+        OutboxWorker(outbox, {PEC_ROUTE: pool}).drain()
+        fake_smtp.instances[0].drop_next = True
+
+        outbox.enqueue(_email("altro@example.com"), sender="a@example.com")
+        result = OutboxWorker(outbox, {PEC_ROUTE: pool}).drain()
+
+        assert result.sent == 1
+        assert pool.connections_opened == 2
+
+    def test_rejections_are_retried_or_failed(self, outbox, fake_smtp):
+        fake_smtp.failures["temp@example.com"] = smtplib.SMTPDataError(451, b"try later")
+        fake_smtp.failures["gone@example.com"] = smtplib.SMTPRecipientsRefused(
+            {"gone@example.com": (550, b"no such user")}
+        )
+        for recipient in ("ok@example.com", "temp@example.com", "gone@example.com"):
+            outbox.enqueue(_email(recipient), sender="a@example.com")
+
+        result = OutboxWorker(outbox, {PEC_ROUTE: _pool()}).drain()
+
+        assert (result.sent, result.retried, result.failed) == (1, 1, 1)
+        assert outbox.counts() == {"pending": 1, "sending": 0, "sent": 1, "failed": 1}
+
+    def test_max_messages_and_validation(self, outbox, fake_smtp):
+        for n in range(5):
+            outbox.enqueue(_email(f"c{n}@example.com"), sender="a@example.com")
+
+        assert OutboxWorker(outbox, {PEC_ROUTE: _pool()}).drain(max_messages=2).sent == 2
+        assert outbox.counts()["pending"] == 3
+        with pytest.raises(ValueError):
+            OutboxWorker(outbox, {PEC_ROUTE: _pool()}, batch_size=0)
+        with pytest.raises(ValueError):
+            OutboxWorker(outbox, {})
+        with pytest.raises(ValueError):
+            _pool(max_size=0)
+
+    def test_entries_are_sent_through_the_server_of_their_route(self, outbox, fake_smtp):
+        outbox.enqueue(_email("pec@example.com"), sender="studio@pec.example.com")
+        outbox.enqueue(_email("reminder@example.com"), sender="noreply@example.com", route="r")
+        pools = {PEC_ROUTE: _pool(host="smtp.pec.example.com"), "r": _pool(host="smtp.example.com")}
+
+        # Entries of routes the worker has no pool for are left alone
+        assert OutboxWorker(outbox, {"r": pools["r"]}).drain().sent == 1
+        assert outbox.counts()["pending"] == 1
+
+        assert OutboxWorker(outbox, pools).drain().sent == 1
+        assert _sent_by(fake_smtp, "smtp.pec.example.com") == ["pec@example.com"]
+        assert _sent_by(fake_smtp, "smtp.example.com") == ["reminder@example.com"]
+
+
+class TestCSSInliner:
+    def test_inlines_by_specificity_and_keeps_inline_styles(self):
+        css = """
+            p { color: black; margin: 0 }
+            .note { color: red }
+            div .note { font-weight: bold }
+            td > p { padding: 2px }
+        """
+        html = '<div><p class="note" style="margin: 4px">Hi</p></div><td><p>x</p></td>'
+
+        result = inline_css(html, css)
+
+        assert 'style="color: red; font-weight: bold; margin: 4px"' in result
+        assert '<p style="color: black; margin: 0; padding: 2px">x</p>' in result
+
+    def test_leaves_non_static_rules_to_the_style_block(self):
+        css = """
+            a:hover { color: red }
+            @media (max-width: 600px) { p { font-size: 12px } }
+            .alert { padding: 5px }
+            .badge { color: green !important }
+        """
+        html = (
+            '<a href="#">x</a><p>y</p>'
+            '<div class="alert {% if ok %}alert-success{% endif %}">z</div>'
+            '<span class="badge" style="color: blue">b</span>'
+        )
+
+        result = inline_css(html, css)
+
+        assert '<a href="#">x</a><p>y</p>' in result
+        assert '<div class="alert {% if ok %}alert-success{% endif %}">' in result
+        assert 'style="color: green !important; color: blue"' in result
+
+    def test_does_not_inline_properties_of_kept_rules(self):
+        css = """
+            td { padding: 8px 0; border-bottom: 1px solid; color: black }
+            tr:last-child td { padding-top: 12px; border-bottom: 2px solid }
+            li + li { margin: 4px }
+            li { margin: 0; color: gray }
+            @media (max-width: 600px) { td { color: red !important } }
+        """
+        html = "<table><tr><td>a</td></tr></table><ul><li>x</li></ul>"
+
+        result = inline_css(html, css)
+
+        # Kept rules override the shorthands; !important ones win over inline styles
+        assert '<td style="color: black">a</td>' in result
+        assert '<li style="color: gray">x</li>' in result
+
+
+class TestCompiledTemplates:
+    def test_rendered_html_has_inline_styles(self, test_settings):
+        html = TemplateRenderer(test_settings).render_html(
+            "batch/riepilogo_batch.html",
+            {"result": BatchResult(total=2, succeeded=2), "operation_type": "send"},
+        )
+
+        assert '<table class="summary-table" style="width: 100%' in html
+        assert "<style>" in html  # Kept for dynamic classes and @media rules
+
+    def test_summary_table_last_row_keeps_its_style_block_rules(self, test_settings):
+        html = TemplateRenderer(test_settings).render_html(
+            "batch/riepilogo_batch.html",
+            {"result": BatchResult(total=2, succeeded=2), "operation_type": "send"},
+        )
+
+        # tr:last-child td sets these from the <style> block: inline values would win
+        summary = html.split('<table class="summary-table"', 1)[1].split("</table>", 1)[0]
+        cells = re.findall(r"<td[^>]*>", summary)
+        assert cells
+        assert all("border-bottom" not in cell and "padding" not in cell for cell in cells)
+        assert "table.summary-table tr:last-child td" in html
+
+    def test_templates_are_compiled_once_per_theme(self, test_settings, mocker):
+        context = {"result": BatchResult(total=1, succeeded=1), "operation_type": "send"}
+        TemplateRenderer(test_settings).render_html("batch/riepilogo_batch.html", context)
+
+        renderer = TemplateRenderer(test_settings)
+        compile_spy = mocker.spy(renderer.env, "compile")
+        renderer.render_html("batch/riepilogo_batch.html", context)
+
+        assert compile_spy.call_count == 0
+
+
+class TestSenderOutbox:
+    def test_batch_summary_is_queued(self, test_settings, outbox):
+        sender = TemplatePECSender(test_settings, outbox=outbox)
+
+        success, error = sender.send_batch_summary(
+            BatchResult(total=1, succeeded=1), "send", ["admin@example.com"]
+        )
+
+        assert (success, error) == (True, None)
+        [entry] = outbox.claim()
+        assert entry.route == PEC_ROUTE
+        assert entry.sender == test_settings.pec_address
+        assert entry.recipients == ["admin@example.com"]
+
+
+class TestReminderOutbox:
+    @pytest.mark.asyncio
+    async def test_flush_sends_queued_reminders_through_the_notifier_server(
+        self, test_settings, outbox, fake_smtp
+    ):
+        smtp_config = SMTPConfig(
+            host="smtp.reminders.example.com", from_email="noreply@example.com"
+        )
+        notifier = EmailNotifier(smtp_config, settings=test_settings, outbox=outbox)
+        outbox.enqueue(_email("pec@example.com"), sender=test_settings.pec_address)
+
+        await notifier._send_email("cliente@example.com", "Promemoria", "<p>x</p>", "x")
+        assert fake_smtp.delivered == []
+        await notifier.flush()
+
+        assert _sent_by(fake_smtp, "smtp.reminders.example.com") == ["cliente@example.com"]
+        assert fake_smtp.delivered[0][0] == "noreply@example.com"
+        # The PEC message waits for the PEC worker
+        assert outbox.counts()["pending"] == 1
+        [entry] = outbox.claim()
+        assert entry.route == PEC_ROUTE
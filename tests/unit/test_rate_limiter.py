@@ -1,14 +1,21 @@
 """Unit tests for rate limiter."""
 
+import asyncio
+import threading
 import time
 from unittest.mock import patch
 
 import pytest
 
 from openfatture.platform.rate_limiter import (
+    AsyncGCRALimiter,
+    AsyncRateLimiter,
+    AsyncTokenBucket,
     ExponentialBackoff,
+    KeyedRateLimiter,
     RateLimiter,
     SlidingWindowRateLimiter,
+    SQLiteLimiterState,
     retry_with_backoff,
 )
 
@@ -297,3 +304,217 @@ class TestRetryWithBackoff:
 
         # Should have called sleep twice (not after last attempt)
         assert mock_sleep.call_count == 2
+
+
+class TestAsyncTokenBucket:
+    """Tests for AsyncTokenBucket."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_refill_rate(self):
+        """Burst is served at once, then one token every 1/rate seconds."""
+        limiter = AsyncTokenBucket(rate=20, burst=3)
+
+        start = time.monotonic()
+        for _ in range(5):
+            assert await limiter.acquire() is True
+        elapsed = time.monotonic() - start
+
+        # 3 immediate, 2 refilled at 50ms each
+        assert 0.09 <= elapsed < 0.3
+
+    @pytest.mark.asyncio
+    async def test_waiters_are_served_in_fifo_order(self):
+        """Parked waiters are woken in arrival order."""
+        limiter = AsyncTokenBucket(rate=100, burst=1)
+        order: list[int] = []
+
+        async def worker(i: int) -> None:
+            await limiter.acquire()
+            order.append(i)
+
+        await asyncio.gather(*(worker(i) for i in range(10)))
+
+        assert order == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_try_acquire_does_not_overtake_waiters(self):
+        """A non-blocking caller cannot jump the queue."""
+        limiter = AsyncTokenBucket(rate=10, burst=1)
+        assert limiter.try_acquire() is True
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.try_acquire() is False
+        assert await waiter is True
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        """acquire returns False when the wait exceeds the timeout."""
+        limiter = AsyncTokenBucket(rate=1, burst=1)
+        await limiter.acquire()
+
+        start = time.monotonic()
+        assert await limiter.acquire(timeout=0.05) is False
+        assert time.monotonic() - start < 0.05
+
+        # Queued behind another waiter, the timeout is waited out
+        first = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert await limiter.acquire(timeout=0.05) is False
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        assert not limiter._waiters
+
+    @pytest.mark.asyncio
+    async def test_cancelled_head_waiter_passes_turn(self):
+        """Cancelling the head waiter wakes the next one on time."""
+        limiter = AsyncTokenBucket(rate=20, burst=1)
+        await limiter.acquire()
+
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        first.cancel()
+
+        start = time.monotonic()
+        assert await second is True
+        assert time.monotonic() - start < 0.2
+
+    def test_base_class_is_abstract(self):
+        """Limiters must implement _reserve."""
+        with pytest.raises(TypeError):
+            AsyncRateLimiter(rate=1, burst=1)  # type: ignore[abstract]
+
+    def test_invalid_arguments(self):
+        """Rates, bursts and token counts are validated."""
+        with pytest.raises(ValueError):
+            AsyncTokenBucket(rate=0, burst=1)
+        with pytest.raises(ValueError):
+            AsyncTokenBucket(rate=1, burst=0)
+        with pytest.raises(ValueError):
+            AsyncTokenBucket(rate=1, burst=2).try_acquire(3)
+
+    def test_get_wait_time_and_reset(self):
+        """get_wait_time does not consume tokens; reset refills."""
+        limiter = AsyncTokenBucket(rate=2, burst=1)
+        assert limiter.get_wait_time() == 0
+        assert limiter.try_acquire() is True
+        assert limiter.get_wait_time() == pytest.approx(0.5, abs=0.05)
+        assert limiter.get_wait_time() == pytest.approx(0.5, abs=0.05)
+
+        limiter.reset()
+        assert limiter.try_acquire() is True
+
+    def test_usable_across_event_loops(self):
+        """Sequential asyncio.run calls share the limiter."""
+        limiter = AsyncTokenBucket(rate=1000, burst=1)
+
+        for _ in range(3):
+            assert asyncio.run(limiter.acquire()) is True
+
+
+class TestAsyncGCRALimiter:
+    """Tests for AsyncGCRALimiter."""
+
+    def test_burst_and_spacing(self):
+        """Up to burst requests pass ahead of schedule, then 1/rate spacing."""
+        limiter = AsyncGCRALimiter(rate=10, burst=3)
+
+        assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+        assert limiter.get_wait_time() == pytest.approx(0.1, abs=0.02)
+
+    @pytest.mark.asyncio
+    async def test_waiters_spaced_by_emission_interval(self):
+        """Waiters are released one emission interval apart."""
+        limiter = AsyncGCRALimiter(rate=50, burst=1)
+        times: list[float] = []
+
+        async def worker() -> None:
+            await limiter.acquire()
+            times.append(time.monotonic())
+
+        await asyncio.gather(*(worker() for _ in range(6)))
+
+        gaps = [b - a for a, b in zip(times, times[1:], strict=False)]
+        assert all(gap >= 0.015 for gap in gaps)
+        assert times[-1] - times[0] < 0.3
+
+
+class TestKeyedRateLimiter:
+    """Tests for KeyedRateLimiter."""
+
+    def test_keys_are_independent(self):
+        """Each key has its own bucket."""
+        limiter = KeyedRateLimiter(rate=1, burst=2)
+
+        assert limiter.try_acquire("openai") is True
+        assert limiter.try_acquire("openai") is True
+        assert limiter.try_acquire("openai") is False
+        assert limiter.try_acquire("anthropic") is True
+
+    def test_configure_overrides_key(self):
+        """configure sets the rate and burst of one key."""
+        limiter = KeyedRateLimiter(rate=1, burst=1, algorithm="gcra")
+        limiter.configure("search_invoices", rate=1, burst=3)
+
+        assert isinstance(limiter.limiter("search_invoices"), AsyncGCRALimiter)
+        assert sum(limiter.try_acquire("search_invoices") for _ in range(5)) == 3
+        assert sum(limiter.try_acquire("other") for _ in range(5)) == 1
+
+    def test_unknown_algorithm(self):
+        """Unknown algorithms are rejected."""
+        with pytest.raises(ValueError, match="Unknown"):
+            KeyedRateLimiter(rate=1, burst=1, algorithm="leaky")  # type: ignore[arg-type]
+
+
+class TestSQLiteLimiterState:
+    """Tests for the shared SQLite state."""
+
+    @pytest.mark.parametrize("algorithm", ["token_bucket", "gcra"])
+    def test_instances_share_quota(self, tmp_path, algorithm):
+        """Limiters on the same database file draw from one quota."""
+        db = tmp_path / "limits.db"
+        first = KeyedRateLimiter(
+            rate=0.1, burst=3, algorithm=algorithm, state=SQLiteLimiterState(db)
+        )
+        second = KeyedRateLimiter(
+            rate=0.1, burst=3, algorithm=algorithm, state=SQLiteLimiterState(db)
+        )
+
+        granted = [first.try_acquire("openai"), second.try_acquire("openai")]
+        granted += [first.try_acquire("openai"), second.try_acquire("openai")]
+
+        assert granted == [True, True, True, False]
+        assert first.get_wait_time("openai") > 0
+        assert second.try_acquire("ollama") is True
+
+    @pytest.mark.asyncio
+    async def test_shared_waiters(self, tmp_path):
+        """Waiters re-check the shared state when their timer fires."""
+        db = tmp_path / "limits.db"
+        first = AsyncTokenBucket(rate=20, burst=1, state=SQLiteLimiterState(db), key="openai")
+        second = AsyncTokenBucket(rate=20, burst=1, state=SQLiteLimiterState(db), key="openai")
+
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire() for limiter in (first, second) * 2))
+
+        # 1 immediate, 3 refilled at 50ms each
+        assert time.monotonic() - start >= 0.14
+
+    @pytest.mark.asyncio
+    async def test_shared_reservations_run_off_the_event_loop(self, tmp_path):
+        """The BEGIN IMMEDIATE transactions of acquire run in worker threads."""
+        state = SQLiteLimiterState(tmp_path / "limits.db")
+        limiter = AsyncTokenBucket(rate=20, burst=1, state=state, key="openai")
+        threads: list[int] = []
+        update = state.update
+
+        def recording_update(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return update(*args, **kwargs)
+
+        with patch.object(state, "update", recording_update):
+            await asyncio.gather(limiter.acquire(), limiter.acquire())
+
+        assert len(threads) >= 2
+        assert threading.get_ident() not in threads
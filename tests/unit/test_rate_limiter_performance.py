@@ -0,0 +1,56 @@
+"""Contention benchmark of the rate limiters.
+
+Many coroutines contend for the same quota: the polling limiter (the previous
+approach, sleeping 100ms between attempts) against the asyncio token bucket and
+GCRA limiters, which park waiters on futures and wake them when tokens free up.
+
+Run with: pytest tests/unit/test_rate_limiter_performance.py -v -m performance -s
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from openfatture.platform.rate_limiter import (
+    AsyncGCRALimiter,
+    AsyncRateLimiter,
+    AsyncTokenBucket,
+    RateLimiter,
+)
+
+WAITERS = 200
+RATE = 1000  # tokens per second
+BURST = 10
+
+
+async def _polling_acquire(limiter: RateLimiter) -> None:
+    while not limiter.acquire(blocking=False):
+        await asyncio.sleep(0.1)
+
+
+async def _run(acquire) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(acquire() for _ in range(WAITERS)))
+    return time.perf_counter() - start
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limiter_class", [AsyncTokenBucket, AsyncGCRALimiter])
+async def test_contention_throughput(limiter_class: type[AsyncRateLimiter]):
+    """Await-based limiters serve contending waiters at the configured rate."""
+    polling = RateLimiter(max_calls=BURST, period=BURST / RATE)  # type: ignore[arg-type]
+    limiter = limiter_class(rate=RATE, burst=BURST)
+
+    polling_elapsed = await _run(lambda: _polling_acquire(polling))
+    elapsed = await _run(limiter.acquire)
+
+    ideal = (WAITERS - BURST) / RATE
+    print(
+        f"\n{WAITERS} waiters at {RATE}/s: polling {WAITERS / polling_elapsed:,.0f} acquires/s, "
+        f"{limiter_class.__name__} {WAITERS / elapsed:,.0f} acquires/s (ideal {ideal:.3f}s)"
+    )
+
+    assert elapsed < ideal * 2
+    assert elapsed * 5 < polling_elapsed